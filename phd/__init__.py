@@ -51,7 +51,8 @@ from phd.riemann.riemann import \
         RiemannBase, \
         HLL, \
         HLLC, \
-        Exact
+        Exact, \
+        Adaptive
 
 from phd.gravity.gravity_force import \
         ConstantGravity, \
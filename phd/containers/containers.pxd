@@ -7,8 +7,12 @@ cdef class CarrayContainer:
     cdef readonly dict carrays
     cdef readonly dict carray_dtypes
     cdef readonly dict carray_named_groups
+    cdef readonly dict carray_members
 
     cpdef register_carray(self, int carray_size, str carray_name, str dtype=*)
+    cpdef register_group(self, int carray_size, str group_name, list carray_list_names,
+                         str layout=*)
+    cpdef list resolve_carray_names(self, list carray_list_names)
 
     cpdef int get_carray_size(self)
     cpdef remove_items(self, np.ndarray index_list)
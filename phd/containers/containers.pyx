@@ -4,7 +4,8 @@ cimport numpy as np
 from cpython cimport PyDict_Contains, PyDict_GetItem
 
 from ..utils.particle_tags import ParticleTAGS
-from ..utils.carray cimport BaseArray, DoubleArray, IntArray, LongArray, LongLongArray
+from ..utils.carray cimport BaseArray, DoubleArray, IntArray, LongArray, LongLongArray,\
+        DoubleBlockArray
 
 
 cdef int Real = ParticleTAGS.Real
@@ -30,6 +31,7 @@ cdef class CarrayContainer:
         self.carrays = {}
         self.carray_dtypes = {}
         self.carray_named_groups = {}
+        self.carray_members = {}
 
         if carrays_to_register is not None:
             for carray_name in carrays_to_register:
@@ -48,9 +50,16 @@ cdef class CarrayContainer:
             Name of carray to be added.
 
         dtype : str
-            Data type of carray.
+            Data type of carray. A block of k doubles per item is
+            registered with "double[k]", or "double[k,soa]" to store
+            each component contiguous, and accessed as a two dimensional
+            numpy array.
         """
-        if carray_name in self.carrays.keys():
+        cdef list block
+        cdef str layout = "aos"
+        cdef int num_components
+
+        if carray_name in self.carrays.keys() or carray_name in self.carray_members:
             raise RuntimeError("ERROR: Carray already registered")
 
         if len(self.carrays) != 0:
@@ -68,9 +77,75 @@ cdef class CarrayContainer:
             self.carrays[carray_name] = LongArray(carray_size)
         elif dtype == "longlong":
             self.carrays[carray_name] = LongLongArray(carray_size)
+        elif dtype.startswith("double[") and dtype.endswith("]"):
+            block = dtype[7:-1].split(",")
+            num_components = int(block[0])
+            if len(block) == 2:
+                layout = block[1]
+            self.carrays[carray_name] = DoubleBlockArray(carray_size, num_components, layout)
         else:
             raise ValueError("ERROR: Unrecognized dtype: %s" % dtype)
 
+    cpdef register_group(self, int carray_size, str group_name, list carray_list_names,
+                         str layout="soa"):
+        """Register a group of double carrays stored as one block carray
+        named group_name, with one component per name. The block is resized,
+        removed, extracted and exchanged as a single carray and accessed as a
+        two dimensional numpy array. Each name is still accessed as a numpy
+        array of its component and the names are stored as a named group.
+
+        Parameters
+        ----------
+        carray_size : int
+            Size of the carrays.
+
+        group_name : str
+            Name of the block carray and named group.
+
+        carray_list_names : list
+            Names of the carrays in the group, in component order.
+
+        layout : str
+            Either "soa" to store each carray contiguous, which allows
+            pointer_groups on the group, or "aos" to store the values
+            of an item contiguous.
+        """
+        cdef int k
+        cdef str carray_name
+
+        for carray_name in carray_list_names:
+            if carray_name in self.carrays.keys() or carray_name in self.carray_members:
+                raise RuntimeError("ERROR: Carray already registered")
+
+        self.register_carray(carray_size, group_name,
+                "double[%d,%s]" % (len(carray_list_names), layout))
+
+        for k, carray_name in enumerate(carray_list_names):
+            self.carray_members[carray_name] = (group_name, k)
+        self.carray_named_groups[group_name] = list(carray_list_names)
+
+    cpdef list resolve_carray_names(self, list carray_list_names):
+        """Return the carrays holding the given names. Names that are a
+        component of a group are replaced by the block carray of their
+        group, once per group.
+
+        Parameters
+        ----------
+        carray_list_names : list
+            Names of carrays or carray components.
+
+        """
+        cdef str carray_name
+        cdef list carray_names = []
+
+        for carray_name in carray_list_names:
+            if carray_name in self.carray_members:
+                carray_name = self.carray_members[carray_name][0]
+            if carray_name not in carray_names:
+                carray_names.append(carray_name)
+
+        return carray_names
+
     def __getitem__(self, str carray_name):
         """Access carrays as numpy array.
 
@@ -82,11 +157,19 @@ cdef class CarrayContainer:
         Returns
         -------
         numpy array
-            Numpy array reference to carray.
+            Numpy array reference to carray. For a carray in a group
+            the array is the component array of the block, which
+            stays valid when the block is resized.
 
         """
+        cdef str group_name
+        cdef int k
+
         if carray_name in self.carrays.keys():
             return self.carrays[carray_name].get_npy_array()
+        elif carray_name in self.carray_members:
+            group_name, k = self.carray_members[carray_name]
+            return (<DoubleBlockArray> self.carrays[group_name]).get_component_array(k)
         else:
             raise AttributeError("Unrecognized field: %s" % carray_name)
 
@@ -211,7 +294,8 @@ cdef class CarrayContainer:
             are extracted.
 
         """
-        cdef str carray_name, dtype
+        cdef str carray_name, member_name, dtype
+        cdef tuple member
         cdef long size = index_array.length
         cdef BaseArray dst_carray, src_carray
         cdef CarrayContainer result_array = CarrayContainer()
@@ -219,6 +303,9 @@ cdef class CarrayContainer:
         if carray_list_names is None:
             carray_list_names = self.carrays.keys()
 
+        # groups are extracted as a whole
+        carray_list_names = self.resolve_carray_names(carray_list_names)
+
         # now we have the result array setup
         # resize it
         if size == 0:
@@ -229,6 +316,13 @@ cdef class CarrayContainer:
             dtype = self.carray_dtypes[carray_name]
             result_array.register_carray(size, carray_name, dtype)
 
+        # components of extracted groups
+        for member_name, member in self.carray_members.iteritems():
+            if member[0] in carray_list_names:
+                result_array.carray_members[member_name] = member
+                result_array.carray_named_groups[member[0]] =\
+                        list(self.carray_named_groups[member[0]])
+
         # copy the required indices for each carray
         for carray_name in carray_list_names:
             src_carray = self.get_carray(carray_name)
@@ -289,7 +383,7 @@ cdef class CarrayContainer:
         self.resize(indices.length)
 
         # copy the required indices for each property
-        for carray_name in carray_list_names:
+        for carray_name in self.resolve_carray_names(carray_list_names):
             dst_array = self.get_carray(carray_name)
             src_array = container.get_carray(carray_name)
             src_array.copy_values(indices, dst_array)
@@ -314,7 +408,7 @@ cdef class CarrayContainer:
             raise RuntimeError("ERROR: inconsistent carray sizes!")
 
         # copy the required indices for each property
-        for carray_name in carray_list_names:
+        for carray_name in self.resolve_carray_names(carray_list_names):
             dst_array = self.get_carray(carray_name)
             src_array = container.get_carray(carray_name)
             src_array.paste_values(indices, dst_array)
@@ -339,7 +433,7 @@ cdef class CarrayContainer:
             raise RuntimeError("ERROR: inconsistent carray sizes!")
 
         # copy the required indices for each property
-        for carray_name in carray_list_names:
+        for carray_name in self.resolve_carray_names(carray_list_names):
             dst_carray = self.get_carray(carray_name)
             src_carray = container.get_carray(carray_name)
             src_carray.add_values(indices, dst_carray)
@@ -371,7 +465,8 @@ cdef class CarrayContainer:
 
     cdef void pointer_groups(self, np.float64_t *vec[], list carray_list_names):
         """Populate a pointer array with references dictated by a list of
-        carray names. Only float64_t type are allowed.
+        carray names. Only float64_t type are allowed, carrays in a group
+        have to be stored in soa layout.
 
         Parameters
         ----------
@@ -384,6 +479,8 @@ cdef class CarrayContainer:
         cdef int i
         cdef str carray_name
         cdef DoubleArray arr
+        cdef DoubleBlockArray block
+        cdef tuple member
 
         i = 0
         for carray_name in carray_list_names:
@@ -391,5 +488,10 @@ cdef class CarrayContainer:
                 arr = <DoubleArray> self.get_carray(carray_name)
                 vec[i] = arr.get_data_ptr()
                 i += 1
+            elif carray_name in self.carray_members:
+                member = self.carray_members[carray_name]
+                block = <DoubleBlockArray> self.get_carray(member[0])
+                vec[i] = block.get_component_ptr(member[1])
+                i += 1
             else:
                 raise ValueError("ERROR: Unknown field!")
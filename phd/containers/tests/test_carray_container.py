@@ -267,5 +267,81 @@ class TestCarrayContainer(TestCase):
         self.assertEqual(check_array(container["x"], [1, 8, 3, 12, 12]), True)
         self.assertEqual(check_array(container["y"], [10, 14, 8, 10, 10]), True)
 
+    def test_block_carray(self):
+        """Tests a block of values per item moves with the item."""
+        container = CarrayContainer(4, {"x": "double", "s": "double[3]"})
+        self.assertEqual(container["s"].shape, (4, 3))
+        self.assertEqual(container.carray_dtypes["s"], "double[3]")
+
+        container["x"][:] = [0., 1., 2., 3.]
+        container["s"][:] = np.arange(12).reshape(4, 3)
+
+        # extracted and resized with the other carrays
+        indices = LongArray(2)
+        indices.get_npy_array()[:] = [3, 1]
+        container2 = container.extract_items(indices)
+        self.assertEqual(container2.carray_dtypes["s"], "double[3]")
+        self.assertEqual(check_array(container2["s"], [[9, 10, 11], [3, 4, 5]]), True)
+
+        container.extend(2)
+        self.assertEqual(container["s"].shape, (6, 3))
+
+        # removed with the other carrays
+        container.remove_items(np.array([0, 4, 5], dtype=np.int))
+        self.assertEqual(check_array(container["x"], [3., 1., 2.]), True)
+        self.assertEqual(check_array(container["s"], [[9, 10, 11], [3, 4, 5], [6, 7, 8]]), True)
+
+    def test_register_group(self):
+        """Tests a group is stored as one block and each member is a view."""
+        container = CarrayContainer(4, {"x": "double"})
+        container.register_group(4, "v", ["v-x", "v-y"])
+
+        self.assertEqual(container["v"].shape, (4, 2))
+        self.assertEqual(container.carray_dtypes["v"], "double[2,soa]")
+        self.assertEqual(container.carray_named_groups["v"], ["v-x", "v-y"])
+        self.assertEqual("v-x" in container.carrays.keys(), False)
+        self.assertRaises(RuntimeError, container.register_carray, 4, "v-x")
+
+        container["x"][:] = [0., 1., 2., 3.]
+        container["v-x"][:] = [0., 10., 20., 30.]
+        container["v-y"][:] = [0., -10., -20., -30.]
+        self.assertEqual(check_array(container["v"][:, 1], [0., -10., -20., -30.]), True)
+
+        # members are extracted with their group
+        indices = LongArray(2)
+        indices.get_npy_array()[:] = [3, 1]
+        container2 = container.extract_items(indices, ["x", "v-y"])
+        self.assertEqual(check_array(container2["v-x"], [30., 10.]), True)
+        self.assertEqual(check_array(container2["v-y"], [-30., -10.]), True)
+        self.assertEqual(container2.carray_named_groups["v"], ["v-x", "v-y"])
+
+        # resized and removed with the other carrays
+        container.extend(2)
+        self.assertEqual(container["v-x"].size, 6)
+        container.remove_items(np.array([0, 4, 5], dtype=np.int))
+        self.assertEqual(check_array(container["x"], [3., 1., 2.]), True)
+        self.assertEqual(check_array(container["v-x"], [30., 10., 20.]), True)
+
+    def test_group_view_after_resize(self):
+        """Tests a member kept across a resize of its group is valid."""
+        container = CarrayContainer(4, {"x": "double"})
+        container.register_group(4, "v", ["v-x", "v-y"])
+
+        vx = container["v-x"]
+        vy = container["v-y"]
+        vx[:] = [0., 10., 20., 30.]
+        vy[:] = [0., -10., -20., -30.]
+
+        container.extend(100)
+        self.assertEqual(vx.size, 104)
+        self.assertEqual(check_array(vx[:4], [0., 10., 20., 30.]), True)
+        self.assertEqual(check_array(vy[:4], [0., -10., -20., -30.]), True)
+
+        vx[4:] = 1.
+        self.assertEqual(check_array(container["v"][4:, 0], np.ones(100)), True)
+
+        container.resize(2)
+        self.assertEqual(check_array(vy, [0., -10.]), True)
+
 if __name__ == "__main__":
     main()
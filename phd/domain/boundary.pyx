@@ -379,7 +379,7 @@ cdef class Periodic(BoundaryConditionBase):
 
                     # create shift indices
                     index[0] = i%3; index[1] = (i/3)%3; index[2] = i/9
-                    if (i == 4 and dim == 2) or (i == 13 and dim == 3):
+                    if i == (3**dim - 1)/2:
                         continue # skip no shift
 
                     # shifted particle
@@ -430,7 +430,7 @@ cdef class Periodic(BoundaryConditionBase):
 
                     # create shift indices
                     index[0] = i%3; index[1] = (i/3)%3; index[2] = i/9
-                    if (i == 4 and dim == 2) or (i == 13 and dim == 3):
+                    if i == (3**dim - 1)/2:
                         continue # skip no shift
 
                     # shifted position
@@ -50,6 +50,11 @@ cdef class DomainManager:
 
     cdef public double initial_radius
     cdef public double search_radius_factor
+    cdef public bint predict_radius
+    cdef public bint reuse_ghosts
+    cdef public int num_reused_ghost
+    cdef int num_old_ghost
+    cdef double move_dt
 
     cdef bint particle_fields_registered
 
@@ -86,6 +91,7 @@ cdef class DomainManager:
     # ghost generation
     cpdef setup_initial_radius(self, CarrayContainer particles)
     cpdef store_radius(self, CarrayContainer particles)
+    cpdef int remove_ghost_particles(self, CarrayContainer particles)
     cpdef setup_for_ghost_creation(self, CarrayContainer particles)
 
     cpdef create_ghost_particles(self, CarrayContainer particles)
@@ -94,6 +100,7 @@ cdef class DomainManager:
     cpdef update_search_radius(self, CarrayContainer particles)
 
     cdef copy_particles_serial(self, CarrayContainer particles)
+    cdef reuse_ghost_particles(self, CarrayContainer particles)
     cdef copy_particles_parallel(self, CarrayContainer particles)
 
     cpdef move_generators(self, CarrayContainer particles, double dt)
@@ -1,7 +1,7 @@
 import phd
 import numpy as np
 
-from libc.math cimport fmin
+from libc.math cimport fmin, fmax, sqrt, pow
 from cython.operator cimport preincrement as inc
 
 from ..load_balance.tree cimport Node
@@ -45,10 +45,40 @@ cdef inline bint ghostid_cmp(
 
 
 cdef class DomainManager:
+    """Class that handles the domain, boundary conditions and
+    ghost particle creation for mesh generation.
+
+    Attributes
+    ----------
+    initial_radius : double
+        Search radius of every particle for the first mesh build.
+
+    num_reused_ghost : int
+        Number of ghost particles of the previous build reused in the
+        last build.
+
+    predict_radius : bool
+        Predict the search radius of each particle from its previous
+        radius, the volume change of its cell in the last step and
+        the displacement of its generator. Reduces the number of
+        passes needed to complete the mesh.
+
+    reuse_ghosts : bool
+        Keep ghost particles between builds. Ghost particles are
+        updated from their image and only ghost particles that
+        enter or leave the ghost layer are created or removed. Only
+        used in serial runs.
+
+    search_radius_factor : double
+        Factor to scale the search radius of particles with
+        incomplete cells.
+
+    """
     def __init__(self, list xmin, list xmax, double initial_radius,
-                 double search_radius_factor=2.0):
+                 double search_radius_factor=2.0, bint predict_radius=False,
+                 bint reuse_ghosts=False):
 
-        if len(xmin) not in [2, 3]:
+        if len(xmin) not in [1, 2, 3]:
             raise RuntimeError("Wrong dimension specified")
         if len(xmin) != len(xmax):
             raise RuntimeError("Wrong dimensions for xmin and xmax")
@@ -56,6 +86,15 @@ cdef class DomainManager:
         self.dim = len(xmin)
         self.initial_radius = initial_radius
         self.search_radius_factor = search_radius_factor
+        self.predict_radius = predict_radius
+        self.reuse_ghosts = reuse_ghosts
+
+        # ghost particles kept from previous build
+        self.num_old_ghost = 0
+        self.num_reused_ghost = 0
+
+        # time step of last generator move
+        self.move_dt = 0.
 
         self.load_balance = None
         self.boundary_condition = None
@@ -120,6 +159,11 @@ cdef class DomainManager:
         particles.register_carray(num_particles, "radius", "double")
         particles.register_carray(num_particles, "old_radius", "double")
 
+        # volume of previous build for radius prediction, always
+        # registered so prediction can be turned on later
+        particles.register_carray(num_particles, "old_volume", "double")
+        particles["old_volume"][:] = 0.
+
         # set initial radius for mesh generation
         self.setup_initial_radius(particles)
         self.particle_fields_registered = True
@@ -199,16 +243,68 @@ cdef class DomainManager:
 
         """
         cdef int i
+        cdef DoubleArray vol, vold
         cdef DoubleArray r = particles.get_carray("radius")
         cdef DoubleArray rold = particles.get_carray("old_radius")
 
         for i in range(particles.get_carray_size()):
             rold.data[i] = r.data[i]
 
+        # volume is still from previous build, the new volume
+        # is computed after the tessellation is complete
+        if self.predict_radius and "volume" in particles.carrays:
+            vol = particles.get_carray("volume")
+            vold = particles.get_carray("old_volume")
+            for i in range(particles.get_carray_size()):
+                vold.data[i] = vol.data[i]
+
+    cpdef int remove_ghost_particles(self, CarrayContainer particles):
+        """Remove ghost particles of the previous build and return the
+        number of real particles.
+
+        If `reuse_ghosts` is set the ghost particles are kept at the end
+        of the container and are matched to the ghost particles created
+        in the first pass of the next mesh build.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        """
+        cdef int i, num_particles
+        cdef IntArray tags = particles.get_carray("tag")
+
+        self.num_old_ghost = 0
+        num_particles = particles.get_carray_size()
+
+        if self.reuse_ghosts and not phd._in_parallel:
+
+            # ghost particles are appended after real particles
+            i = 0
+            while i < num_particles and tags.data[i] != GHOST:
+                i += 1
+            self.num_old_ghost = num_particles - i
+
+            while i < num_particles:
+                if tags.data[i] != GHOST:
+                    self.num_old_ghost = 0
+                    break
+                i += 1
+
+        if self.num_old_ghost == 0:
+            particles.remove_tagged_particles(GHOST)
+
+        return particles.get_carray_size() - self.num_old_ghost
+
     cpdef setup_for_ghost_creation(self, CarrayContainer particles):
         """Go through each particle and flag for ghost creation. For particles
         with infinite radius use radius from previous time step.
 
+        If `predict_radius` is set the radius from the previous time step
+        is scaled by the volume change of the cell in the last step and
+        grown by the displacement of the generators in the last move.
+
         Parameters
         ----------
         particles : CarrayContainer
@@ -217,17 +313,25 @@ cdef class DomainManager:
         """
         cdef int i, k, dim
         cdef FlagParticle *p
-        cdef np.float64_t *x[3]
-        cdef double search_radius
+        cdef np.float64_t *x[3], *wx[3]
+        cdef double search_radius, growth, disp
+        cdef DoubleArray vol, vold
         cdef DoubleArray r = particles.get_carray("radius")
         cdef DoubleArray rold = particles.get_carray("old_radius")
+        cdef bint predict = self.predict_radius and "volume" in particles.carrays
 
         dim = len(particles.carray_named_groups["position"])
         particles.pointer_groups(x, particles.carray_named_groups["position"])
 
-        # set ghost buffer to zero
+        if predict:
+            vol = particles.get_carray("volume")
+            vold = particles.get_carray("old_volume")
+            particles.pointer_groups(wx, particles.carray_named_groups["w"])
+
+        # set ghost buffer to zero, ghost particles
+        # kept for reuse are after real particles
         self.ghost_vec.clear()
-        self.num_real_particles = particles.get_carray_size()
+        self.num_real_particles = particles.get_carray_size() - self.num_old_ghost
 
         # buffer to keep track of which particles
         # have to exported for ghost updates
@@ -238,8 +342,7 @@ cdef class DomainManager:
             self.import_ghost_buffer.clear()
 
         # flag all real particles for ghost creation
-        # there should be no ghost particles in the particle container
-        self.flagged_particles.resize(particles.get_carray_size(), FlagParticle())
+        self.flagged_particles.resize(self.num_real_particles, FlagParticle())
 
         i = 0
         cdef cpplist[FlagParticle].iterator it = self.flagged_particles.begin()
@@ -256,8 +359,24 @@ cdef class DomainManager:
             else:
                 p.old_search_radius = 0.
 
+            search_radius = rold.data[i]
+            if predict:
+
+                # extrapolate volume change of last step, limited
+                # to avoid outliers from rebuilt cells
+                growth = 1.0
+                if vol.data[i] > 0. and vold.data[i] > 0.:
+                    growth = pow(vol.data[i]/vold.data[i], 1.0/dim)
+                    growth = fmin(fmax(growth, 0.5), 2.0)
+
+                # generator and its neighbors moved about w*dt
+                disp = 0.
+                for k in range(dim):
+                    disp += wx[k][i]*wx[k][i]
+                search_radius = growth*search_radius + 2.0*sqrt(disp)*self.move_dt
+
             # scale search radius from voronoi radius
-            p.search_radius = self.search_radius_factor*rold.data[i]
+            p.search_radius = self.search_radius_factor*search_radius
 
             # copy position and momentum, momentum is used because
             # after an update only the momentum is correct
@@ -504,6 +623,11 @@ cdef class DomainManager:
 
         dim = len(particles.carray_named_groups["position"])
 
+        # overwrite kept ghost particles, only
+        # unmatched ghost particles are left
+        if self.num_old_ghost > 0:
+            self.reuse_ghost_particles(particles)
+
         if self.ghost_vec.size() == 0:
             return
 
@@ -538,6 +662,128 @@ cdef class DomainManager:
         # add new ghost to total ghost container
         particles.append_container(ghosts)
 
+    cdef reuse_ghost_particles(self, CarrayContainer particles):
+        """Match ghost particles in ghost_vec to ghost particles kept
+        from the previous build with the same image. Matched ghost
+        particles are updated in place from their image, kept ghost
+        particles without a match are removed and ghost particles
+        without a match are left in ghost_vec to be created.
+
+        Matched ghost particles are compacted after the real particles
+        keeping their previous order, only the ghost particles after a
+        removed ghost particle change slot.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        """
+        cdef IntArray tags = particles.get_carray("tag")
+        cdef IntArray types = particles.get_carray("type")
+        cdef LongArray maps = particles.get_carray("map")
+
+        cdef int i, j, k, n, m, dim, best
+        cdef int num_real, num_old, num_kept
+        cdef double dist, best_dist
+        cdef np.float64_t *x[3]
+        cdef BoundaryParticle *p
+        cdef vector[BoundaryParticle] new_ghost
+
+        cdef IntArray used = IntArray()
+        cdef LongArray head = LongArray()
+        cdef LongArray next_ghost = LongArray()
+        cdef LongArray slots = LongArray()
+        cdef LongArray images = LongArray()
+        cdef LongArray matched = LongArray()
+        cdef LongArray best_ghost = LongArray()
+        cdef LongArray new_slot = LongArray()
+        cdef CarrayContainer ghosts
+
+        dim = len(particles.carray_named_groups["position"])
+        particles.pointer_groups(x, particles.carray_named_groups["position"])
+
+        num_real = self.num_real_particles
+        num_old = self.num_old_ghost
+        self.num_old_ghost = 0
+
+        # bucket kept ghost particles by image
+        head.resize(num_real)
+        for i in range(num_real):
+            head.data[i] = -1
+
+        used.resize(num_old)
+        next_ghost.resize(num_old)
+        for j in range(num_old):
+            i = maps.data[num_real + j]
+            used.data[j] = 0
+            if i < 0 or i >= num_real:
+                next_ghost.data[j] = -1
+                continue
+            next_ghost.data[j] = head.data[i]
+            head.data[i] = j
+
+        # closest unused kept ghost of the same image
+        for n in range(self.ghost_vec.size()):
+            p = &self.ghost_vec[n]
+
+            best = -1
+            best_dist = 0.
+            j = head.data[p.index]
+            while j != -1:
+                if not used.data[j]:
+                    dist = 0.
+                    for k in range(dim):
+                        dist += (x[k][num_real + j] - p.x[k])**2
+                    if best == -1 or dist < best_dist:
+                        best = j
+                        best_dist = dist
+                j = next_ghost.data[j]
+
+            if best == -1:
+                new_ghost.push_back(self.ghost_vec[n])
+            else:
+                used.data[best] = 1
+                best_ghost.append(best)
+                images.append(p.index)
+                matched.append(n)
+
+        # slot of kept ghost particles after removing unused ones
+        num_kept = 0
+        new_slot.resize(num_old)
+        for j in range(num_old):
+            new_slot.data[j] = num_real + num_kept
+            num_kept += used.data[j]
+
+        slots.resize(best_ghost.length)
+        for m in range(best_ghost.length):
+            slots.data[m] = new_slot.data[best_ghost.data[m]]
+
+        # update matched ghost particles from their image, every field
+        # is overwritten so unused ghost particles are dropped by resizing
+        if slots.length > 0:
+            ghosts = particles.extract_items(images)
+            particles.paste(ghosts, slots, particles.carrays.keys())
+        particles.resize(num_real + num_kept)
+
+        if slots.length > 0:
+            particles.pointer_groups(x, particles.carray_named_groups["position"])
+            for m in range(slots.length):
+                i = slots.data[m]
+                p = &self.ghost_vec[matched.data[m]]
+
+                maps.data[i]  = p.index  # reference to image
+                tags.data[i]  = GHOST    # ghost label
+                types.data[i] = p.ghost_type
+
+                for k in range(dim):
+                    x[k][i] = p.x[k]
+
+        self.num_reused_ghost = slots.length
+
+        # ghost particles left to create
+        self.ghost_vec.swap(new_ghost)
+
     cpdef bint ghost_complete(self):
         """Return True if their are no more particles flagged for ghost
         creation.
@@ -584,6 +830,9 @@ cdef class DomainManager:
         particles.pointer_groups(x,  particles.carray_named_groups["position"])
         particles.pointer_groups(wx, particles.carray_named_groups["w"])
 
+        # displacement used to predict search radius
+        self.move_dt = dt
+
         for i in range(particles.get_carray_size()):
             if tags.data[i] == REAL:
                 for k in range(dim):
@@ -790,12 +1039,18 @@ cdef class DomainManager:
 
         """
         cdef str field
+        cdef list fields
         cdef CarrayContainer grad
         cdef int i, num_ghost_particles
         cdef LongArray indices = LongArray()
         cdef np.ndarray indices_npy, map_indices_npy
         cdef IntArray tags = particles.get_carray("tag")
 
+        # gradients of passive scalars are one block
+        fields = list(gradients.carray_named_groups["primitive"])
+        if "passive-scalars" in gradients.carrays:
+            fields.append("passive-scalars")
+
         if phd._in_parallel:
 
             num_ghost_particles = self.export_ghost_buffer.size()
@@ -805,13 +1060,11 @@ cdef class DomainManager:
             for i in range(num_ghost_particles):
                 indices.data[i] = self.export_ghost_buffer[i].index
 
-            grad = gradients.extract_items(indices,
-                    gradients.carray_named_groups["primitive"])
+            grad = gradients.extract_items(indices, fields)
 
             exchange_particles(gradients, grad,
                     self.send_cnts, self.recv_cnts, self.num_real_particles, phd._comm,
-                    gradients.carray_named_groups["primitive"],
-                    self.send_disp, self.recv_disp)
+                    fields, self.send_disp, self.recv_disp)
 
             # modify gradient by boundary condition
             self.boundary_condition.update_gradients(particles, gradients, self)
@@ -830,7 +1083,7 @@ cdef class DomainManager:
             map_indices_npy = particles["map"][indices_npy]
 
             # update ghost gradient from image particle 
-            for field in gradients.carray_named_groups["primitive"]:
+            for field in fields:
                 gradients[field][indices_npy] = gradients[field][map_indices_npy]
 
             # modify gradient by boundary condition
@@ -8,6 +8,8 @@ cdef class EquationStateBase:
     cpdef conservative_from_primitive(self, CarrayContainer particles)
     cpdef primitive_from_conservative(self, CarrayContainer particles)
     cpdef np.float64_t sound_speed(self, np.float64_t density, np.float64_t pressure)
+    cdef int sound_speed_array(self, np.float64_t *density, np.float64_t *pressure,
+            np.float64_t *cs, int num_particles) nogil
     cpdef np.float64_t get_gamma(self)
 
 cdef class IdealGas(EquationStateBase):
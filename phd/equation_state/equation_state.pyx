@@ -1,6 +1,6 @@
 from libc.math cimport sqrt
 
-from ..utils.carray cimport DoubleArray
+from ..utils.carray cimport DoubleArray, DoubleBlockArray
 
 cdef class EquationStateBase:
     """Equation of state base. All equation of states must inherit this
@@ -20,6 +20,13 @@ cdef class EquationStateBase:
         msg = "EquationStateBase::sound_speed called!"
         raise NotImplementedError(msg)
 
+    cdef int sound_speed_array(self, np.float64_t *density, np.float64_t *pressure,
+            np.float64_t *cs, int num_particles) nogil:
+        """Sound speed of the first num_particles particles stored in cs.
+        Returns -1 if not implemented, called without the gil.
+        """
+        return -1
+
     cpdef np.float64_t get_gamma(self):
         msg = "EquationStateBase::get_gamma called!"
         raise NotImplementedError(msg)
@@ -55,6 +62,11 @@ cdef class IdealGas(EquationStateBase):
         # particle volume
         cdef DoubleArray vol = particles.get_carray("volume")
 
+        # passive scalars
+        cdef DoubleBlockArray ps, pm
+        cdef bint passive = "passive-scalars" in particles.carrays
+        cdef int num_passive = 0
+
         cdef int i, k, dim
         cdef np.float64_t vs_sq
         cdef np.float64_t *v[3], *mv[3]
@@ -63,6 +75,11 @@ cdef class IdealGas(EquationStateBase):
         particles.pointer_groups(v,  particles.carray_named_groups['velocity'])
         particles.pointer_groups(mv, particles.carray_named_groups['momentum'])
 
+        if passive:
+            ps = particles.get_carray("passive-scalars")
+            pm = particles.get_carray("passive-mass")
+            num_passive = ps.num_components
+
         # loop through all particles (real + ghost)
         for i in range(particles.get_carray_size()):
 
@@ -78,6 +95,10 @@ cdef class IdealGas(EquationStateBase):
             # total energy in cell
             e.data[i] = (.5*d.data[i]*v_sq + p.data[i]/(self.gamma-1.))*vol.data[i]
 
+            # mass of each species
+            for k in range(num_passive):
+                pm.data[i*num_passive+k] = ps.data[i*num_passive+k]*m.data[i]
+
     cpdef primitive_from_conservative(self, CarrayContainer particles):
         """Computes primitive variables from conservative variables. Calculates
         for all particles (real + ghost).
@@ -93,6 +114,11 @@ cdef class IdealGas(EquationStateBase):
         # particle volume
         cdef DoubleArray vol = particles.get_carray("volume")
 
+        # passive scalars
+        cdef DoubleBlockArray ps, pm
+        cdef bint passive = "passive-scalars" in particles.carrays
+        cdef int num_passive = 0
+
         cdef int i, k
         cdef np.float64_t vs_sq
         cdef np.float64_t *v[3], *mv[3]
@@ -101,6 +127,11 @@ cdef class IdealGas(EquationStateBase):
         particles.pointer_groups(v,  particles.carray_named_groups["velocity"])
         particles.pointer_groups(mv, particles.carray_named_groups["momentum"])
 
+        if passive:
+            ps = particles.get_carray("passive-scalars")
+            pm = particles.get_carray("passive-mass")
+            num_passive = ps.num_components
+
         # loop through all particles (real + ghost)
         for i in range(particles.get_carray_size()):
 
@@ -116,10 +147,24 @@ cdef class IdealGas(EquationStateBase):
             # pressure in cell
             p.data[i] = (e.data[i]/vol.data[i] - .5*d.data[i]*v_sq)*(self.gamma-1.)
 
+            # mass fraction of each species
+            for k in range(num_passive):
+                ps.data[i*num_passive+k] = pm.data[i*num_passive+k]/m.data[i]
+
     cpdef np.float64_t sound_speed(self, np.float64_t density, np.float64_t pressure):
         """Sound speed of particle."""
         return sqrt(self.gamma*pressure/density)
 
+    cdef int sound_speed_array(self, np.float64_t *density, np.float64_t *pressure,
+            np.float64_t *cs, int num_particles) nogil:
+        """Sound speed of the first num_particles particles stored in cs."""
+        cdef int i
+        cdef double gamma = self.gamma
+
+        for i in range(num_particles):
+            cs[i] = sqrt(gamma*pressure[i]/density[i])
+        return 0
+
     cpdef np.float64_t get_gamma(self):
         """Return ratio of specific heats."""
         return self.gamma
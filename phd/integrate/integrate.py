@@ -32,6 +32,12 @@ class IntegrateBase(object):
     dt : float
         Time step of the simulation.
 
+    fused_faces : bool
+        If True reconstruct, solve and apply the flux of each face in
+        one pass instead of writing face states and fluxes. Only used
+        when no source terms are set, since source terms act on the
+        face states and fluxes.
+
     initial_timestep_factor : float
         For dt at the first iteration, reduce by this factor.
 
@@ -64,7 +70,7 @@ class IntegrateBase(object):
     """
     def __init__(self, dt=0., time=0., iteration=0, old_dt=-np.inf,
                  max_dt_change=2.0, initial_timestep_factor=1.0,
-                 restart=False, **kwargs):
+                 restart=False, fused_faces=False, **kwargs):
         """Constructor for Integrate base class.
 
         Parameters
@@ -90,6 +96,10 @@ class IntegrateBase(object):
         restart : bool
             Flag to signal if the simulation is a restart.
 
+        fused_faces : bool
+            If True reconstruct, solve and apply the flux of each
+            face in one pass.
+
         """
         self.dt = dt
         self.time = time
@@ -97,6 +107,7 @@ class IntegrateBase(object):
         self.iteration = iteration
 
         self.restart = restart
+        self.fused_faces = fused_faces
 
         # time step parameters
         self.max_dt_change = max_dt_change
@@ -116,9 +127,9 @@ class IntegrateBase(object):
 
             self.load_balance = None
 
-            # for communication dt across processors
-            self.local_dt  = np.zeros(1, dtype=np.float64)
-            self.global_dt = np.zeros(1, dtype=np.float64)
+            # for communication of hydro and source dt across processors
+            self.local_dt  = np.zeros(2, dtype=np.float64)
+            self.global_dt = np.zeros(2, dtype=np.float64)
 
     @check_class(BoundaryConditionBase)
     def set_boundary_condition(self, boundary_condition):
@@ -209,13 +220,10 @@ class IntegrateBase(object):
 
         # relax mesh if needed 
         if self.mesh.relax_iterations > 0 and not self.restart:
-            phdLogger.info("Relaxing mesh:")
+            phdLogger.info("IntegrateBase: Relaxing mesh")
 
-            for i in range(self.mesh.relax_iterations):
-                phdLogger.info("Relaxing iteration %d" % i)
-                simulation.simulation_time_manager.output(simulation)
-                self.domain_manager.partition(self.particles)
-                self.mesh.relax(self.particles, self.domain_manager)
+            # particles are repartitioned once relaxed
+            self.mesh.relax_mesh(self.particles, self.domain_manager)
 
             # build mesh with ghost
             self.domain_manager.partition(self.particles)
@@ -239,34 +247,26 @@ class IntegrateBase(object):
         # calculate new time step for integrator
         dt = self.riemann.compute_time_step(
                 self.particles, self.equation_state)
+        self.dt = dt
+
+        # modify timestep from source terms
+        dt_source = np.inf
+        for source in self.source_terms.itervalues():
+            dt_source = min(source.compute_time_step(self), dt_source)
 
+        # hydro and source dt in one reduction
         if phd._in_parallel:
 
             self.local_dt[0] = dt
+            self.local_dt[1] = dt_source
             phd._comm.Allreduce(
                     [self.local_dt,  phd.MPI.DOUBLE],
                     [self.global_dt, phd.MPI.DOUBLE],
                     op=phd.MPI.MIN)
-            dt = self.global_dt[0]
+            dt, dt_source = self.global_dt
 
-        self.dt = dt
         phdLogger.info("Hydro dt: %f" %dt)
-
-        # modify timestep from source terms
         if self.source_terms:
-            dt_source = np.inf
-            for source in self.source_terms.itervalues():
-                dt_source = min(source.compute_time_step(self), dt_source)
-
-            if phd._in_parallel:
-
-                self.local_dt[0] = dt_source
-                phd._comm.Allreduce(
-                        [self.local_dt,  phd.MPI.DOUBLE],
-                        [self.global_dt, phd.MPI.DOUBLE],
-                        op=phd.MPI.MIN)
-                dt_source = self.global_dt[0]
-
             phdLogger.info("Source dt: %f" %dt_source)
             dt = min(dt, dt_source)
 
@@ -288,6 +288,34 @@ class IntegrateBase(object):
         msg = "IntegrateBase::evolve_timestep called!"
         raise NotImplementedError(msg)
 
+    def update_from_faces(self):
+        """Reconstruct face states, solve the riemann problem and update
+        conservative variables from the fluxes."""
+
+        # build gradients for reconstruction
+        self.reconstruction.compute_gradients(self.particles, self.mesh,
+                self.domain_manager)
+
+        # source terms need face states and fluxes
+        if self.fused_faces and not self.source_terms:
+            self.riemann.update_from_faces(self.particles, self.mesh,
+                    self.reconstruction, self.equation_state, self.dt)
+            return
+
+        # build left/right states at each face in the mesh
+        self.reconstruction.compute_states(self.particles, self.mesh,
+                self.equation_state.get_gamma(), self.domain_manager, 0.5*self.dt,
+                self.riemann.boost)
+        self.compute_source("primitive")
+
+        # solve riemann problem, generate flux
+        self.riemann.compute_fluxes(self.particles, self.mesh, self.reconstruction,
+                self.equation_state)
+
+        # update conservative from fluxes
+        self.mesh.update_from_fluxes(self.particles, self.riemann, self.dt)
+        self.compute_source("flux")
+
     def after_loop(self, simulation):
         pass
 
@@ -351,21 +379,8 @@ class StaticMeshMUSCLHancock(IntegrateBase):
 
         phdLogger.info("StaticMeshMUSCLHancock: Starting integration")
 
-        # build left/right states at each face in the mesh
-        self.reconstruction.compute_gradients(self.particles, self.mesh,
-                self.domain_manager)
-        self.reconstruction.compute_states(self.particles, self.mesh,
-                self.equation_state.get_gamma(), self.domain_manager, 0.5*self.dt,
-                self.riemann.boost)
-        self.compute_source("primitive")
-
-        # solve riemann problem, generate flux
-        self.riemann.compute_fluxes(self.particles, self.mesh, self.reconstruction,
-                self.equation_state)
-
-        # update conservative from fluxes
-        self.mesh.update_from_fluxes(self.particles, self.riemann, self.dt)
-        self.compute_source("flux")
+        # reconstruct, solve riemann and update conservative
+        self.update_from_faces()
         self.compute_source("compute")
 
         self.compute_source("conservative")
@@ -392,21 +407,8 @@ class MovingMeshMUSCLHancock(StaticMeshMUSCLHancock):
         self.compute_source("motion")
         self.mesh.assign_face_velocities(self.particles)
 
-        # build left/right states at each face in the mesh
-        self.reconstruction.compute_gradients(self.particles, self.mesh,
-                self.domain_manager)
-        self.reconstruction.compute_states(self.particles, self.mesh,
-                self.equation_state.get_gamma(), self.domain_manager, 0.5*self.dt,
-                self.riemann.boost)
-        self.compute_source("primitive")
-
-        # solve riemann problem, generate flux
-        self.riemann.compute_fluxes(self.particles, self.mesh, self.reconstruction,
-                self.equation_state)
-
-        # update conservative from fluxes
-        self.mesh.update_from_fluxes(self.particles, self.riemann, self.dt)
-        self.compute_source("flux")
+        # reconstruct, solve riemann and update conservative
+        self.update_from_faces()
 
         # update mesh generator positions
         self.domain_manager.move_generators(self.particles, self.dt)
@@ -50,6 +50,21 @@ class ReaderWriterBase(object):
         raise NotImplementedError(msg)
 
 class Hdf5(ReaderWriterBase):
+    def __init__(self, write_polygons=False):
+        """Constructor for Hdf5 reader and writer.
+
+        Parameters
+        ----------
+        write_polygons : bool
+            Store the voronoi polygons of real particles in each
+            snapshot so plotting does not tessellate again. The
+            polygons are from the last mesh build and are stored
+            with the positions they were built from, particles move
+            after the build. Only in 2d.
+
+        """
+        self.write_polygons = write_polygons
+
     def write(self, base_name, output_directory, integrator):
         """Write simulation data to hdf5 file."""
         file_name = base_name + ".hdf5"
@@ -77,6 +92,14 @@ class Hdf5(ReaderWriterBase):
                 data_grp.attrs["dtype"] = integrator.particles.carray_dtypes[prop_name]
                 data_grp.create_dataset("data", data=integrator.particles[prop_name])
 
+            # voronoi polygons of real particles
+            if self.write_polygons:
+                vertices, offsets, generators = integrator.mesh.get_voronoi_polygons()
+                mesh_grp = f.create_group("mesh")
+                mesh_grp.create_dataset("polygon_vertices", data=vertices)
+                mesh_grp.create_dataset("polygon_offsets", data=offsets)
+                mesh_grp.create_dataset("polygon_generators", data=generators)
+
             f.close()
 
     def read(self, file_name):
@@ -98,3 +121,36 @@ class Hdf5(ReaderWriterBase):
                 particles[field][:] = field_grp["data"][:]
 
         return particles
+
+    def read_polygons(self, file_name):
+        """Read voronoi polygons of real particles stored by `write`.
+
+        Parameters
+        ----------
+        file_name : str
+            File name to be read in.
+
+        Returns
+        -------
+        vertices : np.ndarray
+            Polygon vertices, shape (number of vertices, 2).
+
+        offsets : np.ndarray
+            Start of each polygon, size number of real particles + 1.
+
+        generators : np.ndarray
+            Position of each real particle the polygons were built
+            from, shape (number of real particles, 2).
+
+        """
+        phdLogger.info("hdf5 format: Reading polygons %s" % file_name)
+
+        with h5py.File(file_name, "r") as f:
+            if "mesh" not in f:
+                raise RuntimeError("ERROR: No polygons stored in %s" % file_name)
+
+            vertices = f["mesh/polygon_vertices"][:]
+            offsets = f["mesh/polygon_offsets"][:]
+            generators = f["mesh/polygon_generators"][:]
+
+        return vertices, offsets, generators
@@ -1,26 +1,47 @@
 cimport numpy as np
-from libcpp.vector cimport vector
 
 from ..mesh.pytess cimport PyTess
 from ..riemann.riemann cimport RiemannBase
 from ..domain.domain_manager cimport DomainManager
+from ..utils.carray cimport LongArray, IntArray
 from ..containers.containers cimport CarrayContainer
 from ..equation_state.equation_state cimport EquationStateBase
 
-ctypedef vector[int] nn           # nearest neighbors
-ctypedef vector[nn] nn_vec
-
 #cdef inline bint in_box(double x[3], double r, np.float64_t bounds[2][3], int dim)
 
 cdef class Mesh:
 
     # initialization parameters
     cdef public int relax_iterations
+    cdef public double relax_tolerance
     cdef public int max_iterations
 
     cdef public double eta
     cdef public bint regularize
     cdef public int num_neighbors
+    cdef public int num_threads
+    cdef public bint persistent_tess
+    cdef public bint extract_by_edge
+    cdef public bint parallel_tess
+    cdef public bint spatial_sort
+    cdef public double face_prune_tolerance
+    cdef public double frozen_tolerance
+    cdef public int full_rebuild_frequency
+
+    # diagnostics of last build
+    cdef public int generation
+    cdef public int num_tess_iterations
+    cdef public list num_ghost_per_pass
+    cdef public int num_relax_iterations
+    cdef public int num_pruned_faces
+    cdef public int num_active_particles
+
+    # local extraction state
+    cdef int num_local_builds
+    cdef int num_real_last_build
+    cdef LongArray active
+    cdef LongArray active_ids
+    cdef public double relax_displacement
 
     cdef dict face_fields
     cdef dict face_field_groups
@@ -29,15 +50,28 @@ cdef class Mesh:
     cdef bint particle_fields_registered
 
     cdef public CarrayContainer faces
+    cdef CarrayContainer unpruned_faces
 
     cdef PyTess tess
-    cdef nn_vec neighbors
+
+    # face adjacency in compressed sparse row format
+    cdef public LongArray neighbor_offsets
+    cdef public LongArray neighbor_faces
+    cdef public LongArray neighbor_ids
 
     # mesh generation routines
     cpdef reset_mesh(self)
     cpdef tessellate(self, CarrayContainer pc, DomainManager domain_manager)
     cpdef build_geometry(self, CarrayContainer pc, DomainManager domain_manager)
-    cpdef relax(self, CarrayContainer particles, DomainManager domain_manager)
+    cdef int prune_faces(self, CarrayContainer particles)
+    cdef int common_face(self, IntArray pruned, LongArray offsets,
+                         LongArray nbr_faces, LongArray nbr_ids, int j, int k)
+    cdef void add_area_vector(self, int n, int i, double av[3], int dim)
+    cdef int flag_active_particles(self, CarrayContainer particles, int num_real_particles)
+    cdef store_positions(self, CarrayContainer particles, int num_real_particles,
+                         bint local_build)
+    cpdef double relax(self, CarrayContainer particles, DomainManager domain_manager)
+    cpdef int relax_mesh(self, CarrayContainer particles, DomainManager domain_manager)
 
     cpdef assign_generator_velocities(self, CarrayContainer particles, EquationStateBase equation_state)
     cpdef assign_face_velocities(self, CarrayContainer particles)
@@ -1,18 +1,34 @@
 import phd
 import logging
 import numpy as np
-from libc.math cimport sqrt
+from libc.math cimport sqrt, pow, fmax
 cimport libc.stdlib as stdlib
 
-from ..mesh.pytess cimport PyTess2d, PyTess3d
+from ..mesh.pytess cimport PyTess1d, PyTess2d, PyTess3d, build_face_graph
 from ..utils.particle_tags import ParticleTAGS
 from ..containers.containers cimport CarrayContainer
-from ..utils.carray cimport DoubleArray, LongArray, IntArray
+from ..utils.carray cimport DoubleArray, LongArray, IntArray, DoubleBlockArray
 
 phdLogger = logging.getLogger("phd")
 
 cdef int REAL = ParticleTAGS.Real
 
+# face fields in 1d
+cdef dict face_vars_1d = {
+        "area": "double",
+        "pair-i": "long",
+        "pair-j": "long",
+        "com-x": "double",
+        "velocity-x": "double",
+        "normal-x": "double",
+        }
+
+cdef dict named_group_1d = {
+        "com": ["com-x"],
+        "velocity": ["velocity-x"],
+        "normal": ["normal-x"]
+        }
+
 # face fields in 2d 
 cdef dict face_vars_2d = {
         "area": "double",
@@ -45,6 +61,13 @@ cdef dict named_group_3d = {
         "normal": ["normal-x", "normal-y", "normal-z"]
         }
 
+# particle fields to register in 1d
+cdef dict fields_to_register_1d = {
+        "volume": "double",
+        "dcom-x": "double",
+        "w-x"   : "double"
+        }
+
 # particle fields to register in 2d
 cdef dict fields_to_register_2d = {
         "volume": "double",
@@ -69,33 +92,152 @@ cdef class Mesh:
     eta : double
         Regularize parameter.
 
+    extract_by_edge : bool
+        Extract the geometry visiting each delaunay edge once instead
+        of circulating around each real particle.
+
+    face_prune_tolerance : double
+        Faces with area smaller than this fraction of the distance
+        between its particles (squared in 3d) are removed from the
+        face list. The area vector of a removed face is moved onto
+        the faces its particles share with common neighbors so every
+        cell stays closed. Volume and center of mass of the cells are
+        not modified. Zero keeps every face. Only in serial runs, the
+        common neighbors of a face on a processor boundary are not
+        known on both processors.
+
+    frozen_tolerance : double
+        Only extract the geometry of cells whose generator, or a
+        neighbor's generator, moved more than this fraction of the
+        cell size since its geometry was last extracted. Faces,
+        volumes and centers of mass of every other cell are reused.
+        Zero extracts every cell. Only used in serial runs, combine
+        with `persistent_tess` to also repair the tessellation locally.
+
+    full_rebuild_frequency : int
+        When `frozen_tolerance` is set, extract the geometry of every
+        cell once every this many builds.
+
+    generation : int
+        Number of times the geometry has been built. Classes that
+        cache geometry compare it to know when the mesh changed.
+
     max_iterations : int
         The max number of mesh updates in a build. This is
         stop an infinite loop for bad meshes.
 
+    neighbor_faces : LongArray
+        Face indices of each particle, the faces of particle i are
+        stored from neighbor_offsets[i] to neighbor_offsets[i+1].
+
+    neighbor_ids : LongArray
+        Particle on the other side of each face in neighbor_faces.
+
+    neighbor_offsets : LongArray
+        Start of the faces of each particle in neighbor_faces and
+        neighbor_ids, has one more entry than particles.
+
     num_neighbors : int
         Initial number of neighbors for each particle. Used
         to allocate storage space.
 
+    num_pruned_faces : int
+        Number of faces removed by `face_prune_tolerance` in the
+        last build.
+
+    num_relax_iterations : int
+        Number of lloyd iterations performed in the last relaxation.
+
+    num_tess_iterations : int
+        Number of passes needed to complete the tessellation in the
+        last build.
+
+    num_active_particles : int
+        Number of real particles whose geometry was extracted in
+        the last build.
+
+    num_ghost_per_pass : list
+        Number of ghost particles added in each pass of the last
+        build.
+
+    num_threads : int
+        Number of threads used to extract the geometry of the mesh.
+        Real particles are split in contiguous ranges, the extracted
+        faces are the same and in the same order for any number of
+        threads. Not used when `extract_by_edge` is set.
+
+    parallel_tess : bool
+        Insert real particles concurrently when building the 3d
+        tessellation. Requires CGAL compiled with TBB, ghost particles
+        are inserted sequentially.
+
+    persistent_tess : bool
+        Keep the tessellation between builds and move the vertices
+        in place instead of rebuilding the tessellation. Only used
+        in serial runs.
+
     regularize : bool
         Add regularization to velocity mesh generators.
 
+    relax_displacement : double
+        Largest displacement of a real particle to its center of mass,
+        in units of the cell size, in the last lloyd iteration.
+
     relax_iterations : int
-        Number of times to perform lloyd relaxation on startup.
+        Max number of times to perform lloyd relaxation on startup.
+
+    relax_tolerance : double
+        Lloyd relaxation on startup stops when the largest displacement
+        of a real particle to its center of mass, in units of the cell
+        size, is below this value.
+
+    spatial_sort : bool
+        Insert particles of the 2d tessellation along a hilbert curve
+        using the last inserted vertex as point location hint. If False
+        particles are inserted one at a time in their order, only used
+        to compare insertion times.
 
     """
     def __init__(self, bint regularize=True, int relax_iterations = 0,
                  double eta=0.25, int num_neighbors=128,
-                 max_iterations = 20):
+                 max_iterations = 20, bint persistent_tess=False,
+                 bint extract_by_edge=False, int num_threads=1,
+                 bint parallel_tess=False, double relax_tolerance=1.0e-3,
+                 double face_prune_tolerance=0., double frozen_tolerance=0.,
+                 int full_rebuild_frequency=10, bint spatial_sort=True):
         # domain manager needs to be set
         self.particle_fields_registered = False
 
         self.max_iterations = max_iterations
         self.relax_iterations = relax_iterations
+        self.relax_tolerance = relax_tolerance
 
         self.eta = eta
         self.regularize = regularize
         self.num_neighbors = num_neighbors
+        self.persistent_tess = persistent_tess
+        self.extract_by_edge = extract_by_edge
+        self.num_threads = num_threads
+        self.parallel_tess = parallel_tess
+        self.spatial_sort = spatial_sort
+        self.face_prune_tolerance = face_prune_tolerance
+        self.frozen_tolerance = frozen_tolerance
+        self.full_rebuild_frequency = full_rebuild_frequency
+
+        self.generation = 0
+        self.num_tess_iterations = 0
+        self.num_ghost_per_pass = []
+        self.num_pruned_faces = 0
+
+        # geometry of last build for local extraction
+        self.num_local_builds = 0
+        self.num_active_particles = 0
+        self.num_real_last_build = -1
+        self.active = LongArray()
+        self.active_ids = LongArray()
+
+        self.num_relax_iterations = 0
+        self.relax_displacement = 0.
 
     def register_fields(self, CarrayContainer particles):
         """Register mesh fields into the particle container (i.e.
@@ -122,7 +264,22 @@ cdef class Mesh:
             particles.carray_named_groups["w"].append("w-" + axis)
             particles.carray_named_groups["dcom"].append("dcom-" + axis)
 
-        if dim == 2:
+        # position when geometry was last extracted
+        if self.frozen_tolerance > 0.:
+            particles.carray_named_groups["old_position"] = []
+            for axis in dimension:
+                particles.register_carray(num_particles, "old_position-" + axis, "double")
+                particles.carray_named_groups["old_position"].append("old_position-" + axis)
+
+        if dim == 1:
+            self.face_fields = face_vars_1d
+            self.face_field_groups = named_group_1d
+
+            for field, dtype in fields_to_register_1d.iteritems():
+                if field not in particles.carrays.keys():
+                    particles.register_carray(num_particles, field, dtype)
+
+        elif dim == 2:
             self.face_fields = face_vars_2d
             self.face_field_groups = named_group_2d
 
@@ -149,22 +306,45 @@ cdef class Mesh:
         always if particle_fields_registered is True.
         """
         cdef int dim
-        cdef nn nearest_neigh = nn()
 
         if not self.particle_fields_registered:
             raise RuntimeError("ERROR: Fields not registered in particles by Mesh!")
 
         dim = len(self.face_field_groups["velocity"])
-        self.neighbors = nn_vec(self.num_neighbors, nearest_neigh)
-
-        if dim == 2:
+        self.neighbor_offsets = LongArray(self.num_neighbors + 1)
+        self.neighbor_faces = LongArray(self.num_neighbors)
+        self.neighbor_ids = LongArray(self.num_neighbors)
+
+        if dim == 1:
+            self.tess = PyTess1d()
+            if phd._in_parallel:
+                raise RuntimeError("ERROR: 1d tessellation only in serial!")
+            if self.parallel_tess:
+                raise RuntimeError("ERROR: Parallel tessellation only in 3d!")
+            if not self.spatial_sort:
+                raise RuntimeError("ERROR: Unsorted insertion only in 2d!")
+        elif dim == 2:
             self.tess = PyTess2d()
+            if self.parallel_tess:
+                raise RuntimeError("ERROR: Parallel tessellation only in 3d!")
+            self.tess.set_spatial_sort(self.spatial_sort)
         elif dim == 3:
             self.tess = PyTess3d()
+            if not self.spatial_sort:
+                raise RuntimeError("ERROR: Unsorted insertion only in 2d!")
+            if self.tess.set_parallel_build(self.parallel_tess) == -1:
+                raise RuntimeError("ERROR: Parallel tessellation requires CGAL with TBB!")
+
+        if self.face_prune_tolerance > 0. and phd._in_parallel:
+            raise RuntimeError("ERROR: Face pruning only in serial!")
 
         self.faces = CarrayContainer(carrays_to_register=self.face_fields)
         self.faces.carray_named_groups = self.face_field_groups
 
+        # faces before pruning, reused by local builds
+        self.unpruned_faces = CarrayContainer(carrays_to_register=self.face_fields)
+        self.unpruned_faces.carray_named_groups = self.face_field_groups
+
     cpdef tessellate(self, CarrayContainer particles, DomainManager domain_manager):
         """Create voronoi tessellation.
 
@@ -180,6 +360,13 @@ cdef class Mesh:
         untill all particles are done. In this first implementation we don't
         have a kd tree but use octtree for searches.
 
+        If `persistent_tess` is set the tessellation of the previous build
+        is reused. Real particles are moved in place and on the first pass
+        the ghost vertices are matched to the new ghost particles, only
+        ghost particles that entered or left the ghost layer are inserted
+        or removed. If the tessellation can not be repaired locally it is
+        rebuilt from scratch.
+
         Parameters
         ---------
         particles : CarrayContainer
@@ -191,39 +378,70 @@ cdef class Mesh:
         """
         cdef int i
         cdef int fail
+        cdef bint relocated
+        cdef LongArray maps
         cdef np.float64_t *xp[3], *rp
         cdef DoubleArray r = particles.get_carray("radius")
         cdef int start_new_ghost, stop_new_ghost, num_real_particles
 
-        # remove current ghost particles
-        particles.remove_tagged_particles(ParticleTAGS.Ghost)
-
-        num_real_particles = particles.get_carray_size()
-        start_new_ghost = stop_new_ghost = particles.get_carray_size()
+        # remove current ghost particles, if ghost particles are
+        # reused they are kept after the real particles
+        num_real_particles = domain_manager.remove_ghost_particles(particles)
+        start_new_ghost = stop_new_ghost = num_real_particles
 
         # reference position and radius 
         rp = r.get_data_ptr()
         particles.pointer_groups(xp, particles.carray_named_groups["position"])
 
-        # first attempt of mesh, radius updated
-        assert(self.tess.build_initial_tess(xp, rp, stop_new_ghost) != -1)
+        # ghost images are only known in serial
+        relocated = False
+        if self.persistent_tess and not phd._in_parallel:
+            maps = particles.get_carray("map")
+            relocated = self.tess.relocate_tess(xp, num_real_particles) != -1
+
+        if not relocated:
+
+            # first attempt of mesh, radius updated
+            self.tess.reset_tess()
+            assert(self.tess.build_initial_tess(xp, rp, stop_new_ghost) != -1)
 
         # every infinite radius set to boundary 
         domain_manager.setup_for_ghost_creation(particles)
+        self.num_ghost_per_pass = []
 
         for i in range(self.max_iterations):
 
-            # add ghost particles untill mesh is complete
-            start_new_ghost = particles.get_carray_size()
+            # add ghost particles untill mesh is complete, reused
+            # ghost particles are part of the first pass
+            if i == 0:
+                start_new_ghost = num_real_particles
+            else:
+                start_new_ghost = particles.get_carray_size()
             domain_manager.create_ghost_particles(particles)
             stop_new_ghost = particles.get_carray_size()
+            self.num_ghost_per_pass.append(stop_new_ghost - start_new_ghost)
 
             # because of malloc
             rp = r.get_data_ptr()
             particles.pointer_groups(xp, particles.carray_named_groups["position"])
 
+            # match ghost layer of previous build
+            if relocated and i == 0:
+
+                fail = self.tess.update_ghost_tess(xp, <int*>maps.get_data_ptr(),
+                        start_new_ghost, stop_new_ghost)
+
+                # topology could not be repaired, rebuild
+                if fail == -1:
+                    self.tess.reset_tess()
+                    assert(self.tess.build_initial_tess(xp, rp, num_real_particles) != -1)
+                    assert(self.tess.update_initial_tess(xp,
+                        start_new_ghost, stop_new_ghost) != -1)
+
+                self.tess.update_radius(xp, rp, domain_manager.flagged_particles)
+
             # add ghost particle to mesh
-            if start_new_ghost != stop_new_ghost:
+            elif start_new_ghost != stop_new_ghost:
 
                 assert(self.tess.update_initial_tess(xp,
                     start_new_ghost, stop_new_ghost) != -1)
@@ -240,9 +458,18 @@ cdef class Mesh:
         if (i+1) == self.max_iterations:
             raise RuntimeError("Mesh failed to converged!")
 
+        self.num_tess_iterations = i+1
+        phdLogger.info("Mesh: Tessellation completed in %d passes, ghost particles per pass %s" %\
+                (self.num_tess_iterations, self.num_ghost_per_pass))
+
         # copy radius for next mesh construction
         domain_manager.store_radius(particles)
 
+        # ghost images for matching in next build
+        if self.persistent_tess and not phd._in_parallel:
+            self.tess.store_ghost_images(<int*>maps.get_data_ptr(),
+                    num_real_particles, particles.get_carray_size())
+
         if phd._in_parallel:
 
             # finally reindex ghost in particles and tessellation
@@ -279,19 +506,44 @@ cdef class Mesh:
         # face pointers
         cdef np.int32_t *pair_i, *pair_j
         cdef np.float64_t *area, *nx[3], *com[3]
+        cdef np.float64_t *nx_new[3], *com_new[3]
 
-        cdef int num_faces, i, j, fail
+        cdef int k, dim, num_kept, num_real_particles
+        cdef int num_faces, num_particles, fail
+        cdef bint local_build
 
         phdLogger.info("Mesh: Starting mesh creation")
 
         # release memory used in the tessellation
-        self.reset_mesh()
+        if not self.persistent_tess:
+            self.reset_mesh()
         self.tessellate(particles, domain_manager)
 
-        # allocate memory for face information
-        num_faces = self.tess.count_number_of_faces()
+        dim = len(particles.carray_named_groups["position"])
+        num_real_particles = domain_manager.num_real_particles
+
+        # reuse faces between cells that have not moved, forced
+        # full extraction every full_rebuild_frequency builds
+        local_build = self.frozen_tolerance > 0. and not phd._in_parallel and\
+                "old_position" in particles.carray_named_groups and\
+                self.num_real_last_build == num_real_particles and\
+                self.num_local_builds + 1 < self.full_rebuild_frequency
+
+        num_kept = 0
+        if local_build:
+
+            # pruning moved area onto reused faces, reuse the faces
+            # as extracted and prune all faces again
+            if self.face_prune_tolerance > 0.:
+                self.faces.resize(0)
+                self.faces.append_container(self.unpruned_faces)
+            num_kept = self.flag_active_particles(particles, num_real_particles)
+
+        # allocate memory for face information, faces are
+        # extracted in one pass so reserve an upper bound
+        num_faces = self.tess.max_number_of_faces()
         assert(num_faces != -1)
-        self.faces.resize(num_faces)
+        self.faces.resize(num_kept + num_faces)
 
         # pointers to particle data 
         particles.pointer_groups(x, particles.carray_named_groups["position"])
@@ -305,30 +557,452 @@ cdef class Mesh:
         pair_j = f_pair_j.get_data_ptr()
         area   = f_area.get_data_ptr()
 
-        self.neighbors.resize(particles.get_carray_size())
-        for i in range(particles.get_carray_size()):
-            self.neighbors[i].resize(0)
-
         # store particle and face information for the tessellation
         # only real particle information is computed
-        fail = self.tess.extract_geometry(x, dcom, vol,
-                area, com, nx, <int*>pair_i, <int*>pair_j,
-                self.neighbors)
+        self.tess.set_num_threads(self.num_threads)
+        if local_build:
+
+            # new faces are stored after reused faces
+            for k in range(dim):
+                nx_new[k] = nx[k] + num_kept
+                com_new[k] = com[k] + num_kept
+
+            fail = self.tess.extract_geometry_subset(
+                    <int*>self.active_ids.get_data_ptr(), self.active_ids.length,
+                    <int*>self.active.get_data_ptr(), x, dcom, vol,
+                    area + num_kept, com_new, nx_new,
+                    <int*>(pair_i + num_kept), <int*>(pair_j + num_kept))
+            assert(fail != -1)
+            fail += num_kept
+
+        elif self.extract_by_edge:
+            fail = self.tess.extract_geometry_by_edge(x, dcom, vol,
+                    area, com, nx, <int*>pair_i, <int*>pair_j)
+        else:
+            fail = self.tess.extract_geometry(x, dcom, vol,
+                    area, com, nx, <int*>pair_i, <int*>pair_j)
         assert(fail != -1)
 
-        # tmp for now
-        self.faces.resize(fail)
+        # trim to extracted faces, memory is kept for next build
+        num_faces = fail
+        self.faces.resize(num_faces)
+
+        # position of extracted cells for next build
+        if self.frozen_tolerance > 0. and "old_position" in particles.carray_named_groups:
+            self.store_positions(particles, num_real_particles, local_build)
+
+        if local_build:
+            self.num_local_builds += 1
+            phdLogger.info("Mesh: Extracted %d of %d cells" %\
+                    (self.num_active_particles, num_real_particles))
+        else:
+            self.num_local_builds = 0
+            self.num_active_particles = num_real_particles
+        self.num_real_last_build = num_real_particles
+
+        # remove degenerate faces
+        self.num_pruned_faces = 0
+        if self.face_prune_tolerance > 0.:
+            if self.frozen_tolerance > 0.:
+                self.unpruned_faces.resize(0)
+                self.unpruned_faces.append_container(self.faces)
+
+            self.num_pruned_faces = self.prune_faces(particles)
+            num_faces = self.faces.get_carray_size()
+            phdLogger.info("Mesh: Pruned %d faces" % self.num_pruned_faces)
+
+        # face adjacency of each particle, each face has two particles
+        num_particles = particles.get_carray_size()
+        self.neighbor_offsets.resize(num_particles + 1)
+        self.neighbor_faces.resize(2*num_faces)
+        self.neighbor_ids.resize(2*num_faces)
+
+        fail = build_face_graph(num_faces, num_particles,
+                <int*>pair_i, <int*>pair_j,
+                <int*>self.neighbor_offsets.get_data_ptr(),
+                <int*>self.neighbor_faces.get_data_ptr(),
+                <int*>self.neighbor_ids.get_data_ptr())
+        assert(fail != -1)
 
         # transfer particle information to ghost particles
         domain_manager.update_ghost_fields(particles, self.update_ghost_fields)
+        self.generation += 1
+
+    cdef int flag_active_particles(self, CarrayContainer particles, int num_real_particles):
+        """Flag the particles whose geometry is extracted in a local
+        build and keep the faces of the last build between the other
+        particles.
+
+        A real particle is active if it moved more than `frozen_tolerance`
+        of its cell size since its geometry was last extracted, if a
+        neighbor moved, or if it neighbors a ghost particle since ghost
+        particles are recreated every build. Neighbors are taken from
+        both the faces of the last build, before pruning, and the
+        current tessellation,
+        a move can change the topology so a particle can gain a moved
+        neighbor it did not share a face with. Ghost particles are
+        always active. Kept faces are compacted in place at the start
+        of the face container.
+
+        Parameters
+        ---------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        num_real_particles : int
+            Number of real particles, ghost particles come after.
+
+        Returns
+        -------
+        int
+            Number of faces kept from the last build.
+
+        """
+        cdef DoubleArray vol = particles.get_carray("volume")
+        cdef DoubleArray f_area = self.faces.get_carray("area")
+        cdef LongArray f_pair_i = self.faces.get_carray("pair-i")
+        cdef LongArray f_pair_j = self.faces.get_carray("pair-j")
+
+        cdef int i, j, k, n, m, dim, num_particles
+        cdef double dist
+        cdef np.float64_t *x[3], *xold[3], *nx[3], *com[3]
+        cdef LongArray moved = LongArray()
+
+        dim = len(particles.carray_named_groups["position"])
+        particles.pointer_groups(x, particles.carray_named_groups["position"])
+        particles.pointer_groups(xold, particles.carray_named_groups["old_position"])
+
+        num_particles = particles.get_carray_size()
+        self.active.resize(num_particles)
+        moved.resize(num_real_particles)
+
+        # particles that moved since last extracted
+        for i in range(num_real_particles):
+            dist = 0.
+            for k in range(dim):
+                dist += (x[k][i] - xold[k][i])**2
+            moved.data[i] = sqrt(dist) > self.frozen_tolerance*pow(vol.data[i], 1.0/dim)
+
+        for i in range(num_real_particles):
+            self.active.data[i] = moved.data[i]
+
+        # neighbors in faces of last build, ghost indices are not
+        # valid anymore
+        for n in range(self.faces.get_carray_size()):
+            i = f_pair_i.data[n]
+            j = f_pair_j.data[n]
+            if i < num_real_particles and\
+                    (j >= num_real_particles or moved.data[j]):
+                self.active.data[i] = 1
+            if j < num_real_particles and\
+                    (i >= num_real_particles or moved.data[i]):
+                self.active.data[j] = 1
+
+        # neighbors in the current tessellation
+        self.tess.activate_neighbors(<int*>moved.get_data_ptr(),
+                <int*>self.active.get_data_ptr())
+
+        for i in range(num_real_particles, num_particles):
+            self.active.data[i] = 1
+
+        self.active_ids.reset()
+        for i in range(num_real_particles):
+            if self.active.data[i]:
+                self.active_ids.append(i)
+        self.num_active_particles = self.active_ids.length
+
+        # keep faces between inactive real particles
+        self.faces.pointer_groups(nx,  self.faces.carray_named_groups["normal"])
+        self.faces.pointer_groups(com, self.faces.carray_named_groups["com"])
+
+        m = 0
+        for n in range(self.faces.get_carray_size()):
+            i = f_pair_i.data[n]
+            j = f_pair_j.data[n]
+
+            if i >= num_real_particles or j >= num_real_particles:
+                continue
+            if self.active.data[i] or self.active.data[j]:
+                continue
+
+            if m != n:
+                f_area.data[m] = f_area.data[n]
+                f_pair_i.data[m] = i
+                f_pair_j.data[m] = j
+                for k in range(dim):
+                    nx[k][m] = nx[k][n]
+                    com[k][m] = com[k][n]
+            m += 1
+
+        return m
+
+    cdef store_positions(self, CarrayContainer particles, int num_real_particles,
+                         bint local_build):
+        """Store position of real particles whose geometry was extracted.
+
+        Parameters
+        ---------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        num_real_particles : int
+            Number of real particles, ghost particles come after.
+
+        local_build : bool
+            If True only active particles are stored.
+
+        """
+        cdef int i, k, dim
+        cdef np.float64_t *x[3], *xold[3]
+
+        dim = len(particles.carray_named_groups["position"])
+        particles.pointer_groups(x, particles.carray_named_groups["position"])
+        particles.pointer_groups(xold, particles.carray_named_groups["old_position"])
+
+        for i in range(num_real_particles):
+            if not local_build or self.active.data[i]:
+                for k in range(dim):
+                    xold[k][i] = x[k][i]
+
+    cdef int prune_faces(self, CarrayContainer particles):
+        """Remove faces with area smaller than `face_prune_tolerance`
+        relative to the distance between its particles. Faces are
+        compacted in place keeping their order. Only used in serial
+        runs, whether a face is removed depends on faces of its
+        neighbors which are not all known on both sides of a processor
+        boundary.
+
+        Removing a face between particles i and j opens both cells, the
+        sum of area vectors of a cell is no longer zero. The area vector
+        of the face is split between the common neighbors k of i and j
+        and added to faces (i, k) and (k, j), the face collapses onto
+        its neighbors, so every cell stays closed and a uniform state
+        stays uniform. Faces without a common neighbor are kept.
+
+        Parameters
+        ---------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        Returns
+        -------
+        int
+            Number of faces removed.
+
+        """
+        cdef DoubleArray f_area = self.faces.get_carray("area")
+        cdef LongArray f_pair_i = self.faces.get_carray("pair-i")
+        cdef LongArray f_pair_j = self.faces.get_carray("pair-j")
+
+        cdef int i, j, k, n, m, a, b, dim, num_faces, num_particles
+        cdef int num_common, fail
+        cdef double h, scale
+        cdef double av[3]
+        cdef np.float64_t *x[3], *nx[3], *com[3]
+
+        cdef IntArray pruned = IntArray()
+        cdef LongArray offsets = LongArray()
+        cdef LongArray nbr_faces = LongArray()
+        cdef LongArray nbr_ids = LongArray()
+
+        dim = len(particles.carray_named_groups["position"])
+        particles.pointer_groups(x, particles.carray_named_groups["position"])
+        self.faces.pointer_groups(nx,  self.faces.carray_named_groups["normal"])
+        self.faces.pointer_groups(com, self.faces.carray_named_groups["com"])
+
+        num_faces = self.faces.get_carray_size()
+        num_particles = particles.get_carray_size()
+
+        # flag faces to remove
+        pruned.resize(num_faces)
+        for n in range(num_faces):
+            i = f_pair_i.data[n]
+            j = f_pair_j.data[n]
+
+            # face area scale from particle separation
+            h = 0.
+            for k in range(dim):
+                h += (x[k][j] - x[k][i])**2
+            scale = pow(h, 0.5*(dim - 1))
+
+            pruned.data[n] = f_area.data[n] < self.face_prune_tolerance*scale
+
+        # face adjacency before removal to find common neighbors
+        offsets.resize(num_particles + 1)
+        nbr_faces.resize(2*num_faces)
+        nbr_ids.resize(2*num_faces)
+        fail = build_face_graph(num_faces, num_particles,
+                <int*>f_pair_i.get_data_ptr(), <int*>f_pair_j.get_data_ptr(),
+                <int*>offsets.get_data_ptr(), <int*>nbr_faces.get_data_ptr(),
+                <int*>nbr_ids.get_data_ptr())
+        assert(fail != -1)
+
+        for n in range(num_faces):
+            if not pruned.data[n]:
+                continue
+
+            i = f_pair_i.data[n]
+            j = f_pair_j.data[n]
+
+            # common neighbors sharing kept faces with i and j
+            num_common = 0
+            for a in range(offsets.data[i], offsets.data[i+1]):
+                b = self.common_face(pruned, offsets, nbr_faces, nbr_ids,
+                        j, nbr_ids.data[a])
+                if b != -1 and not pruned.data[nbr_faces.data[a]]:
+                    num_common += 1
+
+            if num_common == 0:
+                pruned.data[n] = 0
+                continue
+
+            # area vector of face, oriented from i to j
+            for k in range(dim):
+                av[k] = f_area.data[n]*nx[k][n]/num_common
+
+            for a in range(offsets.data[i], offsets.data[i+1]):
+                b = self.common_face(pruned, offsets, nbr_faces, nbr_ids,
+                        j, nbr_ids.data[a])
+                if b != -1 and not pruned.data[nbr_faces.data[a]]:
+                    self.add_area_vector(nbr_faces.data[a], i, av, dim)
+                    self.add_area_vector(b, nbr_ids.data[a], av, dim)
+
+        # compact kept faces
+        m = 0
+        for n in range(num_faces):
+            if pruned.data[n]:
+                continue
+
+            if m != n:
+                f_area.data[m] = f_area.data[n]
+                f_pair_i.data[m] = f_pair_i.data[n]
+                f_pair_j.data[m] = f_pair_j.data[n]
+                for k in range(dim):
+                    nx[k][m] = nx[k][n]
+                    com[k][m] = com[k][n]
+            m += 1
+
+        self.faces.resize(m)
+        return num_faces - m
+
+    cdef int common_face(self, IntArray pruned, LongArray offsets,
+                         LongArray nbr_faces, LongArray nbr_ids, int j, int k):
+        """Return the kept face between particles j and k, -1 if there
+        is none."""
+        cdef int b
+        for b in range(offsets.data[j], offsets.data[j+1]):
+            if nbr_ids.data[b] == k and not pruned.data[nbr_faces.data[b]]:
+                return nbr_faces.data[b]
+        return -1
+
+    cdef void add_area_vector(self, int n, int i, double av[3], int dim):
+        """Add area vector av, oriented out of particle i, to face n."""
+        cdef DoubleArray f_area = self.faces.get_carray("area")
+        cdef LongArray f_pair_i = self.faces.get_carray("pair-i")
+
+        cdef int k
+        cdef double sign, mag
+        cdef double v[3]
+        cdef np.float64_t *nx[3]
+
+        self.faces.pointer_groups(nx,  self.faces.carray_named_groups["normal"])
+
+        # face normal points out of pair-i
+        sign = 1.0 if f_pair_i.data[n] == i else -1.0
+
+        mag = 0.
+        for k in range(dim):
+            v[k] = f_area.data[n]*nx[k][n] + sign*av[k]
+            mag += v[k]*v[k]
+        mag = sqrt(mag)
+
+        if mag > 0.:
+            f_area.data[n] = mag
+            for k in range(dim):
+                nx[k][n] = v[k]/mag
+
+    def get_neighbor_graph(self):
+        """Return the face adjacency of the last build as numpy views.
+        The views are invalidated by the next build.
+
+        Returns
+        -------
+        offsets : np.ndarray
+            Start of faces of each particle, size number of particles + 1.
+
+        faces : np.ndarray
+            Face indices of each particle.
+
+        neighbors : np.ndarray
+            Particle on the other side of each face.
+
+        """
+        return (self.neighbor_offsets.get_npy_array(),
+                self.neighbor_faces.get_npy_array(),
+                self.neighbor_ids.get_npy_array())
+
+    def get_voronoi_polygons(self):
+        """Return the voronoi polygon of each real particle of the last
+        build, taken from the tessellation. Polygon i has vertices
+        vertices[offsets[i]:offsets[i+1]] in counter clockwise order.
+        The polygons belong to the positions of the last build, which
+        are returned with them since generators move after the build.
+        Only available in 2d.
+
+        Returns
+        -------
+        vertices : np.ndarray
+            Polygon vertices, shape (number of vertices, 2).
+
+        offsets : np.ndarray
+            Start of each polygon, size number of real particles + 1.
+
+        generators : np.ndarray
+            Position of each real particle when the polygons were
+            built, shape (number of real particles, 2).
+
+        """
+        cdef int dim = len(self.face_field_groups["velocity"])
+        cdef int num_vertices
+        cdef np.ndarray[np.float64_t, ndim=2] vertices, generators
+        cdef np.ndarray[np.int32_t, ndim=1] offsets
+        cdef np.float64_t *xv[3], *xg[3]
+
+        if dim != 2:
+            raise RuntimeError("ERROR: Voronoi polygons only in 2d!")
+        if self.num_real_last_build < 0:
+            raise RuntimeError("ERROR: Mesh has not been built!")
+
+        # each delaunay edge gives at most two polygon vertices
+        num_vertices = 2*self.tess.max_number_of_faces()
+        vertices = np.empty((2, num_vertices), dtype=np.float64)
+        offsets = np.empty(self.num_real_last_build + 1, dtype=np.int32)
+
+        generators = np.empty((2, self.num_real_last_build + 1), dtype=np.float64)
+
+        xv[0] = &vertices[0, 0]
+        xv[1] = &vertices[1, 0]
+        xg[0] = &generators[0, 0]
+        xg[1] = &generators[1, 0]
+
+        num_vertices = self.tess.extract_polygons(xv, <int*>offsets.data, xg)
+        if num_vertices == -1:
+            raise RuntimeError("ERROR: Voronoi polygons not complete!")
+
+        return (vertices[:, :num_vertices].T.copy(), offsets,
+                generators[:, :self.num_real_last_build].T.copy())
 
     cpdef reset_mesh(self):
         """Clear out mesh data."""
         self.tess.reset_tess()
 
-    cpdef relax(self, CarrayContainer particles, DomainManager domain_manager):
+    cpdef double relax(self, CarrayContainer particles, DomainManager domain_manager):
         """Perform mesh relaxation by moving particles to their center of mass.
 
+        Ghost particles are left to the domain manager, which keeps them
+        for the next build if `reuse_ghosts` is set. Particles are only
+        migrated if a particle left the domain.
+
         Parameters
         ---------
         particles : CarrayContainer
@@ -337,29 +1011,113 @@ cdef class Mesh:
         domain_manager : DomainManager
             Class that handels all things related with the domain.
 
+        Returns
+        -------
+        double
+            Largest displacement of a real particle in units of its
+            cell size.
+
         """
         cdef np.float64_t *x[3], *dcx[3]
         cdef int i, k, dim, num_real_particles
+        cdef double dist, max_dist
+        cdef bint outside
         cdef IntArray tags = particles.get_carray("tag")
+        cdef DoubleArray vol = particles.get_carray("volume")
 
         dim = len(particles.carray_named_groups["position"])
-        particles.remove_tagged_particles(ParticleTAGS.Ghost)
 
         # create ghost, extract geometric values
         self.build_geometry(particles, domain_manager)
 
         # update real particle positions
+        max_dist = 0.
+        outside = False
         particles.pointer_groups(x,   particles.carray_named_groups["position"])
         particles.pointer_groups(dcx, particles.carray_named_groups["dcom"])
         for i in range(particles.get_carray_size()):
             if tags.data[i] == REAL:
+                dist = 0.
                 for k in range(dim):
                     x[k][i] += dcx[k][i]
+                    dist += dcx[k][i]*dcx[k][i]
+                    if x[k][i] < domain_manager.bounds[0][k] or\
+                            x[k][i] > domain_manager.bounds[1][k]:
+                        outside = True
+
+                # displacement relative to cell size
+                max_dist = fmax(max_dist,
+                        sqrt(dist)/pow(vol.data[i], 1.0/dim))
 
         # use boundary conditions for particles
         # that leave the domain
+        if outside:
+            domain_manager.migrate_particles(particles)
+
+        return max_dist
+
+    cpdef int relax_mesh(self, CarrayContainer particles, DomainManager domain_manager):
+        """Perform lloyd relaxation until the largest displacement of a
+        particle to its center of mass, in units of the cell size, is
+        below `relax_tolerance` or `relax_iterations` is reached.
+
+        In serial runs the tessellation is kept between iterations and
+        vertices are moved in place (see `persistent_tess`), persistent
+        mode is not used in parallel runs. Particles are migrated once
+        the relaxation has finished, repartitioning is left to the caller.
+
+        Parameters
+        ---------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        domain_manager : DomainManager
+            Class that handels all things related with the domain.
+
+        Returns
+        -------
+        int
+            Number of lloyd iterations performed.
+
+        """
+        cdef int i
+        cdef double max_dist
+        cdef bint persistent_tess = self.persistent_tess
+        cdef double frozen_tolerance = self.frozen_tolerance
+
+        # move vertices in place between iterations, only in serial,
+        # every cell moves so the geometry is always fully extracted
+        self.persistent_tess = not phd._in_parallel
+        self.frozen_tolerance = 0.
+
+        max_dist = 0.
+        self.num_relax_iterations = 0
+        for i in range(self.relax_iterations):
+
+            max_dist = self.relax(particles, domain_manager)
+            if phd._in_parallel:
+                max_dist = phd._comm.allreduce(max_dist, op=phd.MPI.MAX)
+
+            self.num_relax_iterations = i+1
+            phdLogger.info("Mesh: Relax iteration %d, max displacement %e" %\
+                    (i, max_dist))
+
+            if max_dist < self.relax_tolerance:
+                break
+
+        self.relax_displacement = max_dist
+        self.persistent_tess = persistent_tess
+        self.frozen_tolerance = frozen_tolerance
+
+        # use boundary conditions for particles that
+        # left the domain, removes ghost particles
         domain_manager.migrate_particles(particles)
 
+        phdLogger.info("Mesh: Relaxation finished in %d iterations" %\
+                self.num_relax_iterations)
+
+        return self.num_relax_iterations
+
     cpdef assign_generator_velocities(self, CarrayContainer particles,
                                       EquationStateBase equation_state):
         """Assigns particle velocities.
@@ -411,6 +1169,8 @@ cdef class Mesh:
                 d = sqrt(d)
 
                 # approximate length of cell
+                if dim == 1:
+                    R = 0.5*vol.data[i]
                 if dim == 2:
                     R = sqrt(vol.data[i]/np.pi)
                 if dim == 3:
@@ -506,6 +1266,11 @@ cdef class Mesh:
         cdef DoubleArray fm = riemann.fluxes.get_carray("mass")
         cdef DoubleArray fe = riemann.fluxes.get_carray("energy")
 
+        # mass of passive scalars and their flux
+        cdef DoubleBlockArray pm, fpm
+        cdef int num_passive = 0
+        cdef np.float64_t *pm_i, *pm_j, *fpm_n
+
         cdef double a
         cdef int i, j, k, n, dim
         cdef np.float64_t *x[3], *wx[3], *mv[3], *fmv[3]
@@ -515,6 +1280,11 @@ cdef class Mesh:
         particles.pointer_groups(mv, particles.carray_named_groups["momentum"])
         riemann.fluxes.pointer_groups(fmv, riemann.fluxes.carray_named_groups["momentum"])
 
+        if "passive-mass" in riemann.fluxes.carrays:
+            pm = particles.get_carray("passive-mass")
+            fpm = riemann.fluxes.get_carray("passive-mass")
+            num_passive = fpm.num_components
+
         # update conserved quantities
         for n in range(self.faces.get_carray_size()):
 
@@ -525,6 +1295,10 @@ cdef class Mesh:
             # area of the face
             a = area.data[n]
 
+            # species of face and particles are contiguous
+            if num_passive:
+                fpm_n = fpm.data + n*num_passive
+
             # flux entering cell defined by particle i
             if(tags.data[i] == REAL):
                 m.data[i] -= dt*a*fm.data[n]  # mass 
@@ -534,6 +1308,12 @@ cdef class Mesh:
                 for k in range(dim):
                     mv[k][i] -= dt*a*fmv[k][n]
 
+                # passive scalars
+                if num_passive:
+                    pm_i = pm.data + i*num_passive
+                    for k in range(num_passive):
+                        pm_i[k] -= dt*a*fpm_n[k]
+
             # flux leaving cell defined by particle j
             if(tags.data[j] == REAL):
                 m.data[j] += dt*a*fm.data[n]  # mass
@@ -543,6 +1323,12 @@ cdef class Mesh:
                 for k in range(dim):
                     mv[k][j] += dt*a*fmv[k][n]
 
+                # passive scalars
+                if num_passive:
+                    pm_j = pm.data + j*num_passive
+                    for k in range(num_passive):
+                        pm_j[k] += dt*a*fpm_n[k]
+
             if m.data[i] <= 0.0 or m.data[j] <=0.0:
                 print "mass", m.data[i], m.data[j], ids.data[i], ids.data[j], i, j
                 raise RuntimeError("Mass less than zero in flux update")
@@ -3,19 +3,57 @@ from libcpp.list cimport list as cpplist
 
 from ..domain.domain_manager cimport FlagParticle, GhostID
 
-ctypedef vector[int] nn
-ctypedef vector[nn] nn_vec
-
 cdef extern from "tess.h":
+    int build_face_graph(int num_faces, int num_particles, int *pair_i, int *pair_j,
+            int *offsets, int *face_ids, int *neighbor_ids)
+
+    cdef cppclass Tess1d:
+        Tess1d() except +
+        void reset_tess()
+        int build_initial_tess(double *x[3], double *radius, int num_real_particles)
+        int update_initial_tess(double *x[3], int begin_particles, int end_particles)
+        int relocate_tess(double *x[3], int num_real_particles)
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles)
+        int store_ghost_images(int *image, int begin_particles, int end_particles)
+        int max_number_of_faces()
+        void set_num_threads(int num_threads)
+        int extract_geometry(double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+        int extract_geometry_by_edge(double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+        int activate_neighbors(int* moved, int* active)
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+        int update_radius(double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles)
+        int reindex_ghost(vector[GhostID] &import_ghost_buffer)
+
     cdef cppclass Tess2d:
         Tess2d() except +
         void reset_tess()
         int build_initial_tess(double *x[3], double *radius, int num_real_particles)
         int update_initial_tess(double *x[3], int begin_particles, int end_particles)
-        int count_number_of_faces()
+        int relocate_tess(double *x[3], int num_real_particles)
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles)
+        int store_ghost_images(int *image, int begin_particles, int end_particles)
+        int max_number_of_faces()
+        int extract_polygons(double* vertices[3], int* offsets, double* generators[3])
+        void set_num_threads(int num_threads)
+        void set_spatial_sort(bint spatial_sort)
         int extract_geometry(double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors)
+                int* pair_i, int* pair_j)
+        int extract_geometry_by_edge(double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+        int activate_neighbors(int* moved, int* active)
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
         int update_radius(double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles)
         int reindex_ghost(vector[GhostID] &import_ghost_buffer)
 
@@ -24,10 +62,23 @@ cdef extern from "tess.h":
         void reset_tess()
         int build_initial_tess(double *x[3], double *radius, int num_real_particles)
         int update_initial_tess(double *x[3], int begin_particles, int end_particles)
-        int count_number_of_faces()
+        int relocate_tess(double *x[3], int num_real_particles)
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles)
+        int store_ghost_images(int *image, int begin_particles, int end_particles)
+        int max_number_of_faces()
+        void set_num_threads(int num_threads)
+        int set_parallel_build(bint parallel_build)
         int extract_geometry(double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors)
+                int* pair_i, int* pair_j)
+        int extract_geometry_by_edge(double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+        int activate_neighbors(int* moved, int* active)
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
         int update_radius(double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles)
         int reindex_ghost(vector[GhostID] &import_ghost_buffer)
 
@@ -36,13 +87,31 @@ cdef class PyTess:
     cdef void reset_tess(self)
     cdef int build_initial_tess(self, double *x[3], double *radius, int num_real_particles)
     cdef int update_initial_tess(self, double *x[3], int begin_particles, int end_particles)
-    cdef int count_number_of_faces(self)
+    cdef int relocate_tess(self, double *x[3], int num_real_particles)
+    cdef int update_ghost_tess(self, double *x[3], int *image, int begin_particles, int end_particles)
+    cdef int store_ghost_images(self, int *image, int begin_particles, int end_particles)
+    cdef int max_number_of_faces(self)
+    cdef int extract_polygons(self, double* vertices[3], int* offsets, double* generators[3])
+    cdef void set_num_threads(self, int num_threads)
+    cdef int set_parallel_build(self, bint parallel_build)
+    cdef void set_spatial_sort(self, bint spatial_sort)
     cdef int extract_geometry(self, double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors)
+                int* pair_i, int* pair_j)
+    cdef int extract_geometry_by_edge(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
+    cdef int activate_neighbors(self, int* moved, int* active)
+    cdef int extract_geometry_subset(self, int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j)
     cdef int update_radius(self, double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles)
     cdef int reindex_ghost(self, vector[GhostID] &import_ghost_buffer)
 
+cdef class PyTess1d(PyTess):
+    cdef Tess1d *thisptr
+
 cdef class PyTess2d(PyTess):
     cdef Tess2d *thisptr
 
@@ -9,14 +9,49 @@ cdef class PyTess:
     cdef int update_initial_tess(self, double *x[3], int begin_particles, int end_particles):
         raise NotImplementedError, "PyTess::update_initial_tess"
 
-    cdef int count_number_of_faces(self):
-        raise NotImplementedError, "PyTess::count_number_of_faces"
+    cdef int relocate_tess(self, double *x[3], int num_real_particles):
+        raise NotImplementedError, "PyTess::relocate_tess"
+
+    cdef int update_ghost_tess(self, double *x[3], int *image, int begin_particles, int end_particles):
+        raise NotImplementedError, "PyTess::update_ghost_tess"
+
+    cdef int store_ghost_images(self, int *image, int begin_particles, int end_particles):
+        raise NotImplementedError, "PyTess::store_ghost_images"
+
+    cdef int max_number_of_faces(self):
+        raise NotImplementedError, "PyTess::max_number_of_faces"
+
+    cdef int extract_polygons(self, double* vertices[3], int* offsets, double* generators[3]):
+        raise NotImplementedError, "PyTess::extract_polygons"
+
+    cdef void set_num_threads(self, int num_threads):
+        raise NotImplementedError, "PyTess::set_num_threads"
+
+    cdef int set_parallel_build(self, bint parallel_build):
+        raise NotImplementedError, "PyTess::set_parallel_build"
+
+    cdef void set_spatial_sort(self, bint spatial_sort):
+        raise NotImplementedError, "PyTess::set_spatial_sort"
 
     cdef int extract_geometry(self, double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors):
+                int* pair_i, int* pair_j):
         raise NotImplementedError, 'PyTess::extract_geometry'
 
+    cdef int extract_geometry_by_edge(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        raise NotImplementedError, 'PyTess::extract_geometry_by_edge'
+
+    cdef int activate_neighbors(self, int* moved, int* active):
+        raise NotImplementedError, 'PyTess::activate_neighbors'
+
+    cdef int extract_geometry_subset(self, int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        raise NotImplementedError, 'PyTess::extract_geometry_subset'
+
     cdef int update_radius(self, double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles):
         raise NotImplementedError, 'PyTess::update_radius'
 
@@ -24,6 +59,70 @@ cdef class PyTess:
         raise NotImplementedError, 'PyTess::reindex_ghost'
 
 
+cdef class PyTess1d(PyTess):
+    def __cinit__(self):
+        self.thisptr = new Tess1d()
+
+    def __dealloc__(self):
+        del self.thisptr
+
+    cdef void reset_tess(self):
+        self.thisptr.reset_tess()
+
+    cdef int build_initial_tess(self, double *x[3], double *radius, int num_real_particles):
+        return self.thisptr.build_initial_tess(x, radius, num_real_particles)
+
+    cdef int update_initial_tess(self, double *x[3], int begin_particles, int end_particles):
+        return self.thisptr.update_initial_tess(x, begin_particles, end_particles)
+
+    cdef int relocate_tess(self, double *x[3], int num_real_particles):
+        return self.thisptr.relocate_tess(x, num_real_particles)
+
+    cdef int update_ghost_tess(self, double *x[3], int *image, int begin_particles, int end_particles):
+        return self.thisptr.update_ghost_tess(x, image, begin_particles, end_particles)
+
+    cdef int store_ghost_images(self, int *image, int begin_particles, int end_particles):
+        return self.thisptr.store_ghost_images(image, begin_particles, end_particles)
+
+    cdef int max_number_of_faces(self):
+        return self.thisptr.max_number_of_faces()
+
+    cdef void set_num_threads(self, int num_threads):
+        self.thisptr.set_num_threads(num_threads)
+
+    cdef int extract_geometry(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry(x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
+
+    cdef int extract_geometry_by_edge(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_by_edge(x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
+
+    cdef int activate_neighbors(self, int* moved, int* active):
+        return self.thisptr.activate_neighbors(moved, active)
+
+    cdef int extract_geometry_subset(self, int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_subset(ids, num_ids, active,
+                x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
+
+    cdef int update_radius(self, double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles):
+        return self.thisptr.update_radius(x, radius, flagged_particles)
+
+    cdef int reindex_ghost(self, vector[GhostID] &import_ghost_buffer):
+        return self.thisptr.reindex_ghost(import_ghost_buffer)
+
+
 cdef class PyTess2d(PyTess):
     def __cinit__(self):
         self.thisptr = new Tess2d()
@@ -40,15 +139,52 @@ cdef class PyTess2d(PyTess):
     cdef int update_initial_tess(self, double *x[3], int begin_particles, int end_particles):
         return self.thisptr.update_initial_tess(x, begin_particles, end_particles)
 
-    cdef int count_number_of_faces(self):
-        return self.thisptr.count_number_of_faces()
+    cdef int relocate_tess(self, double *x[3], int num_real_particles):
+        return self.thisptr.relocate_tess(x, num_real_particles)
+
+    cdef int update_ghost_tess(self, double *x[3], int *image, int begin_particles, int end_particles):
+        return self.thisptr.update_ghost_tess(x, image, begin_particles, end_particles)
+
+    cdef int store_ghost_images(self, int *image, int begin_particles, int end_particles):
+        return self.thisptr.store_ghost_images(image, begin_particles, end_particles)
+
+    cdef int max_number_of_faces(self):
+        return self.thisptr.max_number_of_faces()
+
+    cdef int extract_polygons(self, double* vertices[3], int* offsets, double* generators[3]):
+        return self.thisptr.extract_polygons(vertices, offsets, generators)
+
+    cdef void set_num_threads(self, int num_threads):
+        self.thisptr.set_num_threads(num_threads)
+
+    cdef void set_spatial_sort(self, bint spatial_sort):
+        self.thisptr.set_spatial_sort(spatial_sort)
 
     cdef int extract_geometry(self, double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors):
+                int* pair_i, int* pair_j):
         return self.thisptr.extract_geometry(x, dcenter_of_mass, volume,
                 face_area, face_com, face_n,
-                pair_i, pair_j, neighbors)
+                pair_i, pair_j)
+
+    cdef int extract_geometry_by_edge(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_by_edge(x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
+
+    cdef int activate_neighbors(self, int* moved, int* active):
+        return self.thisptr.activate_neighbors(moved, active)
+
+    cdef int extract_geometry_subset(self, int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_subset(ids, num_ids, active,
+                x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
 
     cdef int update_radius(self, double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles):
         return self.thisptr.update_radius(x, radius, flagged_particles)
@@ -73,15 +209,49 @@ cdef class PyTess3d(PyTess):
     cdef int update_initial_tess(self, double *x[3], int begin_particles, int end_particles):
         return self.thisptr.update_initial_tess(x, begin_particles, end_particles)
 
-    cdef int count_number_of_faces(self):
-        return self.thisptr.count_number_of_faces()
+    cdef int relocate_tess(self, double *x[3], int num_real_particles):
+        return self.thisptr.relocate_tess(x, num_real_particles)
+
+    cdef int update_ghost_tess(self, double *x[3], int *image, int begin_particles, int end_particles):
+        return self.thisptr.update_ghost_tess(x, image, begin_particles, end_particles)
+
+    cdef int store_ghost_images(self, int *image, int begin_particles, int end_particles):
+        return self.thisptr.store_ghost_images(image, begin_particles, end_particles)
+
+    cdef int max_number_of_faces(self):
+        return self.thisptr.max_number_of_faces()
+
+    cdef void set_num_threads(self, int num_threads):
+        self.thisptr.set_num_threads(num_threads)
+
+    cdef int set_parallel_build(self, bint parallel_build):
+        return self.thisptr.set_parallel_build(parallel_build)
 
     cdef int extract_geometry(self, double* x[3], double* dcenter_of_mass[3], double* volume,
                 double* face_area, double* face_com[3], double* face_n[3],
-                int* pair_i, int* pair_j, nn_vec &neighbors):
+                int* pair_i, int* pair_j):
         return self.thisptr.extract_geometry(x, dcenter_of_mass, volume,
                 face_area, face_com, face_n,
-                pair_i, pair_j, neighbors)
+                pair_i, pair_j)
+
+    cdef int extract_geometry_by_edge(self, double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_by_edge(x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
+
+    cdef int activate_neighbors(self, int* moved, int* active):
+        return self.thisptr.activate_neighbors(moved, active)
+
+    cdef int extract_geometry_subset(self, int* ids, int num_ids, int* active,
+                double* x[3], double* dcenter_of_mass[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3],
+                int* pair_i, int* pair_j):
+        return self.thisptr.extract_geometry_subset(ids, num_ids, active,
+                x, dcenter_of_mass, volume,
+                face_area, face_com, face_n,
+                pair_i, pair_j)
 
     cdef int update_radius(self, double *x[3], double *radius, cpplist[FlagParticle] &flagged_particles):
         return self.thisptr.update_radius(x, radius, flagged_particles)
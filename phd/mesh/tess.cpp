@@ -1,12 +1,17 @@
 #include "tess.h"
 //#include <vector>
 #include <iostream>
+#include <algorithm>
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 //#include <CGAL/Exact_predicates_exact_constructions_kernel.h>
 #include <CGAL/Delaunay_triangulation_2.h>
 #include <CGAL/Triangulation_vertex_base_with_info_2.h> 
+#include <CGAL/Spatial_sort_traits_adapter_2.h>
+#include <CGAL/spatial_sort.h>
 #include <CGAL/number_utils.h>
 
+#include <boost/iterator/counting_iterator.hpp>
+
 #include <CGAL/Memory_sizer.h>
 
 typedef CGAL::Exact_predicates_inexact_constructions_kernel K; 
@@ -16,20 +21,146 @@ typedef CGAL::Triangulation_data_structure_2<Vb>            Tds;
 typedef CGAL::Delaunay_triangulation_2<K, Tds>              Tess;
 typedef CGAL::Object          Object;
 typedef Tess::Vertex_handle   Vertex_handle;
+typedef Tess::Face_handle     Face_handle;
 typedef Tess::Point           Point;
 typedef Tess::Edge            Edge;
 typedef Tess::Edge_circulator Edge_circulator;
+typedef Tess::Face_circulator Face_circulator;
+typedef Tess::Finite_edges_iterator Finite_edges_iterator;
+
+typedef CGAL::Spatial_sort_traits_adapter_2<K, Point*> Search_traits_2;
+
+static void hilbert_sort_indices(
+        std::vector<Point> &particles,
+        std::vector<std::ptrdiff_t> &indices,
+        bool spatial_sort) {
+    /*
+
+    Sort particles along a hilbert curve (with biased randomized
+    insertion order) such that consecutive insertions are close in
+    space and point location is cheap. The particles are not moved,
+    only their indices are sorted.
+
+    Parameters
+    ----------
+    particles : std::vector<Point>
+        Particles to sort.
+
+    indices : std::vector<std::ptrdiff_t>
+        Container to store sorted indices of particles.
+
+    spatial_sort : bool
+        If false the indices are left in the order of the particles.
+
+    */
+    indices.clear();
+    indices.reserve(particles.size());
+    std::copy(
+            boost::counting_iterator<std::ptrdiff_t>(0),
+            boost::counting_iterator<std::ptrdiff_t>(particles.size()),
+            std::back_inserter(indices));
+
+    if (particles.empty() || !spatial_sort)
+        return;
+
+    // sort particles by hilbert keys
+    CGAL::spatial_sort(indices.begin(), indices.end(), Search_traits_2(&(particles[0])),
+            CGAL::Hilbert_sort_median_policy());
+}
+
+int build_face_graph(
+        int num_faces,
+        int num_particles,
+        int *pair_i,
+        int *pair_j,
+        int *offsets,
+        int *face_ids,
+        int *neighbor_ids) {
+    /*
+
+    Build the face adjacency of the mesh in compressed sparse row
+    format. The faces of particle i are face_ids[offsets[i]:offsets[i+1]]
+    and the particle on the other side of each face is stored in
+    neighbor_ids at the same location. Faces of each particle are
+    stored in ascending face order.
+
+    Parameters
+    ----------
+    num_faces : int
+        Number of faces extracted from the mesh.
+
+    num_particles : int
+        Number of particles (real and ghost) in the mesh.
+
+    pair_i : int*
+        Pointer to left most particle defining the face.
+
+    pair_j : int*
+        Pointer to right most particle defining the face.
+
+    offsets : int*
+        Pointer to row offsets, size num_particles + 1.
+
+    face_ids : int*
+        Pointer to face indices of each particle, size 2*num_faces.
+
+    neighbor_ids : int*
+        Pointer to neighbor indices of each particle, size 2*num_faces.
+
+    */
+    int i, j, n, pos;
+
+    // count faces per particle
+    for (i=0; i<num_particles+1; i++)
+        offsets[i] = 0;
+    for (n=0; n<num_faces; n++) {
+        i = pair_i[n]; j = pair_j[n];
+        if (i < 0 || i >= num_particles || j < 0 || j >= num_particles)
+            return -1;
+        offsets[i+1]++;
+        offsets[j+1]++;
+    }
+
+    // prefix sum for row starts
+    for (i=0; i<num_particles; i++)
+        offsets[i+1] += offsets[i];
+
+    // scatter faces, offsets are shifted to row ends
+    for (n=0; n<num_faces; n++) {
+        i = pair_i[n]; j = pair_j[n];
+
+        pos = offsets[i]++;
+        face_ids[pos] = n;
+        neighbor_ids[pos] = j;
+
+        pos = offsets[j]++;
+        face_ids[pos] = n;
+        neighbor_ids[pos] = i;
+    }
+
+    // shift offsets back to row starts
+    for (i=num_particles; i>0; i--)
+        offsets[i] = offsets[i-1];
+    offsets[0] = 0;
+
+    return offsets[num_particles];
+}
 
 Tess2d::Tess2d(void) {
+    num_threads = 1;
+    spatial_sort = true;
     ptess = NULL;
     pvt_list = NULL;
+    pimage_list = NULL;
 }
 
 void Tess2d::reset_tess(void) {
     delete (Tess*) ptess;
     delete (std::vector<Vertex_handle>*) pvt_list;
+    delete (std::vector<int>*) pimage_list;
     ptess = NULL;
     pvt_list = NULL;
+    pimage_list = NULL;
 }
 
 int Tess2d::build_initial_tess(
@@ -71,11 +202,20 @@ int Tess2d::build_initial_tess(
     Tess &tess = *(Tess*) ptess;
     std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
 
+    // sort particles by hilbert keys
+    std::vector<std::ptrdiff_t> indices;
+    hilbert_sort_indices(particles, indices, spatial_sort);
+
+    // insert sorted particles into the tessellation, the last
+    // inserted vertex is used as hint for point location
     Vertex_handle vt;
-    for (int i=0; i<num_real_particles; i++) {
-        vt = tess.insert(particles[i]);
-        vt->info() = i;
-        vt_list[i] = vt;
+    Face_handle hint;
+    for (std::vector<std::ptrdiff_t>::iterator it=indices.begin(); it!=indices.end(); it++) {
+        vt = tess.insert(particles[*it], hint);
+        vt->info() = *it;
+        vt_list[*it] = vt;
+        if (spatial_sort)
+            hint = vt->face();
     }
 
     // only real particles
@@ -176,63 +316,342 @@ int Tess2d::update_initial_tess(
     for (int i=begin_particles; i<end_particles; i++)
         particles.push_back(Point(x[0][i], x[1][i]));
 
+    // sort particles by hilbert keys
+    std::vector<std::ptrdiff_t> indices;
+    hilbert_sort_indices(particles, indices, spatial_sort);
+
+    int new_num_particles = particles.size();
+    int old_num_particles = vt_list.size();
+
+    vt_list.resize(old_num_particles + new_num_particles);
+
     // add ghost particles to the tessellation
     Vertex_handle vt;
-    for (int i=0, j=begin_particles; i<particles.size(); i++, j++) {
-        vt = tess.insert(particles[i]);
-        vt->info() = j;
-        vt_list.push_back(vt);
+    Face_handle hint;
+    for (std::vector<std::ptrdiff_t>::iterator it=indices.begin(); it!=indices.end(); it++) {
+        vt = tess.insert(particles[*it], hint);
+        vt->info() = *it + begin_particles;
+        vt_list[*it + begin_particles] = vt;
+        if (spatial_sort)
+            hint = vt->face();
     }
     return 0;
 }
 
-int Tess2d::count_number_of_faces(void) {
+int Tess2d::relocate_tess(
+        double *x[3],
+        int num_real_particles) {
     /*
 
-    Count the number of faces that belong to a real
-    particle. This is used to allocate storage for
-    containers holding face information.
+    Move real particles of the previous tessellation to their new
+    positions instead of rebuilding the tessellation. Each vertex is
+    moved in place and CGAL repairs the triangulation locally where
+    the topology changes. Ghost particles from the previous build are
+    left untouched, they are updated in update_ghost_tess.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    num_real_particles : int
+        Starting index of the first ghost particle in the particle
+        data container.
 
     */
+    // nothing to relocate or real particles have changed
+    if (ptess == NULL || pimage_list == NULL)
+        return -1;
+    if (num_real_particles != local_num_particles)
+        return -1;
+
     Tess &tess = *(Tess*) ptess;
     std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
-    int num_faces = 0;
 
-    for (int i=0; i<local_num_particles; i++) {
+    Vertex_handle vt;
+    for (int i=0; i<num_real_particles; i++) {
 
         const Vertex_handle &vi = vt_list[i];
-    
-        // find all edges that are incident with particle vertex
-        Edge_circulator ed = tess.incident_edges(vi), done(ed);
+        const Point p(x[0][i], x[1][i]);
 
-        // process each edge
-        do {
-            // edge is infinite 
-            if (tess.is_infinite(ed)) 
-                return -1;
+        // particle has not moved
+        if (vi->point() == p)
+            continue;
 
-            // extract voronoi face from edge
-            CGAL::Object o = tess.dual(*ed);
+        // vertex collided with another vertex, can not recover
+        vt = tess.move_if_no_collision(vi, p);
+        if (vt != vi)
+            return -1;
+    }
+    return 0;
+}
 
-            // only consider finite faces
-            if (CGAL::object_cast<K::Segment_2>(&o)) {
+int Tess2d::update_ghost_tess(
+        double *x[3],
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
 
-                const Edge e = *ed;
-                int id1 = e.first->vertex( (e.second+2)%3 )->info();
-                int id2 = e.first->vertex( (e.second+1)%3 )->info();
+    Update the ghost particles of a relocated tessellation. Ghost
+    vertices from the previous build are matched to the new ghost
+    particles by their image particle, matched vertices are moved
+    in place while unmatched vertices are removed and new ghost
+    particles are inserted.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
 
-                if (id1 != i)
-                    return -1;
-                if (id1 < id2)
-                    num_faces++;
+    image : int*
+        Pointer to the index of the real particle each ghost
+        particle was created from.
 
-            } else {
-                // face is a ray, tess is not complete
-                return -1;
+    begin_particles : int
+        Starting index of ghost particles.
+
+    end_particles : int
+        Ending index of ghost particles.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+    std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
+    std::vector<int> &image_list = *(std::vector<int>*) pimage_list;
+
+    const int num_old_ghost = vt_list.size() - local_num_particles;
+    const int num_new_ghost = end_particles - begin_particles;
+
+    if (num_old_ghost != (int) image_list.size())
+        return -1;
+
+    // bucket old ghost vertices by their image particle
+    std::vector<int> head(local_num_particles, -1);
+    std::vector<int> next(num_old_ghost, -1);
+    for (int k=0; k<num_old_ghost; k++) {
+        const int m = image_list[k];
+        next[k] = head[m];
+        head[m] = k;
+    }
+
+    // match new ghost to closest old ghost with the same image
+    std::vector<bool> used(num_old_ghost, false);
+    std::vector<int> match(num_new_ghost, -1);
+    for (int j=0; j<num_new_ghost; j++) {
+
+        const int i = j + begin_particles;
+        double dist_min_sq = -1.0;
+
+        // ghost particles are created from real particles
+        if (image[i] < 0 || image[i] >= local_num_particles)
+            return -1;
+
+        for (int k=head[image[i]]; k!=-1; k=next[k]) {
+            if (used[k])
+                continue;
+
+            const Point &pk = vt_list[local_num_particles + k]->point();
+            const double dist_sq =
+                (pk.x() - x[0][i])*(pk.x() - x[0][i]) +
+                (pk.y() - x[1][i])*(pk.y() - x[1][i]);
+
+            if (dist_min_sq < 0.0 || dist_sq < dist_min_sq) {
+                dist_min_sq = dist_sq;
+                match[j] = k;
             }
-        } while (++ed != done);
+        }
+        if (match[j] != -1)
+            used[match[j]] = true;
+    }
+
+    // remove ghost vertices no longer in the ghost layer
+    for (int k=0; k<num_old_ghost; k++)
+        if (!used[k])
+            tess.remove(vt_list[local_num_particles + k]);
+
+    std::vector<Vertex_handle> ghost_list(num_new_ghost);
+
+    // move matched ghost vertices in place
+    Vertex_handle vt;
+    int num_reused = 0;
+    for (int j=0; j<num_new_ghost; j++) {
+        if (match[j] == -1)
+            continue;
+
+        const int i = j + begin_particles;
+        const Vertex_handle &vi = vt_list[local_num_particles + match[j]];
+        const Point p(x[0][i], x[1][i]);
+
+        vt = vi;
+        if (vi->point() != p)
+            vt = tess.move_if_no_collision(vi, p);
+        if (vt != vi)
+            return -1;
+
+        vt->info() = i;
+        ghost_list[j] = vt;
+        num_reused++;
+    }
+
+    // create points for ghost particles created this step
+    std::vector<Point> particles;
+    std::vector<int> particles_index;
+    for (int j=0; j<num_new_ghost; j++) {
+        if (match[j] != -1)
+            continue;
+
+        const int i = j + begin_particles;
+        particles.push_back(Point(x[0][i], x[1][i]));
+        particles_index.push_back(j);
+    }
+
+    // sort particles by hilbert keys
+    std::vector<std::ptrdiff_t> indices;
+    hilbert_sort_indices(particles, indices, spatial_sort);
+
+    // insert sorted particles into the tessellation
+    Face_handle hint;
+    for (std::vector<std::ptrdiff_t>::iterator it=indices.begin(); it!=indices.end(); it++) {
+        const int j = particles_index[*it];
+        vt = tess.insert(particles[*it], hint);
+        vt->info() = j + begin_particles;
+        ghost_list[j] = vt;
+        if (spatial_sort)
+            hint = vt->face();
+    }
+
+    total_num_particles = end_particles;
+    vt_list.resize(local_num_particles);
+    vt_list.insert(vt_list.end(), ghost_list.begin(), ghost_list.end());
+    image_list.clear();
+
+    return num_reused;
+}
+
+int Tess2d::store_ghost_images(
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
+
+    Store the image particle of each ghost particle in the tessellation.
+    This is used to match ghost vertices in the next relocation.
+
+    Parameters
+    ----------
+    image : int*
+        Pointer to the index of the real particle each ghost
+        particle was created from.
+
+    begin_particles : int
+        Starting index of ghost particles.
+
+    end_particles : int
+        Ending index of ghost particles.
+
+    */
+    if (ptess == NULL)
+        return -1;
+
+    if (pimage_list == NULL)
+        pimage_list = (void*) (new std::vector<int>);
+
+    std::vector<int> &image_list = *(std::vector<int>*) pimage_list;
+
+    image_list.clear();
+    for (int i=begin_particles; i<end_particles; i++)
+        image_list.push_back(image[i]);
+
+    return 0;
+}
+
+int Tess2d::max_number_of_faces(void) {
+    /*
+
+    Upper bound of the number of faces that belong to a real
+    particle. This is used to allocate storage for containers
+    holding face information before extracting the geometry,
+    the containers are then trimmed to the extracted faces.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+
+    // euler formula for planar graph, edges <= 3*vertices
+    return 3*tess.number_of_vertices();
+}
+
+int Tess2d::extract_polygons(
+        double* vertices[3],
+        int* offsets,
+        double* generators[3]) {
+    /*
+
+    Extract the voronoi polygon of each real particle. The vertices of
+    polygon i are stored from offsets[i] to offsets[i+1] in counter
+    clockwise order. The polygon of each particle has as many vertices
+    as delaunay faces incident to the particle, the total is bounded
+    by twice max_number_of_faces.
+
+    Parameters
+    ----------
+    vertices : double[3]*
+        Pointer to store the polygon vertices.
+
+    offsets : int*
+        Pointer to the start of each polygon, size number of real
+        particles + 1.
+
+    generators : double[3]*
+        Pointer to store the position of each real particle in the
+        tessellation, the particles may have moved since.
+
+    */
+    if (ptess == NULL)
+        return -1;
+
+    const Tess &tess = *(const Tess*) ptess;
+    const std::vector<Vertex_handle> &vt_list = *(const std::vector<Vertex_handle>*) pvt_list;
+
+    // vertex counter
+    int vc=0;
+    for (int i=0; i<local_num_particles; i++) {
+
+        offsets[i] = vc;
+        generators[0][i] = vt_list[i]->point().x();
+        generators[1][i] = vt_list[i]->point().y();
+
+        // faces around a vertex are circulated counter clockwise
+        Face_circulator fc = tess.incident_faces(vt_list[i]), done(fc);
+        do {
+            // voronoi cell not complete
+            if (tess.is_infinite(fc))
+                return -1;
+
+            const Point c = tess.circumcenter(fc);
+            vertices[0][vc] = c.x();
+            vertices[1][vc] = c.y();
+            vc++;
+
+        } while (++fc != done);
     }
-    return num_faces;
+    offsets[local_num_particles] = vc;
+
+    return vc;
+}
+
+void Tess2d::set_num_threads(int _num_threads) {
+    num_threads = (_num_threads < 1) ? 1 : _num_threads;
+}
+
+void Tess2d::set_spatial_sort(bool _spatial_sort) {
+    /*
+
+    Insert particles along a hilbert curve using the last inserted
+    vertex as point location hint. If false particles are inserted
+    one at a time in their order without hint.
+
+    */
+    spatial_sort = _spatial_sort;
 }
 
 int Tess2d::extract_geometry(
@@ -243,13 +662,18 @@ int Tess2d::extract_geometry(
         double* face_com[3],
         double* face_n[3],
         int* pair_i,
-        int* pair_j,
-        std::vector< std::vector<int> > &neighbors) {
+        int* pair_j) {
     /*
 
     Extract all geometric information pertaining to the mesh,
     i.e. area, normal, volume, ...
 
+    If more than one thread is set, real particles are split in
+    contiguous ranges that are processed concurrently. Each thread
+    stores its faces in its own buffer and the buffers are copied
+    in range order, faces are identical and in the same order as
+    the serial extraction.
+
     Parameters
     ----------
     x : double[3]*
@@ -275,14 +699,184 @@ int Tess2d::extract_geometry(
         Pointer to right most particle defining the face.
 
     */
-    // face counter
-    int fc=0;
     Tess &tess = *(Tess*) ptess;
-    std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
+    const int nthreads = std::min(num_threads, std::max(local_num_particles, 1));
+
+    if (nthreads == 1)
+        return extract_geometry_range(0, local_num_particles, NULL, NULL,
+                x, dcom, volume, face_area, face_com, face_n, pair_i, pair_j);
+
+    // number of faces of each real particle is at most its number of edges
+    std::vector<int> num_edges(local_num_particles, 0);
+    for (Finite_edges_iterator eit = tess.finite_edges_begin();
+            eit != tess.finite_edges_end(); ++eit) {
+        const int id1 = eit->first->vertex( (eit->second+1)%3 )->info();
+        const int id2 = eit->first->vertex( (eit->second+2)%3 )->info();
+        if (id1 < local_num_particles) num_edges[id1]++;
+        if (id2 < local_num_particles) num_edges[id2]++;
+    }
+
+    // contiguous particle range and face buffer size of each thread
+    std::vector<int> begin(nthreads+1), max_faces(nthreads, 0);
+    for (int t=0; t<=nthreads; t++)
+        begin[t] = (int) (((long) local_num_particles*t)/nthreads);
+    for (int t=0; t<nthreads; t++)
+        for (int i=begin[t]; i<begin[t+1]; i++)
+            max_faces[t] += num_edges[i];
+
+    std::vector< std::vector<double> > buf_area(nthreads), buf_com(nthreads), buf_n(nthreads);
+    std::vector< std::vector<int> > buf_pair(nthreads);
+    std::vector<int> num_faces(nthreads, 0);
+
+    #pragma omp parallel for num_threads(nthreads) schedule(static, 1)
+    for (int t=0; t<nthreads; t++) {
+        const int nf = std::max(max_faces[t], 1);
+        buf_area[t].resize(nf);
+        buf_com[t].resize(2*nf);
+        buf_n[t].resize(2*nf);
+        buf_pair[t].resize(2*nf);
+
+        double *t_com[3] = {&buf_com[t][0], &buf_com[t][nf], NULL};
+        double *t_n[3]   = {&buf_n[t][0], &buf_n[t][nf], NULL};
+
+        num_faces[t] = extract_geometry_range(begin[t], begin[t+1], NULL, NULL,
+                x, dcom, volume, &buf_area[t][0], t_com, t_n,
+                &buf_pair[t][0], &buf_pair[t][nf]);
+    }
+
+    // prefix sum of faces to copy buffers in range order
+    int fc = 0;
+    for (int t=0; t<nthreads; t++)
+        if (num_faces[t] == -1)
+            return -1;
+
+    for (int t=0; t<nthreads; t++) {
+        const int nf = std::max(max_faces[t], 1);
+        for (int n=0; n<num_faces[t]; n++, fc++) {
+            face_area[fc] = buf_area[t][n];
+            for (int k=0; k<2; k++) {
+                face_com[k][fc] = buf_com[t][k*nf + n];
+                face_n[k][fc] = buf_n[t][k*nf + n];
+            }
+            pair_i[fc] = buf_pair[t][n];
+            pair_j[fc] = buf_pair[t][nf + n];
+        }
+    }
+
+    return fc;
+}
+
+int Tess2d::activate_neighbors(int* moved, int* active) {
+    /*
+
+    Flag the real particles that neighbor a moved real particle or a
+    ghost particle in the current tessellation. Used after relocating
+    the tessellation, the neighbors of a particle can differ from the
+    faces of the last build when the topology changed.
+
+    Parameters
+    ----------
+    moved : int*
+        Pointer to flag of each real particle, nonzero if moved.
+
+    active : int*
+        Pointer to flag of each real particle, set to one for the
+        neighbors of moved or ghost particles.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+
+    for (Finite_edges_iterator eit = tess.finite_edges_begin();
+            eit != tess.finite_edges_end(); ++eit) {
+        const int id1 = eit->first->vertex( (eit->second+1)%3 )->info();
+        const int id2 = eit->first->vertex( (eit->second+2)%3 )->info();
+        const bool real1 = id1 < local_num_particles;
+        const bool real2 = id2 < local_num_particles;
+
+        if (real1 && (!real2 || moved[id2]))
+            active[id1] = 1;
+        if (real2 && (!real1 || moved[id1]))
+            active[id2] = 1;
+    }
+    return 0;
+}
+
+int Tess2d::extract_geometry_subset(
+        int* ids,
+        int num_ids,
+        int* active,
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract geometric information of the real particles in ids only,
+    the geometry of every other particle is left untouched. Used to
+    update the mesh where particles have moved while reusing the
+    faces between particles that have not.
+
+    Parameters
+    ----------
+    ids : int*
+        Pointer to the indices of real particles to extract.
+
+    num_ids : int
+        Number of particles in ids.
+
+    active : int*
+        Pointer to flag of each particle (real and ghost), nonzero
+        if the particle geometry is extracted. Faces between a
+        particle in ids and a particle not flagged are stored once
+        from the particle in ids.
+
+    See extract_geometry for the remaining parameters.
+
+    */
+    return extract_geometry_range(0, num_ids, ids, active,
+            x, dcom, volume, face_area, face_com, face_n, pair_i, pair_j);
+}
+
+int Tess2d::extract_geometry_range(
+        int begin_particles,
+        int end_particles,
+        const int* ids,
+        const int* active,
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract geometric information of real particles in the range
+    [begin_particles, end_particles). Faces are stored starting
+    at index zero of the face pointers. Only reads the tessellation,
+    calls on disjoint ranges can run concurrently.
+
+    If ids is not NULL the range indexes ids instead of the particles.
+    If active is not NULL, faces shared with a particle flagged zero
+    in active are stored regardless of the particle order.
 
+    Returns the number of faces extracted or -1 if failed.
+
+    */
+    // face counter
+    int fc=0;
+    const Tess &tess = *(const Tess*) ptess;
+    const std::vector<Vertex_handle> &vt_list = *(const std::vector<Vertex_handle>*) pvt_list;
 
     // only process local particle information
-    for (int i=0; i<local_num_particles; i++) {
+    for (int n=begin_particles; n<end_particles; n++) {
+
+        const int i = (ids == NULL) ? n : ids[n];
 
         const Vertex_handle &vi = vt_list[i];
         double xp = x[0][i], yp = x[1][i];
@@ -331,21 +925,13 @@ int Tess2d::extract_geometry(
 
                 // face area in 2d is length between voronoi vertices
                 double area = std::sqrt(xe*xe + ye*ye);
-                //double area0 = std::sqrt(xe*xe + ye*ye);
 
                 // center of mass of face
                 double fx = 0.5*(x1 + x2);
                 double fy = 0.5*(y1 + y2);
 
-                // need to work on
-//                const double SMALLDIFF = 1.0e-10;
-//                const double L1 = std::sqrt(area0);
-//                const double L2 = std::sqrt( (fx-xp)*(fx-xp) + (fy-yp)*(fy-yp) );
-//                const double area = (L1 < SMALLDIFF*L2) ? 0.0 : area0;
-//
-//                // ignore face
-//                if (area <= 0.0)
-//                    continue;
+                // small faces are kept for the volume and center of
+                // mass, they are pruned from the face list in the mesh
 
                 // the volume of the cell is the sum of triangle areas - eq. 27
                 vol += 0.25*area*h;
@@ -359,8 +945,9 @@ int Tess2d::extract_geometry(
                 cx += 0.25*area*h*tx;
                 cy += 0.25*area*h*ty;
 
-                // faces are defined by real partilces
-                if (id1 < id2) {
+                // faces are defined by real partilces, faces shared with
+                // a particle not extracted are stored by this particle
+                if (id1 < id2 || (active != NULL && !active[id2])) {
 
                     face_area[fc] = area;
 
@@ -375,10 +962,6 @@ int Tess2d::extract_geometry(
                     pair_i[fc] = id1;
                     pair_j[fc] = id2;
 
-                    // store neighbors - face id is stored
-                    neighbors[id1].push_back(fc);
-                    neighbors[id2].push_back(fc);
-
                     fc++;
                 }
 
@@ -397,6 +980,148 @@ int Tess2d::extract_geometry(
     return fc;
 }
 
+int Tess2d::extract_geometry_by_edge(
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract all geometric information pertaining to the mesh,
+    i.e. area, normal, volume, ... Extracts the same set of faces
+    as extract_geometry but each delaunay edge is visited once, faces
+    are stored in edge order which differs from the particle order of
+    extract_geometry. The voronoi face is computed once and its volume
+    and center of mass contributions are scattered to both particles
+    that define the face.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    dcenter_of_mass : double[3]*
+        Pointer to the center of mass of each real particle
+        realtive to its position.
+
+    volume : double*
+        Pointer to the volume of each real particle.
+
+    face_area : double*
+        Pointer to face area defined by particle i and j .
+
+    face_com : double[3]*
+        Pointer to face center of mass defined by particle i and j .
+
+    pair_i : int*
+        Pointer to left most particle defining the face.
+
+    pair_j : int*
+        Pointer to right most particle defining the face.
+
+    */
+    // face counter
+    int fc=0;
+    Tess &tess = *(Tess*) ptess;
+
+    // accumulated center of mass of real particles
+    std::vector<double> cx(local_num_particles, 0.0);
+    std::vector<double> cy(local_num_particles, 0.0);
+
+    for (int i=0; i<local_num_particles; i++)
+        volume[i] = 0.0;
+
+    // process each delaunay edge once
+    for (Finite_edges_iterator ed = tess.finite_edges_begin();
+            ed != tess.finite_edges_end(); ed++) {
+
+        const Edge e = *ed;
+        int id1 = e.first->vertex( (e.second+2)%3 )->info();
+        int id2 = e.first->vertex( (e.second+1)%3 )->info();
+
+        // faces are defined by real particles
+        if (id2 < id1)
+            std::swap(id1, id2);
+        if (id1 >= local_num_particles)
+            continue;
+
+        // extract voronoi face from edge
+        CGAL::Object o = tess.dual(e);
+
+        // only consider finite faces
+        const K::Segment_2 *sg = CGAL::object_cast<K::Segment_2>(&o);
+        if (!sg)
+            return -1;
+
+        const Point& p1 = sg->point(0);
+        const Point& p2 = sg->point(1);
+
+        double x1 = p1.x(), x2 = p2.x();
+        double y1 = p1.y(), y2 = p2.y();
+
+        // difference vector between particles
+        double xr = x[0][id2] - x[0][id1];
+        double yr = x[1][id2] - x[1][id1];
+
+        // distance between particles 
+        double h = std::sqrt(xr*xr + yr*yr);
+
+        // edge vector
+        double xe = x2 - x1;
+        double ye = y2 - y1;
+
+        // face area in 2d is length between voronoi vertices
+        double area = std::sqrt(xe*xe + ye*ye);
+
+        // center of mass of face
+        double fx = 0.5*(x1 + x2);
+        double fy = 0.5*(y1 + y2);
+
+        // the volume of the cell is the sum of triangle areas - eq. 27
+        // both particles share the same triangle area
+        double tri_vol = 0.25*area*h;
+
+        // center of mass of triangle - eq. 31, weighted by
+        // triangle area for the center of mass of the cell - eq. 29
+        volume[id1] += tri_vol;
+        cx[id1] += tri_vol*(2.0*fx/3.0 + x[0][id1]/3.0);
+        cy[id1] += tri_vol*(2.0*fy/3.0 + x[1][id1]/3.0);
+
+        if (id2 < local_num_particles) {
+            volume[id2] += tri_vol;
+            cx[id2] += tri_vol*(2.0*fx/3.0 + x[0][id2]/3.0);
+            cy[id2] += tri_vol*(2.0*fy/3.0 + x[1][id2]/3.0);
+        }
+
+        face_area[fc] = area;
+
+        // orientation of the face
+        face_n[0][fc] = xr/h;
+        face_n[1][fc] = yr/h;
+
+        // center of mass of face
+        face_com[0][fc] = fx;
+        face_com[1][fc] = fy;
+
+        pair_i[fc] = id1;
+        pair_j[fc] = id2;
+
+        fc++;
+    }
+
+    // store delta com
+    for (int i=0; i<local_num_particles; i++) {
+        dcom[0][i] = cx[i]/volume[i] - x[0][i];
+        dcom[1][i] = cy[i]/volume[i] - x[1][i];
+    }
+
+    return fc;
+}
+
 int Tess2d::update_radius(
         double* x[3],
         double *radius,
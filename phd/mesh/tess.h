@@ -50,23 +50,80 @@ struct vector3 {
         }
 };
 
+int build_face_graph(int num_faces, int num_particles, int *pair_i, int *pair_j,
+        int *offsets, int *face_ids, int *neighbor_ids);
+
+class Tess1d {
+    private:
+        int local_num_particles;
+        int total_num_particles;
+        int num_threads;
+
+        // particle indices sorted by position and
+        // location of each particle in that order
+        std::vector<int> order;
+        std::vector<int> rank;
+
+        void update_rank(void);
+        int compute_radius(double *x[3], double *radius, int i);
+
+    public:
+        Tess1d(void);
+        void reset_tess(void);
+        int build_initial_tess(double *x[3], double *radius, int num_real_particles); 
+        int update_initial_tess(double *x[3], int begin_particles, int end_particles);
+        int relocate_tess(double *x[3], int num_real_particles);
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles);
+        int store_ghost_images(int *image, int begin_particles, int end_particles);
+        int max_number_of_faces(void);
+        void set_num_threads(int num_threads);
+        int extract_geometry(double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int extract_geometry_by_edge(double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int activate_neighbors(int* moved, int* active);
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int update_radius(double *x[3], double *radius, std::list<FlagParticle> &flagged_particles);
+        int reindex_ghost(std::vector<GhostID> &import_ghost_buffer);
+};
+
 class Tess2d {
     private:
         int local_num_particles;
         int total_num_particles;
+        int num_threads;
+        bool spatial_sort;
 
         void *ptess;
         void *pvt_list;
+        void *pimage_list;
+
+        int extract_geometry_range(int begin_particles, int end_particles,
+                const int* ids, const int* active, double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
 
     public:
         Tess2d(void);
         void reset_tess(void);
         int build_initial_tess(double *x[3], double *radius, int num_real_particles); 
         int update_initial_tess(double *x[3], int begin_particles, int end_particles);
-        int count_number_of_faces(void);
+        int relocate_tess(double *x[3], int num_real_particles);
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles);
+        int store_ghost_images(int *image, int begin_particles, int end_particles);
+        int max_number_of_faces(void);
+        int extract_polygons(double* vertices[3], int* offsets, double* generators[3]);
+        void set_num_threads(int num_threads);
+        void set_spatial_sort(bool spatial_sort);
         int extract_geometry(double* x[3], double* dcom[3], double* volume,
-                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j,
-                std::vector< std::vector<int> > &neighbors);
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int extract_geometry_by_edge(double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int activate_neighbors(int* moved, int* active);
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
         int update_radius(double *x[3], double *radius, std::list<FlagParticle> &flagged_particles);
         int reindex_ghost(std::vector<GhostID> &import_ghost_buffer);
 };
@@ -75,19 +132,36 @@ class Tess3d {
     private:
         int local_num_particles;
         int total_num_particles;
+        int num_threads;
+        bool parallel_build;
 
         void *ptess;
         void *pvt_list;
+        void *pimage_list;
+
+        int extract_geometry_range(int begin_particles, int end_particles,
+                const int* ids, const int* active, double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
 
     public:
         Tess3d(void);
         void reset_tess(void);
         int build_initial_tess(double *x[3], double *radius, int num_real_particles); 
         int update_initial_tess(double *x[3], int begin_particles, int end_particles);
-        int count_number_of_faces(void);
+        int relocate_tess(double *x[3], int num_real_particles);
+        int update_ghost_tess(double *x[3], int *image, int begin_particles, int end_particles);
+        int store_ghost_images(int *image, int begin_particles, int end_particles);
+        int max_number_of_faces(void);
+        void set_num_threads(int num_threads);
+        int set_parallel_build(bool parallel_build);
         int extract_geometry(double* x[3], double* dcom[3], double* volume,
-                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j,
-                std::vector< std::vector<int> > &neighbors);
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int extract_geometry_by_edge(double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
+        int activate_neighbors(int* moved, int* active);
+        int extract_geometry_subset(int* ids, int num_ids, int* active,
+                double* x[3], double* dcom[3], double* volume,
+                double* face_area, double* face_com[3], double* face_n[3], int* pair_i, int* pair_j);
         int update_radius(double *x[3], double *radius, std::list<FlagParticle> &flagged_particles);
         int reindex_ghost(std::vector<GhostID> &import_ghost_buffer);
 };
@@ -0,0 +1,459 @@
+#include "tess.h"
+#include <algorithm>
+
+struct PositionCompare1d {
+    /*
+
+    Order particle indices by their position, ties are broken
+    by index so the order is deterministic.
+
+    */
+    const double *x;
+    PositionCompare1d(const double *_x) : x(_x) {}
+    bool operator() (const int a, const int b) const {
+        return (x[a] < x[b]) || (x[a] == x[b] && a < b);
+    }
+};
+
+Tess1d::Tess1d(void) {
+    num_threads = 1;
+    local_num_particles = 0;
+    total_num_particles = 0;
+}
+
+void Tess1d::reset_tess(void) {
+    order.clear();
+    rank.clear();
+    local_num_particles = 0;
+    total_num_particles = 0;
+}
+
+void Tess1d::update_rank(void) {
+    /*
+
+    Store the location of each particle in the sorted order.
+
+    */
+    rank.resize(order.size());
+    for (int k=0; k<(int) order.size(); k++)
+        rank[order[k]] = k;
+}
+
+int Tess1d::compute_radius(double *x[3], double *radius, int i) {
+    /*
+
+    Compute the radius of real particle i. The radius is twice the
+    largest distance from the particle to its voronoi vertices, the
+    midpoints to its neighbors. If the particle is missing a neighbor
+    the radius is set to -1.
+
+    */
+    const int k = rank[i];
+    const int n = order.size();
+
+    if (k == 0 || k == n-1) {
+        radius[i] = -1;
+        return 0;
+    }
+
+    const double xl = x[0][order[k-1]];
+    const double xr = x[0][order[k+1]];
+    const double xp = x[0][i];
+
+    // coincident particles have no face
+    if (xl == xp || xr == xp)
+        return -1;
+
+    radius[i] = std::max(xp - xl, xr - xp);
+    return 0;
+}
+
+int Tess1d::build_initial_tess(
+        double *x[3],
+        double *radius,
+        int num_real_particles) {
+    /*
+
+    Creates initial tessellation of real particles and calculates
+    the radius. If the radius is infinite the values is to -1. In
+    1d the tessellation is the particles sorted by position.
+
+    Parameters
+    ----------
+    x : double[3]*
+       Pointer to the position of the particles.
+
+    radius : double*
+        Pointer to store the radius of real particles. The radius is
+        twice the largest distance to the voronoi vertices of the
+        given particle.
+
+    num_real_particles : int
+        Starting index of the first ghost particle in the particle
+        data container.
+
+    */
+    local_num_particles = num_real_particles;
+    total_num_particles = num_real_particles;
+
+    order.resize(num_real_particles);
+    for (int i=0; i<num_real_particles; i++)
+        order[i] = i;
+
+    std::sort(order.begin(), order.end(), PositionCompare1d(x[0]));
+    update_rank();
+
+    // only real particles
+    for (int i=0; i<num_real_particles; i++)
+        if (compute_radius(x, radius, i) == -1)
+            return -1;
+
+    return 0;
+}
+
+int Tess1d::update_initial_tess(
+        double *x[3],
+        int begin_particles,
+        int end_particles) {
+    /*
+
+    Update the mesh by adding ghost particles. This function
+    is called multiple times untill all real particles have
+    finite volume. Ghost particles are sorted and merged into
+    the current order.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    begin_particles : int
+        Starting index of ghost particles to add.
+
+    end_particles : int
+        Ending index of ghost particles to add.
+
+    */
+    if (begin_particles == end_particles)
+        return 0;
+
+    total_num_particles = end_particles;
+
+    const int old_num_particles = order.size();
+    for (int i=begin_particles; i<end_particles; i++)
+        order.push_back(i);
+
+    PositionCompare1d compare(x[0]);
+    std::sort(order.begin() + old_num_particles, order.end(), compare);
+    std::inplace_merge(order.begin(), order.begin() + old_num_particles,
+            order.end(), compare);
+    update_rank();
+
+    return 0;
+}
+
+int Tess1d::relocate_tess(
+        double *x[3],
+        int num_real_particles) {
+    /*
+
+    Rebuilding the 1d tessellation is a sort of the particles,
+    there is nothing to gain from relocating vertices so the
+    tessellation is always rebuilt.
+
+    */
+    return -1;
+}
+
+int Tess1d::update_ghost_tess(
+        double *x[3],
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
+
+    Not used, relocation is not supported in 1d.
+
+    */
+    return -1;
+}
+
+int Tess1d::store_ghost_images(
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
+
+    Not used, relocation is not supported in 1d.
+
+    */
+    return 0;
+}
+
+int Tess1d::max_number_of_faces(void) {
+    /*
+
+    Upper bound of the number of faces that belong to a real
+    particle. Consecutive particles share one face.
+
+    */
+    return order.size();
+}
+
+void Tess1d::set_num_threads(int _num_threads) {
+    num_threads = (_num_threads < 1) ? 1 : _num_threads;
+}
+
+int Tess1d::extract_geometry(
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract all geometric information pertaining to the mesh,
+    i.e. area, normal, volume, ... Faces are the midpoints of
+    consecutive particles with unit area and are stored in
+    order of position.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    dcenter_of_mass : double[3]*
+        Pointer to the center of mass of each real particle
+        realtive to its position.
+
+    volume : double*
+        Pointer to the volume of each real particle.
+
+    face_area : double*
+        Pointer to face area defined by particle i and j .
+
+    face_com : double[3]*
+        Pointer to face center of mass defined by particle i and j .
+
+    pair_i : int*
+        Pointer to left most particle defining the face.
+
+    pair_j : int*
+        Pointer to right most particle defining the face.
+
+    */
+    // face counter
+    int fc=0;
+    const int n = order.size();
+
+    // real particles need a neighbor on both sides
+    for (int i=0; i<local_num_particles; i++) {
+
+        const int k = rank[i];
+        if (k == 0 || k == n-1)
+            return -1;
+
+        const double xl = x[0][order[k-1]];
+        const double xr = x[0][order[k+1]];
+        const double xp = x[0][i];
+
+        // cell is bounded by the midpoints to its neighbors
+        volume[i] = 0.5*(xr - xl);
+        dcom[0][i] = 0.25*(xl + xr) - 0.5*xp;
+    }
+
+    // faces between consecutive particles with a real particle
+    for (int k=0; k<n-1; k++) {
+
+        const int a = order[k];
+        const int b = order[k+1];
+
+        if (a >= local_num_particles && b >= local_num_particles)
+            continue;
+
+        const int id1 = std::min(a, b);
+        const int id2 = std::max(a, b);
+
+        face_area[fc] = 1.0;
+
+        // orientation of the face
+        face_n[0][fc] = (x[0][id2] > x[0][id1]) ? 1.0 : -1.0;
+
+        // center of mass of face
+        face_com[0][fc] = 0.5*(x[0][a] + x[0][b]);
+
+        pair_i[fc] = id1;
+        pair_j[fc] = id2;
+
+        fc++;
+    }
+
+    return fc;
+}
+
+int Tess1d::extract_geometry_by_edge(
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    In 1d each face is already visited once, same as
+    extract_geometry.
+
+    */
+    return extract_geometry(x, dcom, volume, face_area,
+            face_com, face_n, pair_i, pair_j);
+}
+
+int Tess1d::activate_neighbors(int* moved, int* active) {
+    /*
+
+    Flag the real particles that neighbor a moved real particle or a
+    ghost particle, consecutive particles in the sorted order. See
+    Tess2d::activate_neighbors.
+
+    */
+    const int n = order.size();
+    for (int k=0; k<n-1; k++) {
+        const int id1 = order[k];
+        const int id2 = order[k+1];
+        const bool real1 = id1 < local_num_particles;
+        const bool real2 = id2 < local_num_particles;
+
+        if (real1 && (!real2 || moved[id2]))
+            active[id1] = 1;
+        if (real2 && (!real1 || moved[id1]))
+            active[id2] = 1;
+    }
+    return 0;
+}
+
+int Tess1d::extract_geometry_subset(
+        int* ids,
+        int num_ids,
+        int* active,
+        double* x[3],
+        double* dcom[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract geometric information of the real particles in ids only,
+    the geometry of every other particle is left untouched. Faces
+    with a particle flagged in active are stored in order of
+    position. See Tess2d::extract_geometry_subset.
+
+    */
+    // face counter
+    int fc=0;
+    const int n = order.size();
+
+    for (int m=0; m<num_ids; m++) {
+
+        const int i = ids[m];
+        const int k = rank[i];
+        if (k == 0 || k == n-1)
+            return -1;
+
+        const double xl = x[0][order[k-1]];
+        const double xr = x[0][order[k+1]];
+
+        volume[i] = 0.5*(xr - xl);
+        dcom[0][i] = 0.25*(xl + xr) - 0.5*x[0][i];
+    }
+
+    for (int k=0; k<n-1; k++) {
+
+        const int a = order[k];
+        const int b = order[k+1];
+
+        if (a >= local_num_particles && b >= local_num_particles)
+            continue;
+        if (!active[a] && !active[b])
+            continue;
+
+        const int id1 = std::min(a, b);
+        const int id2 = std::max(a, b);
+
+        face_area[fc] = 1.0;
+        face_n[0][fc] = (x[0][id2] > x[0][id1]) ? 1.0 : -1.0;
+        face_com[0][fc] = 0.5*(x[0][a] + x[0][b]);
+
+        pair_i[fc] = id1;
+        pair_j[fc] = id2;
+
+        fc++;
+    }
+
+    return fc;
+}
+
+int Tess1d::update_radius(
+        double* x[3],
+        double *radius,
+        std::list<FlagParticle> &flagged_particles) {
+    /*
+
+    For particle in flagged_particle container, upater their
+    radius.
+
+    Parameters
+    ----------
+    x : double[3]*
+       Pointer to the position of the particles.
+
+    radius : double*
+        Pointer to store the radius of real particles. The radius is
+        twice the largest distance to the voronoi vertices of the
+        given particle.
+
+    flagged_particles : list<FlagParticle>
+        List of particles that have been flagged by the domain mananger
+        to create ghost particles.
+
+    */
+    for(std::list<FlagParticle>::iterator it = flagged_particles.begin();
+            it != flagged_particles.end(); ++it)
+        if (compute_radius(x, radius, it->index) == -1)
+            return -1;
+
+    return 0;
+}
+
+int Tess1d::reindex_ghost(std::vector<GhostID> &import_ghost_buffer) {
+    /*
+
+    Reorder ghost particles because after the mesh is complete in parallel
+    ghost particles are put in processor and export order.
+
+    Parameters
+    ----------
+    import_ghost_buffer : std:vector<GhostID>
+        Vector holding old indices and sorted indices of ghost particles
+
+    */
+    std::vector<int> new_index(order.size());
+    for (int i=0; i<(int) order.size(); i++)
+        new_index[i] = i;
+
+    for (int i=local_num_particles, j=0; j<import_ghost_buffer.size(); i++, j++)
+        new_index[import_ghost_buffer[j].index] = i;
+
+    for (int k=0; k<(int) order.size(); k++)
+        order[k] = new_index[order[k]];
+    update_rank();
+
+    return 0;
+}
@@ -1,13 +1,28 @@
 #include "tess.h"
+#include <algorithm>
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 #include <CGAL/Delaunay_triangulation_3.h>
 #include <CGAL/Triangulation_vertex_base_with_info_3.h> 
+#include <CGAL/Delaunay_triangulation_cell_base_with_circumcenter_3.h>
 
 #include <boost/iterator/counting_iterator.hpp>
 
 typedef CGAL::Exact_predicates_inexact_constructions_kernel  K;
 typedef CGAL::Triangulation_vertex_base_with_info_3<int, K> Vb; 
-typedef CGAL::Triangulation_data_structure_3<Vb>           Tds; 
+
+// cells cache their circumcenter, the cache is reset only when
+// a cell is created or its vertices change (i.e. ghost insertion).
+// Moving a vertex without changing the topology keeps the cells so
+// their cache is invalidated explicitly, see invalidate_circumcenters
+typedef CGAL::Delaunay_triangulation_cell_base_with_circumcenter_3<K> Cb;
+
+// with tbb the data structure supports concurrent insertion, the
+// triangulation is only locked while building from real particles
+#ifdef CGAL_LINKED_WITH_TBB
+typedef CGAL::Triangulation_data_structure_3<Vb, Cb, CGAL::Parallel_tag> Tds;
+#else
+typedef CGAL::Triangulation_data_structure_3<Vb, Cb>       Tds; 
+#endif
 typedef CGAL::Delaunay_triangulation_3<K, Tds>            Tess;
 typedef Tess::Vertex_handle   Vertex_handle;
 typedef Tess::Point           Point;
@@ -15,20 +30,41 @@ typedef Tess::Edge            Edge;
 typedef Tess::Cell            Cell;
 typedef Tess::Cell_handle     Cell_handle;
 typedef Tess::Cell_circulator Cell_circulator;
+typedef Tess::Finite_edges_iterator Finite_edges_iterator;
+typedef Tess::Finite_cells_iterator Finite_cells_iterator;
+typedef Tess::Finite_vertices_iterator Finite_vertices_iterator;
 
 typedef CGAL::Spatial_sort_traits_adapter_3<K, Point*> Search_traits_3;
 
 
+static void invalidate_circumcenters(Tess &tess, const Vertex_handle &vt) {
+    /*
+
+    Reset the cached circumcenter of the cells incident to a
+    vertex that was moved in place.
+
+    */
+    std::vector<Cell_handle> cells;
+    tess.incident_cells(vt, std::back_inserter(cells));
+    for (int k=0; k<(int) cells.size(); k++)
+        cells[k]->invalidate_circumcenter();
+}
+
 Tess3d::Tess3d(void) {
+    num_threads = 1;
+    parallel_build = false;
     ptess = NULL;
     pvt_list = NULL;
+    pimage_list = NULL;
 }
 
 void Tess3d::reset_tess(void) {
     delete (Tess*) ptess;
     delete (std::vector<Vertex_handle>*) pvt_list;
+    delete (std::vector<int>*) pimage_list;
     ptess = NULL;
     pvt_list = NULL;
+    pimage_list = NULL;
 }
 
 int Tess3d::build_initial_tess(
@@ -71,9 +107,37 @@ int Tess3d::build_initial_tess(
     Tess &tess = *(Tess*) ptess;
     std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
 
-    // FIX: remove boost and use finite_vertices_iterator to loop over vertices
-    // and tess.insert(points.begin(), points.end()) for sorting and building
-    // the tessellation.
+#ifdef CGAL_LINKED_WITH_TBB
+    if (parallel_build && num_real_particles > 0) {
+
+        // lock grid over bounding box of real particles
+        CGAL::Bbox_3 bbox = particles[0].bbox();
+        for (int i=1; i<num_real_particles; i++)
+            bbox = bbox + particles[i].bbox();
+        Tess::Lock_data_structure locking_ds(bbox, 50);
+
+        // particles with their index, sorted and inserted concurrently
+        std::vector< std::pair<Point, int> > particles_info;
+        particles_info.reserve(num_real_particles);
+        for (int i=0; i<num_real_particles; i++)
+            particles_info.push_back(std::make_pair(particles[i], i));
+
+        tess.set_lock_data_structure(&locking_ds);
+        tess.insert(particles_info.begin(), particles_info.end());
+
+        // ghost particles are inserted sequentially
+        tess.set_lock_data_structure(NULL);
+
+        // duplicate particles are merged
+        if ((int) tess.number_of_vertices() != num_real_particles)
+            return -1;
+
+        for (Finite_vertices_iterator vit = tess.finite_vertices_begin();
+                vit != tess.finite_vertices_end(); ++vit)
+            vt_list[vit->info()] = vit;
+
+    } else {
+#endif
 
     // sort particles
     std::vector<std::ptrdiff_t> indices;
@@ -95,6 +159,10 @@ int Tess3d::build_initial_tess(
         vt_list[*it] = vt;
     }
 
+#ifdef CGAL_LINKED_WITH_TBB
+    }
+#endif
+
     // container for delaunay edges
     std::vector<Edge> edges;
     std::vector<Cell_handle> cells;
@@ -181,7 +249,7 @@ int Tess3d::build_initial_tess(
                 // calculate distance between particle
                 // and voronoi vertex
                 } else {
-                    const Point c = tess.dual(cc);
+                    const Point &c = tess.dual(cc);
                     radius_max_sq = std::max(radius_max_sq,
                             (c.x()-pos.x())*(c.x()-pos.x()) +
                             (c.y()-pos.y())*(c.y()-pos.y()) +
@@ -268,68 +336,283 @@ int Tess3d::update_initial_tess(
     return 0;
 }
 
-int Tess3d::count_number_of_faces(void) {
+int Tess3d::relocate_tess(
+        double *x[3],
+        int num_real_particles) {
     /*
 
-    Count the number of faces that belong to a real
-    particle. This is used to allocate storage for
-    containers holding face information.
+    Move real particles of the previous tessellation to their new
+    positions instead of rebuilding the tessellation. Each vertex is
+    moved in place and CGAL repairs the triangulation locally where
+    the topology changes. Ghost particles from the previous build are
+    left untouched, they are updated in update_ghost_tess.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    num_real_particles : int
+        Starting index of the first ghost particle in the particle
+        data container.
 
     */
+    // nothing to relocate or real particles have changed
+    if (ptess == NULL || pimage_list == NULL)
+        return -1;
+    if (num_real_particles != local_num_particles)
+        return -1;
+
     Tess &tess = *(Tess*) ptess;
     std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
-    int num_faces = 0;
-
-    std::vector<Cell_handle> cells;
-    std::vector<bool> sites_ngb_used(total_num_particles, false);
-    std::vector<int>  site_ngb_list;
 
-    for (int i=0; i<local_num_particles; i++) {
+    Vertex_handle vt;
+    for (int i=0; i<num_real_particles; i++) {
 
         const Vertex_handle &vi = vt_list[i];
+        const Point p(x[0][i], x[1][i], x[2][i]);
 
-        cells.clear();
-        site_ngb_list.clear();
-        tess.incident_cells(vi, std::back_inserter(cells));
+        // particle has not moved
+        if (vi->point() == p)
+            continue;
 
-        const int ncells = cells.size();
-        for (int icell=0; icell<ncells; icell++) {
-            const Cell_handle& ci = cells[icell];
+        // vertex collided with another vertex, can not recover
+        vt = tess.move_if_no_collision(vi, p);
+        if (vt != vi)
+            return -1;
 
-            int idx = -1;
-            for (int iv=0; iv<4; iv++) {
-                if (ci->vertex(iv) == vi)
-                    idx = iv;
-            }
+        // cells kept by the move still cache the old circumcenter
+        invalidate_circumcenters(tess, vt);
+    }
+    return 0;
+}
 
-            int iadd = 0;
-            for (int iv=0; iv<4; iv++) {
-                if (iv == idx)
-                    continue;
+int Tess3d::update_ghost_tess(
+        double *x[3],
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
 
-                const Vertex_handle& v = ci->vertex(iv);
-                if (tess.is_infinite(v))
-                    continue;
+    Update the ghost particles of a relocated tessellation. Ghost
+    vertices from the previous build are matched to the new ghost
+    particles by their image particle, matched vertices are moved
+    in place while unmatched vertices are removed and new ghost
+    particles are inserted.
 
-                const int id = v->info();
-                if (sites_ngb_used[id])
-                    continue;
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
 
-                if (i < id)
-                    num_faces++;
+    image : int*
+        Pointer to the index of the real particle each ghost
+        particle was created from.
 
-                iadd++;
-                sites_ngb_used[id] = true;
-                site_ngb_list.push_back(id);
+    begin_particles : int
+        Starting index of ghost particles.
+
+    end_particles : int
+        Ending index of ghost particles.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+    std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
+    std::vector<int> &image_list = *(std::vector<int>*) pimage_list;
+
+    const int num_old_ghost = vt_list.size() - local_num_particles;
+    const int num_new_ghost = end_particles - begin_particles;
+
+    if (num_old_ghost != (int) image_list.size())
+        return -1;
+
+    // bucket old ghost vertices by their image particle
+    std::vector<int> head(local_num_particles, -1);
+    std::vector<int> next(num_old_ghost, -1);
+    for (int k=0; k<num_old_ghost; k++) {
+        const int m = image_list[k];
+        next[k] = head[m];
+        head[m] = k;
+    }
+
+    // match new ghost to closest old ghost with the same image
+    std::vector<bool> used(num_old_ghost, false);
+    std::vector<int> match(num_new_ghost, -1);
+    for (int j=0; j<num_new_ghost; j++) {
+
+        const int i = j + begin_particles;
+        double dist_min_sq = -1.0;
+
+        // ghost particles are created from real particles
+        if (image[i] < 0 || image[i] >= local_num_particles)
+            return -1;
+
+        for (int k=head[image[i]]; k!=-1; k=next[k]) {
+            if (used[k])
+                continue;
+
+            const Point &pk = vt_list[local_num_particles + k]->point();
+            const double dist_sq =
+                (pk.x() - x[0][i])*(pk.x() - x[0][i]) +
+                (pk.y() - x[1][i])*(pk.y() - x[1][i]) +
+                (pk.z() - x[2][i])*(pk.z() - x[2][i]);
+
+            if (dist_min_sq < 0.0 || dist_sq < dist_min_sq) {
+                dist_min_sq = dist_sq;
+                match[j] = k;
             }
         }
-        const int nngb = site_ngb_list.size();
-        for (int j=0; j<nngb; j++)
-            sites_ngb_used[site_ngb_list[j]] = false;
+        if (match[j] != -1)
+            used[match[j]] = true;
+    }
+
+    // remove ghost vertices no longer in the ghost layer
+    for (int k=0; k<num_old_ghost; k++)
+        if (!used[k])
+            tess.remove(vt_list[local_num_particles + k]);
+
+    std::vector<Vertex_handle> ghost_list(num_new_ghost);
+
+    // move matched ghost vertices in place
+    Vertex_handle vt;
+    int num_reused = 0;
+    for (int j=0; j<num_new_ghost; j++) {
+        if (match[j] == -1)
+            continue;
+
+        const int i = j + begin_particles;
+        const Vertex_handle &vi = vt_list[local_num_particles + match[j]];
+        const Point p(x[0][i], x[1][i], x[2][i]);
+
+        vt = vi;
+        if (vi->point() != p) {
+            vt = tess.move_if_no_collision(vi, p);
+            if (vt != vi)
+                return -1;
+            invalidate_circumcenters(tess, vt);
+        }
+
+        vt->info() = i;
+        ghost_list[j] = vt;
+        num_reused++;
+    }
+
+    // create points for ghost particles created this step
+    std::vector<Point> particles;
+    std::vector<int> particles_index;
+    for (int j=0; j<num_new_ghost; j++) {
+        if (match[j] != -1)
+            continue;
+
+        const int i = j + begin_particles;
+        particles.push_back(Point(x[0][i], x[1][i], x[2][i]));
+        particles_index.push_back(j);
     }
-    return num_faces;
+
+    if (!particles.empty()) {
+
+        // sort particles
+        std::vector<std::ptrdiff_t> indices;
+        indices.reserve(particles.size());
+        std::copy(
+                boost::counting_iterator<std::ptrdiff_t>(0),
+                boost::counting_iterator<std::ptrdiff_t>(particles.size()),
+                std::back_inserter(indices));
+
+        // sort particles by hilbert keys
+        CGAL::spatial_sort(indices.begin(), indices.end(), Search_traits_3(&(particles[0])),
+                CGAL::Hilbert_sort_median_policy());
+
+        // insert sorted particles into the tessellation
+        for (std::vector<std::ptrdiff_t>::iterator it=indices.begin(); it!=indices.end(); it++) {
+            const int j = particles_index[*it];
+            vt = tess.insert(particles[*it]);
+            vt->info() = j + begin_particles;
+            ghost_list[j] = vt;
+        }
+    }
+
+    total_num_particles = end_particles;
+    vt_list.resize(local_num_particles);
+    vt_list.insert(vt_list.end(), ghost_list.begin(), ghost_list.end());
+    image_list.clear();
+
+    return num_reused;
 }
 
+int Tess3d::store_ghost_images(
+        int *image,
+        int begin_particles,
+        int end_particles) {
+    /*
+
+    Store the image particle of each ghost particle in the tessellation.
+    This is used to match ghost vertices in the next relocation.
+
+    Parameters
+    ----------
+    image : int*
+        Pointer to the index of the real particle each ghost
+        particle was created from.
+
+    begin_particles : int
+        Starting index of ghost particles.
+
+    end_particles : int
+        Ending index of ghost particles.
+
+    */
+    if (ptess == NULL)
+        return -1;
+
+    if (pimage_list == NULL)
+        pimage_list = (void*) (new std::vector<int>);
+
+    std::vector<int> &image_list = *(std::vector<int>*) pimage_list;
+
+    image_list.clear();
+    for (int i=begin_particles; i<end_particles; i++)
+        image_list.push_back(image[i]);
+
+    return 0;
+}
+
+int Tess3d::max_number_of_faces(void) {
+    /*
+
+    Upper bound of the number of faces that belong to a real
+    particle. This is used to allocate storage for containers
+    holding face information before extracting the geometry,
+    the containers are then trimmed to the extracted faces.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+
+    // euler formula for triangulation of the sphere (including the
+    // infinite vertex) with faces = 2*cells, edges = vertices + cells
+    return tess.number_of_vertices() + 1 + tess.number_of_cells();
+}
+
+
+void Tess3d::set_num_threads(int _num_threads) {
+    num_threads = (_num_threads < 1) ? 1 : _num_threads;
+}
+
+int Tess3d::set_parallel_build(bool _parallel_build) {
+    /*
+
+    Build the tessellation of real particles with concurrent insertion.
+    Only available if compiled with tbb, returns -1 otherwise.
+
+    */
+#ifdef CGAL_LINKED_WITH_TBB
+    parallel_build = _parallel_build;
+    return 0;
+#else
+    parallel_build = false;
+    return _parallel_build ? -1 : 0;
+#endif
+}
 
 int Tess3d::extract_geometry(
         double* x[3],
@@ -339,13 +622,18 @@ int Tess3d::extract_geometry(
         double* face_com[3],
         double* face_n[3],
         int* pair_i,
-        int* pair_j,
-        std::vector< std::vector<int> > &neighbors) {
+        int* pair_j) {
     /*
 
     Extract all geometric information pertaining to the mesh,
     i.e. area, normal, volume, ...
 
+    If more than one thread is set, real particles are split in
+    contiguous ranges that are processed concurrently. Each thread
+    stores its faces in its own buffer and the buffers are copied
+    in range order, faces are identical and in the same order as
+    the serial extraction.
+
     Parameters
     ----------
     x : double[3]*
@@ -370,11 +658,187 @@ int Tess3d::extract_geometry(
     pair_j : int*
         Pointer to right most particle defining the face.
 
+    */
+    Tess &tess = *(Tess*) ptess;
+    const int nthreads = std::min(num_threads, std::max(local_num_particles, 1));
+
+    if (nthreads == 1)
+        return extract_geometry_range(0, local_num_particles, NULL, NULL,
+                x, dcenter_of_mass, volume, face_area, face_com, face_n, pair_i, pair_j);
+
+    // circumcenters are cached lazily in the cells, compute them
+    // before threads read the tessellation concurrently
+    for (Finite_cells_iterator cit = tess.finite_cells_begin();
+            cit != tess.finite_cells_end(); ++cit)
+        cit->circumcenter(tess.geom_traits());
+
+    // number of faces of each real particle is at most its number of edges
+    std::vector<int> num_edges(local_num_particles, 0);
+    for (Finite_edges_iterator eit = tess.finite_edges_begin();
+            eit != tess.finite_edges_end(); ++eit) {
+        const int id1 = eit->get<0>()->vertex(eit->get<1>())->info();
+        const int id2 = eit->get<0>()->vertex(eit->get<2>())->info();
+        if (id1 < local_num_particles) num_edges[id1]++;
+        if (id2 < local_num_particles) num_edges[id2]++;
+    }
+
+    // contiguous particle range and face buffer size of each thread
+    std::vector<int> begin(nthreads+1), max_faces(nthreads, 0);
+    for (int t=0; t<=nthreads; t++)
+        begin[t] = (int) (((long) local_num_particles*t)/nthreads);
+    for (int t=0; t<nthreads; t++)
+        for (int i=begin[t]; i<begin[t+1]; i++)
+            max_faces[t] += num_edges[i];
+
+    std::vector< std::vector<double> > buf_area(nthreads), buf_com(nthreads), buf_n(nthreads);
+    std::vector< std::vector<int> > buf_pair(nthreads);
+    std::vector<int> num_faces(nthreads, 0);
+
+    #pragma omp parallel for num_threads(nthreads) schedule(static, 1)
+    for (int t=0; t<nthreads; t++) {
+        const int nf = std::max(max_faces[t], 1);
+        buf_area[t].resize(nf);
+        buf_com[t].resize(3*nf);
+        buf_n[t].resize(3*nf);
+        buf_pair[t].resize(2*nf);
+
+        double *t_com[3] = {&buf_com[t][0], &buf_com[t][nf], &buf_com[t][2*nf]};
+        double *t_n[3]   = {&buf_n[t][0], &buf_n[t][nf], &buf_n[t][2*nf]};
+
+        num_faces[t] = extract_geometry_range(begin[t], begin[t+1], NULL, NULL,
+                x, dcenter_of_mass, volume, &buf_area[t][0], t_com, t_n,
+                &buf_pair[t][0], &buf_pair[t][nf]);
+    }
+
+    // prefix sum of faces to copy buffers in range order
+    int fc = 0;
+    for (int t=0; t<nthreads; t++)
+        if (num_faces[t] == -1)
+            return -1;
+
+    for (int t=0; t<nthreads; t++) {
+        const int nf = std::max(max_faces[t], 1);
+        for (int n=0; n<num_faces[t]; n++, fc++) {
+            face_area[fc] = buf_area[t][n];
+            for (int k=0; k<3; k++) {
+                face_com[k][fc] = buf_com[t][k*nf + n];
+                face_n[k][fc] = buf_n[t][k*nf + n];
+            }
+            pair_i[fc] = buf_pair[t][n];
+            pair_j[fc] = buf_pair[t][nf + n];
+        }
+    }
+
+    return fc;
+}
+
+int Tess3d::activate_neighbors(int* moved, int* active) {
+    /*
+
+    Flag the real particles that neighbor a moved real particle or a
+    ghost particle in the current tessellation. Used after relocating
+    the tessellation, the neighbors of a particle can differ from the
+    faces of the last build when the topology changed.
+
+    Parameters
+    ----------
+    moved : int*
+        Pointer to flag of each real particle, nonzero if moved.
+
+    active : int*
+        Pointer to flag of each real particle, set to one for the
+        neighbors of moved or ghost particles.
+
+    */
+    Tess &tess = *(Tess*) ptess;
+
+    for (Finite_edges_iterator eit = tess.finite_edges_begin();
+            eit != tess.finite_edges_end(); ++eit) {
+        const int id1 = eit->get<0>()->vertex(eit->get<1>())->info();
+        const int id2 = eit->get<0>()->vertex(eit->get<2>())->info();
+        const bool real1 = id1 < local_num_particles;
+        const bool real2 = id2 < local_num_particles;
+
+        if (real1 && (!real2 || moved[id2]))
+            active[id1] = 1;
+        if (real2 && (!real1 || moved[id1]))
+            active[id2] = 1;
+    }
+    return 0;
+}
+
+int Tess3d::extract_geometry_subset(
+        int* ids,
+        int num_ids,
+        int* active,
+        double* x[3],
+        double* dcenter_of_mass[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract geometric information of the real particles in ids only,
+    the geometry of every other particle is left untouched. Used to
+    update the mesh where particles have moved while reusing the
+    faces between particles that have not.
+
+    Parameters
+    ----------
+    ids : int*
+        Pointer to the indices of real particles to extract.
+
+    num_ids : int
+        Number of particles in ids.
+
+    active : int*
+        Pointer to flag of each particle (real and ghost), nonzero
+        if the particle geometry is extracted. Faces between a
+        particle in ids and a particle not flagged are stored once
+        from the particle in ids.
+
+    See extract_geometry for the remaining parameters.
+
+    */
+    return extract_geometry_range(0, num_ids, ids, active,
+            x, dcenter_of_mass, volume, face_area, face_com, face_n, pair_i, pair_j);
+}
+
+int Tess3d::extract_geometry_range(
+        int begin_particles,
+        int end_particles,
+        const int* ids,
+        const int* active,
+        double* x[3],
+        double* dcenter_of_mass[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract geometric information of real particles in the range
+    [begin_particles, end_particles). Faces are stored starting
+    at index zero of the face pointers. Only reads the tessellation,
+    calls on disjoint ranges can run concurrently once the cell
+    circumcenters are cached.
+
+    If ids is not NULL the range indexes ids instead of the particles.
+    If active is not NULL, faces shared with a particle flagged zero
+    in active are stored regardless of the particle order.
+
+    Returns the number of faces extracted or -1 if failed.
+
     */
     // face counter
     int fc=0;
-    Tess &tess = *(Tess*) ptess;
-    std::vector<Vertex_handle> &vt_list = *(std::vector<Vertex_handle>*) pvt_list;
+    const Tess &tess = *(const Tess*) ptess;
+    const std::vector<Vertex_handle> &vt_list = *(const std::vector<Vertex_handle>*) pvt_list;
 
     double tot_volume = 0;
     std::vector<Edge> edges;
@@ -382,8 +846,13 @@ int Tess3d::extract_geometry(
     std::vector<bool> sites_ngb_used(total_num_particles, false);
     std::vector<int>  site_ngb_list;
 
+    const int NMAXEDGE = 1024;
+    std::vector< std::vector<vector3> > vertex_list(NMAXEDGE);
+
     // only process local particle information
-    for (int i=0; i<local_num_particles; i++) {
+    for (int n=begin_particles; n<end_particles; n++) {
+
+        const int i = (ids == NULL) ? n : ids[n];
 
         const Vertex_handle &vi = vt_list[i];
         const vector3 ipos(x[0][i], x[1][i], x[2][i]);
@@ -391,7 +860,9 @@ int Tess3d::extract_geometry(
         edges.clear();
         cells.clear();
         site_ngb_list.clear();
-        tess.incident_cells(vi, std::back_inserter(cells));
+
+        // cell marks of the data structure are not used
+        tess.incident_cells_threadsafe(vi, std::back_inserter(cells));
 
         const int ncells = cells.size();
         for (int icell=0; icell<ncells; icell++) {
@@ -427,9 +898,6 @@ int Tess3d::extract_geometry(
         for (int j=0; j<nngb; j++)
             sites_ngb_used[site_ngb_list[j]] = false;
 
-        const int NMAXEDGE = 1024;
-        static std::vector<vector3> vertex_list[NMAXEDGE];
-
         int nedge = 0;
         for (std::vector<Edge>::iterator edge_it = edges.begin(); edge_it != edges.end(); edge_it++) {
             
@@ -441,7 +909,7 @@ int Tess3d::extract_geometry(
                 if (tess.is_infinite(cc)) {
                     return -1;
                 } else {
-                    const Point c = tess.dual(cc);
+                    const Point &c = tess.dual(cc);
                     const vector3 centre(c.x(), c.y(), c.z());
                     vertex_list[nedge].push_back(centre);
                 }
@@ -506,7 +974,9 @@ int Tess3d::extract_geometry(
 
             face_centroid *= 1.0/area;
 
-            if (id1 < id2) {
+            // faces shared with a particle not extracted
+            // are stored by this particle
+            if (id1 < id2 || (active != NULL && !active[id2])) {
 
                 const vector3 jpos(x[0][id2], x[1][id2], x[2][id2]);
                 vector3 normal = jpos - ipos;
@@ -527,10 +997,6 @@ int Tess3d::extract_geometry(
                 pair_i[fc] = id1;
                 pair_j[fc] = id2;
 
-                // store neighbors - face id is stored
-                neighbors[id1].push_back(fc);
-                neighbors[id2].push_back(fc);
-
                 fc++;
             }
 
@@ -562,6 +1028,190 @@ int Tess3d::extract_geometry(
 }
 
 
+int Tess3d::extract_geometry_by_edge(
+        double* x[3],
+        double* dcenter_of_mass[3],
+        double* volume,
+        double* face_area,
+        double* face_com[3],
+        double* face_n[3],
+        int* pair_i,
+        int* pair_j) {
+    /*
+
+    Extract all geometric information pertaining to the mesh,
+    i.e. area, normal, volume, ... Extracts the same set of faces
+    as extract_geometry but each delaunay edge is visited once, faces
+    are stored in edge order which differs from the particle order of
+    extract_geometry. The voronoi face is computed once and its volume
+    and center of mass contributions are scattered to both particles
+    that define the face.
+
+    Parameters
+    ----------
+    x : double[3]*
+        Pointer to the position of the particles.
+
+    dcenter_of_mass : double[3]*
+        Pointer to the center of mass of each real particle
+        realtive to its position.
+
+    volume : double*
+        Pointer to the volume of each real particle.
+
+    face_area : double*
+        Pointer to face area defined by particle i and j .
+
+    face_com : double[3]*
+        Pointer to face center of mass defined by particle i and j .
+
+    pair_i : int*
+        Pointer to left most particle defining the face.
+
+    pair_j : int*
+        Pointer to right most particle defining the face.
+
+    */
+    // face counter
+    int fc=0;
+    Tess &tess = *(Tess*) ptess;
+
+    const double third  = 1.0/3.0;
+    const double fourth = 1.0/4.0;
+    const double SMALLDIFF1 = 1.0e-10;
+
+    // accumulated volume and center of mass of real particles
+    std::vector<double> cell_volume(local_num_particles, 0.0);
+    std::vector<vector3> cell_centroid(local_num_particles, vector3(0.0, 0.0, 0.0));
+
+    std::vector<vector3> vertex_list;
+
+    // process each delaunay edge once
+    for (Finite_edges_iterator edge_it = tess.finite_edges_begin();
+            edge_it != tess.finite_edges_end(); edge_it++) {
+
+        const Edge e = *edge_it;
+        int id1 = e.get<0>()->vertex(e.get<1>())->info();
+        int id2 = e.get<0>()->vertex(e.get<2>())->info();
+
+        // faces are defined by real particles
+        if (id2 < id1)
+            std::swap(id1, id2);
+        if (id1 >= local_num_particles)
+            continue;
+
+        // grab vertices of voronoi face associated with edge
+        const Cell_circulator cc_end = tess.incident_cells(e);
+        Cell_circulator cc(cc_end);
+        vertex_list.clear();
+
+        do {
+            if (tess.is_infinite(cc)) {
+                return -1;
+            } else {
+                const Point &c = tess.dual(cc);
+                vertex_list.push_back(vector3(c.x(), c.y(), c.z()));
+            }
+        } while (++cc != cc_end);
+
+        const vector3 ipos(x[0][id1], x[1][id1], x[2][id1]);
+        const vector3 jpos(x[0][id2], x[1][id2], x[2][id2]);
+
+        vector3 c(0.0, 0.0, 0.0);
+        const int nvtx = vertex_list.size();
+
+        for (int j=0; j<nvtx; j++)
+            c += vertex_list[j];
+        c *= 1.0/nvtx;
+
+        vector3 face_centroid(0.0, 0.0, 0.0);
+        vector3 v1 = vertex_list.back() - c;
+        double area1 = 0.0;
+
+        for (int j=0; j<nvtx; j++) {
+
+            const vector3 v2 = vertex_list[j] - c;
+
+            // face area and center of mass
+            const vector3 norm3 = v1.cross(v2);
+            const double area3 = norm3.abs();
+            const vector3 c3 = c + (v1 + v2)*third;
+
+            face_centroid += c3*area3;
+            area1 += area3;
+
+            v1 = v2;
+        }
+
+        const double area0 = area1;
+        const double L1 = std::sqrt(area0);
+        const double L2 = (face_centroid - ipos).abs();
+        const double area = (L1 < SMALLDIFF1*L2) ? 0.0 : area0;
+
+        // ignore face
+        if (area == 0.0)
+            continue;
+
+        face_centroid *= 1.0/area;
+
+        vector3 normal = jpos - ipos;
+        normal *= 1.0/normal.abs();
+
+        face_area[fc] = 0.5*area1;
+
+        // orientation of face
+        face_n[0][fc] = normal.x;
+        face_n[1][fc] = normal.y;
+        face_n[2][fc] = normal.z;
+
+        // center of mass of face
+        face_com[0][fc] = face_centroid.x;
+        face_com[1][fc] = face_centroid.y;
+        face_com[2][fc] = face_centroid.z;
+
+        pair_i[fc] = id1;
+        pair_j[fc] = id2;
+
+        fc++;
+
+        // pyramid of face with apex at each real particle
+        const int ids[2] = {id1, id2};
+        for (int k=0; k<2; k++) {
+
+            const int id = ids[k];
+            if (id >= local_num_particles)
+                continue;
+
+            const vector3 pos(x[0][id], x[1][id], x[2][id]);
+            const vector3 cv = pos - face_centroid;
+
+            v1 = vertex_list.back() - face_centroid;
+            for (int j=0; j<nvtx; j++) {
+
+                // particle volume and center of mass
+                const vector3 v2 = vertex_list[j] - face_centroid;
+                const vector3 c4 = face_centroid + (v1 + v2 + cv)*fourth;
+                const double vol4 = std::abs(v1.cross(v2)*cv);
+                cell_volume[id] += vol4;
+                cell_centroid[id] += c4 * vol4;
+                v1 = v2;
+            }
+        }
+    }
+
+    // store volume and delta com
+    for (int i=0; i<local_num_particles; i++) {
+        cell_centroid[i] *= 1.0/cell_volume[i];
+
+        volume[i] = cell_volume[i]/6.0;
+        dcenter_of_mass[0][i] = cell_centroid[i].x - x[0][i];
+        dcenter_of_mass[1][i] = cell_centroid[i].y - x[1][i];
+        dcenter_of_mass[2][i] = cell_centroid[i].z - x[2][i];
+    }
+    return fc;
+}
+
+
 int Tess3d::update_radius(
         double *x[3],
         double *radius,
@@ -675,7 +1325,7 @@ int Tess3d::update_radius(
                 } else {
                     // calculate distance between particle
                     // and voronoi vertex
-                    const Point c = tess.dual(cc);
+                    const Point &c = tess.dual(cc);
                     radius_max_sq = std::max(radius_max_sq,
                             (c.x() - xp)*(c.x() - xp) +
                             (c.y() - yp)*(c.y() - yp) +
@@ -1,6 +1,8 @@
 import unittest
 import numpy as np
 
+import phd
+
 from phd.utils.particle_tags import ParticleTAGS
 
 from phd.mesh.mesh import Mesh
@@ -8,6 +10,9 @@ from phd.domain.domain import DomainLimits
 from phd.domain.boundary import Reflective
 from phd.domain.domain_manager import DomainManager
 from phd.utils.particle_creator import HydroParticleCreator
+from phd.riemann.riemann import HLLC
+from phd.equation_state.equation_state import IdealGas
+from phd.reconstruction.reconstruction import PieceWiseConstant
 
 
 class TestMeshSetup2d(unittest.TestCase):
@@ -285,6 +290,559 @@ class TestMesh3dLattice(TestMesh2dLatticeBox):
         self.mesh.register_fields(self.particles)
         self.mesh.initialize()
 
+class TestMesh1dUniformBox(unittest.TestCase):
+
+    def setUp(self):
+        n = 50
+        self.particles = HydroParticleCreator(num=n, dim=1)
+
+        # create uniform random particles in a unit interval
+        np.random.seed(0)
+        self.particles["position-x"][:] = np.random.uniform(size=n)
+
+        # create unit interval domain, reflective boundary condition
+        self.domain_manager = DomainManager(xmin=[0.], xmax=[1.],
+                initial_radius=0.1, search_radius_factor=1.25)
+        self.domain_manager.set_boundary_condition(Reflective())
+        self.domain_manager.register_fields(self.particles)
+        self.domain_manager.initialize()
+
+        self.mesh = Mesh()
+        self.mesh.register_fields(self.particles)
+        self.mesh.initialize()
+
+    def test_volume(self):
+        """
+        Test if volumes are the distance between midpoints of
+        neighboring particles and faces are between consecutive
+        particles.
+        """
+        x = np.sort(self.particles["position-x"])
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertAlmostEqual(np.sum(self.particles["volume"][real]), 1.0)
+
+        # interior cells, boundary cells are reflected
+        xp = self.particles["position-x"][real]
+        vol = self.particles["volume"][real]
+        ind = np.argsort(xp)
+        self.assertTrue(np.allclose(vol[ind][1:-1], 0.5*(x[2:] - x[:-2])))
+        self.assertAlmostEqual(vol[ind][0], x[0] + 0.5*(x[1] - x[0]))
+
+        # one face between each particle and two boundary faces
+        self.assertEqual(self.mesh.faces.get_carray_size(), x.size + 1)
+        self.assertTrue(np.all(self.mesh.faces["area"] == 1.0))
+
+
+def cell_closure(mesh, particles):
+    """Sum of the area vectors of the faces of each particle."""
+    closure = np.zeros((particles.get_carray_size(), 2))
+    pair_i = mesh.faces["pair-i"]
+    pair_j = mesh.faces["pair-j"]
+    for k, ax in enumerate("xy"):
+        av = mesh.faces["area"]*mesh.faces["normal-"+ax]
+        np.add.at(closure[:, k], pair_i,  av)
+        np.add.at(closure[:, k], pair_j, -av)
+    return closure
+
+class UnitBox2dSetup(object):
+    """Uniform random particles in a unit square with reflective
+    boundary conditions. Classes set the number of particles and
+    the options of the domain manager and mesh."""
+
+    num_particles = 100
+    domain_options = {}
+    mesh_options = {}
+
+    def setUp(self):
+        n = self.num_particles
+        self.particles = HydroParticleCreator(num=n, dim=2)
+
+        # create uniform random particles in a unit box
+        np.random.seed(0)
+        self.particles["position-x"][:] = np.random.uniform(size=n)
+        self.particles["position-y"][:] = np.random.uniform(size=n)
+
+        # create unit square domain, reflective boundary condition
+        self.domain_manager = DomainManager(xmin=[0., 0.], xmax=[1., 1.],
+                initial_radius=0.1, search_radius_factor=1.25,
+                **self.domain_options)
+        self.domain_manager.set_boundary_condition(Reflective())
+        self.domain_manager.register_fields(self.particles)
+        self.domain_manager.initialize()
+
+        self.mesh = Mesh(**self.mesh_options)
+        self.mesh.register_fields(self.particles)
+        self.mesh.initialize()
+
+class TestMesh2dPersistentTess(UnitBox2dSetup, unittest.TestCase):
+
+    mesh_options = {"persistent_tess": True}
+
+    def test_relocated_volume(self):
+        """
+        Test if relocating the tessellation gives the same volumes
+        as building the tessellation from scratch.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        # move real particles a fraction of a cell
+        real = self.particles["tag"] == ParticleTAGS.Real
+        for ax in "xy":
+            self.particles["position-"+ax][real] = np.clip(
+                    self.particles["position-"+ax][real] +\
+                    0.01*np.random.uniform(-1, 1, size=np.sum(real)),
+                    0.001, 0.999)
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        self.assertAlmostEqual(np.sum(volume), 1.0)
+
+        # full rebuild of the same particles
+        self.mesh.reset_mesh()
+        self.mesh.persistent_tess = False
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        np.testing.assert_almost_equal(volume, self.particles["volume"][real])
+
+class TestMesh2dExtractByEdge(UnitBox2dSetup, unittest.TestCase):
+
+    def test_extract_by_edge(self):
+        """
+        Test if extracting the geometry by edge gives the same
+        volumes and faces as circulating around each particle.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        faces = self.sorted_faces()
+
+        self.mesh.extract_by_edge = True
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        np.testing.assert_almost_equal(volume, self.particles["volume"][real])
+
+        # same faces, stored in a different order
+        for field, values in self.sorted_faces().iteritems():
+            np.testing.assert_almost_equal(faces[field], values)
+
+    def sorted_faces(self):
+        """Return copy of face fields ordered by (pair-i, pair-j)."""
+        order = np.lexsort((self.mesh.faces["pair-j"], self.mesh.faces["pair-i"]))
+        return dict((field, np.copy(self.mesh.faces[field][order]))
+                for field in ["pair-i", "pair-j", "area", "normal-x",
+                    "normal-y", "com-x", "com-y"])
+
+class TestMesh2dNeighborGraph(UnitBox2dSetup, unittest.TestCase):
+
+    def test_neighbor_graph(self):
+        """
+        Test if the face adjacency lists every face of a particle
+        with the particle on the other side of the face.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        offsets, faces, nbrs = self.mesh.get_neighbor_graph()
+
+        pair_i = self.mesh.faces["pair-i"]
+        pair_j = self.mesh.faces["pair-j"]
+        num_faces = self.mesh.faces.get_carray_size()
+
+        self.assertEqual(offsets.size, self.particles.get_carray_size() + 1)
+        self.assertEqual(offsets[-1], 2*num_faces)
+
+        for i in range(self.particles.get_carray_size()):
+            fids = faces[offsets[i]:offsets[i+1]]
+            nids = nbrs[offsets[i]:offsets[i+1]]
+
+            # faces of particle in ascending order
+            self.assertTrue(np.all(np.diff(fids) > 0))
+            for fid, j in zip(fids, nids):
+                self.assertTrue((pair_i[fid] == i and pair_j[fid] == j) or
+                        (pair_j[fid] == i and pair_i[fid] == j))
+
+class TestMesh2dVoronoiPolygons(UnitBox2dSetup, unittest.TestCase):
+
+    def test_polygon_area(self):
+        """
+        Test if the polygon of each real particle is counter clockwise
+        and its area is the particle volume.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        vertices, offsets, generators = self.mesh.get_voronoi_polygons()
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = self.particles["volume"][real]
+        self.assertEqual(offsets.size, volume.size + 1)
+        position = np.column_stack((self.particles["position-x"][real],
+            self.particles["position-y"][real]))
+
+        # polygons keep positions they were built from
+        self.particles["position-x"][:] += 0.01
+        np.testing.assert_array_equal(generators, position)
+
+        for i in range(volume.size):
+            x = vertices[offsets[i]:offsets[i+1], 0]
+            y = vertices[offsets[i]:offsets[i+1], 1]
+
+            # shoelace formula, positive for counter clockwise
+            area = 0.5*np.sum(x*np.roll(y, -1) - np.roll(x, -1)*y)
+            self.assertAlmostEqual(area, volume[i])
+
+class TestMesh2dUnsortedInsertion(UnitBox2dSetup, unittest.TestCase):
+
+    mesh_options = {"spatial_sort": False}
+
+    def test_unsorted_insertion(self):
+        """
+        Test if inserting particles in their order gives the same
+        volumes as inserting them along a hilbert curve.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        num_faces = self.mesh.faces.get_carray_size()
+
+        mesh = Mesh()
+        mesh.register_fields(self.particles)
+        mesh.initialize()
+        mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertTrue(np.allclose(volume, self.particles["volume"][real]))
+        self.assertEqual(num_faces, mesh.faces.get_carray_size())
+
+class TestMesh2dThreadedExtract(UnitBox2dSetup, unittest.TestCase):
+
+    def test_threaded_extract(self):
+        """
+        Test if extracting the geometry with threads gives the same
+        volumes and faces in the same order as the serial extraction.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        volume = np.copy(self.particles["volume"])
+        area = np.copy(self.mesh.faces["area"])
+        pair_i = np.copy(self.mesh.faces["pair-i"])
+        pair_j = np.copy(self.mesh.faces["pair-j"])
+
+        self.mesh.num_threads = 4
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        np.testing.assert_array_equal(volume, self.particles["volume"])
+        np.testing.assert_array_equal(area, self.mesh.faces["area"])
+        np.testing.assert_array_equal(pair_i, self.mesh.faces["pair-i"])
+        np.testing.assert_array_equal(pair_j, self.mesh.faces["pair-j"])
+
+class TestMesh2dPredictRadius(UnitBox2dSetup, unittest.TestCase):
+
+    domain_options = {"predict_radius": True}
+
+    def test_predicted_radius(self):
+        """
+        Test if the mesh is complete with predicted search radius
+        and the passes of the build are recorded.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertEqual(self.mesh.num_tess_iterations,
+                len(self.mesh.num_ghost_per_pass))
+
+        # move generators a fraction of a cell
+        real = self.particles["tag"] == ParticleTAGS.Real
+        for ax in "xy":
+            self.particles["w-"+ax][:] = 0.0
+            self.particles["w-"+ax][real] = np.random.uniform(-1, 1, size=np.sum(real))
+        self.domain_manager.move_generators(self.particles, 0.001)
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertAlmostEqual(np.sum(self.particles["volume"][real]), 1.0)
+
+        self.assertTrue(self.mesh.num_tess_iterations >= 1)
+        self.assertEqual(self.mesh.num_tess_iterations,
+                len(self.mesh.num_ghost_per_pass))
+
+class TestMesh2dPredictRadiusLater(UnitBox2dSetup, unittest.TestCase):
+
+    def test_predict_radius_later(self):
+        """
+        Test if radius prediction can be turned on after the fields
+        were registered.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        self.domain_manager.predict_radius = True
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertAlmostEqual(np.sum(self.particles["volume"][real]), 1.0)
+
+class TestMesh2dReuseGhosts(UnitBox2dSetup, unittest.TestCase):
+
+    domain_options = {"reuse_ghosts": True}
+
+    def test_reuse_ghosts(self):
+        """
+        Test if ghost particles are reused between builds and the
+        mesh matches a build with new ghost particles.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        # move generators a fraction of a cell
+        real = self.particles["tag"] == ParticleTAGS.Real
+        for ax in "xy":
+            self.particles["w-"+ax][:] = 0.0
+            self.particles["w-"+ax][real] = np.random.uniform(-1, 1, size=np.sum(real))
+        self.domain_manager.move_generators(self.particles, 0.001)
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertTrue(self.domain_manager.num_reused_ghost > 0)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertAlmostEqual(np.sum(self.particles["volume"][real]), 1.0)
+        vol = np.copy(self.particles["volume"][real])
+
+        # rebuild with new ghost particles
+        self.domain_manager.reuse_ghosts = False
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertTrue(np.allclose(vol, self.particles["volume"][real]))
+
+class TestMesh2dRelax(UnitBox2dSetup, unittest.TestCase):
+
+    domain_options = {"reuse_ghosts": True}
+    mesh_options = {"relax_iterations": 200, "relax_tolerance": 1.0e-2}
+
+    def test_relax_tolerance(self):
+        """
+        Test if relaxation stops once the displacement is below
+        the tolerance and the mesh is still valid.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        num_iterations = self.mesh.relax_mesh(self.particles, self.domain_manager)
+
+        self.assertEqual(num_iterations, self.mesh.num_relax_iterations)
+        self.assertTrue(num_iterations < self.mesh.relax_iterations)
+        self.assertTrue(self.mesh.relax_displacement < self.mesh.relax_tolerance)
+
+        # persistent mode only used while relaxing
+        self.assertFalse(self.mesh.persistent_tess)
+
+        # ghost particles reused between iterations and
+        # removed by the migration after relaxing
+        self.assertTrue(self.domain_manager.num_reused_ghost > 0)
+        self.assertFalse(np.any(self.particles["tag"] == ParticleTAGS.Ghost))
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertAlmostEqual(np.sum(self.particles["volume"][real]), 1.0)
+
+class TestMesh2dPruneFaces(UnitBox2dSetup, unittest.TestCase):
+
+    def test_prune_faces(self):
+        """
+        Test if small faces are removed from the face list and
+        adjacency while volumes are unchanged.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        num_faces = self.mesh.faces.get_carray_size()
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        self.assertEqual(self.mesh.num_pruned_faces, 0)
+
+        self.mesh.face_prune_tolerance = 0.05
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+
+        self.assertTrue(self.mesh.num_pruned_faces > 0)
+        self.assertEqual(self.mesh.faces.get_carray_size(),
+                num_faces - self.mesh.num_pruned_faces)
+        self.assertTrue(np.allclose(volume, self.particles["volume"][real]))
+
+        # cells of real particles are closed
+        closure = cell_closure(self.mesh, self.particles)
+        self.assertTrue(np.allclose(closure[real], 0.))
+
+        offsets, faces, neighbors = self.mesh.get_neighbor_graph()
+        self.assertEqual(offsets[-1], 2*self.mesh.faces.get_carray_size())
+
+    def test_serial_only(self):
+        """
+        Test if pruning faces is rejected in parallel runs.
+        """
+        mesh = Mesh(face_prune_tolerance=0.05)
+        mesh.register_fields(self.particles)
+
+        in_parallel = phd._in_parallel
+        phd._in_parallel = True
+        try:
+            self.assertRaises(RuntimeError, mesh.initialize)
+        finally:
+            phd._in_parallel = in_parallel
+
+    def test_uniform_state(self):
+        """
+        Test if a uniform state stays uniform with faces pruned.
+        """
+        self.mesh.face_prune_tolerance = 0.05
+
+        # uniform state at rest, ghost particles are copies
+        self.particles["density"][:] = 1.0
+        self.particles["velocity-x"][:] = 0.0
+        self.particles["velocity-y"][:] = 0.0
+        self.particles["pressure"][:] = 1.0
+        self.particles["w-x"][:] = 0.0
+        self.particles["w-y"][:] = 0.0
+
+        eos = IdealGas(gamma=1.4)
+        reconstruction = PieceWiseConstant()
+        reconstruction.add_fields(self.particles)
+        reconstruction.initialize()
+
+        riemann = HLLC()
+        riemann.add_fields(self.particles)
+        riemann.initialize()
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertTrue(self.mesh.num_pruned_faces > 0)
+        self.mesh.assign_face_velocities(self.particles)
+        eos.conservative_from_primitive(self.particles)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        fields = ["mass", "momentum-x", "momentum-y", "energy"]
+        before = dict((field, np.copy(self.particles[field][real]))
+                for field in fields)
+
+        reconstruction.compute_gradients(self.particles, self.mesh,
+                self.domain_manager)
+        reconstruction.compute_states(self.particles, self.mesh,
+                eos.get_gamma(), self.domain_manager, 0.05, riemann.boost)
+        riemann.compute_fluxes(self.particles, self.mesh, reconstruction, eos)
+        self.mesh.update_from_fluxes(self.particles, riemann, 0.1)
+
+        for field in fields:
+            np.testing.assert_allclose(before[field],
+                    self.particles[field][real], rtol=0, atol=1.0e-12)
+
+class TestMesh2dFrozenRegions(UnitBox2dSetup, unittest.TestCase):
+
+    num_particles = 400
+    mesh_options = {"persistent_tess": True, "frozen_tolerance": 0.01,
+            "full_rebuild_frequency": 2}
+
+    def test_local_build(self):
+        """
+        Test if only cells around moved particles are extracted and
+        the mesh matches a full build.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        num_real = np.sum(self.particles["tag"] == ParticleTAGS.Real)
+        self.assertEqual(self.mesh.num_active_particles, num_real)
+
+        # move particles in the center of the box
+        real = self.particles["tag"] == ParticleTAGS.Real
+        center = real &\
+                (np.abs(self.particles["position-x"] - 0.5) < 0.1) &\
+                (np.abs(self.particles["position-y"] - 0.5) < 0.1)
+        for ax in "xy":
+            self.particles["position-"+ax][center] +=\
+                    0.005*np.random.uniform(-1, 1, size=np.sum(center))
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertTrue(self.mesh.num_active_particles < num_real)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        num_faces = self.mesh.faces.get_carray_size()
+        self.assertAlmostEqual(np.sum(volume), 1.0)
+
+        # forced full build
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertEqual(self.mesh.num_active_particles, num_real)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertTrue(np.allclose(volume, self.particles["volume"][real]))
+        self.assertEqual(num_faces, self.mesh.faces.get_carray_size())
+
+    def test_local_build_flip(self):
+        """
+        Test if a move that changes the topology activates the new
+        neighbors and the volumes still fill the box.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+
+        # particle closest to the center of the box
+        real = np.where(self.particles["tag"] == ParticleTAGS.Real)[0]
+        i = real[np.argmin((self.particles["position-x"][real] - 0.5)**2 +
+                (self.particles["position-y"][real] - 0.5)**2)]
+
+        offsets, faces, nbrs = self.mesh.get_neighbor_graph()
+        old_nbrs = set(nbrs[offsets[i]:offsets[i+1]])
+
+        # move across its cell, neighbors change
+        self.particles["position-x"][i] += 0.8*np.sqrt(self.particles["volume"][i])
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertTrue(self.mesh.num_active_particles < real.size)
+
+        offsets, faces, nbrs = self.mesh.get_neighbor_graph()
+        self.assertTrue(set(nbrs[offsets[i]:offsets[i+1]]) - old_nbrs)
+
+        real = self.particles["tag"] == ParticleTAGS.Real
+        volume = np.copy(self.particles["volume"][real])
+        self.assertAlmostEqual(np.sum(volume), 1.0)
+
+        # forced full build
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        real = self.particles["tag"] == ParticleTAGS.Real
+        self.assertTrue(np.allclose(volume, self.particles["volume"][real]))
+
+class TestMesh2dFrozenPruneFaces(UnitBox2dSetup, unittest.TestCase):
+
+    num_particles = 400
+    mesh_options = {"persistent_tess": True, "frozen_tolerance": 0.01,
+            "full_rebuild_frequency": 10, "face_prune_tolerance": 0.05}
+
+    def test_local_build_closure(self):
+        """
+        Test if cells stay closed when pruning after local builds and
+        the faces match a full build.
+        """
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertTrue(self.mesh.num_pruned_faces > 0)
+
+        # two local builds, reused faces are pruned each time
+        for step in range(2):
+            real = self.particles["tag"] == ParticleTAGS.Real
+            center = real &\
+                    (np.abs(self.particles["position-x"] - 0.5) < 0.1) &\
+                    (np.abs(self.particles["position-y"] - 0.5) < 0.1)
+            for ax in "xy":
+                self.particles["position-"+ax][center] +=\
+                        0.005*np.random.uniform(-1, 1, size=np.sum(center))
+
+            self.mesh.build_geometry(self.particles, self.domain_manager)
+            self.assertTrue(self.mesh.num_active_particles < np.sum(real))
+            self.assertTrue(self.mesh.num_pruned_faces > 0)
+
+            real = self.particles["tag"] == ParticleTAGS.Real
+            closure = cell_closure(self.mesh, self.particles)
+            self.assertTrue(np.allclose(closure[real], 0.))
+
+        num_pruned = self.mesh.num_pruned_faces
+        area = np.sort(self.mesh.faces["area"])
+
+        # forced full build
+        self.mesh.full_rebuild_frequency = 1
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.assertEqual(num_pruned, self.mesh.num_pruned_faces)
+        self.assertTrue(np.allclose(area, np.sort(self.mesh.faces["area"])))
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -17,11 +17,25 @@ cdef class ReconstructionBase:
     cdef dict reconstruct_fields
     cdef dict reconstruct_field_groups
 
+    # passive scalars of particles and their gradients, species
+    # of a particle are contiguous
     cdef int num_passive
-    cdef np.float64_t** passive
-    cdef np.float64_t** passive_l
-    cdef np.float64_t** passive_r
-    cdef np.float64_t** dpassive
+    cdef np.float64_t* passive
+    cdef np.float64_t* dpassive
+
+    # face kernel parameters and pointers, set by prepare_faces
+    cdef int face_dim
+    cdef int face_num_fields
+    cdef double face_gamma
+    cdef double face_dt
+    cdef bint face_boost
+    cdef np.int32_t* face_pair_i
+    cdef np.int32_t* face_pair_j
+    cdef np.float64_t* x[3]
+    cdef np.float64_t* dcx[3]
+    cdef np.float64_t* v[3]
+    cdef np.float64_t* fij[3]
+    cdef np.float64_t* wx[3]
 
     cpdef compute_gradients(self, CarrayContainer particles, Mesh mesh,
                             DomainManager domain_manager)
@@ -38,8 +52,15 @@ cdef class ReconstructionBase:
                          double gamma, DomainManager domain_manager,
                          double dt, bint boost)
 
+    cdef prepare_faces(self, CarrayContainer particles, Mesh mesh,
+                       double gamma, double dt, bint boost)
+
+    cdef void face_states(self, int m, np.float64_t **prim_l,
+                          np.float64_t **prim_r) nogil
+
 cdef class PieceWiseConstant(ReconstructionBase):
-    pass
+    cdef np.float64_t* density
+    cdef np.float64_t* pressure
 
 cdef class PieceWiseLinear(ReconstructionBase):
 
@@ -47,6 +68,7 @@ cdef class PieceWiseLinear(ReconstructionBase):
     cdef public bint gizmo_limiter
 
     cdef public CarrayContainer grad
+    cdef public CarrayContainer predictor
 
     cdef int slope_limiter
 
@@ -61,9 +83,44 @@ cdef class PieceWiseLinear(ReconstructionBase):
 
     cdef np.float64_t** prim_pointer
     cdef np.float64_t** grad_pointer
+    cdef np.float64_t** pred_pointer
 
     cdef np.float64_t* phi_max
     cdef np.float64_t* phi_min
 
     cdef np.float64_t* alpha
     cdef np.float64_t* df
+
+    cdef np.float64_t* passive_max
+    cdef np.float64_t* passive_min
+    cdef np.float64_t* passive_alpha
+
+    # geometry of the faces, reused while the mesh is unchanged
+    cdef public int stencil_generation
+    cdef public int num_stencil_builds
+    cdef CarrayContainer stencil_faces
+    cdef CarrayContainer stencil_neighbors
+
+    cdef np.float64_t* area_r
+    cdef np.float64_t* cfx[3]
+    cdef np.float64_t* dr[3]
+    cdef np.float64_t* sepi[3]
+    cdef np.float64_t* sepj[3]
+    cdef np.float64_t* sepi_ratio
+    cdef np.float64_t* sepj_ratio
+    cdef np.float64_t* dfx[3]
+
+    cdef build_stencil(self, CarrayContainer particles, Mesh mesh)
+    cdef set_face_pointers(self, CarrayContainer particles, Mesh mesh,
+                           double gamma, double dt, bint boost)
+    cdef compute_predictor(self, CarrayContainer particles)
+    cdef compute_passive_gradients(self, CarrayContainer particles, Mesh mesh)
+
+    cdef void passive_face(self, int m, np.float64_t *passive_l,
+                           np.float64_t *passive_r, bint spatial, double dt) nogil
+
+    cdef void spatial_face(self, int m, int s, np.float64_t **prim_l,
+                           np.float64_t **prim_r) nogil
+
+    cdef void temporal_face(self, int m, int s, np.float64_t **prim_l,
+                            np.float64_t **prim_r) nogil
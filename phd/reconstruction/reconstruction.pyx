@@ -6,7 +6,7 @@ cimport libc.stdlib as stdlib
 from libc.math cimport sqrt, fmax, fmin, fabs
 
 from ..utils.particle_tags import ParticleTAGS
-from ..utils.carray cimport DoubleArray, IntArray, LongArray
+from ..utils.carray cimport DoubleArray, IntArray, LongArray, DoubleBlockArray
 
 phdLogger = logging.getLogger("phd")
 
@@ -128,6 +128,41 @@ cdef class ReconstructionBase:
         msg = "Reconstruction::compute called!"
         raise NotImplementedError(msg)
 
+    cdef prepare_faces(self, CarrayContainer particles, Mesh mesh,
+                       double gamma, double dt, bint boost):
+        """Store pointers and parameters used by face_states. Has to
+        be called before face_states.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        mesh : Mesh
+            Class that builds the domain mesh.
+
+        gamma : double
+            Ratio of specific heats.
+
+        dt : float
+            Time to extrapolate reconstructed fields to.
+
+        boost : bool
+            Solve equations in moving reference frame.
+
+        """
+        msg = "Reconstruction::prepare_faces called!"
+        raise NotImplementedError(msg)
+
+    cdef void face_states(self, int m, np.float64_t **prim_l,
+                          np.float64_t **prim_r) nogil:
+        """Reconstruct left and right primitive states of face m and
+        store them at index 0 of prim_l and prim_r, which follow the
+        order of the primitive group. Same as compute_states for a
+        single face without writing left_states and right_states.
+        """
+        pass
+
 cdef class PieceWiseConstant(ReconstructionBase):
     """Reconstruction of primitive variables onto each face using
     constant implementation.
@@ -163,20 +198,10 @@ cdef class PieceWiseConstant(ReconstructionBase):
     def __init__(self):
         super(PieceWiseConstant, self).__init__()
 
-    def __dealloc__(self):
-        """Release pointers"""
-
-        if self.has_passive_scalars:
-            stdlib.free(self.passive)
-            stdlib.free(self.passive_l)
-            stdlib.free(self.passive_r)
-
     def initialize(self):
         """Setup all connections for computation classes. Should always
         check if fields_registered is True.
         """
-        cdef int dim
-
         if not self.fields_registered:
             raise RuntimeError("Reconstruction did not set fields to reconstruct!")
 
@@ -188,15 +213,6 @@ cdef class PieceWiseConstant(ReconstructionBase):
         self.left_states.carray_named_groups  = self.reconstruct_field_groups
         self.right_states.carray_named_groups = self.reconstruct_field_groups
 
-        # allocate helper pointers
-        if self.has_passive_scalars:
-            dim = len(self.left_states.carray_named_groups["velocity"])
-            self.num_passive = len(self.fields_to_reconstruct_groups["passive_scalars"])
-
-            self.passive   = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-            self.passive_l = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-            self.passive_r = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-
     def add_fields(self, CarrayContainer particles):
         """Create lists of variables to reconstruct and setup containers
         for gradients and reconstructions.
@@ -208,6 +224,7 @@ cdef class PieceWiseConstant(ReconstructionBase):
 
         """
         cdef str field_name
+        cdef DoubleBlockArray passive
         cdef dict carray_to_register = {}, carray_named_groups = {}
 
         if "primitive" not in particles.carray_named_groups or\
@@ -222,11 +239,12 @@ cdef class PieceWiseConstant(ReconstructionBase):
         carray_named_groups["primitive"] = particles.carray_named_groups["primitive"]
         carray_named_groups["velocity"] = particles.carray_named_groups["velocity"]
 
-        # add passive-scalars if any 
-        if "passive-scalars" in particles.carray_named_groups.keys():
+        # add passive-scalars if any, all species in one block
+        if "passive-scalars" in particles.carrays:
+            passive = particles.get_carray("passive-scalars")
             self.has_passive_scalars = True
-            carray_named_groups["passive-scalars"] = particles.carray_named_groups["passive-scalars"]
-            self.num_passive = len(particles.carray_named_groups["passive-scalars"])
+            self.num_passive = passive.num_components
+            carray_to_register["passive-scalars"] = particles.carray_dtypes["passive-scalars"]
 
         # store fields info
         self.fields_registered = True
@@ -293,7 +311,11 @@ cdef class PieceWiseConstant(ReconstructionBase):
         cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
         cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
 
-        cdef int i, j, k, n, dim, num_species
+        # passive scalars
+        cdef DoubleBlockArray ps, psl, psr
+        cdef int num_passive = 0
+
+        cdef int i, j, k, n, dim
         cdef np.float64_t *v[3], *vl[3], *vr[3], *wx[3]
 
         phdLogger.info("PieceWiseConstant: Starting reconstruction")
@@ -314,11 +336,10 @@ cdef class PieceWiseConstant(ReconstructionBase):
 
         # include passive scalars if any
         if self.has_passive_scalars:
-
-            # pointers to passive and left/right states
-            particles.pointer_groups(self.passive, particles.carray_named_groups["passive-scalars"])
-            self.left_states.pointer_groups(self.passive_l, self.carray_named_groups["passive-scalars"])
-            self.right_states.pointer_groups(self.passive_r, self.carray_named_groups["passive-scalars"])
+            ps  = particles.get_carray("passive-scalars")
+            psl = self.left_states.get_carray("passive-scalars")
+            psr = self.right_states.get_carray("passive-scalars")
+            num_passive = self.num_passive
 
         # loop through each face
         for n in range(mesh.faces.get_carray_size()):
@@ -331,11 +352,10 @@ cdef class PieceWiseConstant(ReconstructionBase):
             dl.data[n] = d.data[i]
             dr.data[n] = d.data[j]
 
-            # add passive scalars if any
-            if self.has_passive_scalars:
-                for k in range(self.num_passive):
-                    self.passive_l[k][n] = self.passive[k][i]
-                    self.passive_r[k][n] = self.passive[k][j]
+            # add passive scalars if any, species are contiguous
+            for k in range(num_passive):
+                psl.data[n*num_passive+k] = ps.data[i*num_passive+k]
+                psr.data[n*num_passive+k] = ps.data[j*num_passive+k]
 
             # pressure
             pl.data[n] = p.data[i]
@@ -351,6 +371,77 @@ cdef class PieceWiseConstant(ReconstructionBase):
                     vl[k][n] = v[k][i]
                     vr[k][n] = v[k][j]
 
+    cdef prepare_faces(self, CarrayContainer particles, Mesh mesh,
+                       double gamma, double dt, bint boost):
+        """Store pointers and parameters used by face_states.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        mesh : Mesh
+            Class that builds the domain mesh.
+
+        gamma : double
+            Ratio of specific heats.
+
+        dt : float
+            Time to extrapolate reconstructed fields to.
+
+        boost : bool
+            Solve equations in moving reference frame.
+
+        """
+        cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
+        cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
+        cdef DoubleArray d = particles.get_carray("density")
+        cdef DoubleArray p = particles.get_carray("pressure")
+
+        self.face_dim = len(particles.carray_named_groups["position"])
+        self.face_num_fields = len(particles.carray_named_groups["primitive"])
+
+        self.face_gamma = gamma
+        self.face_dt = dt
+        self.face_boost = boost
+
+        self.face_pair_i = pair_i.data
+        self.face_pair_j = pair_j.data
+
+        self.density = d.data
+        self.pressure = p.data
+
+        particles.pointer_groups(self.v, particles.carray_named_groups["velocity"])
+        mesh.faces.pointer_groups(self.wx, mesh.faces.carray_named_groups["velocity"])
+
+    cdef void face_states(self, int m, np.float64_t **prim_l,
+                          np.float64_t **prim_r) nogil:
+        """Copy particle values of face m to index 0 of prim_l and
+        prim_r. Same as compute_states for a single face.
+        """
+        cdef int i, j, k
+        cdef int dim = self.face_dim
+
+        # particles that make up the face
+        i = self.face_pair_i[m]
+        j = self.face_pair_j[m]
+
+        # density and pressure
+        prim_l[0][0] = self.density[i]
+        prim_r[0][0] = self.density[j]
+
+        prim_l[dim+1][0] = self.pressure[i]
+        prim_r[dim+1][0] = self.pressure[j]
+
+        # velocities
+        for k in range(dim):
+            if self.face_boost:
+                # velocity in face frame
+                prim_l[1+k][0] = self.v[k][i] - self.wx[k][m]
+                prim_r[1+k][0] = self.v[k][j] - self.wx[k][m]
+            else:
+                prim_l[1+k][0] = self.v[k][i]
+                prim_r[1+k][0] = self.v[k][j]
 
 cdef class PieceWiseLinear(ReconstructionBase):
     """Reconstruction of primitive variables onto each face using
@@ -364,6 +455,10 @@ cdef class PieceWiseLinear(ReconstructionBase):
     grad : CarrayContainer
        Gradient of each primitive field.
 
+    predictor : CarrayContainer
+       Change of each primitive field of each particle over the
+       extrapolation time, computed once per particle in the lab frame.
+
     left_states : CarrayContainer
         Left states primitive values for riemann problem.
 
@@ -399,10 +494,20 @@ cdef class PieceWiseLinear(ReconstructionBase):
         Dictionary of collection of gradient names allowing for ease
         of subsetting of gradients.
 
+    stencil_generation : int
+        Mesh generation the face geometry was cached for. The geometry
+        is rebuilt when the mesh generation changes.
+
+    num_stencil_builds : int
+        Number of times the face geometry has been cached.
+
     """
     def __init__(self, str limiter = "arepo", bint gizmo_limiter=True, **kwargs):
         super(PieceWiseLinear, self).__init__()
 
+        self.stencil_generation = -1
+        self.num_stencil_builds = 0
+
         if limiter == "arepo":
             self.slope_limiter = 0
         elif limiter == "tess":
@@ -424,12 +529,12 @@ cdef class PieceWiseLinear(ReconstructionBase):
         stdlib.free(self.state_r)
 
         stdlib.free(self.grad_pointer)
+        stdlib.free(self.pred_pointer)
 
         if self.has_passive_scalars:
-            stdlib.free(self.passive)
-            stdlib.free(self.passive_l)
-            stdlib.free(self.passive_r)
-            stdlib.free(self.dpassive)
+            stdlib.free(self.passive_max)
+            stdlib.free(self.passive_min)
+            stdlib.free(self.passive_alpha)
 
         stdlib.free(self.phi_max)
         stdlib.free(self.phi_min)
@@ -449,6 +554,7 @@ cdef class PieceWiseLinear(ReconstructionBase):
         """
         cdef int i, dim
         cdef str field_name, grad_name
+        cdef DoubleBlockArray passive
         cdef list axis = ["x", "y", "z"]
         cdef dict grad_carray_to_register = {}, grad_carray_named_groups = {}
         cdef dict recon_carray_to_register = {}, recon_carray_named_groups = {}
@@ -486,18 +592,15 @@ cdef class PieceWiseLinear(ReconstructionBase):
         # store velocity group
         recon_carray_named_groups["velocity"] = particles.carray_named_groups["velocity"]
 
-        # add passive-scalars if any 
-        if "passive-scalars" in particles.carray_named_groups.keys():
+        # add passive-scalars if any, all species in one block and
+        # their gradients in one block with dimension stacked
+        if "passive-scalars" in particles.carrays:
+            passive = particles.get_carray("passive-scalars")
             self.has_passive_scalars = True
-            self.num_passive = len(particles.carray_named_groups["passive-scalars"])
-
-            grad_carray_named_groups["passive-scalars"] = []
-            recon_carray_named_groups["passive-scalars"] = particles.carray_named_groups["passive-scalars"]
+            self.num_passive = passive.num_components
 
-            for field_name in particles.carray_named_groups["passive-scalars"]:
-                for i in range(dim):
-                    grad_name = field_name + "_" + axis[i]
-                    grad_carray_named_groups["passive-scalars"].append(grad_name)
+            recon_carray_to_register["passive-scalars"] = particles.carray_dtypes["passive-scalars"]
+            grad_carray_to_register["passive-scalars"] = "double[%d]" % (self.num_passive*dim)
 
         # store fields
         self.fields_registered = True
@@ -528,19 +631,21 @@ cdef class PieceWiseLinear(ReconstructionBase):
         self.grad = CarrayContainer(carrays_to_register=self.reconstruct_grads)
         self.grad.carray_named_groups = self.reconstruct_grad_groups
 
+        # initialize time extrapolation of particles, passive
+        # scalars are extrapolated at each face
+        self.predictor = CarrayContainer(carrays_to_register=dict(
+            (field_name, "double") for field_name in self.reconstruct_field_groups["primitive"]))
+        self.predictor.carray_named_groups = self.reconstruct_field_groups
+
         # allocate helper pointers
         dim = len(self.left_states.carray_named_groups["velocity"])
         num_fields = len(self.left_states.carray_named_groups["primitive"])
 
-        # allocate helper pointers
+        # min/max of passive scalars of particle
         if self.has_passive_scalars:
-            self.num_passive = len(self.fields_to_reconstruct_groups["passive_scalars"])
-
-            self.passive   = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-            self.passive_l = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-            self.passive_r = <np.float64_t**> stdlib.malloc(self.num_passive*sizeof(void*))
-
-            self.dpassive  = <np.float64_t**> stdlib.malloc((self.num_passive*dim)*sizeof(void*))
+            self.passive_max   = <np.float64_t*> stdlib.malloc(self.num_passive*sizeof(np.float64))
+            self.passive_min   = <np.float64_t*> stdlib.malloc(self.num_passive*sizeof(np.float64))
+            self.passive_alpha = <np.float64_t*> stdlib.malloc(self.num_passive*sizeof(np.float64))
 
         # primitive values and gradient
         self.prim_pointer = <np.float64_t**> stdlib.malloc(num_fields*sizeof(void*))
@@ -551,6 +656,7 @@ cdef class PieceWiseLinear(ReconstructionBase):
         self.primr_pointer = <np.float64_t**> stdlib.malloc(num_fields*sizeof(void*))
 
         self.grad_pointer = <np.float64_t**> stdlib.malloc((num_fields*dim)*sizeof(void*))
+        self.pred_pointer = <np.float64_t**> stdlib.malloc(num_fields*sizeof(void*))
 
         # min/max of field value of particle
         self.phi_max = <np.float64_t*> stdlib.malloc(num_fields*sizeof(np.float64))
@@ -560,9 +666,119 @@ cdef class PieceWiseLinear(ReconstructionBase):
         # difference of field value at paticle position to face position
         self.df = <np.float64_t*> stdlib.malloc((num_fields*dim)*sizeof(np.float64))
 
+        # face geometry, per face and per face of each particle
+        self.stencil_faces = CarrayContainer(carrays_to_register={
+            "area_r": "double", "sepi_ratio": "double", "sepj_ratio": "double"})
+        self.stencil_neighbors = CarrayContainer()
+
+        # vectors are stored as one block, each component contiguous
+        for group in ["cfx", "dr", "sepi", "sepj"]:
+            self.stencil_faces.register_group(0, group,
+                    [group + "-" + axis for axis in "xyz"[:dim]])
+
+        self.stencil_neighbors.register_group(0, "dfx",
+                ["dfx-" + axis for axis in "xyz"[:dim]])
+
+    cdef build_stencil(self, CarrayContainer particles, Mesh mesh):
+        """Cache the geometry of each face used by the gradients and the
+        spatial reconstruction. Nothing is done if the mesh has not been
+        rebuilt since the last call, so on a static mesh the geometry is
+        computed once.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        mesh : Mesh
+            Class that builds the domain mesh.
+
+        """
+        cdef DoubleArray face_area = mesh.faces.get_carray("area")
+        cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
+        cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
+
+        cdef np.int32_t* offsets = mesh.neighbor_offsets.get_data_ptr()
+        cdef np.int32_t* nbr_faces = mesh.neighbor_faces.get_data_ptr()
+
+        cdef DoubleArray area_r = self.stencil_faces.get_carray("area_r")
+        cdef DoubleArray sepi_ratio = self.stencil_faces.get_carray("sepi_ratio")
+        cdef DoubleArray sepj_ratio = self.stencil_faces.get_carray("sepj_ratio")
+
+        cdef int i, j, k, m, fid, dim, num_faces, num_particles
+        cdef double r, sepi_mag, sepj_mag
+        cdef np.float64_t *x[3], *dcx[3], *fij[3]
+
+        if mesh.generation == self.stencil_generation:
+            return
+
+        phdLogger.info("PieceWiseLinear: Caching face geometry")
+
+        dim = len(particles.carray_named_groups["position"])
+        num_faces = mesh.faces.get_carray_size()
+        num_particles = particles.get_carray_size()
+
+        self.stencil_faces.resize(num_faces)
+        self.stencil_neighbors.resize(offsets[num_particles])
+
+        particles.pointer_groups(x, particles.carray_named_groups["position"])
+        particles.pointer_groups(dcx, particles.carray_named_groups["dcom"])
+        mesh.faces.pointer_groups(fij, mesh.faces.carray_named_groups["com"])
+
+        self.area_r = area_r.data
+        self.sepi_ratio = sepi_ratio.data
+        self.sepj_ratio = sepj_ratio.data
+
+        self.stencil_faces.pointer_groups(self.cfx, self.stencil_faces.carray_named_groups["cfx"])
+        self.stencil_faces.pointer_groups(self.dr, self.stencil_faces.carray_named_groups["dr"])
+        self.stencil_faces.pointer_groups(self.sepi, self.stencil_faces.carray_named_groups["sepi"])
+        self.stencil_faces.pointer_groups(self.sepj, self.stencil_faces.carray_named_groups["sepj"])
+        self.stencil_neighbors.pointer_groups(self.dfx, self.stencil_neighbors.carray_named_groups["dfx"])
+
+        with nogil:
+
+            for fid in range(num_faces):
+
+                i = pair_i.data[fid]
+                j = pair_j.data[fid]
+
+                r = sepi_mag = sepj_mag = 0.0
+                for k in range(dim):
+
+                    # face center mass relative to midpoint of particles
+                    self.cfx[k][fid] = fij[k][fid] - 0.5*(x[k][i] + x[k][j])
+
+                    # separation vector of particles
+                    self.dr[k][fid] = x[k][i] - x[k][j]
+                    r += self.dr[k][fid]**2
+
+                    # distance from particle com to com of face
+                    self.sepi[k][fid] = fij[k][fid] - (x[k][i] + dcx[k][i])
+                    self.sepj[k][fid] = fij[k][fid] - (x[k][j] + dcx[k][j])
+
+                    sepi_mag += self.sepi[k][fid]**2
+                    sepj_mag += self.sepj[k][fid]**2
+
+                r = sqrt(r)
+                self.area_r[fid] = face_area.data[fid]/r
+                self.sepi_ratio[fid] = sqrt(sepi_mag)/r
+                self.sepj_ratio[fid] = sqrt(sepj_mag)/r
+
+            # face com relative to particle com for the limiter
+            for i in range(num_particles):
+                for m in range(offsets[i], offsets[i+1]):
+                    fid = nbr_faces[m]
+                    for k in range(dim):
+                        self.dfx[k][m] = fij[k][fid] - (x[k][i] + dcx[k][i])
+
+        self.stencil_generation = mesh.generation
+        self.num_stencil_builds += 1
+
     cpdef compute_gradients(self, CarrayContainer particles, Mesh mesh,
                             DomainManager domain_manager):
-        """Compute gradients for each primitive variable.
+        """Compute gradients for each primitive variable. Each face is
+        visited once and adds its contribution to both particles, the
+        gradients are then normalized and limited particle by particle.
 
         Parameters
         ----------
@@ -577,19 +793,20 @@ cdef class PieceWiseLinear(ReconstructionBase):
         cdef DoubleArray vol = particles.get_carray("volume")
 
         # face information
-        cdef DoubleArray face_area = mesh.faces.get_carray("area")
         cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
         cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
 
-        cdef int dim, num_fields
+        # face adjacency of particles
+        cdef np.int32_t* offsets = mesh.neighbor_offsets.get_data_ptr()
+        cdef np.int32_t* nbr_ids = mesh.neighbor_ids.get_data_ptr()
+
+        cdef int dim, num_fields, num_faces, num_particles
         cdef int limiter = self.slope_limiter
 
         cdef int i, j, k, n, m, fid
-        cdef double dph, psi, d_dif, d_sum
-
-        cdef double *x[3], *dcx[3]
-        cdef double cfx[3], *fij[3], area
-        cdef double xi[3], xj[3], dr[3], cx[3], r, _vol
+        cdef bint real_i, real_j
+        cdef double dphi, psi, d_dif, d_sum, w
+        cdef double area_r, _vol
 
         cdef np.float64_t** prim = self.prim_pointer
         cdef np.float64_t** grad = self.grad_pointer
@@ -597,101 +814,91 @@ cdef class PieceWiseLinear(ReconstructionBase):
         cdef np.float64_t* phi_max = self.phi_max
         cdef np.float64_t* phi_min = self.phi_min
         cdef np.float64_t* alpha   = self.alpha
-        cdef np.float64_t* df      = self.df
+
+        cdef np.float64_t **cfx, **dr, **dfx
 
         phdLogger.info("PieceWiseLinear: Starting gradient cacluation")
-        self.grad.resize(particles.get_carray_size())
+
+        # cached face geometry
+        self.build_stencil(particles, mesh)
+        cfx = self.cfx; dr = self.dr; dfx = self.dfx
+
+        num_particles = particles.get_carray_size()
+        num_faces = mesh.faces.get_carray_size()
+        self.grad.resize(num_particles)
 
         dim = len(particles.carray_named_groups["position"])
         num_fields = len(particles.carray_named_groups["primitive"])
 
-        # pointer to particle information
-        particles.pointer_groups(x, particles.carray_named_groups["position"])
-        particles.pointer_groups(dcx, particles.carray_named_groups["dcom"])
+        # pointer to particle primitive values
         particles.pointer_groups(prim, particles.carray_named_groups["primitive"])
 
-        # pointer to face center of mass
-        mesh.faces.pointer_groups(fij, mesh.faces.carray_named_groups["com"])
-
         # pointer to primitive gradients with dimension stacked
         self.grad.pointer_groups(grad, self.grad.carray_named_groups["primitive"])
 
-        # calculate gradients
-        for i in range(particles.get_carray_size()):
-            if tags.data[i] == REAL:
+        with nogil:
 
-                # store particle position
-                for k in range(dim):
-                    xi[k] = x[k][i]
-                    cx[k] = xi[k] + dcx[k][i]
-                _vol = vol.data[i]
+            # zero out gradients
+            for n in range(num_fields*dim):
+                for i in range(num_particles):
+                    grad[n][i] = 0.
 
-                for n in range(num_fields):
+            # first pass: each face adds its contribution to both particles
+            for fid in range(num_faces):
 
-                    # set min/max primitive values
-                    phi_max[n] = phi_min[n] = prim[n][i]
-                    alpha[n]   = 1.0
+                i = pair_i.data[fid]
+                j = pair_j.data[fid]
 
-                    # zero out gradients
-                    for k in range(dim):
-                        df[dim*n+k] = 0
+                real_i = tags.data[i] == REAL
+                real_j = tags.data[j] == REAL
 
-                # loop over faces of particle
-                for m in range(mesh.neighbors[i].size()):
+                area_r = self.area_r[fid]
 
-                    # index of face neighbor
-                    fid = mesh.neighbors[i][m]
-                    area = face_area.data[fid]
+                # gradient estimate Eq. 21, contribution to particle j
+                # has opposite sign, volume is divided out in the limiter
+                for n in range(num_fields):
 
-                    # extract neighbor from face
-                    if i == pair_i.data[fid]:
-                        j = pair_j.data[fid]
-                    elif i == pair_j.data[fid]:
-                        j = pair_i.data[fid]
-                    else:
-                        raise RuntimeError("ERROR: incorrect neighbors!")
+                    d_dif = prim[n][j] - prim[n][i]
+                    d_sum = prim[n][j] + prim[n][i]
 
-                    r = 0.0
                     for k in range(dim):
+                        w = area_r*(d_dif*cfx[k][fid] - 0.5*d_sum*dr[k][fid])
+                        if real_i:
+                            grad[dim*n+k][i] += w
+                        if real_j:
+                            grad[dim*n+k][j] -= w
 
-                        # neighbor position
-                        xj[k] = x[k][j]
+            # second pass: normalize and limit gradients of each particle
+            for i in range(num_particles):
+                if tags.data[i] != REAL:
+                    continue
 
-                        # face center mass relative to midpoint of particles
-                        cfx[k] = fij[k][fid] - 0.5*(xi[k] + xj[k])
+                _vol = vol.data[i]
+                for n in range(num_fields):
 
-                        # separation vector of particles
-                        dr[k] = xi[k] - xj[k]
-                        r += dr[k]**2
+                    # set min/max primitive values
+                    phi_max[n] = phi_min[n] = prim[n][i]
+                    alpha[n]   = 1.0
 
-                    r = sqrt(r)
+                    for k in range(dim):
+                        grad[dim*n+k][i] /= _vol
 
-                    # extrapolate each field to face
+                # add neighbor values to max and min
+                for m in range(offsets[i], offsets[i+1]):
+                    j = nbr_ids[m]
                     for n in range(num_fields):
-
-                        # add neighbor values to max and min
                         phi_max[n] = fmax(phi_max[n], prim[n][j])
                         phi_min[n] = fmin(phi_min[n], prim[n][j])
 
-                        d_dif = prim[n][j] - prim[n][i]
-                        d_sum = prim[n][j] + prim[n][i]
-
-                        # gradient estimate Eq. 21
-                        for k in range(dim):
-                            df[dim*n+k] += area*(d_dif*cfx[k] - 0.5*d_sum*dr[k])/(r*_vol)
-
                 if limiter == 0: # AREPO limiter
 
                     # limit gradients Eq. 30
                     for n in range(num_fields):
-                        for m in range(mesh.neighbors[i].size()):
-
-                            # index of face neighbor
-                            fid = mesh.neighbors[i][m]
+                        for m in range(offsets[i], offsets[i+1]):
 
                             dphi = 0
                             for k in range(dim):
-                                dphi += df[dim*n+k]*(fij[k][fid] - cx[k])
+                                dphi += grad[dim*n+k][i]*dfx[k][m]
 
                             if dphi > 0:
                                 psi = (phi_max[n] - prim[n][i])/dphi
@@ -706,44 +913,41 @@ cdef class PieceWiseLinear(ReconstructionBase):
 
                     # limit gradients Eq. 22
                     for n in range(num_fields):
-                        for m in range(mesh.neighbors[i].size()):
+                        for m in range(offsets[i], offsets[i+1]):
 
-                            # index of face neighbor
-                            fid = mesh.neighbors[i][m]
-                            # extract neighbor from face
-
-                            if i == pair_i.data[fid]:
-                                j = pair_j.data[fid]
-                            elif i == pair_j.data[fid]:
-                                j = pair_i.data[fid]
+                            # index of neighbor
+                            j = nbr_ids[m]
 
                             dphi = 0
                             for k in range(dim):
-                                dphi += df[dim*n+k]*(fij[k][fid] - cx[k])
+                                dphi += grad[dim*n+k][i]*dfx[k][m]
 
                             if dphi > 0.0:
-                                psi = max((prim[n][j] - prim[n][i])/dphi, 0.)
+                                psi = fmax((prim[n][j] - prim[n][i])/dphi, 0.)
                             elif dphi < 0.0:
-                                psi = max((prim[n][j] - prim[n][i])/dphi, 0.)
+                                psi = fmax((prim[n][j] - prim[n][i])/dphi, 0.)
                             else:
                                 psi = 1.0
 
                             alpha[0] = fmin(alpha[0], fmax(psi, 0.))
 
-                # store the gradients
+                # store the limited gradients
                 for n in range(num_fields):
                     for k in range(dim):
-                        grad[dim*n+k][i] = alpha[n]*df[dim*n+k]
+                        grad[dim*n+k][i] *= alpha[n]
+
+        if self.has_passive_scalars:
+            self.compute_passive_gradients(particles, mesh)
 
         # transfer gradients to ghost particles
         domain_manager.update_ghost_gradients(particles, self.grad)
 
-    cpdef add_spatial(self, CarrayContainer particles, Mesh mesh,
-                         double gamma, DomainManager domain_manager,
-                         double dt, bint boost):
-        """Perform reconstruction from cell center to face center.
-        This follows the method outlined by Springel (2009) and all equations
-        referenced are from that paper.
+    cdef compute_passive_gradients(self, CarrayContainer particles, Mesh mesh):
+        """Compute limited gradients of the passive scalars, same as
+        the primitive gradients. The species of a particle are contiguous
+        and so are their gradients, each face and neighbor updates all
+        species in one inner loop. Has to be called after the face
+        geometry is cached.
 
         Parameters
         ----------
@@ -753,177 +957,486 @@ cdef class PieceWiseLinear(ReconstructionBase):
         mesh : Mesh
             Class that builds the domain mesh.
 
-        boost : bool
-            Solve equations in moving reference frame.
+        """
+        # particle information
+        cdef IntArray tags = particles.get_carray("tag")
+        cdef DoubleArray vol = particles.get_carray("volume")
+        cdef DoubleBlockArray passive = particles.get_carray("passive-scalars")
+        cdef DoubleBlockArray dpassive = self.grad.get_carray("passive-scalars")
 
-        domain_manager : DomainManager
-            Class that handels all things related with the domain.
+        # face information
+        cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
+        cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
+
+        # face adjacency of particles
+        cdef np.int32_t* offsets = mesh.neighbor_offsets.get_data_ptr()
+        cdef np.int32_t* nbr_ids = mesh.neighbor_ids.get_data_ptr()
+
+        cdef int i, j, k, n, m, fid
+        cdef int dim, num_faces, num_particles
+        cdef int num_passive = self.num_passive
+        cdef int limiter = self.slope_limiter
+
+        cdef bint real_i, real_j
+        cdef double dphi, psi, d_dif, d_sum, w
+        cdef double area_r, _vol
+
+        cdef np.float64_t *ps_i, *ps_j, *grad_i, *grad_j
+        cdef np.float64_t* ps = passive.data
+        cdef np.float64_t* grad = dpassive.data
+
+        cdef np.float64_t* phi_max = self.passive_max
+        cdef np.float64_t* phi_min = self.passive_min
+        cdef np.float64_t* alpha   = self.passive_alpha
+
+        cdef np.float64_t **cfx = self.cfx, **dr = self.dr, **dfx = self.dfx
+
+        dim = len(particles.carray_named_groups["position"])
+        num_particles = particles.get_carray_size()
+        num_faces = mesh.faces.get_carray_size()
+
+        with nogil:
+
+            # zero out gradients
+            for n in range(num_particles*num_passive*dim):
+                grad[n] = 0.
+
+            # first pass: each face adds its contribution to both particles
+            for fid in range(num_faces):
+
+                i = pair_i.data[fid]
+                j = pair_j.data[fid]
+
+                real_i = tags.data[i] == REAL
+                real_j = tags.data[j] == REAL
+
+                area_r = self.area_r[fid]
+
+                ps_i = ps + i*num_passive
+                ps_j = ps + j*num_passive
+                grad_i = grad + i*num_passive*dim
+                grad_j = grad + j*num_passive*dim
+
+                for n in range(num_passive):
+
+                    d_dif = ps_j[n] - ps_i[n]
+                    d_sum = ps_j[n] + ps_i[n]
+
+                    for k in range(dim):
+                        w = area_r*(d_dif*cfx[k][fid] - 0.5*d_sum*dr[k][fid])
+                        if real_i:
+                            grad_i[n*dim+k] += w
+                        if real_j:
+                            grad_j[n*dim+k] -= w
+
+            # second pass: normalize and limit gradients of each particle
+            for i in range(num_particles):
+                if tags.data[i] != REAL:
+                    continue
+
+                ps_i = ps + i*num_passive
+                grad_i = grad + i*num_passive*dim
+
+                _vol = vol.data[i]
+                for n in range(num_passive*dim):
+                    grad_i[n] /= _vol
+
+                # set min/max passive values
+                for n in range(num_passive):
+                    phi_max[n] = phi_min[n] = ps_i[n]
+                    alpha[n]   = 1.0
+
+                # add neighbor values to max and min
+                for m in range(offsets[i], offsets[i+1]):
+                    ps_j = ps + nbr_ids[m]*num_passive
+                    for n in range(num_passive):
+                        phi_max[n] = fmax(phi_max[n], ps_j[n])
+                        phi_min[n] = fmin(phi_min[n], ps_j[n])
+
+                # limit gradients, AREPO Eq. 30 or TESS Eq. 22
+                for m in range(offsets[i], offsets[i+1]):
+                    ps_j = ps + nbr_ids[m]*num_passive
+                    for n in range(num_passive):
+
+                        dphi = 0
+                        for k in range(dim):
+                            dphi += grad_i[n*dim+k]*dfx[k][m]
+
+                        if dphi == 0.:
+                            psi = 1.0
+                        elif limiter == 1:
+                            psi = (ps_j[n] - ps_i[n])/dphi
+                        elif dphi > 0:
+                            psi = (phi_max[n] - ps_i[n])/dphi
+                        else:
+                            psi = (phi_min[n] - ps_i[n])/dphi
+
+                        alpha[n] = fmin(alpha[n], fmax(psi, 0.))
+
+                # store the limited gradients
+                for n in range(num_passive):
+                    for k in range(dim):
+                        grad_i[n*dim+k] *= alpha[n]
+
+    cdef prepare_faces(self, CarrayContainer particles, Mesh mesh,
+                       double gamma, double dt, bint boost):
+        """Store pointers and parameters used by the face kernels and
+        compute the time extrapolation of each particle.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        mesh : Mesh
+            Class that builds the domain mesh.
+
+        gamma : double
+            Ratio of specific heats.
 
         dt : float
             Time to extrapolate reconstructed fields to.
+
+        boost : bool
+            Solve equations in moving reference frame.
+
         """
-        cdef int i, j, k, m, n, dim, num_fields
+        self.set_face_pointers(particles, mesh, gamma, dt, boost)
+        self.compute_predictor(particles)
 
-        # gizmo limiter parameters
-        cdef double psi1 = 0.5, psi2 = 0.25
-        cdef double delta1, delta2
-        cdef double phi_min, phi_max
-        cdef double phibar_l, phibar_r
-        cdef double phi_minus, phi_plus
+    cdef set_face_pointers(self, CarrayContainer particles, Mesh mesh,
+                           double gamma, double dt, bint boost):
+        """Store pointers and parameters used by the face kernels.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
 
-        cdef double sepi, sepj
-        cdef double sepi_mag, sepj_mag, diff_mag
+        mesh : Mesh
+            Class that builds the domain mesh.
 
-        cdef np.float64_t *vl[3], *vr[3]
-        cdef np.float64_t *fij[3], *wx[3]
-        cdef np.float64_t *x[3], *v[3], *dcx[3]
+        gamma : double
+            Ratio of specific heats.
 
+        dt : float
+            Time to extrapolate reconstructed fields to.
+
+        boost : bool
+            Solve equations in moving reference frame.
+
+        """
         cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
         cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
+        cdef DoubleBlockArray passive, dpassive
 
-        # left state primitive variables
-        cdef DoubleArray dl = self.left_states.get_carray("density")
-        cdef DoubleArray pl = self.left_states.get_carray("pressure")
+        self.face_dim = len(particles.carray_named_groups["position"])
+        self.face_num_fields = len(particles.carray_named_groups["primitive"])
 
-        # right state primitive variables
-        cdef DoubleArray dr = self.right_states.get_carray("density")
-        cdef DoubleArray pr = self.right_states.get_carray("pressure")
+        self.face_gamma = gamma
+        self.face_dt = dt
+        self.face_boost = boost
 
-        cdef np.float64_t** prim = self.prim_pointer
-        cdef np.float64_t** prim_l = self.priml_pointer
-        cdef np.float64_t** prim_r = self.primr_pointer
+        # particles that make up each face
+        self.face_pair_i = pair_i.data
+        self.face_pair_j = pair_j.data
 
-        cdef np.float64_t* state_l = self.state_l
-        cdef np.float64_t* state_r = self.state_r
+        # pointers to particle primitive, position, com, and velocity
+        particles.pointer_groups(self.prim_pointer, particles.carray_named_groups["primitive"])
+        particles.pointer_groups(self.x, particles.carray_named_groups["position"])
+        particles.pointer_groups(self.dcx, particles.carray_named_groups["dcom"])
+        particles.pointer_groups(self.v, particles.carray_named_groups["velocity"])
 
-        cdef np.float64_t** grad = self.grad_pointer
+        # pointers to face velocity and center of mass 
+        mesh.faces.pointer_groups(self.fij, mesh.faces.carray_named_groups["com"])
+        mesh.faces.pointer_groups(self.wx, mesh.faces.carray_named_groups["velocity"])
 
-        phdLogger.info("PieceWiseLinear: Starting spatial reconstruction")
+        # pointers to primitive gradients with dimension stacked
+        self.grad.pointer_groups(self.grad_pointer, self.grad.carray_named_groups["primitive"])
 
-        dim = len(particles.carray_named_groups["position"])
-        num_fields = len(particles.carray_named_groups["primitive"])
+        # passive scalars and their gradients
+        if self.has_passive_scalars:
+            passive = particles.get_carray("passive-scalars")
+            dpassive = self.grad.get_carray("passive-scalars")
+            self.passive = passive.data
+            self.dpassive = dpassive.data
+
+        # cached face geometry
+        self.build_stencil(particles, mesh)
+
+    cdef compute_predictor(self, CarrayContainer particles):
+        """Compute the change of the primitive fields of each particle,
+        real and ghost, over the extrapolation time in the lab frame. The
+        time derivatives follow Springel (2009) Eq. 37 and only depend on
+        the particle so they are computed once instead of for every
+        face. Ghost particles use their transferred gradients. Has to be
+        called after set_face_pointers.
 
-        # resize states to hold values at each face
-        self.left_states.resize(mesh.faces.get_carray_size())
-        self.right_states.resize(mesh.faces.get_carray_size())
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
 
-        # pointers left/right primitive values
-        self.left_states.pointer_groups(prim_l, self.left_states.carray_named_groups["primitive"])
-        self.right_states.pointer_groups(prim_r, self.right_states.carray_named_groups["primitive"])
+        """
+        cdef int i, k, n
+        cdef int dim = self.face_dim
+        cdef int num_particles = particles.get_carray_size()
 
-        # pointers to particle primitive, position, com, and velocity
-        particles.pointer_groups(prim, particles.carray_named_groups["primitive"])
-        particles.pointer_groups(x, particles.carray_named_groups["position"])
-        particles.pointer_groups(dcx, particles.carray_named_groups["dcom"])
-        particles.pointer_groups(v, particles.carray_named_groups["velocity"])
+        cdef double div_v, dt = self.face_dt, gamma = self.face_gamma
 
-        # pointers to left/right velocities at face
-        self.left_states.pointer_groups(vl, self.left_states.carray_named_groups["velocity"])
-        self.right_states.pointer_groups(vr, self.right_states.carray_named_groups["velocity"])
+        cdef np.float64_t** prim = self.prim_pointer
+        cdef np.float64_t** grad = self.grad_pointer
+        cdef np.float64_t** dprim = self.pred_pointer
 
-        # pointers to face velocity and center of mass 
-        mesh.faces.pointer_groups(fij, mesh.faces.carray_named_groups["com"])
-        mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
+        self.predictor.resize(num_particles)
+        self.predictor.pointer_groups(dprim, self.predictor.carray_named_groups["primitive"])
 
-        # pointers to primitive gradients
-        self.grad.pointer_groups(grad, self.grad.carray_named_groups["primitive"])
+        # density, velocity and pressure gradients are stacked in
+        # primitive order: grad[k] density, grad[(1+n)*dim+k] velocity
+        # component n and grad[(dim+1)*dim+k] pressure
+        with nogil:
+            for i in range(num_particles):
 
-        # create left/right states for each face
-        for m in range(mesh.faces.get_carray_size()):
+                # the trace of dv is div of velocity
+                div_v = 0.
+                for k in range(dim):
+                    div_v += grad[(1+k)*dim+k][i]
 
-            # particles that make up the face
-            i = pair_i.data[m]
-            j = pair_j.data[m]
+                dprim[0][i] = -dt*prim[0][i]*div_v
+                dprim[dim+1][i] = -dt*gamma*prim[dim+1][i]*div_v
+                for n in range(dim):
+                    dprim[1+n][i] = -dt*grad[(dim+1)*dim+n][i]/prim[0][i]
 
-            # copy constant states
+                # advection of each field
+                for k in range(dim):
+                    dprim[0][i] -= dt*prim[1+k][i]*grad[k][i]
+                    dprim[dim+1][i] -= dt*prim[1+k][i]*grad[(dim+1)*dim+k][i]
+                    for n in range(dim):
+                        dprim[1+n][i] -= dt*prim[1+k][i]*grad[(1+n)*dim+k][i]
+
+    cdef void spatial_face(self, int m, int s, np.float64_t **prim_l,
+                           np.float64_t **prim_r) nogil:
+        """Extrapolate primitive values of the particles of face m to the
+        face center of mass. The states are stored at index s of prim_l
+        and prim_r, which follow the order of the primitive group. This
+        follows the method outlined by Springel (2009) and all equations
+        referenced are from that paper.
+        """
+        cdef int i, j, k, n
+        cdef int dim = self.face_dim
+        cdef int num_fields = self.face_num_fields
+
+        # gizmo limiter parameters
+        cdef double psi1 = 0.5, psi2 = 0.25
+        cdef double delta1, delta2
+        cdef double phi_min, phi_max
+        cdef double phibar_l, phibar_r
+        cdef double phi_minus, phi_plus
+
+        cdef double sepi_ratio, sepj_ratio
+
+        cdef np.float64_t** prim = self.prim_pointer
+        cdef np.float64_t** grad = self.grad_pointer
+
+        cdef np.float64_t* state_l = self.state_l
+        cdef np.float64_t* state_r = self.state_r
+
+        # particles that make up the face
+        i = self.face_pair_i[m]
+        j = self.face_pair_j[m]
+
+        # copy constant states
+        for n in range(num_fields):
+            prim_l[n][s] = prim[n][i]
+            prim_r[n][s] = prim[n][j]
+
+        # update because of boost, velocity follows density
+        for k in range(dim):
+            if self.face_boost:
+                prim_l[1+k][s] = self.v[k][i] - self.wx[k][m]
+                prim_r[1+k][s] = self.v[k][j] - self.wx[k][m]
+
+        # copy constant states
+        for n in range(num_fields):
+            state_l[n] = prim_l[n][s]
+            state_r[n] = prim_r[n][s]
+
+        # add spatial derivatives Eq. 27, distance from particle
+        # to com of face is cached
+        for k in range(dim):
             for n in range(num_fields):
-                prim_l[n][m] = prim[n][i]
-                prim_r[n][m] = prim[n][j]
+                prim_l[n][s] += grad[n*dim+k][i]*self.sepi[k][m]
+                prim_r[n][s] += grad[n*dim+k][j]*self.sepj[k][m]
 
-            # update because of boost
-            for k in range(dim):
-                if boost:
-                    vl[k][m] = v[k][i] - wx[k][m]
-                    vr[k][m] = v[k][j] - wx[k][m]
+        # distance to face relative to particle separation
+        sepi_ratio = self.sepi_ratio[m]
+        sepj_ratio = self.sepj_ratio[m]
+
+        # gizmo limiter: appendix B4
+        if self.gizmo_limiter:
 
-            # copy constant states
+            # limit each field pairwise
             for n in range(num_fields):
-                state_l[n] = prim_l[n][m]
-                state_r[n] = prim_r[n][m]
 
-            diff_mag = 0.0
-            sepi_mag = sepj_mag = 0.0 
+                delta1 = psi1*fabs(state_l[n] - state_r[n])
+                delta2 = psi2*fabs(state_l[n] - state_r[n])
 
-            # add spatial derivatives Eq. 27
-            for k in range(dim):
+                phi_min = fmin(state_l[n], state_r[n])
+                phi_max = fmax(state_l[n], state_r[n])
 
-                # distance from particle to com of face
-                sepi = fij[k][m] - (x[k][i] + dcx[k][i])
-                sepj = fij[k][m] - (x[k][j] + dcx[k][j])
+                phibar_l = state_l[n] + sepi_ratio*(state_r[n] - state_l[n])
+                phibar_r = state_r[n] + sepj_ratio*(state_l[n] - state_r[n])
 
-                sepi_mag += sepi*sepi
-                sepj_mag += sepj*sepj
-                diff_mag += (x[k][j] - x[k][i])**2
+                if ((phi_max + delta1)*phi_max >= 0.):
+                    phi_plus = phi_max + delta1
+                else:
+                    phi_plus = phi_max/(1 + delta1/fabs(phi_max))
 
-                # extraploate to face
-                for n in range(num_fields):
-                    prim_l[n][m] += grad[n*dim+k][i]*sepi
-                    prim_r[n][m] += grad[n*dim+k][j]*sepj
+                if ((phi_min - delta1)*phi_min >= 0.):
+                    phi_minus = phi_min - delta1
+                else:
+                    phi_minus = phi_min/(1 + delta1/fabs(phi_min))
 
-            sepi_mag = sqrt(sepi_mag)
-            sepj_mag = sqrt(sepj_mag)
-            diff_mag = sqrt(diff_mag)
+                if prim[n][i] < prim[n][j]:
+                    prim_l[n][s] = fmax(phi_minus, fmin(phibar_l+delta2, prim_l[n][s]))
+                    prim_r[n][s] = fmin(phi_plus,  fmax(phibar_r-delta2, prim_r[n][s]))
 
-            # gizmo limiter: appendix B4
-            if self.gizmo_limiter:
+                elif prim[n][i] > prim[n][j]:
+                    prim_l[n][s] = fmin(phi_plus,  fmax(phibar_l-delta2, prim_l[n][s]))
+                    prim_r[n][s] = fmax(phi_minus, fmin(phibar_r+delta2, prim_r[n][s]))
 
-                # limit each field pairwise
+                else:
+                    prim_l[n][s] = state_l[n]
+                    prim_r[n][s] = state_r[n]
+
+            # if negative reduce to constant reconstruction
+            if prim_l[0][s] < 0.0 or prim_l[dim+1][s] < 0.0:
                 for n in range(num_fields):
+                    prim_l[n][s] = state_l[n]
 
-                    delta1 = psi1*fabs(state_l[n] - state_r[n])
-                    delta2 = psi2*fabs(state_l[n] - state_r[n])
+            if prim_r[0][s] < 0.0 or prim_r[dim+1][s] < 0.0:
+                for n in range(num_fields):
+                    prim_r[n][s] = state_r[n]
+
+    cdef void temporal_face(self, int m, int s, np.float64_t **prim_l,
+                            np.float64_t **prim_r) nogil:
+        """Add the time extrapolation of the particles of face m to the
+        states stored at index s of prim_l and prim_r. The change of
+        each particle is taken from the predictor, in the moving frame
+        the advection by the face velocity is added. This follows the
+        method outlined by Springel (2009) and all equations referenced
+        are from that paper.
+        """
+        cdef int i, j, k, n
+        cdef int dim = self.face_dim
+        cdef int num_fields = self.face_num_fields
 
-                    phi_min = fmin(state_l[n], state_r[n])
-                    phi_max = fmax(state_l[n], state_r[n])
+        cdef double w, dt = self.face_dt
 
-                    phibar_l = state_l[n] + sepi_mag/diff_mag*(state_r[n] - state_l[n])
-                    phibar_r = state_r[n] + sepj_mag/diff_mag*(state_l[n] - state_r[n])
+        cdef np.float64_t** grad = self.grad_pointer
+        cdef np.float64_t** dprim = self.pred_pointer
 
-                    if ((phi_max + delta1)*phi_max >= 0.):
-                        phi_plus = phi_max + delta1
-                    else:
-                        phi_plus = phi_max/(1 + delta1/fabs(phi_max))
+        cdef np.float64_t* state_l = self.state_l
+        cdef np.float64_t* state_r = self.state_r
 
-                    if ((phi_min - delta1)*phi_min >= 0.):
-                        phi_minus = phi_min - delta1
-                    else:
-                        phi_minus = phi_min/(1 + delta1/fabs(phi_min))
+        # particles that make up the face
+        i = self.face_pair_i[m]
+        j = self.face_pair_j[m]
 
-                    if prim[n][i] < prim[n][j]:
-                        prim_l[n][m] = fmax(phi_minus, fmin(phibar_l+delta2, prim_l[n][m]))
-                        prim_r[n][m] = fmin(phi_plus,  fmax(phibar_r-delta2, prim_r[n][m]))
+        # copy states before time derivatives
+        for n in range(num_fields):
+            state_l[n] = prim_l[n][s]
+            state_r[n] = prim_r[n][s]
 
-                    elif prim[n][i] > prim[n][j]:
-                        prim_l[n][m] = fmin(phi_plus,  fmax(phibar_l-delta2, prim_l[n][m]))
-                        prim_r[n][m] = fmax(phi_minus, fmin(phibar_r+delta2, prim_r[n][m]))
+        # time extrapolation in lab frame (Eq. 37)
+        for n in range(num_fields):
+            prim_l[n][s] += dprim[n][i]
+            prim_r[n][s] += dprim[n][j]
 
-                    else:
-                        prim_l[n][m] = state_l[n]
-                        prim_r[n][m] = state_r[n]
+        # particle velocity relative to face changes advection
+        if self.face_boost:
+            for k in range(dim):
+                w = dt*self.wx[k][m]
+                for n in range(num_fields):
+                    prim_l[n][s] += w*grad[n*dim+k][i]
+                    prim_r[n][s] += w*grad[n*dim+k][j]
 
-                # if negative reduce to constant reconstruction
-                if dl.data[m] < 0.0 or pl.data[m] < 0.0:
-                    for n in range(num_fields):
-                        prim_l[n][m] = state_l[n]
+        # if negative remove time derivative 
+        if prim_l[0][s] < 0.0 or prim_l[dim+1][s] < 0.0:
+            for n in range(num_fields):
+                prim_l[n][s] = state_l[n]
 
-                if dr.data[m] < 0.0 or pr.data[m] < 0.0:
-                    for n in range(num_fields):
-                        prim_r[n][m] = state_r[n]
+        if prim_r[0][s] < 0.0 or prim_r[dim+1][s] < 0.0:
+            for n in range(num_fields):
+                prim_r[n][s] = state_r[n]
+
+    cdef void passive_face(self, int m, np.float64_t *passive_l,
+                           np.float64_t *passive_r, bint spatial, double dt) nogil:
+        """Extrapolate passive scalars of the particles of face m to the
+        face and store them at face m of passive_l and passive_r. Passive
+        scalars are advected with the fluid, dX/dt = -v.grad(X), so the
+        spatial and temporal extrapolation are one displacement per
+        particle applied to all species. If spatial is False the time
+        extrapolation is added to the stored states.
+        """
+        cdef int i, j, k, n
+        cdef int dim = self.face_dim
+        cdef int num_passive = self.num_passive
+        cdef double di[3], dj[3]
+
+        cdef np.float64_t* ps_i
+        cdef np.float64_t* ps_j
+        cdef np.float64_t* grad_i
+        cdef np.float64_t* grad_j
+        cdef np.float64_t* psl = passive_l + m*num_passive
+        cdef np.float64_t* psr = passive_r + m*num_passive
+
+        # particles that make up the face
+        i = self.face_pair_i[m]
+        j = self.face_pair_j[m]
+
+        ps_i = self.passive + i*num_passive
+        ps_j = self.passive + j*num_passive
+        grad_i = self.dpassive + i*num_passive*dim
+        grad_j = self.dpassive + j*num_passive*dim
+
+        # displacement from particle, advection is relative to the face
+        for k in range(dim):
+            di[k] = -dt*self.v[k][i]
+            dj[k] = -dt*self.v[k][j]
+            if self.face_boost:
+                di[k] += dt*self.wx[k][m]
+                dj[k] += dt*self.wx[k][m]
+
+            # distance from particle com to com of face
+            if spatial:
+                di[k] += self.sepi[k][m]
+                dj[k] += self.sepj[k][m]
+
+        # copy constant states
+        if spatial:
+            for n in range(num_passive):
+                psl[n] = ps_i[n]
+                psr[n] = ps_j[n]
+
+        for n in range(num_passive):
+            for k in range(dim):
+                psl[n] += grad_i[n*dim+k]*di[k]
+                psr[n] += grad_j[n*dim+k]*dj[k]
+
+    cdef void face_states(self, int m, np.float64_t **prim_l,
+                          np.float64_t **prim_r) nogil:
+        """Reconstruct left and right states of face m and store them
+        at index 0 of prim_l and prim_r. Same as compute_states for a
+        single face.
+        """
+        self.spatial_face(m, 0, prim_l, prim_r)
+        self.temporal_face(m, 0, prim_l, prim_r)
 
-    cpdef add_temporal(self, CarrayContainer particles, Mesh mesh,
+    cpdef add_spatial(self, CarrayContainer particles, Mesh mesh,
                          double gamma, DomainManager domain_manager,
                          double dt, bint boost):
-        """Perform temporal reconstruction from cell center to face center.
+        """Perform reconstruction from cell center to face center.
         This follows the method outlined by Springel (2009) and all equations
         referenced are from that paper.
 
@@ -944,132 +1457,79 @@ cdef class PieceWiseLinear(ReconstructionBase):
         dt : float
             Time to extrapolate reconstructed fields to.
         """
-        cdef int i, j, k, m, n, dim, num_passive, num_fields
-
-        cdef np.float64_t vi[3], vj[3]
-        cdef np.float64_t *v[3], *wx[3]
-        cdef np.float64_t *vl[3], *vr[3]
-        cdef np.float64_t *dd[3], *dv[9], *dp[3]
-
-        cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
-        cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
-
-        # particle primitive variables
-        cdef DoubleArray d = particles.get_carray("density")
-        cdef DoubleArray p = particles.get_carray("pressure")
-
-        # left state primitive variables
-        cdef DoubleArray dl = self.left_states.get_carray("density")
-        cdef DoubleArray pl = self.left_states.get_carray("pressure")
-
-        # right state primitive variables
-        cdef DoubleArray dr = self.right_states.get_carray("density")
-        cdef DoubleArray pr = self.right_states.get_carray("pressure")
-
-        cdef np.float64_t* state_l = self.state_l
-        cdef np.float64_t* state_r = self.state_r
-
+        cdef int m
+        cdef DoubleBlockArray psl, psr
         cdef np.float64_t** prim_l = self.priml_pointer
         cdef np.float64_t** prim_r = self.primr_pointer
 
-        phdLogger.info("PieceWiseLinear: Starting temporal reconstruction")
-
-        dim = len(particles.carray_named_groups["position"])
-        num_fields = len(particles.carray_named_groups["primitive"])
+        phdLogger.info("PieceWiseLinear: Starting spatial reconstruction")
 
-        # extract pointers
-        particles.pointer_groups(v, particles.carray_named_groups["velocity"])
+        # resize states to hold values at each face
+        self.left_states.resize(mesh.faces.get_carray_size())
+        self.right_states.resize(mesh.faces.get_carray_size())
 
         # pointers left/right primitive values
         self.left_states.pointer_groups(prim_l, self.left_states.carray_named_groups["primitive"])
         self.right_states.pointer_groups(prim_r, self.right_states.carray_named_groups["primitive"])
 
-        # pointers to velocity states
-        self.left_states.pointer_groups(vl, self.left_states.carray_named_groups["velocity"])
-        self.right_states.pointer_groups(vr, self.right_states.carray_named_groups["velocity"])
-
-        # pointers to face velocity and center of mass 
-        mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
-
-        # pointers to gradients
-        self.grad.pointer_groups(dd, self.grad.carray_named_groups["density"])
-        self.grad.pointer_groups(dv, self.grad.carray_named_groups["velocity"])
-        self.grad.pointer_groups(dp, self.grad.carray_named_groups["pressure"])
-
-        if self.has_passive_scalars:
-
-            num_passive = self.num_passive
-            particles.pointer_groups(self.passive, particles.carray_named_groups["passive-scalars"])
-
-            # pointer to passive left/right states
-            self.left_states.pointer_groups(self.passive_l, self.carray_named_groups["passive-scalars"])
-            self.right_states.pointer_groups(self.passive_r, self.carray_named_groups["passive-scalars"])
-
-            # pointer to gradients of passive scalars
-            self.grad.pointer_groups(self.dpassive, self.reconstruct_grad_groups["passive-scalars"])
+        self.set_face_pointers(particles, mesh, gamma, dt, boost)
 
         # create left/right states for each face
         for m in range(mesh.faces.get_carray_size()):
+            self.spatial_face(m, m, prim_l, prim_r)
 
-            # particles that make up the face
-            i = pair_i.data[m]
-            j = pair_j.data[m]
-
-            # copy states before time derivatives
-            for n in range(num_fields):
-                state_l[n] = prim_l[n][m]
-                state_r[n] = prim_r[n][m]
-
-            # velocity
-            for k in range(dim):
+        if self.has_passive_scalars:
+            psl = self.left_states.get_carray("passive-scalars")
+            psr = self.right_states.get_carray("passive-scalars")
+            for m in range(mesh.faces.get_carray_size()):
+                self.passive_face(m, psl.data, psr.data, True, 0.)
 
-                # copy velocities for temporal calculation
-                if boost:
-                    vi[k] = v[k][i] - wx[k][m]
-                    vj[k] = v[k][j] - wx[k][m]
-                else:
-                    vi[k] = v[k][i]
-                    vj[k] = v[k][j]
+    cpdef add_temporal(self, CarrayContainer particles, Mesh mesh,
+                         double gamma, DomainManager domain_manager,
+                         double dt, bint boost):
+        """Perform temporal reconstruction from cell center to face center.
+        This follows the method outlined by Springel (2009) and all equations
+        referenced are from that paper.
 
-                vl[k][m] -= dt*dp[k][i]/d.data[i]
-                vr[k][m] -= dt*dp[k][j]/d.data[j]
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
 
-            # add derivatives to primitive 
-            for k in range(dim): # dot products
+        mesh : Mesh
+            Class that builds the domain mesh.
 
-                # add gradient (Eq. 21) and time Extrapolation (eq. 37)
-                # the trace of dv is div of velocity
+        boost : bool
+            Solve equations in moving reference frame.
 
-                # density, add temporal derivative
-                dl.data[m] -= dt*(d.data[i]*dv[(dim+1)*k][i] + vi[k]*dd[k][i])
-                dr.data[m] -= dt*(d.data[j]*dv[(dim+1)*k][j] + vj[k]*dd[k][j])
+        domain_manager : DomainManager
+            Class that handels all things related with the domain.
 
-                if self.has_passive_scalars:
-                    for n in range(num_passive):
+        dt : float
+            Time to extrapolate reconstructed fields to.
+        """
+        cdef int m
+        cdef DoubleBlockArray psl, psr
+        cdef np.float64_t** prim_l = self.priml_pointer
+        cdef np.float64_t** prim_r = self.primr_pointer
 
-                        # passive scalars, add spatial derivative
-                        self.passive_l[n][m] -= dt*(self.passive[n][i]*dv[(dim+1)*k][i]\
-                                - vi[k]*self.dpassive[n*dim+k][i])
-                        self.passive_r[n][m] -= dt*(self.passive[n][j]*dv[(dim+1)*k][j]\
-                                - vj[k]*self.dpassive[n*dim+k][j])
+        phdLogger.info("PieceWiseLinear: Starting temporal reconstruction")
 
-                # pressure, add spatial derivative
-                pl.data[m] -= dt*(gamma*p.data[i]*dv[(dim+1)*k][i] + vi[k]*dp[k][i])
-                pr.data[m] -= dt*(gamma*p.data[j]*dv[(dim+1)*k][j] + vj[k]*dp[k][j])
+        # pointers left/right primitive values
+        self.left_states.pointer_groups(prim_l, self.left_states.carray_named_groups["primitive"])
+        self.right_states.pointer_groups(prim_r, self.right_states.carray_named_groups["primitive"])
 
-                # velocity, add spatial derivative
-                for n in range(dim): # over velocity components
-                    vl[n][m] -= dt*vi[k]*dv[n*dim+k][i]
-                    vr[n][m] -= dt*vj[k]*dv[n*dim+k][j]
+        self.prepare_faces(particles, mesh, gamma, dt, boost)
 
-            # if negative remove time derivative 
-            if dl.data[m] < 0.0 or pl.data[m] < 0.0:
-                for n in range(num_fields):
-                    prim_l[n][m] = state_l[n]
+        # create left/right states for each face
+        for m in range(mesh.faces.get_carray_size()):
+            self.temporal_face(m, m, prim_l, prim_r)
 
-            if dr.data[m] < 0.0 or pr.data[m] < 0.0:
-                for n in range(num_fields):
-                    prim_r[n][m] = state_r[n]
+        if self.has_passive_scalars:
+            psl = self.left_states.get_carray("passive-scalars")
+            psr = self.right_states.get_carray("passive-scalars")
+            for m in range(mesh.faces.get_carray_size()):
+                self.passive_face(m, psl.data, psr.data, False, dt)
 
     cpdef compute_states(self, CarrayContainer particles, Mesh mesh,
                          double gamma, DomainManager domain_manager,
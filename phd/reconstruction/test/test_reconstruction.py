@@ -2,8 +2,10 @@ import unittest
 import numpy as np
 
 from phd.mesh.mesh import Mesh
+from phd.domain.boundary import Reflective
 from phd.domain.domain_manager import DomainManager
 from phd.containers.containers import CarrayContainer
+from phd.utils.particle_tags import ParticleTAGS
 from phd.utils.particle_creator import HydroParticleCreator
 from phd.reconstruction.reconstruction import PieceWiseConstant, PieceWiseLinear
 
@@ -94,5 +96,134 @@ class TestPieceWiseLinear(TestPieceWiseConstant):
     def test_compute_states(self):
         self.assertTrue(True)
 
+class TestPieceWiseLinearGradients(unittest.TestCase):
+    """Tests for the gradients of the linear reconstruction class."""
+
+    def setUp(self):
+
+        n = 100
+        self.particles = HydroParticleCreator(num=n, dim=2)
+
+        # random particles in a unit box with random primitive values
+        np.random.seed(0)
+        self.particles["position-x"][:] = np.random.uniform(size=n)
+        self.particles["position-y"][:] = np.random.uniform(size=n)
+        for field in self.particles.carray_named_groups["primitive"]:
+            self.particles[field][:] = np.random.uniform(1.0, 2.0, size=n)
+
+        self.domain_manager = DomainManager(xmin=[0., 0.], xmax=[1., 1.],
+                initial_radius=0.1)
+        self.domain_manager.set_boundary_condition(Reflective())
+        self.domain_manager.register_fields(self.particles)
+        self.domain_manager.initialize()
+
+        self.mesh = Mesh()
+        self.mesh.register_fields(self.particles)
+        self.mesh.initialize()
+
+        self.recon = PieceWiseLinear()
+        self.recon.add_fields(self.particles)
+        self.recon.initialize()
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.domain_manager.boundary_condition.update_fields(
+                self.particles, self.domain_manager)
+
+    def test_compute_gradients(self):
+        """
+        Test if gradients accumulated over faces agree with gradients
+        estimated and limited particle by particle.
+        """
+        pc = self.particles
+        faces = self.mesh.faces
+        offsets = self.mesh.neighbor_offsets.get_npy_array()
+        nbr_faces = self.mesh.neighbor_faces.get_npy_array()
+        nbr_ids = self.mesh.neighbor_ids.get_npy_array()
+
+        self.recon.compute_gradients(pc, self.mesh, self.domain_manager)
+
+        x = np.array([pc["position-x"], pc["position-y"]])
+        cx = x + np.array([pc["dcom-x"], pc["dcom-y"]])
+        fij = np.array([faces["com-x"], faces["com-y"]])
+
+        for i in np.where(pc["tag"] == ParticleTAGS.Real)[0]:
+            fid = nbr_faces[offsets[i]:offsets[i+1]]
+            j = nbr_ids[offsets[i]:offsets[i+1]]
+
+            # Eq. 21 of AREPO
+            cfx = fij[:, fid] - 0.5*(x[:, [i]] + x[:, j])
+            dr = x[:, [i]] - x[:, j]
+            r = np.sqrt(np.sum(dr**2, axis=0))
+
+            for field in pc.carray_named_groups["primitive"]:
+                phi = pc[field]
+                d_dif = phi[j] - phi[i]
+                d_sum = phi[j] + phi[i]
+                df = np.sum(faces["area"][fid]*(d_dif*cfx - 0.5*d_sum*dr)/r,
+                        axis=1)/pc["volume"][i]
+
+                # limiter Eq. 30 of AREPO
+                dphi = np.dot(df, fij[:, fid] - cx[:, [i]])
+                psi = np.ones(len(dphi))
+                psi[dphi > 0] = (max(phi[j].max(), phi[i]) - phi[i])/dphi[dphi > 0]
+                psi[dphi < 0] = (min(phi[j].min(), phi[i]) - phi[i])/dphi[dphi < 0]
+                alpha = min(1.0, np.maximum(psi, 0.).min())
+
+                for k, axis in enumerate("xy"):
+                    self.assertAlmostEqual(self.recon.grad[field + "_" + axis][i],
+                            alpha*df[k], places=10)
+
+    def test_stencil_cache(self):
+        """
+        Test if the face geometry is cached once per mesh build.
+        """
+        self.recon.compute_gradients(self.particles, self.mesh, self.domain_manager)
+        grad = dict((field, np.copy(self.recon.grad[field]))
+                for field in self.recon.grad.carrays.keys())
+
+        # same mesh, geometry is reused
+        self.recon.compute_gradients(self.particles, self.mesh, self.domain_manager)
+        self.assertEqual(self.recon.num_stencil_builds, 1)
+        self.assertEqual(self.recon.stencil_generation, self.mesh.generation)
+        for field in grad.keys():
+            self.assertTrue(np.array_equal(grad[field], self.recon.grad[field]))
+
+        # new mesh, geometry is cached again
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.recon.compute_gradients(self.particles, self.mesh, self.domain_manager)
+        self.assertEqual(self.recon.num_stencil_builds, 2)
+        self.assertEqual(self.recon.stencil_generation, self.mesh.generation)
+
+    def test_predictor(self):
+        """
+        Test if the time extrapolation of each particle follows the
+        primitive equations.
+        """
+        pc = self.particles
+        dt, gamma = 0.1, 1.4
+
+        self.recon.compute_gradients(pc, self.mesh, self.domain_manager)
+        self.recon.compute_states(pc, self.mesh, gamma, self.domain_manager,
+                dt, False)
+
+        grad = self.recon.grad
+        d, p = pc["density"], pc["pressure"]
+        v = [pc["velocity-x"], pc["velocity-y"]]
+        div_v = grad["velocity-x_x"] + grad["velocity-y_y"]
+
+        dd = -dt*(d*div_v + v[0]*grad["density_x"] + v[1]*grad["density_y"])
+        dp = -dt*(gamma*p*div_v + v[0]*grad["pressure_x"] + v[1]*grad["pressure_y"])
+        np.testing.assert_allclose(self.recon.predictor["density"], dd,
+                rtol=1.0e-12, atol=1.0e-14)
+        np.testing.assert_allclose(self.recon.predictor["pressure"], dp,
+                rtol=1.0e-12, atol=1.0e-14)
+
+        for axis in "xy":
+            field = "velocity-" + axis
+            dv = -dt*(grad["pressure_" + axis]/d + v[0]*grad[field + "_x"] +\
+                    v[1]*grad[field + "_y"])
+            np.testing.assert_allclose(self.recon.predictor[field], dv,
+                    rtol=1.0e-12, atol=1.0e-14)
+
 if __name__ == "__main__":
     unittest.main()
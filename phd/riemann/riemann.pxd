@@ -1,3 +1,5 @@
+cimport numpy as np
+
 from ..mesh.mesh cimport Mesh
 from ..containers.containers cimport CarrayContainer
 from ..equation_state.equation_state cimport EquationStateBase
@@ -7,6 +9,9 @@ from ..reconstruction.reconstruction cimport ReconstructionBase
 cdef class RiemannBase:
 
     cdef public double cfl
+    cdef public int num_threads
+    cdef public double quiescent_tolerance
+    cdef public int num_quiescent
 
     cdef bint fields_registered
     cdef dict flux_fields
@@ -18,34 +23,99 @@ cdef class RiemannBase:
 
     cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction, double gamma, int dim)
 
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil
+
+    cpdef update_from_faces(self, CarrayContainer particles, Mesh mesh,
+                            ReconstructionBase reconstruction,
+                            EquationStateBase eos, double dt)
+
     cpdef double compute_time_step(self, CarrayContainer particles, EquationStateBase eos)
 
     cdef deboost(self, CarrayContainer fluxes, CarrayContainer faces, int dim)
+    cdef passive_fluxes(self, ReconstructionBase reconstruction)
 
 cdef class HLL(RiemannBase):
     cdef public bint boost
 
-    cdef inline void get_waves(self, double dl, double ul, double pl,
-            double dr, double ur, double pr,
-            double gamma, double *sl, double *sc, double *sr)
-
 cdef class HLLC(HLL):
     pass
 
 cdef class Exact(RiemannBase):
     cdef public bint boost
 
-    cdef inline double p_guess(self, double dl, double ul, double pl, double cl,
-            double dr, double ur, double pr, double cr, double gamma) nogil
-
-    cdef inline double p_func(self, double d, double u, double p,
-            double c, double gamma, double p_old) nogil
-
-    cdef inline double p_func_deriv(self, double d, double u, double p,
-            double c, double gamma, double p_old) nogil
-
-    cdef inline double get_pstar(self, double dl, double ul, double pl, double cl,
-            double dr, double ur, double pr, double cr, double gamma) nogil
+cdef class Adaptive(Exact):
+    cdef public double q_user
+    cdef public double q_shock
+
+    # faces solved by each branch in last call
+    cdef public int num_pvrs
+    cdef public int num_trrs
+    cdef public int num_tsrs
+    cdef public int num_exact
+
+# face kernels, called without the gil over face ranges
+cdef inline int quiescent_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost, double tol) nogil
+
+cdef inline void hll_waves(double dl, double ul, double pl,
+        double dr, double ur, double pr,
+        double gamma, double *sl, double *sc, double *sr) nogil
+
+cdef inline void hll_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost) nogil
+
+cdef inline void hllc_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost) nogil
+
+cdef inline int exact_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim) nogil
+
+cdef inline int adaptive_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, double q_user, double q_shock) nogil
+
+cdef inline void sample_flux(int i,
+        np.float64_t *vl[3], np.float64_t *vr[3], np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double _dl, double vnl, double _pl, double cl, double vl_sq,
+        double _dr, double vnr, double _pr, double cr, double vr_sq,
+        double p_star, double u_star, double gamma, int dim) nogil
+
+cdef inline double p_guess(double dl, double ul, double pl, double cl,
+        double dr, double ur, double pr, double cr, double gamma) nogil
+
+cdef inline double p_func(double d, double u, double p,
+        double c, double gamma, double p_old) nogil
+
+cdef inline double p_func_deriv(double d, double u, double p,
+        double c, double gamma, double p_old) nogil
+
+cdef inline double get_pstar(double dl, double ul, double pl, double cl,
+        double dr, double ur, double pr, double cr, double gamma) nogil
 
 cdef inline void vacuum_right(
         double dl, double vl[3], double pl, double vnl, double cl,
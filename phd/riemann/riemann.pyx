@@ -3,15 +3,22 @@ import numpy as np
 
 cimport cython
 cimport numpy as np
-from libc.math cimport sqrt, pow, fmin, fmax, fabs
+from cython.parallel cimport prange
+from libc.math cimport sqrt, pow, cbrt, fmin, fmax, fabs, M_PI, INFINITY
 
 from ..utils.particle_tags import ParticleTAGS
-from ..utils.carray cimport DoubleArray, IntArray
+from ..utils.carray cimport DoubleArray, IntArray, LongArray, DoubleBlockArray
 
 phdLogger = logging.getLogger("phd")
 
 cdef int REAL = ParticleTAGS.Real
 
+# star state solvers of the adaptive riemann solver
+cdef int ADAPTIVE_PVRS = 0
+cdef int ADAPTIVE_TRRS = 1
+cdef int ADAPTIVE_TSRS = 2
+cdef int ADAPTIVE_EXACT = 3
+
 cdef class RiemannBase:
     """Riemann base that all riemann solvers need to inherit.
 
@@ -20,8 +27,22 @@ cdef class RiemannBase:
     cfl : float
         The Courant Friedrichs Lewy condition.
 
+    num_threads : int
+        Number of threads used to solve the faces. Faces are
+        independent so the fluxes do not depend on the number
+        of threads.
+
+    quiescent_tolerance : float
+        Faces whose left and right states differ by less than this
+        relative tolerance take the physical flux of the averaged
+        state and skip the solver. Zero solves every face.
+
+    num_quiescent : int
+        Number of faces that skipped the solver in the last solve.
+
     """
-    def __init__(self, double cfl=0.5, **kwargs):
+    def __init__(self, double cfl=0.5, int num_threads=1,
+                 double quiescent_tolerance=0., **kwargs):
         """Constructor for RiemannBase.
 
         Parameters
@@ -29,8 +50,17 @@ cdef class RiemannBase:
         cfl : float
             The Courant Friedrichs Lewy condition.
 
+        num_threads : int
+            Number of threads used to solve the faces.
+
+        quiescent_tolerance : float
+            Relative tolerance for matching left and right states.
+
         """
         self.cfl = cfl
+        self.num_threads = num_threads
+        self.quiescent_tolerance = quiescent_tolerance
+        self.num_quiescent = 0
         self.fields_registered = False
 
     def initialize(self):
@@ -66,6 +96,14 @@ cdef class RiemannBase:
         carray_named_groups["conservative"] = particles.carray_named_groups["conservative"]
         carray_named_groups["momentum"] = particles.carray_named_groups["momentum"]
 
+        # mass of passive scalars, one block for all species
+        if "passive-mass" in particles.carrays:
+            carray_to_register["passive-mass"] = particles.carray_dtypes["passive-mass"]
+
+        # time step of each particle
+        if "dt" not in particles.carrays:
+            particles.register_carray(particles.get_carray_size(), "dt", "double")
+
         # store fields info
         self.fields_registered = True
         self.flux_fields = carray_to_register
@@ -97,6 +135,9 @@ cdef class RiemannBase:
         self.fluxes.resize(mesh.faces.get_carray_size())
         self.riemann_solver(mesh, reconstruction, eos.get_gamma(), dim)
 
+        if "passive-mass" in self.fluxes.carrays:
+            self.passive_fluxes(reconstruction)
+
     cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction,
                         double gamma, int dim):
         """Solve the riemann problem.
@@ -117,9 +158,167 @@ cdef class RiemannBase:
         msg = "RiemannBase::riemann_solver called!"
         raise NotImplementedError(msg)
 
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil:
+        """Solve the riemann problem of face i and store the flux in
+        the face frame if boosted. Returns -1 if the face could not be
+        solved, 0 otherwise.
+        """
+        return -1
+
+    cpdef update_from_faces(self, CarrayContainer particles, Mesh mesh,
+                            ReconstructionBase reconstruction,
+                            EquationStateBase eos, double dt):
+        """Reconstruct, solve and apply the flux of each face in one pass.
+
+        Same as compute_states, compute_fluxes and update_from_fluxes of
+        the mesh but the states and flux of a face are kept on the stack,
+        no face sized containers are written. States are extrapolated to
+        half the time step. Gradients have to be computed before.
+
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
+
+        mesh : Mesh
+            Class that builds the domain mesh.
+
+        reconstruction : ReconstructionBase
+            Class that performs field reconstruction inputs for the
+            riemann problem.
+
+        eos : EquationStateBase
+            Thermodynamic equation of state.
+
+        dt : double
+            Simulation time step.
+
+        """
+        # face information
+        cdef DoubleArray area = mesh.faces.get_carray("area")
+        cdef LongArray pair_i = mesh.faces.get_carray("pair-i")
+        cdef LongArray pair_j = mesh.faces.get_carray("pair-j")
+
+        # particle values
+        cdef DoubleArray m = particles.get_carray("mass")
+        cdef DoubleArray e = particles.get_carray("energy")
+        cdef IntArray tags = particles.get_carray("tag")
+
+        cdef double a, gamma = eos.get_gamma()
+        cdef int i, j, k, n, dim, fail = 0
+        cdef bint boost = self.boost
+        cdef int num_faces = mesh.faces.get_carray_size()
+        cdef np.float64_t *mv[3], *nx[3], *wx[3]
+
+        # states, normal, velocity and flux of a single face
+        cdef np.float64_t ql[5], qr[5], n_face[3], w_face[3]
+        cdef np.float64_t fm, fe, fmv[3]
+        cdef np.float64_t *ql_ptr[5], *qr_ptr[5], *vl[3], *vr[3]
+        cdef np.float64_t *n_ptr[3], *w_ptr[3], *fmv_ptr[3]
+
+        dim = len(particles.carray_named_groups["position"])
+
+        if reconstruction.has_passive_scalars or\
+                len(particles.carray_named_groups["primitive"]) != dim + 2:
+            raise RuntimeError("ERROR: Fused face update only supports density, velocity and pressure")
+
+        phdLogger.info("%s: Starting fused face update" % self.__class__.__name__)
+
+        self.num_quiescent = 0
+
+        reconstruction.prepare_faces(particles, mesh, gamma, 0.5*dt, boost)
+
+        particles.pointer_groups(mv, particles.carray_named_groups["momentum"])
+        mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
+        mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
+
+        # face values at index 0 in primitive order, velocity follows density
+        for k in range(dim + 2):
+            ql_ptr[k] = &ql[k]
+            qr_ptr[k] = &qr[k]
+
+        for k in range(dim):
+            vl[k] = &ql[1+k]
+            vr[k] = &qr[1+k]
+            n_ptr[k] = &n_face[k]
+            w_ptr[k] = &w_face[k]
+            fmv_ptr[k] = &fmv[k]
+
+        with nogil:
+            for n in range(num_faces):
+
+                # left/right states at face
+                reconstruction.face_states(n, ql_ptr, qr_ptr)
+
+                for k in range(dim):
+                    n_face[k] = nx[k][n]
+                    w_face[k] = wx[k][n]
+
+                # flux in face frame
+                if self.solve_face(0, &ql[0], &ql[dim+1], vl, &qr[0], &qr[dim+1], vr,
+                        n_ptr, w_ptr, &fm, &fe, fmv_ptr, gamma, dim) == -1:
+                    fail = 1
+                    break
+
+                # return flux to lab frame Eq. 17
+                if boost:
+                    for k in range(dim):
+                        fe += w_face[k]*(0.5*w_face[k]*fm + fmv[k])
+                        fmv[k] += w_face[k]*fm
+
+                # particles that make up the face
+                i = pair_i.data[n]
+                j = pair_j.data[n]
+
+                # area of the face
+                a = area.data[n]
+
+                # flux entering cell defined by particle i
+                if(tags.data[i] == REAL):
+                    m.data[i] -= dt*a*fm  # mass 
+                    e.data[i] -= dt*a*fe  # energy
+
+                    # momentum
+                    for k in range(dim):
+                        mv[k][i] -= dt*a*fmv[k]
+
+                # flux leaving cell defined by particle j
+                if(tags.data[j] == REAL):
+                    m.data[j] += dt*a*fm  # mass
+                    e.data[j] += dt*a*fe  # energy
+
+                    # momentum
+                    for k in range(dim):
+                        mv[k][j] += dt*a*fmv[k]
+
+                if m.data[i] <= 0.0 or m.data[j] <= 0.0:
+                    fail = 2
+                    break
+                if e.data[i] <= 0.0 or e.data[j] <= 0.0:
+                    fail = 3
+                    break
+
+        if fail == 1:
+            raise RuntimeError("ERROR: Riemann solver failed on face %d" % n)
+        elif fail == 2:
+            raise RuntimeError("Mass less than zero in flux update")
+        elif fail == 3:
+            raise RuntimeError("Energy less than zero in flux update")
+
+        if self.quiescent_tolerance > 0.:
+            phdLogger.info("%s: %d quiescent faces" %\
+                    (self.__class__.__name__, self.num_quiescent))
+
     cpdef double compute_time_step(self, CarrayContainer particles,
                                    EquationStateBase eos):
-        """Compute time step for next integration step.
+        """Compute time step for next integration step. The signal speed
+        time step of each particle is stored in field "dt" and the
+        smallest time step of the real particles is returned.
 
         Parameters
         ----------
@@ -140,52 +339,49 @@ cdef class RiemannBase:
 
         cdef DoubleArray d = particles.get_carray("density")
         cdef DoubleArray p = particles.get_carray("pressure")
+        cdef DoubleArray cell_dt = particles.get_carray("dt")
 
         cdef int i, k, dim
         cdef np.float64_t* v[3]
-        cdef double c, R, dt, vsq
+        cdef double R, vsq, dt = INFINITY
+        cdef double cfl = self.cfl
         cdef bint boost = self.boost
+        cdef int num_threads = self.num_threads
+        cdef int num_particles = particles.get_carray_size()
 
         dim = len(particles.carray_named_groups["position"])
         particles.pointer_groups(v, particles.carray_named_groups["velocity"])
 
-        # calculate first value for min
-        c = eos.sound_speed(d.data[0], p.data[0])
+        # sound speed of every particle, stored in dt until converted
+        if eos.sound_speed_array(d.data, p.data, cell_dt.data, num_particles) == -1:
+            raise RuntimeError("ERROR: Equation of state has no sound speeds")
 
-        if dim == 2:
-            R = sqrt(vol.data[0]/np.pi)
-        elif dim == 3:
-            R = pow(3.0*vol.data[0]/(4.0*np.pi), 1.0/3.0)
+        for i in prange(num_particles, nogil=True, num_threads=num_threads,
+                schedule="static"):
 
-        if boost:
-            dt = R/c
-        else:
-            vsq = 0.0
-            for k in range(dim):
-                vsq += v[k][0]*v[k][0]
-            dt = R/(c + sqrt(vsq))
+            # calculate approx radius of each voronoi cell
+            if dim == 1:
+                R = 0.5*vol.data[i]
+            elif dim == 2:
+                R = sqrt(vol.data[i]/M_PI)
+            else:
+                R = cbrt(0.75*vol.data[i]/M_PI)
 
-        for i in range(particles.get_carray_size()):
-            # use only real particles
-            if tags.data[i] == REAL:
+            # signal speed in face frame or lab frame
+            vsq = 0.0
+            if not boost:
+                for k in range(dim):
+                    vsq = vsq + v[k][i]*v[k][i]
 
-                # sound speed
-                c = eos.sound_speed(d.data[i], p.data[i])
+            cell_dt.data[i] = cfl*R/(cell_dt.data[i] + sqrt(vsq))
 
-                # calculate approx radius of each voronoi cell
-                if dim == 2:
-                    R = sqrt(vol.data[i]/np.pi)
-                elif dim == 3:
-                    R = pow(3.0*vol.data[i]/(4.0*np.pi), 1.0/3.0)
+        # smallest time step of real particles
+        with nogil:
+            for i in range(num_particles):
+                if tags.data[i] == REAL:
+                    dt = fmin(cell_dt.data[i], dt)
 
-                if boost:
-                    dt = fmin(R/c, dt)
-                else:
-                    vsq = 0.0
-                    for k in range(dim):
-                        vsq += v[k][i]*v[k][i]
-                    dt = fmin(R/(c + sqrt(vsq)), dt)
-        return self.cfl*dt
+        return dt
 
     cdef deboost(self, CarrayContainer fluxes, CarrayContainer faces, int dim):
         """Deboost riemann solution of fluxes from face reference to lab frame.
@@ -211,16 +407,58 @@ cdef class RiemannBase:
 
         cdef int m, k
         cdef np.float64_t *fmv[3], *wx[3]
+        cdef int num_threads = self.num_threads
+        cdef int num_faces = faces.get_carray_size()
 
         fluxes.pointer_groups(fmv, fluxes.carray_named_groups["momentum"])
         faces.pointer_groups(wx, faces.carray_named_groups["velocity"])
 
         # return flux to lab frame Eq. 17
-        for m in range(faces.get_carray_size()):
+        for m in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
             for k in range(dim):
                 fe.data[m] += wx[k][m]*(0.5*wx[k][m]*fm.data[m] + fmv[k][m])
                 fmv[k][m]  += wx[k][m]*fm.data[m]
 
+    cdef passive_fluxes(self, ReconstructionBase reconstruction):
+        """Compute the flux of passive scalars from the mass flux.
+
+        Passive scalars are advected with the mass, the flux of each
+        species is the mass flux times the mass fraction of the upwind
+        state. The mass flux is the same in the face and lab frame so
+        this is called after the fluxes are deboosted.
+
+        Parameters
+        ----------
+        reconstruction : ReconstructionBase
+            Class that performs field reconstruction inputs for the
+            riemann problem.
+
+        """
+        cdef DoubleArray fm = self.fluxes.get_carray("mass")
+        cdef DoubleBlockArray fpm = self.fluxes.get_carray("passive-mass")
+        cdef DoubleBlockArray psl = reconstruction.left_states.get_carray("passive-scalars")
+        cdef DoubleBlockArray psr = reconstruction.right_states.get_carray("passive-scalars")
+
+        cdef int m, k
+        cdef np.float64_t *ps
+        cdef int num_threads = self.num_threads
+        cdef int num_passive = fpm.num_components
+        cdef int num_faces = self.fluxes.get_carray_size()
+
+        # species of a face are contiguous
+        for m in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
+
+            # upwind state, mass flows from left to right if positive
+            if fm.data[m] > 0.:
+                ps = psl.data + m*num_passive
+            else:
+                ps = psr.data + m*num_passive
+
+            for k in range(num_passive):
+                fpm.data[m*num_passive+k] = fm.data[m]*ps[k]
+
 
 cdef class HLL(RiemannBase):
     """HLL implementation of solving the riemann problem. This is taken
@@ -235,6 +473,9 @@ cdef class HLL(RiemannBase):
     boost : boolean
         Flag indicating to boost to face frame if true
 
+    num_threads : int
+        Number of threads used to solve the faces.
+
     """
     def __init__(self, double cfl=0.5, bint boost=True, **kwargs):
         self.boost = boost
@@ -271,15 +512,13 @@ cdef class HLL(RiemannBase):
         cdef DoubleArray fm = self.fluxes.get_carray("mass")
         cdef DoubleArray fe = self.fluxes.get_carray("energy")
 
-        cdef int i, k
-        cdef double _dl, _pl
-        cdef double _dr, _pr
-        cdef double fac1, fac2, el, er
-        cdef double wn, Vnl, Vnr, sl, sr, s_contact
-        cdef double vl_tmp, vr_tmp, nx_tmp, vl_sq, vr_sq
+        cdef int i
         cdef np.float64_t *vl[3], *vr[3], *fmv[3], *nx[3], *wx[3]
 
         cdef bint boost = self.boost
+        cdef int num_quiescent = 0
+        cdef double tol = self.quiescent_tolerance
+        cdef int num_threads = self.num_threads
         cdef int num_faces = mesh.faces.get_carray_size()
 
         phdLogger.info("HLL: Starting riemann")
@@ -297,229 +536,306 @@ cdef class HLL(RiemannBase):
         mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
         mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
 
-        # solve riemann for each face
-        for i in range(num_faces):
-
-            # left state
-            _dl = dl.data[i]
-            _pl = pl.data[i]
-
-            # right state
-            _dr = dr.data[i]
-            _pr = pr.data[i]
-
-            Vnl = Vnr = 0.0
-            vl_sq = vr_sq = wn = 0.0
-            for k in range(dim):
+        # solve riemann for each face, faces are independent
+        for i in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
+            if tol > 0. and quiescent_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                    nx, wx, fm.data, fe.data, fmv, gamma, dim, boost, tol):
+                num_quiescent += 1
+            else:
+                hll_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                        nx, wx, fm.data, fe.data, fmv, gamma, dim, boost)
 
-                vl_tmp = vl[k][i]; vr_tmp = vr[k][i]
-                nx_tmp = nx[k][i]
+        self.num_quiescent = num_quiescent
+        if tol > 0.:
+            phdLogger.info("HLL: %d quiescent faces" % num_quiescent)
 
-                # left/right velocity square
-                vl_sq += vl_tmp*vl_tmp
-                vr_sq += vr_tmp*vr_tmp
+        if boost:
+            self.deboost(self.fluxes, mesh.faces, dim)
 
-                # project left/righ velocity to face normal
-                Vnl += vl_tmp*nx_tmp
-                Vnr += vr_tmp*nx_tmp
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil:
+        """Solve the riemann problem of face i by HLL solver."""
+        if self.quiescent_tolerance > 0. and quiescent_flux(i, dl, pl, vl, dr, pr, vr,
+                nx, wx, fm, fe, fmv, gamma, dim, self.boost, self.quiescent_tolerance):
+            self.num_quiescent += 1
+            return 0
 
-                # project face velocity to face normal
-                wn += wx[k][i]*nx_tmp
+        hll_flux(i, dl, pl, vl, dr, pr, vr, nx, wx, fm, fe, fmv,
+                gamma, dim, self.boost)
+        return 0
 
-            # in face frame
-            if boost:
-                wn = 0.
 
-            self.get_waves(_dl, Vnl, _pl, _dr, Vnr, _pr, gamma,
-                    &sl, &s_contact, &sr)
+cdef class HLLC(HLL):
+    """HLLC implementation of solving the riemann problem. This is taken
+    from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics
+    chapter 10.
 
-            # calculate interface flux Eq. 10.21
-            if(wn <= sl):
+    Attributes
+    ----------
+    cfl : float
+        The Courant Friedrichs Lewy condition.
 
-                # left state
-                fm.data[i]  = _dl*(Vnl - wn)
-                fe.data[i]  = (0.5*_dl*vl_sq + _pl/(gamma - 1.0))*(Vnl - wn) + _pl*Vnl
+    boost : boolean
+        Flag indicating to boost to face frame if true
 
-                for k in range(dim):
-                    fmv[k][i] = _dl*vl[k][i]*(Vnl - wn) + _pl*nx[k][i]
+    num_threads : int
+        Number of threads used to solve the faces.
 
-            elif((sl < wn) and (wn <= sr)):
+    """
+    cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction, double gamma, int dim):
+        """Solve the riemann problem by HLLC solver.
 
-                fac1 = sr - wn
-                fac2 = sl - wn
-                fac3 = sr - sl
+        Parameters
+        ----------
+        mesh : Mesh
+            Class that builds the domain mesh.
 
-                # Eq. 10.20 and Eq. 10.13
-                fm.data[i] = (_dl*Vnl*fac1 - _dr*Vnr*fac2 - sl*_dl*fac1 + sr*_dr*fac2)/fac3
+        reconstruction : ReconstructionBase
+            Class that performs field reconstruction inputs for the
+            riemann problem.
 
-                for k in range(dim):
-                    fmv[k][i] = ((_dl*vl[k][i]*Vnl + _pl*nx[k][i])*fac1 - (_dr*vr[k][i]*Vnr + _pr*nx[k][i])*fac2 \
-                            - sl*(_dl*vl[k][i])*fac1 + sr*(_dr*vr[k][i])*fac2)/fac3
+        gamma : float
+            Ratio of specific heats.
 
-                el = 0.5*_dl*vl_sq + _pl/(gamma - 1.0)
-                er = 0.5*_dr*vr_sq + _pr/(gamma - 1.0)
-                fe.data[i]  = ((el + _pl)*Vnl*fac1 - (er + _pr)*Vnr*fac2 - sl*el*fac1 + sr*er*fac2)/fac3
+        dim : int
+            Dimension of the problem.
 
-            else:
+        """
+        # left state primitive variables
+        cdef DoubleArray dl = reconstruction.left_states.get_carray("density")
+        cdef DoubleArray pl = reconstruction.left_states.get_carray("pressure")
 
-                # right state
-                fm.data[i]  = _dr*(Vnr - wn)
-                fe.data[i]  = (0.5*_dr*vr_sq + _pr/(gamma - 1.0))*(Vnr - wn) + _pr*Vnr
+        # left state primitive variables
+        cdef DoubleArray dr = reconstruction.right_states.get_carray("density")
+        cdef DoubleArray pr = reconstruction.right_states.get_carray("pressure")
 
-                for k in range(dim):
-                    fmv[k][i] = _dr*vr[k][i]*(Vnr - wn) + _pr*nx[k][i]
+        cdef DoubleArray fm = self.fluxes.get_carray("mass")
+        cdef DoubleArray fe = self.fluxes.get_carray("energy")
 
-        if boost:
-            self.deboost(self.fluxes, mesh.faces, dim)
+        cdef int i
+        cdef np.float64_t *vl[3], *vr[3], *fmv[3], *nx[3], *wx[3]
 
-    cdef inline void get_waves(self, double dl, double ul, double pl,
-            double dr, double ur, double pr,
-            double gamma, double *sl, double *sc, double *sr):
-        """Solve wave estimates for HLL type solvers.
+        cdef bint boost = self.boost
+        cdef int num_quiescent = 0
+        cdef double tol = self.quiescent_tolerance
+        cdef int num_threads = self.num_threads
+        cdef int num_faces = mesh.faces.get_carray_size()
 
-        Parameters
-        ----------
-        dl : double
-            Left state density.
+        phdLogger.info("HLLC: Starting riemann")
 
-        ul : double
-            Left state velocity.
+        # particle velocities left/right face
+        reconstruction.left_states.pointer_groups(vl,
+                reconstruction.left_states.carray_named_groups["velocity"])
+        reconstruction.right_states.pointer_groups(vr,
+                reconstruction.right_states.carray_named_groups["velocity"])
 
-        pl : double
-            Left state pressure.
+        # face momentum fluxes
+        self.fluxes.pointer_groups(fmv, self.fluxes.carray_named_groups["momentum"])
 
-        dr : double
-            Right state density.
+        # face normal and velocity
+        mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
+        mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
 
-        ur : double
-            Right state velocity.
+        # solve riemann for each face, faces are independent
+        for i in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
+            if tol > 0. and quiescent_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                    nx, wx, fm.data, fe.data, fmv, gamma, dim, boost, tol):
+                num_quiescent += 1
+            else:
+                hllc_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                        nx, wx, fm.data, fe.data, fmv, gamma, dim, boost)
 
-        pr : double
-            Right state pressure.
+        self.num_quiescent = num_quiescent
+        if tol > 0.:
+            phdLogger.info("HLLC: %d quiescent faces" % num_quiescent)
 
-        gamma : double
-            Ratio of specific heats.
+        if boost:
+            self.deboost(self.fluxes, mesh.faces, dim)
 
-        Returns
-        -------
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil:
+        """Solve the riemann problem of face i by HLLC solver."""
+        if self.quiescent_tolerance > 0. and quiescent_flux(i, dl, pl, vl, dr, pr, vr,
+                nx, wx, fm, fe, fmv, gamma, dim, self.boost, self.quiescent_tolerance):
+            self.num_quiescent += 1
+            return 0
+
+        hllc_flux(i, dl, pl, vl, dr, pr, vr, nx, wx, fm, fe, fmv,
+                gamma, dim, self.boost)
+        return 0
 
-        sl : double
-            Left wave.
+cdef class Exact(RiemannBase):
+    """Exact implementation of solving the riemann problem. This is taken
+    from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics
+    chapter 9.
 
-        sc : double
-            Contact wave.
+    Attributes
+    ----------
+    cfl : float
+        The Courant Friedrichs Lewy condition.
 
-        sr : double
-            Right wave.
+    num_threads : int
+        Number of threads used to solve the faces.
 
-        """
-        cdef double p_star, u_star
-        cdef double d_avg, c_avg
+    """
+    def __init__(self, double cfl=0.5, int num_threads=1,
+                 double quiescent_tolerance=0., **kwargs):
+        self.boost = True
+        self.cfl = cfl
+        self.num_threads = num_threads
+        self.quiescent_tolerance = quiescent_tolerance
+        self.num_quiescent = 0
+        self.fields_registered = False
 
-        cdef double _sl, _sr, _sc
-        cdef double cl, cr
+    cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction, double gamma, int dim):
+        """Solve the riemann problem by Exact solver.
 
-        cdef double z, plr
-        cdef double Q = 2.
-        cdef double Al, Ar, Bl, Br
-        cdef double gl, gr
+        Parameters
+        ----------
+        mesh : Mesh
+            Class that builds the domain mesh.
 
-        cdef double p_min
-        cdef double p_max
-        cdef double c_floor = 1.0E-10
+        reconstruction : ReconstructionBase
+            Class that performs field reconstruction inputs for the
+            riemann problem.
 
-        cl = fmax(sqrt(gamma*pl/dl), c_floor)
-        cr = fmax(sqrt(gamma*pr/dr), c_floor)
+        gamma : float
+            Ratio of specific heats.
 
-        d_avg = .5*(dl + dr)
-        c_avg = .5*(cl + cr)
+        dim : int
+            Dimension of the problem.
 
-        # estimate p* Eq. 9.20
-        p_star = fmax(0., .5*(pl + pr) + .5*(ul - ur)*d_avg*c_avg)
+        """
+        # left state primitive variables
+        cdef DoubleArray dl = reconstruction.left_states.get_carray("density")
+        cdef DoubleArray pl = reconstruction.left_states.get_carray("pressure")
 
-        p_min = fmin(pl, pr)
-        p_max = fmax(pl, pr)
+        # left state primitive variables
+        cdef DoubleArray dr = reconstruction.right_states.get_carray("density")
+        cdef DoubleArray pr = reconstruction.right_states.get_carray("pressure")
 
-        if(((p_max/p_min) < Q) and ((p_min < p_star) and (p_star < p_max))):
+        cdef DoubleArray fm  = self.fluxes.get_carray("mass")
+        cdef DoubleArray fe  = self.fluxes.get_carray("energy")
 
-            u_star = .5*(ul + ur) + .5*(pl - pr)/(d_avg*c_avg)
+        cdef int i, fail = 0
+        cdef np.float64_t *vl[3], *vr[3], *fmv[3], *nx[3], *wx[3]
 
-        elif(p_star <= p_min):
+        cdef int num_quiescent = 0
+        cdef double tol = self.quiescent_tolerance
+        cdef int num_threads = self.num_threads
+        cdef int num_faces = mesh.faces.get_carray_size()
 
-            # two rarefaction riemann solver (TRRS)
-            # Eq. 9.31
-            z = (gamma - 1.)/(2.*gamma);
+        phdLogger.info("Exact: Starting riemann")
 
-            # Eq. 9.35
-            plr = pow(pl/pr, z);
+        # particle velocities left/right face
+        reconstruction.left_states.pointer_groups(vl,
+                reconstruction.left_states.carray_named_groups["velocity"])
+        reconstruction.right_states.pointer_groups(vr,
+                reconstruction.right_states.carray_named_groups["velocity"])
 
-            u_star = (plr*ul/cl + ur/cr + 2.*(plr - 1.)/(gamma - 1.))/\
-                    (plr/cl + 1./cr)
+        # face momentum fluxes
+        self.fluxes.pointer_groups(fmv, self.fluxes.carray_named_groups["momentum"])
 
-            # estimate p* from two rarefaction aprroximation Eq. 9.36
-            p_star  = .5*pl*pow(1. + (gamma - 1.)*(ul - u_star)/(2.*cl), 1./z)
-            p_star += .5*pr*pow(1. + (gamma - 1.)*(u_star - ur)/(2.*cr), 1./z)
+        # face normal and velocity
+        mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
+        mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
 
-        else:
+        # solve riemann for each face, faces are independent
+        for i in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
+            if tol > 0. and quiescent_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                    nx, wx, fm.data, fe.data, fmv, gamma, dim, True, tol):
+                num_quiescent += 1
+            else:
+                fail += exact_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                        nx, fm.data, fe.data, fmv, gamma, dim)
 
-            # two shock riemann solver (TSRS)
-            # Eq. 9.31
-            Al = 2./((gamma + 1.)*dl)
-            Ar = 2./((gamma + 1.)*dr)
+        if fail != 0:
+            raise RuntimeError("ERROR: No convergence in Exact Riemann Solver")
 
-            Bl = pl*((gamma - 1.)/(gamma + 1.))
-            Br = pr*((gamma - 1.)/(gamma + 1.))
+        self.num_quiescent = num_quiescent
+        if tol > 0.:
+            phdLogger.info("Exact: %d quiescent faces" % num_quiescent)
 
-            # Eq. 9.41
-            gl = sqrt(Al/(p_star + Bl))
-            gr = sqrt(Ar/(p_star + Br))
+        self.deboost(self.fluxes, mesh.faces, dim)
 
-            # estimate p* from two shock aprroximation Eq. 9.43
-            p_star = (gl*pl + gr*pr - (ur - ul))/(gl + gr)
-            u_star = .5*(ul + ur) + .5*(gr*(p_star - pr) - gl*(p_star - pl))
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil:
+        """Solve the riemann problem of face i by Exact solver."""
+        if self.quiescent_tolerance > 0. and quiescent_flux(i, dl, pl, vl, dr, pr, vr,
+                nx, wx, fm, fe, fmv, gamma, dim, True, self.quiescent_tolerance):
+            self.num_quiescent += 1
+            return 0
+
+        return exact_flux(i, dl, pl, vl, dr, pr, vr, nx, fm, fe, fmv,
+                gamma, dim)
+
+cdef class Adaptive(Exact):
+    """Adaptive noniterative implementation of solving the riemann problem.
+    The star state is found by approximate solvers and the exact iteration
+    is only used for strong shocks. This is taken from Toro Riemann Solvers
+    and Numerical Methods for Fluid Dynamics chapter 9.
 
-        # calculate fastest left wave speed estimates Eq. 10.68-10.69
-        if(p_star <= pl):
-            # rarefaction wave
-            _sl = ul - cl
+    Attributes
+    ----------
+    cfl : float
+        The Courant Friedrichs Lewy condition.
 
-        else:
-            # shock wave
-            _sl = ul - cl*sqrt(1.+((gamma+1.)/(2.*gamma))*(p_star/pl - 1.))
+    q_user : float
+        Largest pressure ratio of left and right state for which the
+        primitive variable solver (PVRS) is used.
 
-        # calculate fastest right wave speed estimates Eq. 10.68-10.69
-        if(p_star <= pr):
-            # Rarefaction wave
-            _sr = ur + cr
+    q_shock : float
+        Largest pressure ratio of left and right state for which the
+        two shock solver (TSRS) is used, stronger shocks are solved by
+        the exact iteration.
 
-        else:
-            # shock wave
-            _sr = ur + cr*sqrt(1. + ((gamma+1.)/(2.*gamma))*(p_star/pr - 1.))
+    num_threads : int
+        Number of threads used to solve the faces.
 
-        # contact wave speed Eq. 10.70
-        _sc = (pr - pl + dl*ul*(_sl - ul) - dr*ur*(_sr - ur))/(dl*(_sl - ul) - dr*(_sr - ur))
+    num_pvrs : int
+        Number of faces solved by the primitive variable solver in the
+        last call.
 
-        sl[0] = _sl
-        sc[0] = _sc
-        sr[0] = _sr
+    num_trrs : int
+        Number of faces solved by the two rarefaction solver in the
+        last call.
 
+    num_tsrs : int
+        Number of faces solved by the two shock solver in the last call.
 
-cdef class HLLC(HLL):
-    """HLLC implementation of solving the riemann problem. This is taken
-    from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics
-    chapter 10.
+    num_exact : int
+        Number of faces solved by the exact iteration in the last call.
 
-    Attributes
-    ----------
-    cfl : float
-        The Courant Friedrichs Lewy condition.
+    """
+    def __init__(self, double cfl=0.5, double q_user=2.0, double q_shock=5.0,
+                 int num_threads=1, **kwargs):
+        super(Adaptive, self).__init__(cfl, num_threads, **kwargs)
+        self.cfl = cfl
+        self.q_user = q_user
+        self.q_shock = q_shock
 
-    boost : boolean
-        Flag indicating to boost to face frame if true
+        self.num_pvrs = 0
+        self.num_trrs = 0
+        self.num_tsrs = 0
+        self.num_exact = 0
 
-    """
     cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction, double gamma, int dim):
-        """Solve the riemann problem by HLLC solver.
+        """Solve the riemann problem by Adaptive solver.
 
         Parameters
         ----------
@@ -545,27 +861,21 @@ cdef class HLLC(HLL):
         cdef DoubleArray dr = reconstruction.right_states.get_carray("density")
         cdef DoubleArray pr = reconstruction.right_states.get_carray("pressure")
 
-        cdef DoubleArray fm = self.fluxes.get_carray("mass")
-        cdef DoubleArray fe = self.fluxes.get_carray("energy")
-
-        # local variables
-        cdef int i, k
-
-        cdef double _dl, _pl, _vl[3], el, cl
-        cdef double _dr, _pr, _vr[3], er, cr
-        cdef double d, p, v[3], n[3], vn, vsq
+        cdef DoubleArray fm  = self.fluxes.get_carray("mass")
+        cdef DoubleArray fe  = self.fluxes.get_carray("energy")
 
-        cdef double factor_1, factor_2, frho
-        cdef double wn, Vnl, Vnr, sl, sr, s_contact
-        cdef double vl_tmp, vr_tmp, nx_tmp, vl_sq, vr_sq
+        cdef int i, branch, fail = 0
+        cdef int num_pvrs = 0, num_trrs = 0, num_tsrs = 0, num_exact = 0
         cdef np.float64_t *vl[3], *vr[3], *fmv[3], *nx[3], *wx[3]
 
-        cdef double fac1, fac2, fac3
-
-        cdef int boost = self.boost
+        cdef int num_quiescent = 0
+        cdef double tol = self.quiescent_tolerance
+        cdef double q_user = self.q_user
+        cdef double q_shock = self.q_shock
+        cdef int num_threads = self.num_threads
         cdef int num_faces = mesh.faces.get_carray_size()
 
-        phdLogger.info("HLLC: Starting riemann")
+        phdLogger.info("Adaptive: Starting riemann")
 
         # particle velocities left/right face
         reconstruction.left_states.pointer_groups(vl,
@@ -580,514 +890,994 @@ cdef class HLLC(HLL):
         mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
         mesh.faces.pointer_groups(wx, mesh.faces.carray_named_groups["velocity"])
 
-        for i in range(num_faces):
+        # solve riemann for each face, faces are independent
+        for i in prange(num_faces, nogil=True, num_threads=num_threads,
+                schedule="static"):
+            if tol > 0. and quiescent_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                    nx, wx, fm.data, fe.data, fmv, gamma, dim, True, tol):
+                num_quiescent += 1
+                continue
+
+            branch = adaptive_flux(i, dl.data, pl.data, vl, dr.data, pr.data, vr,
+                    nx, fm.data, fe.data, fmv, gamma, dim, q_user, q_shock)
+
+            if branch == ADAPTIVE_PVRS:
+                num_pvrs += 1
+            elif branch == ADAPTIVE_TRRS:
+                num_trrs += 1
+            elif branch == ADAPTIVE_TSRS:
+                num_tsrs += 1
+            elif branch == ADAPTIVE_EXACT:
+                num_exact += 1
+            else:
+                fail += 1
 
-            # left state
-            _dl = dl.data[i]
-            _pl = pl.data[i]
+        if fail != 0:
+            raise RuntimeError("ERROR: No convergence in Adaptive Riemann Solver")
 
-            # right state
-            _dr = dr.data[i]
-            _pr = pr.data[i]
+        self.num_pvrs = num_pvrs
+        self.num_trrs = num_trrs
+        self.num_tsrs = num_tsrs
+        self.num_exact = num_exact
+        self.num_quiescent = num_quiescent
 
-            cl = sqrt(gamma*_pl/_dl)
-            cr = sqrt(gamma*_pr/_dr)
+        phdLogger.info("Adaptive: PVRS %d, TRRS %d, TSRS %d, Exact %d faces" %\
+                (num_pvrs, num_trrs, num_tsrs, num_exact))
+        if tol > 0.:
+            phdLogger.info("Adaptive: %d quiescent faces" % num_quiescent)
 
-            Vnl = Vnr = 0.0
-            vl_sq = vr_sq = wn = 0.0
-            for k in range(dim):
+        self.deboost(self.fluxes, mesh.faces, dim)
 
-                _vl[k] = vl[k][i]
-                _vr[k] = vr[k][i]
+    cdef int solve_face(self, int i,
+            np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+            np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+            np.float64_t *nx[3], np.float64_t *wx[3],
+            np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+            double gamma, int dim) nogil:
+        """Solve the riemann problem of face i by Adaptive solver and
+        count the branch taken.
+        """
+        cdef int branch
+
+        if self.quiescent_tolerance > 0. and quiescent_flux(i, dl, pl, vl, dr, pr, vr,
+                nx, wx, fm, fe, fmv, gamma, dim, True, self.quiescent_tolerance):
+            self.num_quiescent += 1
+            return 0
+
+        branch = adaptive_flux(i, dl, pl, vl, dr, pr, vr, nx,
+                fm, fe, fmv, gamma, dim, self.q_user, self.q_shock)
+
+        if branch == ADAPTIVE_PVRS:
+            self.num_pvrs += 1
+        elif branch == ADAPTIVE_TRRS:
+            self.num_trrs += 1
+        elif branch == ADAPTIVE_TSRS:
+            self.num_tsrs += 1
+        elif branch == ADAPTIVE_EXACT:
+            self.num_exact += 1
+        else:
+            return -1
+        return 0
 
-                n[k] = nx[k][i]
+    cpdef update_from_faces(self, CarrayContainer particles, Mesh mesh,
+                            ReconstructionBase reconstruction,
+                            EquationStateBase eos, double dt):
+        """Reconstruct, solve and apply the flux of each face in one pass
+        and count the branch taken by each face.
 
-                # left/right velocity square
-                vl_sq += _vl[k]*_vl[k]
-                vr_sq += _vr[k]*_vr[k]
+        Parameters
+        ----------
+        particles : CarrayContainer
+            Class that holds all information pertaining to the particles.
 
-                # project left/righ velocity to face normal
-                Vnl += _vl[k]*n[k]
-                Vnr += _vr[k]*n[k]
+        mesh : Mesh
+            Class that builds the domain mesh.
 
-                # project face velocity to face normal
-                wn += wx[k][i]*n[k]
+        reconstruction : ReconstructionBase
+            Class that performs field reconstruction inputs for the
+            riemann problem.
 
-            # if boosted we are in face frame
-            if boost == 1:
-                wn = 0.
+        eos : EquationStateBase
+            Thermodynamic equation of state.
 
-            self.get_waves(_dl, Vnl, _pl, _dr, Vnr, _pr, gamma,
-                    &sl, &s_contact, &sr)
+        dt : double
+            Simulation time step.
 
-            # calculate interface flux Eq. 10.71
-            if(wn <= sl):
+        """
+        self.num_pvrs = 0
+        self.num_trrs = 0
+        self.num_tsrs = 0
+        self.num_exact = 0
+
+        RiemannBase.update_from_faces(self, particles, mesh, reconstruction, eos, dt)
+
+        phdLogger.info("Adaptive: PVRS %d, TRRS %d, TSRS %d, Exact %d faces" %\
+                (self.num_pvrs, self.num_trrs, self.num_tsrs, self.num_exact))
+
+@cython.cdivision(True)
+cdef inline int quiescent_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost, double tol) nogil:
+    """If the left and right states of face i match to a relative
+    tolerance store the physical flux of the averaged state and
+    return 1, otherwise return 0 and leave the flux untouched. The
+    density and pressure are compared relative to their average and
+    the velocity jump relative to the sound speed.
+    """
+    cdef int k
+    cdef double d, p, dv_sq, v_sq, vn, wn, v_tmp
 
-                # left state
-                fm.data[i]  = _dl*(Vnl - wn)
-                fe.data[i]  = (0.5*_dl*vl_sq + _pl/(gamma - 1.0))*(Vnl - wn) + _pl*Vnl
+    d = 0.5*(dl[i] + dr[i])
+    p = 0.5*(pl[i] + pr[i])
 
-                for k in range(dim):
-                    fmv[k][i] = _dl*vl[k][i]*(Vnl - wn) + _pl*nx[k][i]
+    if fabs(dl[i] - dr[i]) > tol*d or fabs(pl[i] - pr[i]) > tol*p:
+        return 0
 
-            elif((sl < wn) and (wn <= sr)):
+    dv_sq = 0.
+    for k in range(dim):
+        dv_sq += (vl[k][i] - vr[k][i])**2
 
-                # intermediate state
-                if(wn <= s_contact):
+    if dv_sq > tol*tol*gamma*p/d:
+        return 0
 
-                    # left star state Eq. 10.38 and 10.39
-                    factor_1 = _dl*(sl - Vnl)/(sl - s_contact)
-                    factor_2 = factor_1*(sl - wn)*(s_contact - Vnl) + _pl
-                    frho = _dl*(Vnl - sl) + factor_1*(sl - wn)
+    vn = v_sq = wn = 0.
+    for k in range(dim):
+        v_tmp = 0.5*(vl[k][i] + vr[k][i])
+        v_sq += v_tmp*v_tmp
+        vn += v_tmp*nx[k][i]
+        wn += wx[k][i]*nx[k][i]
 
-                    # total energy
-                    el = 0.5*_dl*vl_sq + _pl/(gamma-1.0)
+    # in face frame
+    if boost:
+        wn = 0.
 
-                    fm.data[i] = frho
-                    fe.data[i] = (el + _pl)*Vnl - sl*el +\
-                            (sl - wn)*factor_1*(el/_dl + (s_contact - Vnl)*\
-                            (s_contact + _pl/(_dl*(sl - Vnl))))
+    fm[i] = d*(vn - wn)
+    fe[i] = (0.5*d*v_sq + p/(gamma - 1.0))*(vn - wn) + p*vn
 
-                    for k in range(dim):
-                        fmv[k][i] = frho*vl[k][i] + factor_2*nx[k][i]
+    for k in range(dim):
+        fmv[k][i] = d*0.5*(vl[k][i] + vr[k][i])*(vn - wn) + p*nx[k][i]
 
-                else:
+    return 1
 
-                    # right star state
-                    factor_1 = _dr*(sr - Vnr)/(sr - s_contact)
-                    factor_2 = factor_1*(sr - wn)*(s_contact - Vnr) + _pr
-                    frho = _dr*(Vnr - sr) + factor_1*(sr - wn)
+@cython.cdivision(True)
+cdef inline void hll_waves(double dl, double ul, double pl,
+        double dr, double ur, double pr,
+        double gamma, double *sl, double *sc, double *sr) nogil:
+    """Solve wave estimates for HLL type solvers.
 
-                    # total energy
-                    er = 0.5*_dr*vr_sq + _pr/(gamma-1.0)
+    Parameters
+    ----------
+    dl : double
+        Left state density.
 
-                    fm.data[i] = frho
-                    fe.data[i] = (er + _pr)*Vnr - sr*er +\
-                            (sr - wn)*factor_1*(er/_dr + (s_contact - Vnr)*\
-                            (s_contact + _pr/(_dr*(sr - Vnr))))
+    ul : double
+        Left state velocity.
 
-                    for k in range(dim):
-                        fmv[k][i] = frho*vr[k][i] + factor_2*nx[k][i]
+    pl : double
+        Left state pressure.
 
-            else:
+    dr : double
+        Right state density.
 
-                # right state
-                fm.data[i]  = _dr*(Vnr - wn)
-                fe.data[i]  = (0.5*_dr*vr_sq + _pr/(gamma - 1.0))*(Vnr - wn) + _pr*Vnr
+    ur : double
+        Right state velocity.
 
-                for k in range(dim):
-                    fmv[k][i] = _dr*vr[k][i]*(Vnr - wn) + _pr*nx[k][i]
+    pr : double
+        Right state pressure.
 
-        if boost:
-            self.deboost(self.fluxes, mesh.faces, dim)
+    gamma : double
+        Ratio of specific heats.
 
-cdef class Exact(RiemannBase):
-    """Exact implementation of solving the riemann problem. This is taken
-    from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics
-    chapter 9.
+    Returns
+    -------
 
-    Attributes
-    ----------
-    cfl : float
-        The Courant Friedrichs Lewy condition.
+    sl : double
+        Left wave.
+
+    sc : double
+        Contact wave.
+
+    sr : double
+        Right wave.
 
     """
-    def __init__(self, double cfl=0.5, **kwargs):
-        self.boost = True
-        self.cfl = 0.5
-        self.fields_registered = False
+    cdef double p_star, u_star
+    cdef double d_avg, c_avg
 
-    cdef riemann_solver(self, Mesh mesh, ReconstructionBase reconstruction, double gamma, int dim):
-        """Solve the riemann problem by Exact solver.
+    cdef double _sl, _sr, _sc
+    cdef double cl, cr
 
-        Parameters
-        ----------
-        mesh : Mesh
-            Class that builds the domain mesh.
+    cdef double z, plr
+    cdef double Q = 2.
+    cdef double Al, Ar, Bl, Br
+    cdef double gl, gr
 
-        reconstruction : ReconstructionBase
-            Class that performs field reconstruction inputs for the
-            riemann problem.
+    cdef double p_min
+    cdef double p_max
+    cdef double c_floor = 1.0E-10
 
-        gamma : float
-            Ratio of specific heats.
+    cl = fmax(sqrt(gamma*pl/dl), c_floor)
+    cr = fmax(sqrt(gamma*pr/dr), c_floor)
 
-        dim : int
-            Dimension of the problem.
+    d_avg = .5*(dl + dr)
+    c_avg = .5*(cl + cr)
 
-        """
-        # left state primitive variables
-        cdef DoubleArray dl = reconstruction.left_states.get_carray("density")
-        cdef DoubleArray pl = reconstruction.left_states.get_carray("pressure")
+    # estimate p* Eq. 9.20
+    p_star = fmax(0., .5*(pl + pr) + .5*(ul - ur)*d_avg*c_avg)
 
-        # left state primitive variables
-        cdef DoubleArray dr = reconstruction.right_states.get_carray("density")
-        cdef DoubleArray pr = reconstruction.right_states.get_carray("pressure")
+    p_min = fmin(pl, pr)
+    p_max = fmax(pl, pr)
 
-        cdef DoubleArray fm  = self.fluxes.get_carray("mass")
-        cdef DoubleArray fe  = self.fluxes.get_carray("energy")
+    if(((p_max/p_min) < Q) and ((p_min < p_star) and (p_star < p_max))):
 
-        cdef int i, k
-        cdef np.float64_t *vl[3], *vr[3], *fmv[3], *nx[3]
-        cdef np.float64_t _vl[3], _vr[3], n[3]
+        u_star = .5*(ul + ur) + .5*(pl - pr)/(d_avg*c_avg)
 
-        # state values
-        cdef double _dl, _pl
-        cdef double _dr, _pr
-        cdef double _d, v[3], _p, vn, v_sq
+    elif(p_star <= p_min):
 
-        cdef double vnl, vnr, vl_sq, vr_sq
+        # two rarefaction riemann solver (TRRS)
+        # Eq. 9.31
+        z = (gamma - 1.)/(2.*gamma);
 
-        # wave estimates
-        cdef double fr, fl, u_tmp
-        cdef double p_star, u_star
-        cdef double s_hl, s_tl, sl, sr
-        cdef double c, cl, cr, c_star_l, c_star_r
+        # Eq. 9.35
+        plr = pow(pl/pr, z);
 
-        cdef int num_faces = mesh.faces.get_carray_size()
+        u_star = (plr*ul/cl + ur/cr + 2.*(plr - 1.)/(gamma - 1.))/\
+                (plr/cl + 1./cr)
 
-        phdLogger.info("Exact: Starting riemann")
+        # estimate p* from two rarefaction aprroximation Eq. 9.36
+        p_star  = .5*pl*pow(1. + (gamma - 1.)*(ul - u_star)/(2.*cl), 1./z)
+        p_star += .5*pr*pow(1. + (gamma - 1.)*(u_star - ur)/(2.*cr), 1./z)
 
-        # particle velocities left/right face
-        reconstruction.left_states.pointer_groups(vl,
-                reconstruction.left_states.carray_named_groups["velocity"])
-        reconstruction.right_states.pointer_groups(vr,
-                reconstruction.right_states.carray_named_groups["velocity"])
+    else:
 
-        # face momentum fluxes
-        self.fluxes.pointer_groups(fmv, self.fluxes.carray_named_groups["momentum"])
+        # two shock riemann solver (TSRS)
+        # Eq. 9.31
+        Al = 2./((gamma + 1.)*dl)
+        Ar = 2./((gamma + 1.)*dr)
 
-        # face normal
-        mesh.faces.pointer_groups(nx, mesh.faces.carray_named_groups["normal"])
+        Bl = pl*((gamma - 1.)/(gamma + 1.))
+        Br = pr*((gamma - 1.)/(gamma + 1.))
+
+        # Eq. 9.41
+        gl = sqrt(Al/(p_star + Bl))
+        gr = sqrt(Ar/(p_star + Br))
+
+        # estimate p* from two shock aprroximation Eq. 9.43
+        p_star = (gl*pl + gr*pr - (ur - ul))/(gl + gr)
+        u_star = .5*(ul + ur) + .5*(gr*(p_star - pr) - gl*(p_star - pl))
+
+    # calculate fastest left wave speed estimates Eq. 10.68-10.69
+    if(p_star <= pl):
+        # rarefaction wave
+        _sl = ul - cl
+
+    else:
+        # shock wave
+        _sl = ul - cl*sqrt(1.+((gamma+1.)/(2.*gamma))*(p_star/pl - 1.))
+
+    # calculate fastest right wave speed estimates Eq. 10.68-10.69
+    if(p_star <= pr):
+        # Rarefaction wave
+        _sr = ur + cr
+
+    else:
+        # shock wave
+        _sr = ur + cr*sqrt(1. + ((gamma+1.)/(2.*gamma))*(p_star/pr - 1.))
+
+    # contact wave speed Eq. 10.70
+    _sc = (pr - pl + dl*ul*(_sl - ul) - dr*ur*(_sr - ur))/(dl*(_sl - ul) - dr*(_sr - ur))
+
+    sl[0] = _sl
+    sc[0] = _sc
+    sr[0] = _sr
+
+@cython.cdivision(True)
+cdef inline void hll_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost) nogil:
+    """Solve the riemann problem of face i by HLL solver and store
+    the flux. Only face i is read and written so faces can be solved
+    in any order.
+    """
+    cdef int k
+    cdef double _dl, _pl
+    cdef double _dr, _pr
+    cdef double fac1, fac2, fac3, el, er
+    cdef double wn, Vnl, Vnr, sl, sr, s_contact
+    cdef double vl_tmp, vr_tmp, nx_tmp, vl_sq, vr_sq
+
+    # left state
+    _dl = dl[i]
+    _pl = pl[i]
+
+    # right state
+    _dr = dr[i]
+    _pr = pr[i]
 
-        for i in range(num_faces):
+    Vnl = Vnr = 0.0
+    vl_sq = vr_sq = wn = 0.0
+    for k in range(dim):
 
-            # left state
-            _dl = dl.data[i]
-            _pl = pl.data[i]
+        vl_tmp = vl[k][i]; vr_tmp = vr[k][i]
+        nx_tmp = nx[k][i]
 
-            # right state
-            _dr = dr.data[i]
-            _pr = pr.data[i]
+        # left/right velocity square
+        vl_sq += vl_tmp*vl_tmp
+        vr_sq += vr_tmp*vr_tmp
 
-            # sound speed
-            cl = sqrt(gamma*_pl/_dl)
-            cr = sqrt(gamma*_pr/_dr)
+        # project left/righ velocity to face normal
+        Vnl += vl_tmp*nx_tmp
+        Vnr += vr_tmp*nx_tmp
+
+        # project face velocity to face normal
+        wn += wx[k][i]*nx_tmp
+
+    # in face frame
+    if boost:
+        wn = 0.
+
+    hll_waves(_dl, Vnl, _pl, _dr, Vnr, _pr, gamma,
+            &sl, &s_contact, &sr)
+
+    # calculate interface flux Eq. 10.21
+    if(wn <= sl):
+
+        # left state
+        fm[i]  = _dl*(Vnl - wn)
+        fe[i]  = (0.5*_dl*vl_sq + _pl/(gamma - 1.0))*(Vnl - wn) + _pl*Vnl
+
+        for k in range(dim):
+            fmv[k][i] = _dl*vl[k][i]*(Vnl - wn) + _pl*nx[k][i]
+
+    elif((sl < wn) and (wn <= sr)):
+
+        fac1 = sr - wn
+        fac2 = sl - wn
+        fac3 = sr - sl
+
+        # Eq. 10.20 and Eq. 10.13
+        fm[i] = (_dl*Vnl*fac1 - _dr*Vnr*fac2 - sl*_dl*fac1 + sr*_dr*fac2)/fac3
+
+        for k in range(dim):
+            fmv[k][i] = ((_dl*vl[k][i]*Vnl + _pl*nx[k][i])*fac1 - (_dr*vr[k][i]*Vnr + _pr*nx[k][i])*fac2 \
+                    - sl*(_dl*vl[k][i])*fac1 + sr*(_dr*vr[k][i])*fac2)/fac3
+
+        el = 0.5*_dl*vl_sq + _pl/(gamma - 1.0)
+        er = 0.5*_dr*vr_sq + _pr/(gamma - 1.0)
+        fe[i]  = ((el + _pl)*Vnl*fac1 - (er + _pr)*Vnr*fac2 - sl*el*fac1 + sr*er*fac2)/fac3
+
+    else:
+
+        # right state
+        fm[i]  = _dr*(Vnr - wn)
+        fe[i]  = (0.5*_dr*vr_sq + _pr/(gamma - 1.0))*(Vnr - wn) + _pr*Vnr
+
+        for k in range(dim):
+            fmv[k][i] = _dr*vr[k][i]*(Vnr - wn) + _pr*nx[k][i]
+
+@cython.cdivision(True)
+cdef inline void hllc_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3], np.float64_t *wx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, bint boost) nogil:
+    """Solve the riemann problem of face i by HLLC solver and store
+    the flux. Only face i is read and written so faces can be solved
+    in any order.
+    """
+    cdef int k
+
+    cdef double _dl, _pl, _vl[3], el, cl
+    cdef double _dr, _pr, _vr[3], er, cr
+    cdef double n[3]
+
+    cdef double factor_1, factor_2, frho
+    cdef double wn, Vnl, Vnr, sl, sr, s_contact
+    cdef double vl_sq, vr_sq
+
+    # left state
+    _dl = dl[i]
+    _pl = pl[i]
+
+    # right state
+    _dr = dr[i]
+    _pr = pr[i]
+
+    cl = sqrt(gamma*_pl/_dl)
+    cr = sqrt(gamma*_pr/_dr)
+
+    Vnl = Vnr = 0.0
+    vl_sq = vr_sq = wn = 0.0
+    for k in range(dim):
+
+        _vl[k] = vl[k][i]
+        _vr[k] = vr[k][i]
+
+        n[k] = nx[k][i]
+
+        # left/right velocity square
+        vl_sq += _vl[k]*_vl[k]
+        vr_sq += _vr[k]*_vr[k]
+
+        # project left/righ velocity to face normal
+        Vnl += _vl[k]*n[k]
+        Vnr += _vr[k]*n[k]
+
+        # project face velocity to face normal
+        wn += wx[k][i]*n[k]
+
+    # if boosted we are in face frame
+    if boost:
+        wn = 0.
+
+    hll_waves(_dl, Vnl, _pl, _dr, Vnr, _pr, gamma,
+            &sl, &s_contact, &sr)
+
+    # calculate interface flux Eq. 10.71
+    if(wn <= sl):
+
+        # left state
+        fm[i]  = _dl*(Vnl - wn)
+        fe[i]  = (0.5*_dl*vl_sq + _pl/(gamma - 1.0))*(Vnl - wn) + _pl*Vnl
+
+        for k in range(dim):
+            fmv[k][i] = _dl*vl[k][i]*(Vnl - wn) + _pl*nx[k][i]
+
+    elif((sl < wn) and (wn <= sr)):
+
+        # intermediate state
+        if(wn <= s_contact):
+
+            # left star state Eq. 10.38 and 10.39
+            factor_1 = _dl*(sl - Vnl)/(sl - s_contact)
+            factor_2 = factor_1*(sl - wn)*(s_contact - Vnl) + _pl
+            frho = _dl*(Vnl - sl) + factor_1*(sl - wn)
+
+            # total energy
+            el = 0.5*_dl*vl_sq + _pl/(gamma-1.0)
+
+            fm[i] = frho
+            fe[i] = (el + _pl)*Vnl - sl*el +\
+                    (sl - wn)*factor_1*(el/_dl + (s_contact - Vnl)*\
+                    (s_contact + _pl/(_dl*(sl - Vnl))))
 
-            vnl = vnr = 0.0
-            vl_sq = vr_sq = 0.0
             for k in range(dim):
+                fmv[k][i] = frho*vl[k][i] + factor_2*nx[k][i]
 
-                _vl[k] = vl[k][i]
-                _vr[k] = vr[k][i]
-                n[k]   = nx[k][i]
+        else:
 
-                # project left/righ velocity to face normal
-                vnl += _vl[k]*n[k]
-                vnr += _vr[k]*n[k]
+            # right star state
+            factor_1 = _dr*(sr - Vnr)/(sr - s_contact)
+            factor_2 = factor_1*(sr - wn)*(s_contact - Vnr) + _pr
+            frho = _dr*(Vnr - sr) + factor_1*(sr - wn)
 
-                # left/right velocity square
-                vl_sq += _vl[k]*_vl[k]
-                vr_sq += _vr[k]*_vr[k]
+            # total energy
+            er = 0.5*_dr*vr_sq + _pr/(gamma-1.0)
 
-            # newton rhapson 
-            p_star = self.get_pstar(_dl, vnl, _pl, cl,
-                    _dr, vnr, _pr, cr, gamma)
+            fm[i] = frho
+            fe[i] = (er + _pr)*Vnr - sr*er +\
+                    (sr - wn)*factor_1*(er/_dr + (s_contact - Vnr)*\
+                    (s_contact + _pr/(_dr*(sr - Vnr))))
 
-            # calculate the contact wave speed
-            fl = self.p_func(_dl, vnl, _pl, cl, gamma, p_star)
-            fr = self.p_func(_dr, vnr, _pr, cr, gamma, p_star)
-            u_star = 0.5*(vnl + vnr + fr - fl)
+            for k in range(dim):
+                fmv[k][i] = frho*vr[k][i] + factor_2*nx[k][i]
 
-            if(0.0 <= u_star): # left of contact discontinuity
-                if(p_star <= _pl): # left rarefraction
+    else:
 
-                    # sound speed of head
-                    s_hl = vnl - cl
+        # right state
+        fm[i]  = _dr*(Vnr - wn)
+        fe[i]  = (0.5*_dr*vr_sq + _pr/(gamma - 1.0))*(Vnr - wn) + _pr*Vnr
+
+        for k in range(dim):
+            fmv[k][i] = _dr*vr[k][i]*(Vnr - wn) + _pr*nx[k][i]
+
+@cython.cdivision(True)
+cdef inline int exact_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim) nogil:
+    """Solve the riemann problem of face i by Exact solver and store
+    the flux in the face frame. Only face i is read and written so
+    faces can be solved in any order. Returns -1 if the star pressure
+    did not converge, 0 otherwise.
+    """
+    cdef int k
+
+    # state values
+    cdef double _dl, _pl
+    cdef double _dr, _pr
+
+    cdef double vnl, vnr, vl_sq, vr_sq
+
+    # wave estimates
+    cdef double fr, fl
+    cdef double p_star, u_star
+    cdef double cl, cr
+
+    # left state
+    _dl = dl[i]
+    _pl = pl[i]
+
+    # right state
+    _dr = dr[i]
+    _pr = pr[i]
+
+    # sound speed
+    cl = sqrt(gamma*_pl/_dl)
+    cr = sqrt(gamma*_pr/_dr)
+
+    vnl = vnr = 0.0
+    vl_sq = vr_sq = 0.0
+    for k in range(dim):
+
+        # project left/righ velocity to face normal
+        vnl += vl[k][i]*nx[k][i]
+        vnr += vr[k][i]*nx[k][i]
+
+        # left/right velocity square
+        vl_sq += vl[k][i]*vl[k][i]
+        vr_sq += vr[k][i]*vr[k][i]
+
+    # newton rhapson 
+    p_star = get_pstar(_dl, vnl, _pl, cl,
+            _dr, vnr, _pr, cr, gamma)
+    if p_star < 0.:
+        return -1
+
+    # calculate the contact wave speed
+    fl = p_func(_dl, vnl, _pl, cl, gamma, p_star)
+    fr = p_func(_dr, vnr, _pr, cr, gamma, p_star)
+    u_star = 0.5*(vnl + vnr + fr - fl)
+
+    sample_flux(i, vl, vr, nx, fm, fe, fmv,
+            _dl, vnl, _pl, cl, vl_sq,
+            _dr, vnr, _pr, cr, vr_sq,
+            p_star, u_star, gamma, dim)
+
+    return 0
+
+@cython.cdivision(True)
+cdef inline int adaptive_flux(int i,
+        np.float64_t *dl, np.float64_t *pl, np.float64_t *vl[3],
+        np.float64_t *dr, np.float64_t *pr, np.float64_t *vr[3],
+        np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double gamma, int dim, double q_user, double q_shock) nogil:
+    """Solve the riemann problem of face i by the adaptive noniterative
+    scheme and store the flux in the face frame. This is taken from Toro
+    Riemann Solvers and Numerical Methods for Fluid Dynamics chapter 9.
+
+    The star state is taken from the primitive variable solver (PVRS)
+    if the pressure ratio is below q_user and the PVRS pressure lies
+    between the left and right pressure. Otherwise two rarefactions use
+    the two rarefaction solver (TRRS), which is exact, and shocks use
+    the two shock solver (TSRS) if the pressure ratio is below q_shock.
+    Strong shocks fall back to the exact iteration. The star state is
+    sampled as in the exact solver.
+
+    Returns the branch taken: ADAPTIVE_PVRS, ADAPTIVE_TRRS, ADAPTIVE_TSRS
+    or ADAPTIVE_EXACT, and -1 if the exact iteration did not converge.
+    """
+    cdef int k, branch
 
-                    if(0.0 <= s_hl): # left state
-                        fm.data[i]  = _dl*vnl
-                        fe.data[i]  = (0.5*_dl*vl_sq + gamma*_pl/(gamma - 1.0))*vnl
+    # state values
+    cdef double _dl, _pl
+    cdef double _dr, _pr
 
-                        for k in range(dim):
-                            fmv[k][i] = _dl*vl[k][i]*vnl + _pl*nx[k][i]
+    cdef double vnl, vnr, vl_sq, vr_sq
 
-                    else: # left rarefaction
+    # wave estimates
+    cdef double fr, fl
+    cdef double p_star, u_star
+    cdef double cl, cr, d_avg, c_avg
+    cdef double ppv, p_min, p_max
+    cdef double z, plr, Al, Ar, Bl, Br, gl, gr, p0
 
-                        # sound speed of star state and tail of rarefraction
-                        c_star_l = cl*pow(p_star/_pl, (gamma - 1.0)/(2.0*gamma))
-                        s_tl = u_star - c_star_l
+    # left state
+    _dl = dl[i]
+    _pl = pl[i]
 
-                        if(0.0 >= s_tl): # star left state
-                            _d = _dl*pow(p_star/_pl, 1.0/gamma)
-                            _p = p_star
+    # right state
+    _dr = dr[i]
+    _pr = pr[i]
 
-                            v_sq = vn = 0.
-                            for k in range(dim):
-                                v[k]  = vl[k][i] + (u_star - vnl)*nx[k][i]
-                                vn   += v[k]*nx[k][i]
-                                v_sq += v[k]*v[k]
+    # sound speed
+    cl = sqrt(gamma*_pl/_dl)
+    cr = sqrt(gamma*_pr/_dr)
 
-                            fm.data[i]  = _d*vn
-                            fe.data[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+    vnl = vnr = 0.0
+    vl_sq = vr_sq = 0.0
+    for k in range(dim):
 
-                            for k in range(dim):
-                                fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+        # project left/righ velocity to face normal
+        vnl += vl[k][i]*nx[k][i]
+        vnr += vr[k][i]*nx[k][i]
 
-                        else: # inside left fan
+        # left/right velocity square
+        vl_sq += vl[k][i]*vl[k][i]
+        vr_sq += vr[k][i]*vr[k][i]
 
-                            c  = (2.0/(gamma + 1.0))*(cl + 0.5*(gamma - 1.0)*vnl)
-                            _d = _dl*pow(c/cl, 2.0/(gamma - 1.0))
-                            _p = _pl*pow(c/cl, 2.0*gamma/(gamma - 1.0))
+    d_avg = .5*(_dl + _dr)
+    c_avg = .5*(cl + cr)
 
-                            v_sq = vn = 0.
-                            for k in range(dim):
-                                v[k]  = vl[k][i] + (c - vnl)*nx[k][i]
-                                vn   += v[k]*nx[k][i]
-                                v_sq += v[k]*v[k]
+    # primitive variable pressure Eq. 9.20
+    ppv = .5*(_pl + _pr) + .5*(vnl - vnr)*d_avg*c_avg
 
-                            fm.data[i] = _d*vn
-                            fe.data[i] = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+    p_min = fmin(_pl, _pr)
+    p_max = fmax(_pl, _pr)
 
-                            for k in range(dim):
-                                fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+    if (p_max/p_min < q_user) and (p_min <= ppv) and (ppv <= p_max):
 
-                else: # left shock
+        # primitive variable riemann solver (PVRS) Eq. 9.20
+        branch = ADAPTIVE_PVRS
+        p_star = ppv
+        u_star = .5*(vnl + vnr) + .5*(_pl - _pr)/(d_avg*c_avg)
 
-                    sl = vnl - cl*sqrt((gamma + 1.0)*p_star/(2.0*gamma*_pl)\
-                            + (gamma - 1.0)/(2.0*gamma))
+    elif ppv <= p_min:
 
-                    if(0.0 <= sl): # left state
-                        fm.data[i] = _dl*vnl
-                        fe.data[i] = (0.5*_dl*vl_sq + gamma*_pl/(gamma - 1.0))*vnl
+        # two rarefaction riemann solver (TRRS) Eq. 9.35-9.36
+        branch = ADAPTIVE_TRRS
+        z = (gamma - 1.)/(2.*gamma)
+        plr = pow(_pl/_pr, z)
 
-                        for k in range(dim):
-                            fmv[k][i] = _dl*vl[k][i]*vnl + _pl*nx[k][i]
+        u_star = (plr*vnl/cl + vnr/cr + 2.*(plr - 1.)/(gamma - 1.))/\
+                (plr/cl + 1./cr)
 
-                    else: # star left state
+        p_star  = .5*_pl*pow(1. + (gamma - 1.)*(vnl - u_star)/(2.*cl), 1./z)
+        p_star += .5*_pr*pow(1. + (gamma - 1.)*(u_star - vnr)/(2.*cr), 1./z)
 
-                        _d = _dl*(p_star/_pl + (gamma - 1.0)/(gamma + 1.0))\
-                                /(p_star*(gamma - 1.0)/((gamma + 1.0)*_pl) + 1.0)
-                        _p = p_star
+    elif p_max/p_min < q_shock:
 
-                        v_sq = vn = 0.
-                        for k in range(dim):
-                            v[k]  = vl[k][i] + (u_star - vnl)*nx[k][i]
-                            vn   += v[k]*nx[k][i]
-                            v_sq += v[k]*v[k]
+        # two shock riemann solver (TSRS) Eq. 9.42-9.43
+        branch = ADAPTIVE_TSRS
+        p0 = fmax(0., ppv)
 
-                        fm.data[i]  = _d*vn
-                        fe.data[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+        Al = 2./((gamma + 1.)*_dl)
+        Ar = 2./((gamma + 1.)*_dr)
 
-                        for k in range(dim):
-                            fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+        Bl = _pl*((gamma - 1.)/(gamma + 1.))
+        Br = _pr*((gamma - 1.)/(gamma + 1.))
 
-            else: # right of contact
+        gl = sqrt(Al/(p0 + Bl))
+        gr = sqrt(Ar/(p0 + Br))
 
-                if(p_star >= _pr): # right shock
+        p_star = (gl*_pl + gr*_pr - (vnr - vnl))/(gl + gr)
+        u_star = .5*(vnl + vnr) + .5*(gr*(p_star - _pr) - gl*(p_star - _pl))
 
-                    sr = vnr + cr*sqrt((gamma + 1.0)*p_star/(2.0*gamma*_pr)\
-                            + (gamma-1.0)/(2.0*gamma))
+    else:
 
-                    if(0.0 >= sr): # right state
-                        fm.data[i] = _dr*vnr
-                        fe.data[i] = (0.5*_dr*vr_sq + gamma*_pr/(gamma - 1.0))*vnr
+        # strong shock, newton rhapson
+        branch = ADAPTIVE_EXACT
+        p_star = get_pstar(_dl, vnl, _pl, cl,
+                _dr, vnr, _pr, cr, gamma)
+        if p_star < 0.:
+            return -1
+
+        fl = p_func(_dl, vnl, _pl, cl, gamma, p_star)
+        fr = p_func(_dr, vnr, _pr, cr, gamma, p_star)
+        u_star = 0.5*(vnl + vnr + fr - fl)
+
+    sample_flux(i, vl, vr, nx, fm, fe, fmv,
+            _dl, vnl, _pl, cl, vl_sq,
+            _dr, vnr, _pr, cr, vr_sq,
+            p_star, u_star, gamma, dim)
+
+    return branch
+
+@cython.cdivision(True)
+cdef inline void sample_flux(int i,
+        np.float64_t *vl[3], np.float64_t *vr[3], np.float64_t *nx[3],
+        np.float64_t *fm, np.float64_t *fe, np.float64_t *fmv[3],
+        double _dl, double vnl, double _pl, double cl, double vl_sq,
+        double _dr, double vnr, double _pr, double cr, double vr_sq,
+        double p_star, double u_star, double gamma, int dim) nogil:
+    """Sample the riemann solution of face i at the face, given the
+    star pressure and velocity, and store the flux in the face frame.
+    This is taken from Toro Riemann Solvers and Numerical Methods for
+    Fluid Dynamics chapter 4.
+    """
+    cdef int k
+    cdef double _d, v[3], _p, vn, v_sq
+    cdef double u_tmp
+    cdef double s_hl, s_tl, s_hr, s_tr, sl, sr
+    cdef double c, c_star_l, c_star_r
 
-                        for k in range(dim):
-                            fmv[k][i] = _dr*vr[k][i]*vnr + _pr*nx[k][i]
+    if(0.0 <= u_star): # left of contact discontinuity
+        if(p_star <= _pl): # left rarefraction
 
-                    else: # star right state
+            # sound speed of head
+            s_hl = vnl - cl
 
-                        _d = _dr*(p_star/_pr + (gamma - 1.0)/(gamma + 1.0))\
-                                /(p_star*(gamma - 1.0)/((gamma + 1.0)*_pr) + 1.0)
-                        _p = p_star
+            if(0.0 <= s_hl): # left state
+                fm[i]  = _dl*vnl
+                fe[i]  = (0.5*_dl*vl_sq + gamma*_pl/(gamma - 1.0))*vnl
 
-                        v_sq = vn = 0.
-                        for k in range(dim):
-                            v[k]  = vr[k][i] + (u_star - vnr)*nx[k][i]
-                            vn   += v[k]*nx[k][i]
-                            v_sq += v[k]*v[k]
+                for k in range(dim):
+                    fmv[k][i] = _dl*vl[k][i]*vnl + _pl*nx[k][i]
 
-                        fm.data[i]  = _d*vn
-                        fe.data[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+            else: # left rarefaction
 
-                        for k in range(dim):
-                            fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+                # sound speed of star state and tail of rarefraction
+                c_star_l = cl*pow(p_star/_pl, (gamma - 1.0)/(2.0*gamma))
+                s_tl = u_star - c_star_l
 
-                else: # right rarefaction
+                if(0.0 >= s_tl): # star left state
+                    _d = _dl*pow(p_star/_pl, 1.0/gamma)
+                    _p = p_star
 
-                    s_hr = vnr + cr
+                    v_sq = vn = 0.
+                    for k in range(dim):
+                        v[k]  = vl[k][i] + (u_star - vnl)*nx[k][i]
+                        vn   += v[k]*nx[k][i]
+                        v_sq += v[k]*v[k]
 
-                    if(0.0 >= s_hr): # right data state
-                        fm.data[i]  = _dr*vnr
-                        fe.data[i]  = (0.5*_dr*vr_sq + gamma*_pr/(gamma - 1.0))*vnr
+                    fm[i]  = _d*vn
+                    fe[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
 
-                        for k in range(dim):
-                            fmv[k][i] = _dr*vr[k][i]*vnr + _pr*nx[k][i]
+                    for k in range(dim):
+                        fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
 
-                    else:
+                else: # inside left fan
 
-                        # sound speed of the star state and sound speed
-                        # of the tail of the rarefraction
-                        c_star_r = cr*pow(p_star/_pr, (gamma-1.0)/(2.0*gamma))
-                        s_tr = u_star + c_star_r
+                    c  = (2.0/(gamma + 1.0))*(cl + 0.5*(gamma - 1.0)*vnl)
+                    _d = _dl*pow(c/cl, 2.0/(gamma - 1.0))
+                    _p = _pl*pow(c/cl, 2.0*gamma/(gamma - 1.0))
 
-                        if(0.0 <= s_tr): # star left state
-                            _d = _dr*pow(p_star/_pr, 1.0/gamma)
-                            _p = p_star
+                    v_sq = vn = 0.
+                    for k in range(dim):
+                        v[k]  = vl[k][i] + (c - vnl)*nx[k][i]
+                        vn   += v[k]*nx[k][i]
+                        v_sq += v[k]*v[k]
 
-                            v_sq = vn = 0.
-                            for k in range(dim):
-                                v[k]  = vr[k][i] + (u_star - vnr)*nx[k][i]
-                                vn   += v[k]*nx[k][i]
-                                v_sq += v[k]*v[k]
+                    fm[i] = _d*vn
+                    fe[i] = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
 
-                            fm.data[i]  = _d*vn
-                            fe.data[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+                    for k in range(dim):
+                        fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
 
-                            for k in range(dim):
-                                fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+        else: # left shock
 
-                        else:
+            sl = vnl - cl*sqrt((gamma + 1.0)*p_star/(2.0*gamma*_pl)\
+                    + (gamma - 1.0)/(2.0*gamma))
 
-                            # sampled point is inside right fan
-                            c = (2.0/(gamma + 1.0))*(cr - 0.5*(gamma - 1.0)*vnr)
-                            u_tmp = (2.0/(gamma + 1.0))*(-cr + 0.5*(gamma-1.0)*vnr)
+            if(0.0 <= sl): # left state
+                fm[i] = _dl*vnl
+                fe[i] = (0.5*_dl*vl_sq + gamma*_pl/(gamma - 1.0))*vnl
 
-                            _d = _dr*pow(c/cr, 2.0/(gamma - 1.0))
-                            _p = _pr*pow(c/cr, 2.0*gamma/(gamma - 1.0))
+                for k in range(dim):
+                    fmv[k][i] = _dl*vl[k][i]*vnl + _pl*nx[k][i]
 
-                            v_sq = vn = 0.
-                            for k in range(dim):
-                                v[k]  = vr[k][i] + (u_tmp - vnr)*nx[k][i]
-                                vn   += v[k]*nx[k][i]
-                                v_sq += v[k]*v[k]
+            else: # star left state
 
-                            fm.data[i]  = _d*vn
-                            fe.data[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+                _d = _dl*(p_star/_pl + (gamma - 1.0)/(gamma + 1.0))\
+                        /(p_star*(gamma - 1.0)/((gamma + 1.0)*_pl) + 1.0)
+                _p = p_star
 
-                            for k in range(dim):
-                                fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+                v_sq = vn = 0.
+                for k in range(dim):
+                    v[k]  = vl[k][i] + (u_star - vnl)*nx[k][i]
+                    vn   += v[k]*nx[k][i]
+                    v_sq += v[k]*v[k]
 
-        self.deboost(self.fluxes, mesh.faces, dim)
+                fm[i]  = _d*vn
+                fe[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
 
-    @cython.cdivision(True)
-    cdef inline double p_guess(self, double dl, double ul, double pl, double cl,
-            double dr, double ur, double pr, double cr, double gamma) nogil:
-        """Calculate starting pressure for iterative exact scheme. This is taken
-        from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics chapter 4.
+                for k in range(dim):
+                    fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
 
+    else: # right of contact
 
-        """
-        cdef double ppv
-        cdef double p_lr, p_tl
-        cdef double gl, gr, p0
-        cdef double p_star, p_max, p_min, q_max
-
-        # initial guess for pressure Eq. 4.47
-        ppv = .5*(pl + pr) - .125*(ur - ul)*(dl + dr)*(cl + cr)
-
-        p_star = max(0., ppv)
-        p_max  = max(pl, pr)
-        p_min  = min(pl, pr)
-        q_max  = p_max/p_min
-
-        if ((q_max <= 2.) and (p_min <= ppv <= p_max)):
-            p0 = ppv
-
-        elif (ppv <= p_min):
-            p_lr   = pow(pl/pr, (gamma - 1.)/(2.*gamma))
-            u_star = (p_lr*ul/cl + ur/cr + 2.*(p_lr - 1.)/(gamma - 1.))
-            u_star = u_star/(p_lr/cl + 1./cr)
-            p_tl   = pow(1. + (gamma - 1.)*(ul - u_star)/(2.*cl), 2.*gamma/(gamma - 1.))
-            p_tr   = pow(1. + (gamma - 1.)*(u_star - ur)/(2.*cr), 2.*gamma/(gamma - 1.))
-            p0 = .5*(pl*p_tl + pr*p_tr)
+        if(p_star >= _pr): # right shock
 
-        else:
-            gl = sqrt((2./(dl*(gamma + 1.)))/((gamma - 1.)*pl/(gamma + 1.) + ppv))
-            gr = sqrt((2./(dr*(gamma + 1.)))/((gamma - 1.)*pr/(gamma + 1.) + ppv))
-            p0 = (gl*pl + gr*pr - (ur - ul))/(gr + gl)
+            sr = vnr + cr*sqrt((gamma + 1.0)*p_star/(2.0*gamma*_pr)\
+                    + (gamma-1.0)/(2.0*gamma))
 
-        return p0
+            if(0.0 >= sr): # right state
+                fm[i] = _dr*vnr
+                fe[i] = (0.5*_dr*vr_sq + gamma*_pr/(gamma - 1.0))*vnr
 
-    @cython.cdivision(True)
-    cdef inline double p_func(self, double d, double u, double p,
-            double c, double gamma, double p_old) nogil:
-        """
-        Calculate the derivative of the jump across the wave.
-        Reference: Toro (2009): Chapter 4
-        """
-        cdef double f, Ak, Bk
+                for k in range(dim):
+                    fmv[k][i] = _dr*vr[k][i]*vnr + _pr*nx[k][i]
 
-        # rarefaction wave Eq: 4.6b and Eq. 4.7b
-        if (p_old <= p):
-            f = 2.*c/(gamma - 1.)*(pow(p_old/p, (gamma - 1.)/(2.*gamma)) - 1.)
+            else: # star right state
 
-        # shock wave Eq. 4.6a and Eq. 4.7a
-        else:
-            Ak = 2./(d*(gamma + 1.))
-            Bk = p*(gamma - 1.)/(gamma + 1.)
-            f = (p_old - p)*sqrt(Ak/(p_old + Bk))
-
-        return f
-
-    @cython.cdivision(True)
-    cdef inline double p_func_deriv(self, double d, double u, double p,
-            double c, double gamma, double p_old) nogil:
-        """Calculate the derivative of the jump across the wave. This was
-        taken from Toro Riemann Solvers and Numerical Methods for Fluid
-        Dynamics chapter 4.
-        """
-        cdef double df, Ak, Bk
+                _d = _dr*(p_star/_pr + (gamma - 1.0)/(gamma + 1.0))\
+                        /(p_star*(gamma - 1.0)/((gamma + 1.0)*_pr) + 1.0)
+                _p = p_star
 
-        # derivative for rarefaction wave Eq. 4.37
-        if (p_old <= p):
-            df = pow(p_old/p, -(gamma + 1.)/(2.*gamma))/(c*d)
+                v_sq = vn = 0.
+                for k in range(dim):
+                    v[k]  = vr[k][i] + (u_star - vnr)*nx[k][i]
+                    vn   += v[k]*nx[k][i]
+                    v_sq += v[k]*v[k]
 
-        # derivative for shock wave
-        else:
-            # Eq: 4.8 and Eq. 4.37
-            Ak = 2./(d*(gamma + 1.))
-            Bk = p*(gamma - 1.)/(gamma + 1.)
-            df = sqrt(Ak/(p_old + Bk))*(1. - .5*(p_old - p)/(Bk + p_old))
-
-        return df
-
-    @cython.cdivision(True)
-    cdef inline double get_pstar(self, double dl, double ul, double pl, double cl,
-            double dr, double ur, double pr, double cr, double gamma) nogil:
-        """Calculate star pressure by iteration. This was taken from Toro
-        Riemann Solvers and Numerical Methods for Fluid Dynamics chapter 4.
-        """
-        cdef double TOL = 1.0e-6
-        cdef int MAX_ITER = 1000
+                fm[i]  = _d*vn
+                fe[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+
+                for k in range(dim):
+                    fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+
+        else: # right rarefaction
+
+            s_hr = vnr + cr
+
+            if(0.0 >= s_hr): # right data state
+                fm[i]  = _dr*vnr
+                fe[i]  = (0.5*_dr*vr_sq + gamma*_pr/(gamma - 1.0))*vnr
+
+                for k in range(dim):
+                    fmv[k][i] = _dr*vr[k][i]*vnr + _pr*nx[k][i]
+
+            else:
+
+                # sound speed of the star state and sound speed
+                # of the tail of the rarefraction
+                c_star_r = cr*pow(p_star/_pr, (gamma-1.0)/(2.0*gamma))
+                s_tr = u_star + c_star_r
+
+                if(0.0 <= s_tr): # star left state
+                    _d = _dr*pow(p_star/_pr, 1.0/gamma)
+                    _p = p_star
+
+                    v_sq = vn = 0.
+                    for k in range(dim):
+                        v[k]  = vr[k][i] + (u_star - vnr)*nx[k][i]
+                        vn   += v[k]*nx[k][i]
+                        v_sq += v[k]*v[k]
+
+                    fm[i]  = _d*vn
+                    fe[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+
+                    for k in range(dim):
+                        fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+
+                else:
+
+                    # sampled point is inside right fan
+                    c = (2.0/(gamma + 1.0))*(cr - 0.5*(gamma - 1.0)*vnr)
+                    u_tmp = (2.0/(gamma + 1.0))*(-cr + 0.5*(gamma-1.0)*vnr)
+
+                    _d = _dr*pow(c/cr, 2.0/(gamma - 1.0))
+                    _p = _pr*pow(c/cr, 2.0*gamma/(gamma - 1.0))
+
+                    v_sq = vn = 0.
+                    for k in range(dim):
+                        v[k]  = vr[k][i] + (u_tmp - vnr)*nx[k][i]
+                        vn   += v[k]*nx[k][i]
+                        v_sq += v[k]*v[k]
+
+                    fm[i]  = _d*vn
+                    fe[i]  = (0.5*_d*v_sq + gamma*_p/(gamma - 1.0))*vn
+
+                    for k in range(dim):
+                        fmv[k][i] = _d*v[k]*vn + _p*nx[k][i]
+
+@cython.cdivision(True)
+cdef inline double p_guess(double dl, double ul, double pl, double cl,
+        double dr, double ur, double pr, double cr, double gamma) nogil:
+    """Calculate starting pressure for iterative exact scheme. This is taken
+    from Toro Riemann Solvers and Numerical Methods for Fluid Dynamics chapter 4.
+
+
+    """
+    cdef double ppv, u_star
+    cdef double p_lr, p_tl, p_tr
+    cdef double gl, gr, p0
+    cdef double p_star, p_max, p_min, q_max
+
+    # initial guess for pressure Eq. 4.47
+    ppv = .5*(pl + pr) - .125*(ur - ul)*(dl + dr)*(cl + cr)
+
+    p_star = max(0., ppv)
+    p_max  = max(pl, pr)
+    p_min  = min(pl, pr)
+    q_max  = p_max/p_min
+
+    if ((q_max <= 2.) and (p_min <= ppv <= p_max)):
+        p0 = ppv
+
+    elif (ppv <= p_min):
+        p_lr   = pow(pl/pr, (gamma - 1.)/(2.*gamma))
+        u_star = (p_lr*ul/cl + ur/cr + 2.*(p_lr - 1.)/(gamma - 1.))
+        u_star = u_star/(p_lr/cl + 1./cr)
+        p_tl   = pow(1. + (gamma - 1.)*(ul - u_star)/(2.*cl), 2.*gamma/(gamma - 1.))
+        p_tr   = pow(1. + (gamma - 1.)*(u_star - ur)/(2.*cr), 2.*gamma/(gamma - 1.))
+        p0 = .5*(pl*p_tl + pr*p_tr)
+
+    else:
+        gl = sqrt((2./(dl*(gamma + 1.)))/((gamma - 1.)*pl/(gamma + 1.) + ppv))
+        gr = sqrt((2./(dr*(gamma + 1.)))/((gamma - 1.)*pr/(gamma + 1.) + ppv))
+        p0 = (gl*pl + gr*pr - (ur - ul))/(gr + gl)
+
+    return p0
+
+@cython.cdivision(True)
+cdef inline double p_func(double d, double u, double p,
+        double c, double gamma, double p_old) nogil:
+    """
+    Calculate the derivative of the jump across the wave.
+    Reference: Toro (2009): Chapter 4
+    """
+    cdef double f, Ak, Bk
+
+    # rarefaction wave Eq: 4.6b and Eq. 4.7b
+    if (p_old <= p):
+        f = 2.*c/(gamma - 1.)*(pow(p_old/p, (gamma - 1.)/(2.*gamma)) - 1.)
+
+    # shock wave Eq. 4.6a and Eq. 4.7a
+    else:
+        Ak = 2./(d*(gamma + 1.))
+        Bk = p*(gamma - 1.)/(gamma + 1.)
+        f = (p_old - p)*sqrt(Ak/(p_old + Bk))
+
+    return f
+
+@cython.cdivision(True)
+cdef inline double p_func_deriv(double d, double u, double p,
+        double c, double gamma, double p_old) nogil:
+    """Calculate the derivative of the jump across the wave. This was
+    taken from Toro Riemann Solvers and Numerical Methods for Fluid
+    Dynamics chapter 4.
+    """
+    cdef double df, Ak, Bk
+
+    # derivative for rarefaction wave Eq. 4.37
+    if (p_old <= p):
+        df = pow(p_old/p, -(gamma + 1.)/(2.*gamma))/(c*d)
+
+    # derivative for shock wave
+    else:
+        # Eq: 4.8 and Eq. 4.37
+        Ak = 2./(d*(gamma + 1.))
+        Bk = p*(gamma - 1.)/(gamma + 1.)
+        df = sqrt(Ak/(p_old + Bk))*(1. - .5*(p_old - p)/(Bk + p_old))
+
+    return df
+
+@cython.cdivision(True)
+cdef inline double get_pstar(double dl, double ul, double pl, double cl,
+        double dr, double ur, double pr, double cr, double gamma) nogil:
+    """Calculate star pressure by iteration. This was taken from Toro
+    Riemann Solvers and Numerical Methods for Fluid Dynamics chapter 4.
+    Returns -1 if the iteration did not converge.
+    """
+    cdef double TOL = 1.0e-6
+    cdef int MAX_ITER = 1000
 
-        cdef int i = 0
-        cdef double p_old, p_new, p
-        cdef double fr, fl, df_r, df_l
+    cdef int i = 0
+    cdef double p_old, p_new
+    cdef double fr, fl, dfr, dfl
 
-        p_old = self.p_guess(dl, ul, pl, cl, dr, ur, pr, cr, gamma)
-        while(i < MAX_ITER):
+    p_old = p_guess(dl, ul, pl, cl, dr, ur, pr, cr, gamma)
+    while(i < MAX_ITER):
 
-            fl  = self.p_func(dl, ul, pl, cl, gamma, p_old)
-            fr  = self.p_func(dr, ur, pr, cr, gamma, p_old)
-            dfl = self.p_func_deriv(dl, ul, pl, cl, gamma, p_old)
-            dfr = self.p_func_deriv(dr, ur, pr, cr, gamma, p_old)
+        fl  = p_func(dl, ul, pl, cl, gamma, p_old)
+        fr  = p_func(dr, ur, pr, cr, gamma, p_old)
+        dfl = p_func_deriv(dl, ul, pl, cl, gamma, p_old)
+        dfr = p_func_deriv(dr, ur, pr, cr, gamma, p_old)
 
-            p_new = p_old - (fl + fr + ur - ul)/(dfl + dfr)
+        p_new = p_old - (fl + fr + ur - ul)/(dfl + dfr)
 
-            if ( 2.*fabs((p_new - p_old)/(p_new + p_old)) ) <= TOL:
-                return p_new
+        if ( 2.*fabs((p_new - p_old)/(p_new + p_old)) ) <= TOL:
+            return p_new
 
-            if (p_new < 0.):
-                p_new = TOL
+        if (p_new < 0.):
+            p_new = TOL
 
-            p_old = p_new
-            i += 1
+        p_old = p_new
+        i += 1
 
-        # failed to converge
-        with gil:
-            raise RuntimeError('No convergence in Exact Riemann Solver')
+    # failed to converge
+    return -1
 
 cdef inline void vacuum(
         double dl, double vl[3], double pl, double vnl, double cl,
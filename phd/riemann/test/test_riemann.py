@@ -3,10 +3,13 @@ import numpy as np
 
 
 from phd.mesh.mesh import Mesh
-from phd.riemann.riemann import HLL
+from phd.domain.boundary import Reflective
+from phd.domain.domain_manager import DomainManager
+from phd.riemann.riemann import HLL, HLLC, Exact, Adaptive
 from phd.equation_state.equation_state import IdealGas
+from phd.utils.particle_tags import ParticleTAGS
 from phd.utils.particle_creator import HydroParticleCreator
-from phd.reconstruction.reconstruction import PieceWiseConstant
+from phd.reconstruction.reconstruction import PieceWiseConstant, PieceWiseLinear
 
 class TestHLLSetup(unittest.TestCase):
     """Tests for the Reconstruction class."""
@@ -121,5 +124,349 @@ class TestHLLFlux(unittest.TestCase):
         for field in self.riemann.fluxes.carrays.keys():
             self.assertAlmostEqual(self.riemann.fluxes[field][0], ans[field])
 
+class RandomFacesSetup(object):
+    """Random left/right states across randomly oriented faces."""
+    def setUp(self):
+
+        n = 1000
+        self.particles = HydroParticleCreator(num=2, dim=2)
+
+        # mesh class
+        self.mesh = Mesh()
+        self.mesh.register_fields(self.particles)
+        self.mesh.initialize()
+
+        # equation of state class
+        self.eos = IdealGas(gamma=1.4)
+
+        # reconstruction class
+        self.reconstruction = PieceWiseConstant()
+        self.reconstruction.add_fields(self.particles)
+        self.reconstruction.initialize()
+
+        # random left/right states and faces
+        np.random.seed(0)
+        lt = self.reconstruction.left_states
+        rt = self.reconstruction.right_states
+        lt.resize(n); rt.resize(n)
+        for state in [lt, rt]:
+            state["density"][:]    = np.random.uniform(0.1, 1.0, size=n)
+            state["velocity-x"][:] = np.random.uniform(-1.0, 1.0, size=n)
+            state["velocity-y"][:] = np.random.uniform(-1.0, 1.0, size=n)
+            state["pressure"][:]   = np.random.uniform(0.1, 1.0, size=n)
+
+        faces = self.mesh.faces
+        faces.resize(n)
+        theta = np.random.uniform(0, 2*np.pi, size=n)
+        faces["normal-x"][:] = np.cos(theta)
+        faces["normal-y"][:] = np.sin(theta)
+        faces["velocity-x"][:] = np.random.uniform(-0.5, 0.5, size=n)
+        faces["velocity-y"][:] = np.random.uniform(-0.5, 0.5, size=n)
+
+    def compute_fluxes(self, riemann):
+        riemann.add_fields(self.particles)
+        riemann.initialize()
+        riemann.compute_fluxes(self.particles, self.mesh,
+                self.reconstruction, self.eos)
+        return dict((field, np.copy(riemann.fluxes[field]))
+                for field in riemann.fluxes.carrays.keys())
+
+class RandomBoxSetup(object):
+    """Random particles in a reflective unit box with a built mesh."""
+    num_passive = 0
+
+    def setUp(self):
+
+        n = 100
+        self.particles = HydroParticleCreator(num=n, dim=2,
+                num_passive=self.num_passive)
+
+        np.random.seed(0)
+        self.initial_conditions(n)
+
+        self.domain_manager = DomainManager(xmin=[0., 0.], xmax=[1., 1.],
+                initial_radius=0.1)
+        self.domain_manager.set_boundary_condition(Reflective())
+        self.domain_manager.register_fields(self.particles)
+        self.domain_manager.initialize()
+
+        self.mesh = Mesh()
+        self.mesh.register_fields(self.particles)
+        self.mesh.initialize()
+
+        self.eos = IdealGas(gamma=1.4)
+
+        self.reconstruction = PieceWiseLinear()
+        self.reconstruction.add_fields(self.particles)
+        self.reconstruction.initialize()
+
+        self.mesh.build_geometry(self.particles, self.domain_manager)
+        self.domain_manager.boundary_condition.update_fields(
+                self.particles, self.domain_manager)
+        self.eos.conservative_from_primitive(self.particles)
+
+    def initial_conditions(self, n):
+        """Random particles in a unit box with random primitive values."""
+        self.particles["position-x"][:] = np.random.uniform(size=n)
+        self.particles["position-y"][:] = np.random.uniform(size=n)
+        self.particles["density"][:] = np.random.uniform(1.0, 2.0, size=n)
+        self.particles["velocity-x"][:] = np.random.uniform(-0.1, 0.1, size=n)
+        self.particles["velocity-y"][:] = np.random.uniform(-0.1, 0.1, size=n)
+        self.particles["pressure"][:] = np.random.uniform(1.0, 2.0, size=n)
+
+class TestRiemannThreads(RandomFacesSetup, unittest.TestCase):
+    """Tests for solving faces with multiple threads."""
+    def test_threaded_fluxes(self):
+        """
+        Test if solving faces with multiple threads gives the same
+        fluxes as solving them in serial.
+        """
+        for riemann_class in [HLL, HLLC, Exact, Adaptive]:
+            serial = self.compute_fluxes(riemann_class(num_threads=1))
+            threaded = self.compute_fluxes(riemann_class(num_threads=4))
+
+            for field in serial.keys():
+                self.assertTrue(np.array_equal(serial[field], threaded[field]))
+
+class TestAdaptiveRiemann(RandomFacesSetup, unittest.TestCase):
+    """Tests for the adaptive riemann solver."""
+    def test_strong_shock(self):
+        """
+        Test if strong shocks are solved by the exact iteration.
+        """
+        lt = self.reconstruction.left_states
+        rt = self.reconstruction.right_states
+        n = lt.get_carray_size()
+
+        # sod shock tube, pressure ratio above q_shock
+        lt["pressure"][:] = 1.0; rt["pressure"][:] = 0.01
+        for state in [lt, rt]:
+            state["velocity-x"][:] = 0.0
+            state["velocity-y"][:] = 0.0
+
+        riemann = Adaptive()
+        adaptive = self.compute_fluxes(riemann)
+        exact = self.compute_fluxes(Exact())
+
+        self.assertEqual(riemann.num_exact, n)
+        for field in exact.keys():
+            self.assertTrue(np.array_equal(adaptive[field], exact[field]))
+
+    def test_smooth_states(self):
+        """
+        Test if small jumps are solved by the approximate solvers and
+        agree with the exact solution.
+        """
+        lt = self.reconstruction.left_states
+        rt = self.reconstruction.right_states
+        n = lt.get_carray_size()
+
+        # small perturbations across each face
+        for field in ["density", "velocity-x", "velocity-y", "pressure"]:
+            rt[field][:] = lt[field]*(1.0 + 1.0e-4*np.random.uniform(-1, 1, size=n))
+
+        riemann = Adaptive()
+        adaptive = self.compute_fluxes(riemann)
+        exact = self.compute_fluxes(Exact())
+
+        self.assertEqual(riemann.num_exact, 0)
+        self.assertEqual(riemann.num_pvrs + riemann.num_trrs +\
+                riemann.num_tsrs, n)
+        for field in exact.keys():
+            np.testing.assert_allclose(adaptive[field], exact[field],
+                    rtol=1.0e-5, atol=1.0e-7)
+
+class TestQuiescentFaces(RandomFacesSetup, unittest.TestCase):
+    """Tests for skipping the solver on faces with matching states."""
+    def test_matching_states(self):
+        """
+        Test if faces with matching states take the physical flux
+        and agree with the solvers.
+        """
+        lt = self.reconstruction.left_states
+        rt = self.reconstruction.right_states
+        n = lt.get_carray_size()
+
+        for field in ["density", "velocity-x", "velocity-y", "pressure"]:
+            rt[field][:] = lt[field]
+
+        for riemann_class in [HLL, HLLC, Exact, Adaptive]:
+            riemann = riemann_class(quiescent_tolerance=1.0e-12)
+            quiescent = self.compute_fluxes(riemann)
+            solved = self.compute_fluxes(riemann_class())
+
+            self.assertEqual(riemann.num_quiescent, n)
+            for field in solved.keys():
+                np.testing.assert_allclose(quiescent[field], solved[field],
+                        rtol=1.0e-10, atol=1.0e-12)
+
+    def test_distinct_states(self):
+        """
+        Test if faces with different states are solved.
+        """
+        for riemann_class in [HLL, HLLC, Exact, Adaptive]:
+            riemann = riemann_class(quiescent_tolerance=1.0e-12)
+            quiescent = self.compute_fluxes(riemann)
+            solved = self.compute_fluxes(riemann_class())
+
+            self.assertEqual(riemann.num_quiescent, 0)
+            for field in solved.keys():
+                self.assertTrue(np.array_equal(quiescent[field], solved[field]))
+
+class TestFusedFaceUpdate(RandomBoxSetup, unittest.TestCase):
+    """Tests for reconstructing, solving and updating faces in one pass."""
+    def setUp(self):
+        super(TestFusedFaceUpdate, self).setUp()
+
+        # static faces
+        self.mesh.faces["velocity-x"][:] = 0.
+        self.mesh.faces["velocity-y"][:] = 0.
+
+    def test_fused_update(self):
+        """
+        Test if the fused face update gives the same conservative
+        values as reconstruction, riemann and flux update in turn.
+        """
+        dt = 1.0e-3
+        fields = self.particles.carray_named_groups["conservative"]
+        initial = dict((field, np.copy(self.particles[field])) for field in fields)
+
+        for riemann_class in [HLL, HLLC, Exact, Adaptive]:
+            riemann = riemann_class()
+            riemann.add_fields(self.particles)
+            riemann.initialize()
+
+            # reconstruction, riemann and flux update in turn
+            for field in fields:
+                self.particles[field][:] = initial[field]
+
+            self.reconstruction.compute_gradients(self.particles, self.mesh,
+                    self.domain_manager)
+            self.reconstruction.compute_states(self.particles, self.mesh,
+                    self.eos.get_gamma(), self.domain_manager, 0.5*dt,
+                    riemann.boost)
+            riemann.compute_fluxes(self.particles, self.mesh,
+                    self.reconstruction, self.eos)
+            self.mesh.update_from_fluxes(self.particles, riemann, dt)
+            separate = dict((field, np.copy(self.particles[field])) for field in fields)
+
+            # fused face update
+            for field in fields:
+                self.particles[field][:] = initial[field]
+
+            self.reconstruction.compute_gradients(self.particles, self.mesh,
+                    self.domain_manager)
+            riemann.update_from_faces(self.particles, self.mesh,
+                    self.reconstruction, self.eos, dt)
+
+            for field in fields:
+                np.testing.assert_allclose(self.particles[field], separate[field],
+                        rtol=1.0e-12)
+
+class TestPassiveScalars(RandomBoxSetup, unittest.TestCase):
+    """Tests for advecting passive scalars with the mass flux."""
+    num_passive = 2
+
+    def setUp(self):
+        super(TestPassiveScalars, self).setUp()
+
+        self.riemann = HLLC()
+        self.riemann.add_fields(self.particles)
+        self.riemann.initialize()
+
+    def initial_conditions(self, n):
+        """First species fills every cell and second is random."""
+        super(TestPassiveScalars, self).initial_conditions(n)
+        self.particles["passive-scalars"][:, 0] = 1.0
+        self.particles["passive-scalars"][:, 1] = np.random.uniform(size=n)
+
+    def test_passive_flux(self):
+        """
+        Test if the flux of each species is the mass flux times the
+        upwind reconstructed mass fraction and a uniform species
+        follows the mass.
+        """
+        dt = 1.0e-3
+        pc = self.particles
+
+        self.reconstruction.compute_gradients(pc, self.mesh,
+                self.domain_manager)
+        self.reconstruction.compute_states(pc, self.mesh,
+                self.eos.get_gamma(), self.domain_manager, 0.5*dt,
+                self.riemann.boost)
+        self.riemann.compute_fluxes(pc, self.mesh,
+                self.reconstruction, self.eos)
+
+        fm = self.riemann.fluxes["mass"]
+        psl = self.reconstruction.left_states["passive-scalars"]
+        psr = self.reconstruction.right_states["passive-scalars"]
+        upwind = np.where((fm > 0.)[:, np.newaxis], psl, psr)
+
+        self.assertEqual(self.riemann.fluxes["passive-mass"].shape, (fm.size, 2))
+        np.testing.assert_allclose(self.riemann.fluxes["passive-mass"],
+                fm[:, np.newaxis]*upwind, rtol=1.0e-14)
+
+        # uniform species stays uniform
+        np.testing.assert_allclose(psl[:, 0], 1.0, rtol=1.0e-12)
+        np.testing.assert_allclose(psr[:, 0], 1.0, rtol=1.0e-12)
+
+        self.mesh.update_from_fluxes(pc, self.riemann, dt)
+        self.eos.primitive_from_conservative(pc)
+
+        real = pc["tag"] == ParticleTAGS.Real
+        np.testing.assert_allclose(pc["passive-mass"][real, 0], pc["mass"][real],
+                rtol=1.0e-12)
+        np.testing.assert_allclose(pc["passive-scalars"][real, 0], 1.0,
+                rtol=1.0e-12)
+
+class TestTimeStep(unittest.TestCase):
+    """Tests for the time step of the riemann solvers."""
+    def setUp(self):
+
+        n = 100
+        self.particles = HydroParticleCreator(num=n, dim=2)
+
+        mesh = Mesh()
+        mesh.register_fields(self.particles)
+
+        np.random.seed(0)
+        self.particles["density"][:] = np.random.uniform(0.1, 1.0, size=n)
+        self.particles["velocity-x"][:] = np.random.uniform(-1.0, 1.0, size=n)
+        self.particles["velocity-y"][:] = np.random.uniform(-1.0, 1.0, size=n)
+        self.particles["pressure"][:] = np.random.uniform(0.1, 1.0, size=n)
+        self.particles["volume"][:] = np.random.uniform(0.5, 1.0, size=n)/n
+
+        # ghost particles do not constrain the time step
+        self.particles["tag"][n/2:] = ParticleTAGS.Ghost
+        self.particles["volume"][n/2:] = 1.0e-8
+
+        self.eos = IdealGas(gamma=1.4)
+
+    def test_time_step(self):
+        """
+        Test if the time step of each particle is stored and the
+        smallest of the real particles is returned.
+        """
+        pc = self.particles
+        c = np.sqrt(1.4*pc["pressure"]/pc["density"])
+        R = np.sqrt(pc["volume"]/np.pi)
+        v = np.sqrt(pc["velocity-x"]**2 + pc["velocity-y"]**2)
+        real = pc["tag"] == ParticleTAGS.Real
+
+        for riemann, signal in [(HLL(boost=False), c + v), (Exact(), c)]:
+            riemann.add_fields(pc)
+            dt = riemann.compute_time_step(pc, self.eos)
+
+            cell_dt = riemann.cfl*R/signal
+            np.testing.assert_allclose(pc["dt"], cell_dt, rtol=1.0e-12)
+            self.assertAlmostEqual(dt, cell_dt[real].min(), places=14)
+
+    def test_cfl(self):
+        """
+        Test if each riemann solver keeps the given cfl.
+        """
+        for riemann_class in [HLL, HLLC, Exact, Adaptive]:
+            self.assertEqual(riemann_class(cfl=0.3).cfl, 0.3)
+
 if __name__ == "__main__":
     unittest.main()
@@ -119,3 +119,35 @@ cdef class LongLongArray(BaseArray):
     cpdef copy_values(self, LongArray indices, BaseArray dest)
     cpdef paste_values(self, LongArray indices, BaseArray dest)
     cpdef add_values(self, LongArray indices, BaseArray dest)
+
+cdef class DoubleBlockArray(BaseArray):
+    """This class defines a managed block of np.float64_t with
+    num_components values per item"""
+    cdef np.float64_t *data
+    cdef readonly int num_components
+    cdef readonly bint soa
+    cdef list _component_arrays
+
+    cdef _setup_npy_array(self)
+    cdef _update_npy_arrays(self)
+    cdef _reallocate(self, long size)
+    cdef long offset(self, long pid, int k)
+    cdef np.float64_t* get_data_ptr(self)
+    cdef np.float64_t* get_component_ptr(self, int k) except NULL
+
+    cpdef str get_layout(self)
+    cpdef np.ndarray get_component_array(self, int k)
+
+    cpdef reserve(self, long size)
+    cpdef resize(self, long size)
+    cpdef reset(self)
+    cpdef shrink(self, long size)
+    cpdef squeeze(self)
+    cpdef remove(self, np.ndarray index_list, bint input_sorted=*)
+    cpdef extend(self, np.ndarray in_array)
+
+    cpdef align_array(self, np.ndarray new_indices)
+    cpdef str get_c_type(self)
+    cpdef copy_values(self, LongArray indices, BaseArray dest)
+    cpdef paste_values(self, LongArray indices, BaseArray dest)
+    cpdef add_values(self, LongArray indices, BaseArray dest)
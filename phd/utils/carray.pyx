@@ -11,8 +11,14 @@ cdef extern from "numpy/arrayobject.h":
     ctypedef struct PyArrayObject:
         char *data
         np.npy_intp *dimensions
+        np.npy_intp *strides
+
+    cdef enum:
+        NPY_ARRAY_C_CONTIGUOUS
+        NPY_ARRAY_F_CONTIGUOUS
 
     np.ndarray PyArray_SimpleNewFromData(int, np.npy_intp*, int, void*)
+    void PyArray_UpdateFlags(PyArrayObject*, int)
 
 # numpy module initialization call
 import_array()
@@ -1030,3 +1036,346 @@ cdef class LongLongArray(BaseArray):
 
         for i in range(indices.length):
             dest_array.data[indices.data[i]] += self.data[i]
+
+cdef class DoubleBlockArray(BaseArray):
+    """Represents a block of 64 bit floats with a fixed number of
+    components per item, exposed as a two dimensional numpy array with
+    one row per item. Components can be stored item by item (aos) where
+    item n occupies data[n*num_components:(n+1)*num_components] or
+    component by component (soa) where component k occupies
+    data[k*alloc:k*alloc+length]."""
+
+    def __cinit__(self, long n=0, int num_components=1, str layout="aos"):
+        """
+        Constructor for the class.
+
+        Mallocs a memory buffer of size (n*num_components*sizeof(np.float64_t))
+        and sets up the numpy array.
+
+        Parameters:
+        -----------
+        n : int
+            Number of items of the initial buffer.
+        num_components : int
+            Number of values per item.
+        layout : str
+            Either "aos" to store the components of an item contiguous
+            or "soa" to store each component contiguous.
+
+        Data attributes:
+        ----------------
+        data : np.float64_t*
+            Pointer to np.float64 buffer.
+        alloc : int
+            Number of items the data buffer can hold.
+        length : int
+            Number of items used in the buffer.
+        num_components : int
+            Number of values per item.
+        soa : bint
+            True if each component is contiguous.
+        """
+        if num_components < 1:
+            raise ValueError, 'number of components has to be positive'
+
+        if layout == "aos":
+            self.soa = False
+        elif layout == "soa":
+            self.soa = True
+        else:
+            raise ValueError, 'unrecognized layout: %s' % layout
+
+        self.num_components = num_components
+        self.length = n
+        if n == 0:
+            n = 16
+        self.alloc = n
+        self.data = <np.float64_t*> stdlib.malloc(n*num_components*sizeof(np.float64_t))
+        if self.data == <np.float64_t*> NULL:
+            raise MemoryError
+
+        self._setup_npy_array()
+
+    def __dealloc__(self):
+        """Frees the c array."""
+        stdlib.free(<void*>self.data)
+
+    def __getitem__(self, long pid):
+        """Get values of item at position pid."""
+        return self._npy_array[pid]
+
+    def __setitem__(self, long pid, value):
+        """Set values of item at position pid."""
+        self._npy_array[pid] = value
+
+    cdef _setup_npy_array(self):
+        """Create two dimensional numpy array of the data, one row
+        per item, and a one dimensional numpy array of each component.
+        The arrays are created once and follow the buffer through
+        resizes like the other carrays."""
+        cdef int k
+        cdef np.npy_intp dims[2]
+
+        dims[0] = self.length
+        dims[1] = self.num_components
+        self._npy_array = PyArray_SimpleNewFromData(2, dims,
+                np.NPY_FLOAT64, self.data)
+
+        self._component_arrays = []
+        for k in range(self.num_components):
+            self._component_arrays.append(PyArray_SimpleNewFromData(1, dims,
+                np.NPY_FLOAT64, self.data))
+
+        self._update_npy_arrays()
+
+    cdef _update_npy_arrays(self):
+        """Point the numpy arrays at the current buffer, length and
+        strides in place so references to them stay valid."""
+        cdef int k
+        cdef PyArrayObject* arr
+        cdef np.npy_intp item_stride, component_stride
+
+        if self.soa:
+            item_stride = sizeof(np.float64_t)
+            component_stride = self.alloc*sizeof(np.float64_t)
+        else:
+            item_stride = self.num_components*sizeof(np.float64_t)
+            component_stride = sizeof(np.float64_t)
+
+        arr = <PyArrayObject*> self._npy_array
+        arr.data = <char*> self.data
+        arr.dimensions[0] = self.length
+        arr.strides[0] = item_stride
+        arr.strides[1] = component_stride
+        PyArray_UpdateFlags(arr, NPY_ARRAY_C_CONTIGUOUS | NPY_ARRAY_F_CONTIGUOUS)
+
+        for k in range(self.num_components):
+            arr = <PyArrayObject*> self._component_arrays[k]
+            arr.data = <char*> (self.data + self.offset(0, k))
+            arr.dimensions[0] = self.length
+            arr.strides[0] = item_stride
+            PyArray_UpdateFlags(arr, NPY_ARRAY_C_CONTIGUOUS | NPY_ARRAY_F_CONTIGUOUS)
+
+    cdef long offset(self, long pid, int k):
+        """Return the index in data of component k of item pid."""
+        if self.soa:
+            return k*self.alloc + pid
+        return pid*self.num_components + k
+
+    cdef _reallocate(self, long size):
+        """Move the data to a buffer holding size items. In soa layout
+        each component moves to its new offset."""
+        cdef int k
+        cdef void* data = NULL
+
+        # keep a valid buffer for empty arrays
+        cdef long n_bytes = max(size, 1)*self.num_components*sizeof(np.float64_t)
+
+        if not self.soa:
+            data = <np.float64_t*> stdlib.realloc(self.data, n_bytes)
+
+            if data == NULL:
+                stdlib.free(<void*> self.data)
+                raise MemoryError
+
+            self.data = <np.float64_t*> data
+            self.alloc = size
+            self._update_npy_arrays()
+            return
+
+        data = <np.float64_t*> stdlib.malloc(n_bytes)
+        if data == NULL:
+            raise MemoryError
+
+        for k in range(self.num_components):
+            string.memcpy(<void*> ((<np.float64_t*> data) + k*size),
+                    <void*> (self.data + k*self.alloc),
+                    min(self.length, size)*sizeof(np.float64_t))
+
+        stdlib.free(<void*> self.data)
+        self.data = <np.float64_t*> data
+        self.alloc = size
+
+        # component stride changed
+        self._update_npy_arrays()
+
+    cpdef str get_c_type(self):
+        """Return the c data type for this array."""
+        return 'np.float64'
+
+    cdef np.float64_t* get_data_ptr(self):
+        """Return the internal data pointer."""
+        return self.data
+
+    cdef np.float64_t* get_component_ptr(self, int k) except NULL:
+        """Return pointer to the contiguous values of component k,
+        only valid in soa layout."""
+        if not self.soa:
+            raise ValueError, 'components are only contiguous in soa layout'
+        if k < 0 or k >= self.num_components:
+            raise IndexError, 'component out of range'
+        return self.data + k*self.alloc
+
+    cpdef str get_layout(self):
+        """Return the layout of the components."""
+        return "soa" if self.soa else "aos"
+
+    cpdef np.ndarray get_component_array(self, int k):
+        """Return a numpy array of component k, the same array is
+        returned and kept valid across resizes."""
+        if k < 0 or k >= self.num_components:
+            raise IndexError, 'component out of range'
+        return self._component_arrays[k]
+
+    cpdef reserve(self, long size):
+        """Resizes the internal data to hold size items."""
+        if size > self.alloc:
+            self._reallocate(size)
+
+    cpdef resize(self, long size):
+        """
+        Resizes internal data to hold size items and sets the
+        length to the new size.
+        """
+        # reserve memory
+        self.reserve(size)
+
+        # update the lengths
+        self.length = size
+        self._update_npy_arrays()
+
+    cpdef reset(self):
+        """Reset the length of the array to 0."""
+        self.length = 0
+        self._update_npy_arrays()
+
+    cpdef shrink(self, long size):
+        """Reset the length of the array to length size."""
+        if size > self.length:
+            raise ValueError, 'shrink size is larger then array size'
+        self.length = size
+        self._update_npy_arrays()
+
+    cpdef squeeze(self):
+        """Release any unused memory."""
+        self._reallocate(self.length)
+
+    cpdef remove(self, np.ndarray index_list, bint input_sorted=0):
+        """
+        Remove the items with indices in index_list, all components
+        of an item are removed together.
+
+        Parameters
+        ----------
+        index_list : np.ndarray
+            Indices which should be removed.
+        input_sorted : bint
+            Indicates if the input is sorted in ascending order. If not
+            the array will be sorted internally.
+        """
+        cdef int i, k
+        cdef int inlength = index_list.size
+        cdef int nc = self.num_components
+        cdef np.ndarray sorted_indices
+        cdef int pid
+
+        if inlength > self.length:
+            return
+
+        if input_sorted != 1:
+            sorted_indices = np.sort(index_list)
+        else:
+            sorted_indices = index_list
+
+        for i in range(inlength):
+            pid = sorted_indices[inlength-(i+1)]
+            if pid < self.length:
+                if pid != self.length-1:
+                    for k in range(nc):
+                        self.data[self.offset(pid, k)] =\
+                                self.data[self.offset(self.length-1, k)]
+                self.length -= 1
+
+        self._update_npy_arrays()
+
+    cpdef extend(self, np.ndarray in_array):
+        """
+        Extend the array with data from in_array.
+
+        Parameters
+        ----------
+        in_array : ndarray
+            Array with data to be added to the current array, one row
+            per item.
+        """
+        cdef long old_length = self.length
+        cdef long length = in_array.size//self.num_components
+
+        self.resize(old_length + length)
+        self._npy_array[old_length:] = in_array.reshape(length, self.num_components)
+
+    cpdef align_array(self, np.ndarray new_indices):
+        """Rearrange the array contents according to the new indices."""
+        if new_indices.size != self.length:
+            raise ValueError, 'Unequal array lengths'
+
+        cdef int i, k
+        cdef int length = self.length
+        cdef int nc = self.num_components
+        cdef int n_bytes
+        cdef np.float64_t *temp
+
+        n_bytes = sizeof(np.float64_t)*self.alloc*nc
+        temp = <np.float64_t*> stdlib.malloc(n_bytes)
+
+        string.memcpy(<void*> temp, <void*> self.data, n_bytes)
+
+        # copy the data from the resized portion to the actual positions.
+        for i in range(length):
+            if i != new_indices[i]:
+                for k in range(nc):
+                    self.data[self.offset(i, k)] = temp[self.offset(new_indices[i], k)]
+
+        stdlib.free(<void*> temp)
+
+    cpdef copy_values(self, LongArray indices, BaseArray dest):
+        """
+        Copies values of indices in indices from self to dest.
+
+        no size check if performed, we assume the dest to of proper size
+        i.e. atleast as long as indices and with the same number of
+        components. The layouts of self and dest can differ.
+        """
+        cdef DoubleBlockArray dest_array = <DoubleBlockArray>dest
+        cdef int i, k, nc = self.num_components
+
+        for i in range(indices.length):
+            for k in range(nc):
+                dest_array.data[dest_array.offset(i, k)] =\
+                        self.data[self.offset(indices.data[i], k)]
+
+    cpdef paste_values(self, LongArray indices, BaseArray dest):
+        """
+        Copy values from self to dest, stored at indices. Note
+        indices has to be a subset of dest indices.
+        """
+        cdef DoubleBlockArray dest_array = <DoubleBlockArray>dest
+        cdef int i, k, nc = self.num_components
+
+        for i in range(indices.length):
+            for k in range(nc):
+                dest_array.data[dest_array.offset(indices.data[i], k)] =\
+                        self.data[self.offset(i, k)]
+
+    cpdef add_values(self, LongArray indices, BaseArray dest):
+        """
+        Add values from self to dest, stored at indices. Note
+        indices has to be a subset of dest indices.
+        """
+        cdef DoubleBlockArray dest_array = <DoubleBlockArray>dest
+        cdef int i, k, nc = self.num_components
+
+        for i in range(indices.length):
+            for k in range(nc):
+                dest_array.data[dest_array.offset(indices.data[i], k)] +=\
+                        self.data[self.offset(i, k)]
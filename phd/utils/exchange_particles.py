@@ -21,13 +21,15 @@ def exchange_particles(particles, send_data, send_particles, recv_particles, dis
     comm : object
         mpi controller
     fields : list
-        List of fields to export
+        List of fields to export, fields with more than one value per
+        particle are sent as one block and fields of a group are sent
+        with their group
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
 
     if fields != None:
-        export_fields = fields
+        export_fields = particles.resolve_carray_names(list(fields))
     else:
         export_fields = particles.carrays.keys()
 
@@ -50,12 +52,28 @@ def exchange_particles(particles, send_data, send_particles, recv_particles, dis
             if send_particles[recvTask] > 0 or recv_particles[recvTask] > 0:
                 for prop in export_fields:
 
-                    sendbuf=[send_data[prop],   (send_particles[recvTask], offset_se[recvTask])]
-                    recvbuf=[particles[prop][disp:], (recv_particles[recvTask],
-                        offset_re[recvTask])]
+                    # values per particle
+                    nc = int(np.prod(particles[prop].shape[1:]))
+
+                    # blocks stored component by component are strided
+                    send_buf = np.ascontiguousarray(send_data[prop])
+                    recv_buf = particles[prop][disp:]
+                    strided = not recv_buf.flags["C_CONTIGUOUS"]
+                    if strided:
+                        recv_buf = np.ascontiguousarray(recv_buf)
+
+                    sendbuf=[send_buf,   (nc*send_particles[recvTask], nc*offset_se[recvTask])]
+                    recvbuf=[recv_buf, (nc*recv_particles[recvTask],
+                        nc*offset_re[recvTask])]
 
                     comm.Sendrecv(sendbuf=sendbuf, dest=recvTask, recvbuf=recvbuf, source=recvTask)
 
+                    if strided:
+                        first = disp + offset_re[recvTask]
+                        last = first + recv_particles[recvTask]
+                        particles[prop][first:last] = recv_buf[offset_re[recvTask]:
+                                offset_re[recvTask] + recv_particles[recvTask]]
+
 
     # do we have particles to send to our own processor
     if send_particles[phd._rank] > 0:
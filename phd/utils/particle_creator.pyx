@@ -1,7 +1,7 @@
 from .particle_tags import ParticleTAGS
 from ..containers.containers cimport CarrayContainer
 
-def HydroParticleCreator(num=0, dim=2, parallel=False):
+def HydroParticleCreator(num=0, dim=2, parallel=False, num_passive=0):
 
     cdef dict carray_named_groups = {}
     cdef str axis, dimension = 'xyz'[:dim]
@@ -33,6 +33,12 @@ def HydroParticleCreator(num=0, dim=2, parallel=False):
 
     pc.register_carray(num, 'energy', 'double')
 
+    # passive scalars, mass fraction and mass of each
+    # species stored as one block per particle
+    if num_passive > 0:
+        pc.register_carray(num, 'passive-scalars', 'double[%d]' % num_passive)
+        pc.register_carray(num, 'passive-mass', 'double[%d]' % num_passive)
+
     # information for prallel runs
 #    if parallel:
 #
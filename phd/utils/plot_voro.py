@@ -7,7 +7,15 @@ from matplotlib.patches import Polygon
 import matplotlib.colors as mat_colors
 from matplotlib.collections import PatchCollection
 
-def vor_collection(pc, field):
+def vor_collection(pc, field, polygons=None):
+    """
+    Create voronoi patches of real particles colored by field. If
+    polygons, as returned by `Mesh.get_voronoi_polygons` or
+    `Hdf5.read_polygons`, are given they are used instead of
+    tessellating the particles.
+    """
+    if polygons is not None:
+        return polygon_collection(pc, field, *polygons)
 
     mesh = VoronoiMesh2D()
     mesh.tessellate(pc['position-x'], pc['position-y'])
@@ -46,6 +54,23 @@ def vor_collection(pc, field):
 
     return patch, colors
 
+def polygon_collection(pc, field, vertices, offsets, generators=None):
+    """
+    Create voronoi patches of real particles from polygons in flat
+    vertex and offset arrays, polygon i belongs to the i-th real
+    particle. Generators are the positions the polygons were built
+    from, not used to draw the patches.
+    """
+    real = np.where(pc['tag'] == ParticleTAGS.Real)[0]
+    if real.size != offsets.size - 1:
+        raise RuntimeError("ERROR: Polygons do not match real particles")
+
+    patch = [Polygon(vertices[offsets[i]:offsets[i+1]], True)
+            for i in range(real.size)]
+    colors = list(pc[field][real])
+
+    return patch, colors
+
 class VoronoiMesh2D(dict):
     """
     2d voronoi mesh class
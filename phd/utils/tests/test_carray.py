@@ -1,7 +1,7 @@
 import unittest
 import numpy as np
 
-from phd.utils.carray import IntArray, DoubleArray, LongArray, LongLongArray
+from phd.utils.carray import IntArray, DoubleArray, LongArray, LongLongArray, DoubleBlockArray
 
 class TestDoubleArray(unittest.TestCase):
     """Tests for the DoubleArray class."""
@@ -751,3 +751,149 @@ class TestLongLongArray(unittest.TestCase):
         lla1.paste_values(indices, lla2)
         for i in indices:
             self.assertTrue(lla2[i] == 2)
+
+class TestDoubleBlockArray(unittest.TestCase):
+    """Tests for the DoubleBlockArray class."""
+    def test_constructor(self):
+        """Test the constructor."""
+        dba = DoubleBlockArray(10, 3)
+
+        self.assertEqual(dba.length, 10)
+        self.assertEqual(dba.alloc, 10)
+        self.assertEqual(dba.num_components, 3)
+        self.assertEqual(dba.get_npy_array().shape, (10, 3))
+        self.assertEqual(dba.get_npy_array().dtype, np.float64)
+        self.assertTrue(dba.get_npy_array().flags["C_CONTIGUOUS"])
+
+        dba = DoubleBlockArray()
+
+        self.assertEqual(dba.length, 0)
+        self.assertEqual(dba.alloc, 16)
+        self.assertEqual(dba.get_npy_array().shape, (0, 1))
+
+    def test_resize(self):
+        """Tests the resize function keeps the values of each item."""
+        dba = DoubleBlockArray(4, 3)
+        dba.get_npy_array()[:] = np.arange(12, dtype=np.float64).reshape(4, 3)
+
+        dba.resize(40)
+        self.assertEqual(dba.length, 40)
+        self.assertEqual(dba.get_npy_array().shape, (40, 3))
+        self.assertTrue(np.array_equal(dba.get_npy_array()[:4],
+            np.arange(12, dtype=np.float64).reshape(4, 3)))
+
+        dba.shrink(2)
+        self.assertEqual(dba.get_npy_array().shape, (2, 3))
+
+    def test_extend(self):
+        """Tests the extend function."""
+        dba = DoubleBlockArray(2, 2)
+        dba.get_npy_array()[:] = [[0, 1], [2, 3]]
+
+        dba.extend(np.array([[4, 5], [6, 7]], dtype=np.float64))
+        self.assertTrue(np.array_equal(dba.get_npy_array(),
+            np.arange(8, dtype=np.float64).reshape(4, 2)))
+
+    def test_remove(self):
+        """Tests the remove function moves whole items."""
+        dba = DoubleBlockArray(5, 2)
+        dba.get_npy_array()[:] = np.arange(10, dtype=np.float64).reshape(5, 2)
+
+        dba.remove(np.array([3, 0], dtype=np.int))
+        self.assertEqual(dba.length, 3)
+        self.assertTrue(np.array_equal(dba.get_npy_array(),
+            np.array([[8, 9], [2, 3], [4, 5]], dtype=np.float64)))
+
+    def test_aling_array(self):
+        """Test the align_array function."""
+        dba = DoubleBlockArray(3, 2)
+        dba.get_npy_array()[:] = np.arange(6, dtype=np.float64).reshape(3, 2)
+
+        dba.align_array(np.array([2, 0, 1], dtype=np.int))
+        self.assertTrue(np.array_equal(dba.get_npy_array(),
+            np.array([[4, 5], [0, 1], [2, 3]], dtype=np.float64)))
+
+    def test_copy_paste_add_values(self):
+        """Tests the copy, paste and add values functions."""
+        dba1 = DoubleBlockArray(4, 3)
+        dba1.get_npy_array()[:] = np.arange(12, dtype=np.float64).reshape(4, 3)
+
+        indices = LongArray(2)
+        indices.get_npy_array()[:] = [3, 1]
+
+        dba2 = DoubleBlockArray(2, 3)
+        dba1.copy_values(indices, dba2)
+        self.assertTrue(np.array_equal(dba2.get_npy_array(),
+            dba1.get_npy_array()[[3, 1]]))
+
+        dba3 = DoubleBlockArray(4, 3)
+        dba3.get_npy_array()[:] = 0.
+        dba2.paste_values(indices, dba3)
+        self.assertTrue(np.array_equal(dba3.get_npy_array()[[3, 1]],
+            dba1.get_npy_array()[[3, 1]]))
+        self.assertTrue(np.all(dba3.get_npy_array()[[0, 2]] == 0.))
+
+        dba2.add_values(indices, dba3)
+        self.assertTrue(np.array_equal(dba3.get_npy_array()[[3, 1]],
+            2*dba1.get_npy_array()[[3, 1]]))
+
+    def test_soa_layout(self):
+        """Tests each component is contiguous in soa layout and values
+        are kept when the buffer grows."""
+        dba = DoubleBlockArray(4, 3, "soa")
+        self.assertEqual(dba.get_layout(), "soa")
+        self.assertEqual(dba.get_npy_array().shape, (4, 3))
+        self.assertTrue(dba.get_npy_array()[:, 1].flags["C_CONTIGUOUS"])
+
+        dba.get_npy_array()[:] = np.arange(12, dtype=np.float64).reshape(4, 3)
+        dba.resize(40)
+        self.assertEqual(dba.get_npy_array().shape, (40, 3))
+        self.assertTrue(np.array_equal(dba.get_npy_array()[:4],
+            np.arange(12, dtype=np.float64).reshape(4, 3)))
+
+        dba.resize(4)
+        dba.remove(np.array([0], dtype=np.int))
+        self.assertTrue(np.array_equal(dba.get_npy_array(),
+            np.array([[9, 10, 11], [3, 4, 5], [6, 7, 8]], dtype=np.float64)))
+
+        # copy between layouts
+        indices = LongArray(2)
+        indices.get_npy_array()[:] = [2, 0]
+        dba2 = DoubleBlockArray(2, 3, "aos")
+        dba.copy_values(indices, dba2)
+        self.assertTrue(np.array_equal(dba2.get_npy_array(),
+            dba.get_npy_array()[[2, 0]]))
+
+        self.assertRaises(ValueError, DoubleBlockArray, 2, 3, "csr")
+
+    def test_views_after_resize(self):
+        """Tests the block and component arrays stay valid when the
+        buffer is reallocated."""
+        for layout in ["aos", "soa"]:
+            dba = DoubleBlockArray(4, 3, layout)
+            block = dba.get_npy_array()
+            component = dba.get_component_array(1)
+            block[:] = np.arange(12, dtype=np.float64).reshape(4, 3)
+
+            dba.extend(np.arange(12, 120, dtype=np.float64))
+            self.assertTrue(block is dba.get_npy_array())
+            self.assertTrue(component is dba.get_component_array(1))
+            self.assertEqual(block.shape, (40, 3))
+            self.assertEqual(component.shape, (40,))
+            self.assertTrue(np.array_equal(block.ravel(),
+                np.arange(120, dtype=np.float64)))
+            self.assertTrue(np.array_equal(component,
+                np.arange(1, 120, 3, dtype=np.float64)))
+
+            # writes go to the new buffer
+            component[:] = -1.
+            self.assertTrue(np.all(dba.get_npy_array()[:, 1] == -1.))
+
+            dba.squeeze()
+            dba.shrink(2)
+            self.assertEqual(component.shape, (2,))
+            self.assertTrue(np.array_equal(block,
+                np.array([[0, -1, 2], [3, -1, 5]], dtype=np.float64)))
+
+        self.assertTrue(dba.get_component_array(0).flags["C_CONTIGUOUS"])
+        self.assertRaises(IndexError, dba.get_component_array, 3)
@@ -29,11 +29,14 @@ subdirs = [
 #cpp = ("mesh", "boundary", "reconstruction", "riemann", "integrate", "gravity")
 cpp = ("mesh", "domain", "reconstruction", "riemann", "gravity", "load_balance", "source_term")
 
+# modules with threaded kernels
+openmp = ("mesh", "riemann")
+
 extensions = []
 for subdir in subdirs:
     sources = [os.path.join(subdir, "*.pyx")]
     if "mesh" in subdir:
-        sources += ["phd/mesh/tess.cpp", "phd/mesh/tess3.cpp"]
+        sources += ["phd/mesh/tess1.cpp", "phd/mesh/tess.cpp", "phd/mesh/tess3.cpp"]
     if "domain" in subdir:
         sources += ["phd/domain/particle.cpp"]
     extensions.append(
@@ -43,6 +46,13 @@ for subdir in subdirs:
                 define_macros=[("CGAL_NDEBUG",1)],
             )
     )
+    if "mesh" in subdir and os.environ.get("PHD_USE_TBB"):
+        # concurrent 3d tessellation
+        extensions[-1].libraries += ["tbb"]
+        extensions[-1].define_macros += [("CGAL_LINKED_WITH_TBB", 1)]
+    if any(_ in subdir for _ in openmp):
+        extensions[-1].extra_compile_args = ["-fopenmp"]
+        extensions[-1].extra_link_args = ["-fopenmp"]
     if any(_ in subdir for _ in cpp):
         extensions[-1].language = "c++"
 
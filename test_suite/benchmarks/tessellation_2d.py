@@ -0,0 +1,53 @@
+import phd
+import time
+import numpy as np
+
+# to run:
+# $ python tessellation_2d.py
+# single core only, times the 2d tessellation of random particles
+# inserted one at a time in their order and along a hilbert curve.
+# Geometry extraction is not timed, ghost particles only cover the
+# boundary so real particle insertion dominates
+
+def create_particles(n):
+
+    # create particle container
+    particles = phd.HydroParticleCreator(n, dim=2)
+
+    np.random.seed(0)
+    particles["position-x"][:] = np.random.rand(n)
+    particles["position-y"][:] = np.random.rand(n)
+    particles["ids"][:] = np.arange(n)
+
+    return particles
+
+def tessellation_time(n, spatial_sort):
+
+    particles = create_particles(n)
+
+    # computation related to boundaries
+    domain_manager = phd.DomainManager(
+            xmin=[0., 0.], xmax=[1., 1.],
+            initial_radius=0.1)
+    domain_manager.set_boundary_condition(phd.Periodic())
+    domain_manager.register_fields(particles)
+    domain_manager.initialize()
+
+    # create voronoi mesh
+    mesh = phd.Mesh(spatial_sort=spatial_sort)
+    mesh.register_fields(particles)
+    mesh.initialize()
+
+    # first build sets the radius used for ghost creation
+    # so the timed tessellation completes in one pass
+    mesh.build_geometry(particles, domain_manager)
+
+    start = time.time()
+    mesh.tessellate(particles, domain_manager)
+    return time.time() - start
+
+print "%10s %14s %14s %10s" % ("n", "unsorted (s)", "sorted (s)", "speedup")
+for n in [10**5, 10**6, 10**7]:
+    unsorted = tessellation_time(n, False)
+    hilbert = tessellation_time(n, True)
+    print "%10d %14.3f %14.3f %10.2f" % (n, unsorted, hilbert, unsorted/hilbert)
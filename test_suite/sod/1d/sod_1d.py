@@ -0,0 +1,62 @@
+import phd
+import numpy as np
+
+# to run:
+# $ python sod_1d.py
+# for single core, 1d runs are serial only
+
+def create_particles(dim=1, n=200, diaphragm=0.5, gamma=1.4):
+
+    # create particle container
+    particles = phd.HydroParticleCreator(n, dim=1)
+    for i in range(n):
+        particles["position-x"][i] = (i + 0.5)/n
+        particles["ids"][i] = i
+
+    # set ambient values
+    particles["density"][:]  = 1.0
+    particles["pressure"][:] = 1.0
+    particles["velocity-x"][:] = 0.0
+
+    cells = particles["position-x"] > diaphragm
+    particles["density"][cells] = 0.125
+    particles["pressure"][cells] = 0.1
+
+    return particles
+
+dim = 1; gamma = 1.4
+particles = create_particles(dim=dim, gamma=gamma)
+
+# computation related to boundaries
+domain_manager = phd.DomainManager(
+        xmin=[0.], xmax=[1.],
+        initial_radius=0.1)
+
+# create voronoi mesh
+mesh = phd.Mesh()
+
+# computation
+integrator = phd.MovingMeshMUSCLHancock()
+integrator.set_mesh(mesh)
+integrator.set_particles(particles)
+integrator.set_riemann(phd.HLLC())
+integrator.set_domain_manager(domain_manager)
+integrator.set_boundary_condition(phd.Reflective())
+integrator.set_reconstruction(phd.PieceWiseLinear())
+integrator.set_equation_state(phd.IdealGas(gamma=gamma))
+
+# add finish criteria
+simulation_time_manager = phd.SimulationTimeManager()
+simulation_time_manager.add_finish(phd.Time(time_max=0.15))
+
+# output last step
+output = phd.FinalOutput()
+output.set_writer(phd.Hdf5())
+simulation_time_manager.add_output(output)
+
+# Create simulator
+simulation = phd.Simulation(simulation_name="sod")
+simulation.set_integrator(integrator)
+simulation.set_simulation_time_manager(simulation_time_manager)
+simulation.initialize()
+simulation.solve()
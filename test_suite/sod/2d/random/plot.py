@@ -20,7 +20,9 @@ f.close()
 fig, axes = plt.subplots(2,2, figsize=(12,12))
 plt.suptitle("Sod Simulation")
 
-patch, colors = phd.vor_collection(sod, "density")
+# polygons stored in snapshot, no tessellation needed
+polygons = reader.read_polygons(file_name)
+patch, colors = phd.vor_collection(sod, "density", polygons)
 sod.remove_tagged_particles(phd.ParticleTAGS.Ghost)
 
 p = PatchCollection(patch, edgecolor="black", linewidth=0.3, alpha=0.8)
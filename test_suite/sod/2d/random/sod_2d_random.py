@@ -62,7 +62,7 @@ simulation_time_manager.add_finish(phd.Time(time_max=0.15))
 
 # output last step
 output = phd.FinalOutput()
-output.set_writer(phd.Hdf5())
+output.set_writer(phd.Hdf5(write_polygons=True))
 simulation_time_manager.add_output(output)
 
 # Create simulator